@@ -6,6 +6,7 @@ cdef class Cartesian(object):
         str __name
         double[:] __origin
         list __labels
+        unsigned long long __version
 
     cpdef rotate(self, Rotation rotation, double[:] rot_center=*)
     cpdef rotate_axis_angle(self, double[:] axis, double theta, double[:] rot_center=*)
@@ -14,3 +15,6 @@ cdef class Cartesian(object):
     cpdef double[:, :] to_parent(self, double[:, :] xyz)
     cpdef double[:] to_local_vector(self, double[:] xyz)
     cpdef double[:, :] to_local(self, double[:, :] xyz)
+
+
+cdef unsigned long long coordinate_systems_changes()
@@ -11,6 +11,30 @@ from BDQuaternions cimport Rotation, EulerAngles
 from .transforms cimport unit_vector
 
 
+cdef unsigned long long _last_version = 0
+cdef unsigned long long _last_change = 0
+
+
+cdef unsigned long long _next_version():
+    global _last_version
+    _last_version += 1
+    return _last_version
+
+
+cdef unsigned long long _changed_version():
+    global _last_change
+    _last_change += 1
+    return _next_version()
+
+
+cdef unsigned long long coordinate_systems_changes():
+    """
+    Number of changes made to coordinate systems after their creation.
+    Temporary coordinate systems created by transformations do not count.
+    """
+    return _last_change
+
+
 cdef class Cartesian(object):
     """
     3D cartesian coordinate system
@@ -20,6 +44,7 @@ cdef class Cartesian(object):
                  euler_angles_convention=None):
         # The basis rotation is kept as Rotation quaternion
         self.__rotation = Rotation()
+        self.__version = _next_version()
         self.euler_angles_convention = euler_angles_convention
         self.__name = str(name)
         self.labels = labels
@@ -54,6 +79,14 @@ cdef class Cartesian(object):
         else:
             raise ValueError('Labels must be iterable of size 3')
 
+    @property
+    def version(self):
+        """
+        Unique version number of the coordinate system state, it is renewed by every change of basis or origin.
+        In-place modification of the origin array is not tracked.
+        """
+        return self.__version
+
     @property
     def euler_angles_convention(self):
         return self.__rotation.euler_angles_convention
@@ -69,6 +102,7 @@ cdef class Cartesian(object):
     @euler_angles.setter
     def euler_angles(self, euler_angles):
         self.__rotation.euler_angles = euler_angles
+        self.__version = _changed_version()
 
     @property
     def basis(self):
@@ -95,6 +129,7 @@ cdef class Cartesian(object):
             if not np.allclose(np.cross(basis[0], basis[1]), basis[2]):
                 raise ValueError('only right-hand basis accepted')
             self.__rotation.rotation_matrix = basis.T
+            self.__version = _changed_version()
         else:
             raise ValueError('complete 3D basis is needed')
 
@@ -111,6 +146,18 @@ cdef class Cartesian(object):
             if origin.size != 3:
                 raise ValueError('Origin must be 3 numeric coordinates')
             self.__origin = origin
+        self.__version = _changed_version()
+
+    def __reduce__(self):
+        # the rotation is shipped as quaternion to restore the basis exactly
+        return (Cartesian, (None, np.array(self.__origin), self.__name, self.__labels, self.euler_angles_convention),
+                np.array(self.__rotation.quadruple))
+
+    def __setstate__(self, quadruple):
+        euler_angles_convention = self.__rotation.euler_angles_convention
+        self.__rotation = Rotation(np.asarray(quadruple, dtype=np.double))
+        self.__rotation.euler_angles_convention = euler_angles_convention
+        self.__version = _changed_version()
 
     def __richcmp__(x, y, int op):
         if op == Py_EQ:
@@ -155,6 +202,7 @@ cdef class Cartesian(object):
             origin_shift = rotation.rotate_vector(origin_shift)
             for i in range(3):
                 self.__origin[i] = rot_center[i] + origin_shift[i]
+        self.__version = _changed_version()
 
     cpdef rotate_axis_angle(self, double[:] axis, double theta, double[:] rot_center=None):
         """
@@ -0,0 +1,26 @@
+from BDSpace.Curve.Parametric cimport ParametricCurve
+
+
+cdef class CurveBVH(object):
+    cdef:
+        ParametricCurve __curve
+        double[:] __t
+        double[:, :] __points
+        double[:] __sag
+        double[:, :] __box_min
+        double[:, :] __box_max
+        int[:] __left
+        int[:] __right
+        int[:] __first
+        int[:] __last
+        int __leaves
+
+    cdef int __build_node(self, int node, int first, int last) nogil
+    cpdef double[:, :] bounding_box(self)
+    cpdef tuple leaf_pairs(self, CurveBVH other, double distance, bint nearest=*)
+
+
+cdef double segments_distance(double* p1, double* p2, double* q1, double* q2, double* s, double* u) nogil
+cpdef tuple min_distance(curve_a, curve_b, unsigned int max_iterations=*)
+cpdef tuple intersections(curve_a, curve_b, double tolerance=*, unsigned int max_iterations=*)
+cpdef list pairwise_clearance(curves, double clearance)
@@ -0,0 +1,408 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from libc.math cimport sqrt, fmax, fmin, INFINITY
+from libc.stdlib cimport malloc, realloc, free
+
+from BDSpace.Space cimport Space
+from BDSpace.Curve.Parametric cimport ParametricCurve
+
+
+cdef class CurveBVH(object):
+    """
+    Bounding volume hierarchy of axis aligned boxes in global coordinate system
+    built over the parameter intervals of the curve mesh_tree.
+    Each leaf box contains a segment of the curve between two neighbouring nodes of the curve
+    length table. The box is inflated by the maximal possible deviation of the curve from the chord
+    of the segment, which is known from the segment length, so the hierarchy is conservative.
+    The hierarchy is a snapshot, it has to be rebuilt if the curve or its coordinate systems are changed.
+    """
+
+    @boundscheck(False)
+    @wraparound(False)
+    def __init__(self, ParametricCurve curve):
+        cdef:
+            int i, n
+            double chord, length
+            double[:] s
+        self.__curve = curve
+        t, s_table = curve.length_table
+        self.__t = np.ascontiguousarray(t, dtype=np.double)
+        s = s_table
+        self.__points = np.ascontiguousarray(curve.to_global_coordinate_system(curve.generate_points(self.__t)),
+                                             dtype=np.double)
+        n = self.__t.shape[0] - 1
+        if n < 1:
+            raise ValueError('Curve has to have at least two nodes')
+        self.__leaves = n
+        self.__sag = np.empty(n, dtype=np.double)
+        self.__box_min = np.empty((2 * n - 1, 3), dtype=np.double)
+        self.__box_max = np.empty((2 * n - 1, 3), dtype=np.double)
+        self.__left = np.empty(2 * n - 1, dtype=np.intc)
+        self.__right = np.empty(2 * n - 1, dtype=np.intc)
+        self.__first = np.empty(2 * n - 1, dtype=np.intc)
+        self.__last = np.empty(2 * n - 1, dtype=np.intc)
+        with nogil:
+            for i in prange(n):
+                chord = sqrt((self.__points[i + 1, 0] - self.__points[i, 0]) ** 2
+                             + (self.__points[i + 1, 1] - self.__points[i, 1]) ** 2
+                             + (self.__points[i + 1, 2] - self.__points[i, 2]) ** 2)
+                length = fmax(s[i + 1] - s[i], chord) * (1.0 + curve.__precision)
+                self.__sag[i] = sqrt(length * length - chord * chord) / 2
+            self.__build_node(0, 0, n)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __build_node(self, int node, int first, int last) nogil:
+        cdef:
+            int j, mid, next_node
+        self.__first[node] = first
+        self.__last[node] = last
+        if last - first == 1:
+            self.__left[node] = -1
+            self.__right[node] = -1
+            for j in range(3):
+                self.__box_min[node, j] = fmin(self.__points[first, j], self.__points[last, j]) - self.__sag[first]
+                self.__box_max[node, j] = fmax(self.__points[first, j], self.__points[last, j]) + self.__sag[first]
+            return node + 1
+        mid = (first + last) // 2
+        self.__left[node] = node + 1
+        next_node = self.__build_node(node + 1, first, mid)
+        self.__right[node] = next_node
+        next_node = self.__build_node(next_node, mid, last)
+        for j in range(3):
+            self.__box_min[node, j] = fmin(self.__box_min[node + 1, j], self.__box_min[self.__right[node], j])
+            self.__box_max[node, j] = fmax(self.__box_max[node + 1, j], self.__box_max[self.__right[node], j])
+        return next_node
+
+    @property
+    def curve(self):
+        return self.__curve
+
+    @property
+    def t(self):
+        return np.asarray(self.__t)
+
+    @property
+    def leaves(self):
+        return self.__leaves
+
+    cpdef double[:, :] bounding_box(self):
+        """
+        Bounding box of the whole curve in global coordinate system
+        :return: array [[x_min, y_min, z_min], [x_max, y_max, z_max]]
+        """
+        return np.array([self.__box_min[0], self.__box_max[0]], dtype=np.double)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef tuple leaf_pairs(self, CurveBVH other, double distance, bint nearest=False):
+        """
+        Traverses the pair of hierarchies and finds the pairs of leaf segments which could be closer
+        to each other than given distance.
+        In nearest mode the distance is used only as initial upper bound and is tightened during
+        the traversal, so only the leaf pairs which could contain the closest points of the curves are returned.
+        :param other: CurveBVH of the second curve
+        :param distance: distance threshold
+        :param nearest: if True run branch and bound search of the closest segments
+        :return: tuple of arrays (i, j, chord_distance, s, u), where i and j are leaf indices,
+        s and u are the positions of the closest points on the chords in the range [0, 1]
+        """
+        cdef:
+            double[:, :] a_min = self.__box_min, a_max = self.__box_max
+            double[:, :] b_min = other.__box_min, b_max = other.__box_max
+            double[:, :] a_p = self.__points, b_p = other.__points
+            double[:] a_sag = self.__sag, b_sag = other.__sag
+            int[:] a_l = self.__left, a_r = self.__right, a_first = self.__first, a_last = self.__last
+            int[:] b_l = other.__left, b_r = other.__right, b_first = other.__first, b_last = other.__last
+            int stack_size = 0, stack_capacity = 256, found = 0, found_capacity = 256, k, m, a, b, i, j
+            int* stack = <int*> malloc(2 * stack_capacity * sizeof(int))
+            int* found_ij = <int*> malloc(2 * found_capacity * sizeof(int))
+            double* found_d = <double*> malloc(4 * found_capacity * sizeof(double))
+            int* new_ij
+            int* new_stack
+            double* new_d
+            double bound = distance, d, gap, c, s, u
+            bint failed = False
+        if stack == NULL or found_ij == NULL or found_d == NULL:
+            free(stack)
+            free(found_ij)
+            free(found_d)
+            raise MemoryError()
+        with nogil:
+            stack[0] = 0
+            stack[1] = 0
+            stack_size = 1
+            while stack_size > 0:
+                stack_size -= 1
+                a = stack[2 * stack_size]
+                b = stack[2 * stack_size + 1]
+                d = 0.0
+                for k in range(3):
+                    gap = fmax(0.0, fmax(a_min[a, k] - b_max[b, k], b_min[b, k] - a_max[a, k]))
+                    d += gap * gap
+                if sqrt(d) > bound:
+                    continue
+                if a_l[a] < 0 and b_l[b] < 0:
+                    i = a_first[a]
+                    j = b_first[b]
+                    c = segments_distance(&a_p[i, 0], &a_p[i + 1, 0], &b_p[j, 0], &b_p[j + 1, 0], &s, &u)
+                    if c - a_sag[i] - b_sag[j] > bound:
+                        continue
+                    if nearest and c + a_sag[i] + b_sag[j] < bound:
+                        bound = c + a_sag[i] + b_sag[j]
+                    if found == found_capacity:
+                        found_capacity *= 2
+                        new_ij = <int*> realloc(found_ij, 2 * found_capacity * sizeof(int))
+                        if new_ij != NULL:
+                            found_ij = new_ij
+                        new_d = <double*> realloc(found_d, 4 * found_capacity * sizeof(double))
+                        if new_d != NULL:
+                            found_d = new_d
+                        if new_ij == NULL or new_d == NULL:
+                            failed = True
+                            break
+                    found_ij[2 * found] = i
+                    found_ij[2 * found + 1] = j
+                    found_d[4 * found] = c
+                    found_d[4 * found + 1] = s
+                    found_d[4 * found + 2] = u
+                    found_d[4 * found + 3] = c - a_sag[i] - b_sag[j]
+                    found += 1
+                    continue
+                if stack_size + 2 > stack_capacity:
+                    stack_capacity *= 2
+                    new_stack = <int*> realloc(stack, 2 * stack_capacity * sizeof(int))
+                    if new_stack == NULL:
+                        failed = True
+                        break
+                    stack = new_stack
+                if b_l[b] < 0 or (a_l[a] >= 0 and a_last[a] - a_first[a] >= b_last[b] - b_first[b]):
+                    stack[2 * stack_size] = a_r[a]
+                    stack[2 * stack_size + 1] = b
+                    stack[2 * stack_size + 2] = a_l[a]
+                    stack[2 * stack_size + 3] = b
+                else:
+                    stack[2 * stack_size] = a
+                    stack[2 * stack_size + 1] = b_r[b]
+                    stack[2 * stack_size + 2] = a
+                    stack[2 * stack_size + 3] = b_l[b]
+                stack_size += 2
+        if failed:
+            # buffers which could not grow are still valid and owned by us
+            free(stack)
+            free(found_ij)
+            free(found_d)
+            raise MemoryError()
+        m = 0
+        for k in range(found):
+            if found_d[4 * k + 3] <= bound:
+                m += 1
+        result_i = np.empty(m, dtype=np.intc)
+        result_j = np.empty(m, dtype=np.intc)
+        result_d = np.empty(m, dtype=np.double)
+        result_s = np.empty(m, dtype=np.double)
+        result_u = np.empty(m, dtype=np.double)
+        m = 0
+        for k in range(found):
+            if found_d[4 * k + 3] <= bound:
+                result_i[m] = found_ij[2 * k]
+                result_j[m] = found_ij[2 * k + 1]
+                result_d[m] = found_d[4 * k]
+                result_s[m] = found_d[4 * k + 1]
+                result_u[m] = found_d[4 * k + 2]
+                m += 1
+        free(stack)
+        free(found_ij)
+        free(found_d)
+        return result_i, result_j, result_d, result_s, result_u
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef double segments_distance(double* p1, double* p2, double* q1, double* q2, double* s, double* u) nogil:
+    """
+    Distance between two segments [p1, p2] and [q1, q2].
+    Positions of the closest points on the segments are returned in s and u.
+    """
+    cdef:
+        int k
+        double d1[3]
+        double d2[3]
+        double r[3]
+        double a = 0.0, e = 0.0, f = 0.0, c = 0.0, b = 0.0, denominator, dist = 0.0, x
+    for k in range(3):
+        d1[k] = p2[k] - p1[k]
+        d2[k] = q2[k] - q1[k]
+        r[k] = p1[k] - q1[k]
+        a += d1[k] * d1[k]
+        e += d2[k] * d2[k]
+        f += d2[k] * r[k]
+        c += d1[k] * r[k]
+        b += d1[k] * d2[k]
+    if a <= 0 and e <= 0:
+        s[0] = 0.0
+        u[0] = 0.0
+    elif a <= 0:
+        s[0] = 0.0
+        u[0] = fmin(fmax(f / e, 0.0), 1.0)
+    elif e <= 0:
+        u[0] = 0.0
+        s[0] = fmin(fmax(-c / a, 0.0), 1.0)
+    else:
+        denominator = a * e - b * b
+        if denominator > 0:
+            s[0] = fmin(fmax((b * f - c * e) / denominator, 0.0), 1.0)
+        else:
+            s[0] = 0.0
+        u[0] = (b * s[0] + f) / e
+        if u[0] < 0:
+            u[0] = 0.0
+            s[0] = fmin(fmax(-c / a, 0.0), 1.0)
+        elif u[0] > 1:
+            u[0] = 1.0
+            s[0] = fmin(fmax((b - c) / a, 0.0), 1.0)
+    for k in range(3):
+        x = r[k] + d1[k] * s[0] - d2[k] * u[0]
+        dist += x * x
+    return sqrt(dist)
+
+
+cdef CurveBVH _as_bvh(curve):
+    if isinstance(curve, CurveBVH):
+        return curve
+    elif isinstance(curve, ParametricCurve):
+        return CurveBVH(curve)
+    raise ValueError('ParametricCurve or CurveBVH expected')
+
+
+cdef tuple _refine(CurveBVH a, CurveBVH b, long[:] i, long[:] j, double[:] s, double[:] u,
+                   unsigned int max_iterations):
+    """
+    Refines the closest points of two curves starting from the closest points of the chord pairs
+    by alternating projection of the points of one curve to the other.
+    """
+    cdef:
+        ParametricCurve curve_a = a.__curve, curve_b = b.__curve
+        unsigned int iteration = 0
+    t_a = np.asarray(a.__t)[i] + np.asarray(s) * (np.asarray(a.__t)[np.asarray(i) + 1] - np.asarray(a.__t)[i])
+    t_b = np.asarray(b.__t)[j] + np.asarray(u) * (np.asarray(b.__t)[np.asarray(j) + 1] - np.asarray(b.__t)[j])
+    distance = np.zeros(t_a.size, dtype=np.double)
+    if t_a.size == 0:
+        return t_a, t_b, distance
+    p_b = curve_b.to_global_coordinate_system(curve_b.generate_points(t_b))
+    while iteration < max_iterations:
+        iteration += 1
+        t_a, _ = curve_a.closest_points(p_b)
+        t_a = np.asarray(t_a)
+        p_a = curve_a.to_global_coordinate_system(curve_a.generate_points(t_a))
+        t_b_new, distance = curve_b.closest_points(p_a)
+        t_b_new = np.asarray(t_b_new)
+        distance = np.asarray(distance)
+        p_b = curve_b.to_global_coordinate_system(curve_b.generate_points(t_b_new))
+        if np.max(np.abs(t_b_new - t_b)) < 1.0e-12:
+            t_b = t_b_new
+            break
+        t_b = t_b_new
+    return t_a, t_b, distance
+
+
+cpdef tuple min_distance(curve_a, curve_b, unsigned int max_iterations=100):
+    """
+    Minimal distance between two curves
+    :param curve_a: ParametricCurve or its CurveBVH
+    :param curve_b: ParametricCurve or its CurveBVH
+    :param max_iterations: max number of alternating projection iterations
+    :return: tuple (distance, t_a, t_b)
+    """
+    cdef:
+        CurveBVH a = _as_bvh(curve_a), b = _as_bvh(curve_b)
+    i, j, c, s, u = a.leaf_pairs(b, INFINITY, nearest=True)
+    t_a, t_b, distance = _refine(a, b, i.astype(np.int_), j.astype(np.int_), s, u, max_iterations)
+    k = np.argmin(distance)
+    return distance[k], t_a[k], t_b[k]
+
+
+cpdef tuple intersections(curve_a, curve_b, double tolerance=1.0e-6, unsigned int max_iterations=100):
+    """
+    Finds intersection points of two curves
+    :param curve_a: ParametricCurve or its CurveBVH
+    :param curve_b: ParametricCurve or its CurveBVH
+    :param tolerance: max distance between the curves to count as intersection
+    :param max_iterations: max number of alternating projection iterations
+    :return: tuple of arrays (t_a, t_b, distance) sorted by t_a
+    """
+    cdef:
+        CurveBVH a = _as_bvh(curve_a), b = _as_bvh(curve_b)
+        int k, last
+    i, j, c, s, u = a.leaf_pairs(b, tolerance, nearest=False)
+    t_a, t_b, distance = _refine(a, b, i.astype(np.int_), j.astype(np.int_), s, u, max_iterations)
+    mask = distance <= tolerance
+    t_a = t_a[mask]
+    t_b = t_b[mask]
+    distance = distance[mask]
+    order = np.argsort(t_a)
+    t_a = t_a[order]
+    t_b = t_b[order]
+    distance = distance[order]
+    if t_a.size == 0:
+        return t_a, t_b, distance
+    points = np.asarray(a.__curve.to_global_coordinate_system(a.__curve.generate_points(t_a)))
+    keep = [0]
+    for k in range(1, t_a.size):
+        last = keep[-1]
+        if np.sqrt(np.sum((points[k] - points[last]) ** 2)) > tolerance:
+            keep.append(k)
+        elif distance[k] < distance[last]:
+            keep[-1] = k
+    return t_a[keep], t_b[keep], distance[keep]
+
+
+def _collect_curves(Space space):
+    curves = []
+    if isinstance(space, ParametricCurve):
+        curves.append(space)
+    for key in space.elements.keys():
+        curves += _collect_curves(space.elements[key])
+    return curves
+
+
+cpdef list pairwise_clearance(curves, double clearance):
+    """
+    Finds all pairs of curves which are closer to each other than given clearance.
+    Pairs are pruned by global bounding boxes of the curves (sweep and prune along x axis)
+    and then by the curves hierarchies.
+    :param curves: iterable of ParametricCurve or CurveBVH objects or the root Space of the scene
+    :param clearance: distance threshold
+    :return: list of tuples (curve_a, curve_b, distance, t_a, t_b)
+    """
+    cdef:
+        int k, m, n
+        CurveBVH a, b
+        list result = []
+    if isinstance(curves, Space) and not isinstance(curves, ParametricCurve):
+        curves = _collect_curves(curves)
+    bvh = [_as_bvh(curve) for curve in curves]
+    n = len(bvh)
+    boxes = np.array([np.asarray(item.bounding_box()) for item in bvh]).reshape((n, 2, 3))
+    order = np.argsort(boxes[:, 0, 0])
+    for k in range(n):
+        a = bvh[order[k]]
+        for m in range(k + 1, n):
+            b = bvh[order[m]]
+            if boxes[order[m], 0, 0] - boxes[order[k], 1, 0] > clearance:
+                break
+            gap = np.maximum(0.0, np.maximum(boxes[order[k], 0] - boxes[order[m], 1],
+                                             boxes[order[m], 0] - boxes[order[k], 1]))
+            if np.sqrt(np.sum(gap ** 2)) > clearance:
+                continue
+            i, j, c, s, u = a.leaf_pairs(b, clearance, nearest=True)
+            if i.size == 0:
+                continue
+            t_a, t_b, distance = _refine(a, b, i.astype(np.int_), j.astype(np.int_), s, u, 100)
+            idx = np.argmin(distance)
+            if distance[idx] <= clearance:
+                result.append((a.__curve, b.__curve, distance[idx], t_a[idx], t_b[idx]))
+    return result
@@ -9,6 +9,12 @@ cdef class ParametricCurve(Space):
         double __stop
         double __dt
         double __precision
+        double[:] __length_table_t
+        double[:] __length_table_s
+        double[:] __length_table_dt_ds
+        object __points_index
+        TreeMesh1DUniform __cached_mesh_tree
+        unsigned int __cached_mesh_tree_iterations
     cdef double __x_point(self, double t) nogil
     cdef double __y_point(self, double t) nogil
     cdef double __z_point(self, double t) nogil
@@ -29,6 +35,11 @@ cdef class ParametricCurve(Space):
     cpdef double[:] tangent_y(self, double[:] t)
     cpdef double[:] tangent_z(self, double[:] t)
     cpdef double[:, :] tangent(self, double[:] t)
+    cdef double __derivative_x_point(self, double t, int order) nogil
+    cdef double __derivative_y_point(self, double t, int order) nogil
+    cdef double __derivative_z_point(self, double t, int order) nogil
+    cpdef double[:, :] derivative(self, double[:] t, int order=*)
+    cpdef tuple frenet_frame(self, double[:] t)
     cdef double __length_tangent_array(self, double[:] t)
     cdef double __length_poly_array(self, double[:] t)
     cdef double __length_tangent_mesh(self, Mesh1DUniform mesh)
@@ -36,6 +47,12 @@ cdef class ParametricCurve(Space):
     cpdef TreeMesh1DUniform mesh_tree(self, unsigned int max_iterations=*)
     cpdef double distance_to_point_square(self, double t, double[:] xyz)
     cpdef double distance_to_point(self, double t, double[:] xyz)
+    cpdef void invalidate_cache(self)
+    cpdef void build_length_table(self, unsigned int max_iterations=*)
+    cdef double __t_at_length_point(self, double s) nogil
+    cpdef double[:] t_at_length(self, double[:] s)
+    cpdef double[:, :] generate_points_uniform(self, int num)
+    cpdef tuple closest_points(self, double[:, :] xyz, unsigned int max_iterations=*, double tolerance=*)
 
 
 cdef class Line(ParametricCurve):
@@ -60,3 +77,54 @@ cdef class Helix(ParametricCurve):
         double __radius
         double __pitch
         short __direction
+
+
+cdef class PolylineCurve(ParametricCurve):
+    cdef:
+        double[:, ::1] __points
+        double[::1] __lengths
+        int __num
+    cdef void __set_points(self, points) except *
+    cdef int __segment(self, double t) nogil
+    cdef double __coordinate(self, double t, int axis) nogil
+    cdef double __direction(self, double t, int axis) nogil
+
+
+cdef class CubicSplineCurve(ParametricCurve):
+    cdef:
+        double[:, ::1] __points
+        double[::1] __knots
+        double[:, :, ::1] __coefficients
+        int __num
+        str __boundary
+    cdef void __set_points(self, points, knots) except *
+    cdef int __segment(self, double t) nogil
+    cdef double __polynomial(self, double t, int axis, int order) nogil
+
+
+cdef class VectorizedParametricCurve(ParametricCurve):
+    cdef:
+        object __x_function
+        object __y_function
+        object __z_function
+        object __dx_function
+        object __dy_function
+        object __dz_function
+
+    cdef double __component(self, double t, int order, int axis)
+
+
+cdef class CompositeCurve(ParametricCurve):
+    cdef:
+        list __curves
+        double[::1] __offsets
+        double[::1] __starts
+        double[::1] __signs
+        double[:, :, ::1] __bases
+        double[:, ::1] __origins
+        tuple __pieces_state
+    cdef void __update(self) except *
+    cdef int __piece(self, double t) nogil
+    cpdef void build_length_table(self, unsigned int max_iterations=*)
+    cpdef TreeMesh1DUniform mesh_tree(self, unsigned int max_iterations=*)
+    cpdef tuple locate(self, double[:] t)
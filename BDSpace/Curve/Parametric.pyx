@@ -1,10 +1,12 @@
 import numpy as np
+from scipy.spatial import cKDTree
+from scipy.interpolate import CubicSpline
 
 from cython import boundscheck, wraparound
 from cython.parallel import prange
 
 from cpython.array cimport array, clone
-from libc.math cimport sin, cos, sqrt, M_PI, fabs
+from libc.math cimport sin, cos, sqrt, M_PI, fabs, fmax
 from BDMesh.Mesh1D cimport Mesh1D
 from BDMesh.Mesh1DUniform cimport Mesh1DUniform
 from BDMesh.TreeMesh1DUniform cimport TreeMesh1DUniform
@@ -23,6 +25,7 @@ cdef class ParametricCurve(Space):
         self.__stop = stop
         self.__dt = 1.0e-10
         self.__precision = 1.0e-6
+        self.invalidate_cache()
 
     cdef double __x_point(self, double t) nogil:
         return 0.0
@@ -85,6 +88,7 @@ cdef class ParametricCurve(Space):
     @start.setter
     def start(self, double start):
         self.__start = start
+        self.invalidate_cache()
 
     @property
     def stop(self):
@@ -93,6 +97,15 @@ cdef class ParametricCurve(Space):
     @stop.setter
     def stop(self, double stop):
         self.__stop = stop
+        self.invalidate_cache()
+
+    def _pickle_parameters(self):
+        return ParametricCurve, {'name': self.name, 'start': self.__start, 'stop': self.__stop}
+
+    def _pickle_state(self):
+        state = super(ParametricCurve, self)._pickle_state()
+        state['attributes'].update(dt=self.__dt, precision=self.__precision)
+        return state
 
     @property
     def dt(self):
@@ -101,6 +114,7 @@ cdef class ParametricCurve(Space):
     @dt.setter
     def dt(self, double dt):
         self.__dt = dt
+        self.invalidate_cache()
 
     @property
     def precision(self):
@@ -109,6 +123,7 @@ cdef class ParametricCurve(Space):
     @precision.setter
     def precision(self, double precision):
         self.__precision = precision
+        self.invalidate_cache()
 
     @boundscheck(False)
     @wraparound(False)
@@ -223,6 +238,160 @@ cdef class ParametricCurve(Space):
                 result[i, 2] = self.__tangent_z_point(t[i])
         return result
 
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        cdef:
+            double h
+        if order == 1:
+            h = 7.0e-4 * fmax(1.0, fabs(t))
+            return (self.__x_point(t - 2 * h) - 8 * self.__x_point(t - h)
+                    + 8 * self.__x_point(t + h) - self.__x_point(t + 2 * h)) / (12 * h)
+        elif order == 2:
+            h = 2.5e-3 * fmax(1.0, fabs(t))
+            return (-self.__x_point(t - 2 * h) + 16 * self.__x_point(t - h) - 30 * self.__x_point(t)
+                    + 16 * self.__x_point(t + h) - self.__x_point(t + 2 * h)) / (12 * h * h)
+        elif order == 3:
+            h = 7.0e-3 * fmax(1.0, fabs(t))
+            return (self.__x_point(t - 3 * h) - 8 * self.__x_point(t - 2 * h) + 13 * self.__x_point(t - h)
+                    - 13 * self.__x_point(t + h) + 8 * self.__x_point(t + 2 * h)
+                    - self.__x_point(t + 3 * h)) / (8 * h * h * h)
+        elif order == 0:
+            return self.__x_point(t)
+        return 0.0
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        cdef:
+            double h
+        if order == 1:
+            h = 7.0e-4 * fmax(1.0, fabs(t))
+            return (self.__y_point(t - 2 * h) - 8 * self.__y_point(t - h)
+                    + 8 * self.__y_point(t + h) - self.__y_point(t + 2 * h)) / (12 * h)
+        elif order == 2:
+            h = 2.5e-3 * fmax(1.0, fabs(t))
+            return (-self.__y_point(t - 2 * h) + 16 * self.__y_point(t - h) - 30 * self.__y_point(t)
+                    + 16 * self.__y_point(t + h) - self.__y_point(t + 2 * h)) / (12 * h * h)
+        elif order == 3:
+            h = 7.0e-3 * fmax(1.0, fabs(t))
+            return (self.__y_point(t - 3 * h) - 8 * self.__y_point(t - 2 * h) + 13 * self.__y_point(t - h)
+                    - 13 * self.__y_point(t + h) + 8 * self.__y_point(t + 2 * h)
+                    - self.__y_point(t + 3 * h)) / (8 * h * h * h)
+        elif order == 0:
+            return self.__y_point(t)
+        return 0.0
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        cdef:
+            double h
+        if order == 1:
+            h = 7.0e-4 * fmax(1.0, fabs(t))
+            return (self.__z_point(t - 2 * h) - 8 * self.__z_point(t - h)
+                    + 8 * self.__z_point(t + h) - self.__z_point(t + 2 * h)) / (12 * h)
+        elif order == 2:
+            h = 2.5e-3 * fmax(1.0, fabs(t))
+            return (-self.__z_point(t - 2 * h) + 16 * self.__z_point(t - h) - 30 * self.__z_point(t)
+                    + 16 * self.__z_point(t + h) - self.__z_point(t + 2 * h)) / (12 * h * h)
+        elif order == 3:
+            h = 7.0e-3 * fmax(1.0, fabs(t))
+            return (self.__z_point(t - 3 * h) - 8 * self.__z_point(t - 2 * h) + 13 * self.__z_point(t - h)
+                    - 13 * self.__z_point(t + h) + 8 * self.__z_point(t + 2 * h)
+                    - self.__z_point(t + 3 * h)) / (8 * h * h * h)
+        elif order == 0:
+            return self.__z_point(t)
+        return 0.0
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef double[:, :] derivative(self, double[:] t, int order=1):
+        """
+        Calculates derivative of the curve radius vector of given order at points t.
+        Analytic derivatives are used where the curve provides them,
+        otherwise the high-order central finite difference stencils are used.
+        :param t: array of curve parameter values
+        :param order: derivative order (0, 1, 2, or 3)
+        :return: array of derivative vectors shaped (N, 3)
+        """
+        cdef:
+            int i, s = t.shape[0]
+            double[:, :] result = np.empty((s, 3), dtype=np.double)
+        with nogil:
+            for i in prange(s):
+                result[i, 0] = self.__derivative_x_point(t[i], order)
+                result[i, 1] = self.__derivative_y_point(t[i], order)
+                result[i, 2] = self.__derivative_z_point(t[i], order)
+        return result
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef tuple frenet_frame(self, double[:] t):
+        """
+        Calculates Frenet-Serret frame of the curve at points t in the curve coordinate system.
+        At the points of zero curvature the normal is chosen perpendicular to the tangent and
+        to the coordinate axis least aligned with it, torsion is set to zero.
+        :param t: array of curve parameter values
+        :return: tuple (tangent, normal, binormal, curvature, torsion),
+        unit vectors arrays are shaped (N, 3), curvature and torsion are arrays of size N
+        """
+        cdef:
+            int i, s = t.shape[0]
+            double[:, :] d1 = self.derivative(t, 1)
+            double[:, :] d2 = self.derivative(t, 2)
+            double[:, :] d3 = self.derivative(t, 3)
+            double[:, :] tangent = np.empty((s, 3), dtype=np.double)
+            double[:, :] normal = np.empty((s, 3), dtype=np.double)
+            double[:, :] binormal = np.empty((s, 3), dtype=np.double)
+            double[:] curvature = np.empty(s, dtype=np.double)
+            double[:] torsion = np.empty(s, dtype=np.double)
+            double speed, cx, cy, cz, c2, c, ex, ey, ez, p
+        with nogil:
+            for i in prange(s):
+                speed = sqrt(d1[i, 0] * d1[i, 0] + d1[i, 1] * d1[i, 1] + d1[i, 2] * d1[i, 2])
+                if speed > 0:
+                    tangent[i, 0] = d1[i, 0] / speed
+                    tangent[i, 1] = d1[i, 1] / speed
+                    tangent[i, 2] = d1[i, 2] / speed
+                else:
+                    tangent[i, 0] = 0.0
+                    tangent[i, 1] = 0.0
+                    tangent[i, 2] = 0.0
+                cx = d1[i, 1] * d2[i, 2] - d1[i, 2] * d2[i, 1]
+                cy = d1[i, 2] * d2[i, 0] - d1[i, 0] * d2[i, 2]
+                cz = d1[i, 0] * d2[i, 1] - d1[i, 1] * d2[i, 0]
+                c2 = cx * cx + cy * cy + cz * cz
+                c = sqrt(c2)
+                if speed > 0 and c > 1.0e-12 * speed * speed * speed:
+                    binormal[i, 0] = cx / c
+                    binormal[i, 1] = cy / c
+                    binormal[i, 2] = cz / c
+                    curvature[i] = c / (speed * speed * speed)
+                    torsion[i] = (cx * d3[i, 0] + cy * d3[i, 1] + cz * d3[i, 2]) / c2
+                else:
+                    ex = 0.0
+                    ey = 0.0
+                    ez = 0.0
+                    if fabs(tangent[i, 0]) <= fabs(tangent[i, 1]) and fabs(tangent[i, 0]) <= fabs(tangent[i, 2]):
+                        ex = 1.0
+                    elif fabs(tangent[i, 1]) <= fabs(tangent[i, 2]):
+                        ey = 1.0
+                    else:
+                        ez = 1.0
+                    cx = tangent[i, 1] * ez - tangent[i, 2] * ey
+                    cy = tangent[i, 2] * ex - tangent[i, 0] * ez
+                    cz = tangent[i, 0] * ey - tangent[i, 1] * ex
+                    c = sqrt(cx * cx + cy * cy + cz * cz)
+                    if c > 0:
+                        binormal[i, 0] = cx / c
+                        binormal[i, 1] = cy / c
+                        binormal[i, 2] = cz / c
+                    else:
+                        binormal[i, 0] = ex
+                        binormal[i, 1] = ey
+                        binormal[i, 2] = ez
+                    curvature[i] = 0.0
+                    torsion[i] = 0.0
+                normal[i, 0] = binormal[i, 1] * tangent[i, 2] - binormal[i, 2] * tangent[i, 1]
+                normal[i, 1] = binormal[i, 2] * tangent[i, 0] - binormal[i, 0] * tangent[i, 2]
+                normal[i, 2] = binormal[i, 0] * tangent[i, 1] - binormal[i, 1] * tangent[i, 0]
+        return tangent, normal, binormal, curvature, torsion
+
     @boundscheck(False)
     @wraparound(False)
     cdef double __length_tangent_array(self, double[:] t):
@@ -306,6 +475,8 @@ cdef class ParametricCurve(Space):
             double[:] t
             double length_tangent = 0.0
             long[:, :] refinements
+        if self.__cached_mesh_tree is not None and self.__cached_mesh_tree_iterations == max_iterations:
+            return self.__cached_mesh_tree
         root_mesh = Mesh1DUniform(self.__start, self.__stop,
                                   boundary_condition_1=0.0,
                                   boundary_condition_2=0.0,
@@ -330,6 +501,8 @@ cdef class ParametricCurve(Space):
                 meshes_tree.remove_coarse_duplicates()
             if to_refine == 0:
                 break
+        self.__cached_mesh_tree = meshes_tree
+        self.__cached_mesh_tree_iterations = max_iterations
         return meshes_tree
 
     @boundscheck(False)
@@ -344,6 +517,325 @@ cdef class ParametricCurve(Space):
     cpdef double distance_to_point(self, double t, double[:] xyz):
         return sqrt(self.distance_to_point_square(t, xyz))
 
+    cpdef void invalidate_cache(self):
+        """
+        Drops all cached data derived from the curve geometry (e.g. arc-length table).
+        Must be called whenever a parameter affecting the curve shape is changed.
+        """
+        self.__length_table_t = None
+        self.__length_table_s = None
+        self.__length_table_dt_ds = None
+        self.__points_index = None
+        self.__cached_mesh_tree = None
+        self.invalidate_bounding_box()
+
+    def _mesh_cache(self):
+        """
+        Cached mesh tree and arc-length table as flat arrays, e.g. for saving with the scene.
+        :return: dict of arrays, empty if nothing is cached
+        """
+        cache = {}
+        if self.__cached_mesh_tree is not None:
+            meshes = [(level, mesh) for level in self.__cached_mesh_tree.levels
+                      for mesh in self.__cached_mesh_tree.tree[level]]
+            cache['mesh_iterations'] = self.__cached_mesh_tree_iterations
+            cache['mesh_levels'] = np.array([level for level, _ in meshes], dtype=np.intc)
+            cache['mesh_bounds'] = np.array([[mesh.physical_boundary_1, mesh.physical_boundary_2]
+                                             for _, mesh in meshes], dtype=np.double)
+            cache['mesh_steps'] = np.array([mesh.physical_step for _, mesh in meshes], dtype=np.double)
+            cache['mesh_solution'] = np.concatenate([np.asarray(mesh.solution) for _, mesh in meshes])
+            cache['mesh_residual'] = np.concatenate([np.asarray(mesh.residual) for _, mesh in meshes])
+        if self.__length_table_s is not None:
+            cache['length_t'] = np.array(self.__length_table_t)
+            cache['length_s'] = np.array(self.__length_table_s)
+            cache['length_dt_ds'] = np.array(self.__length_table_dt_ds)
+        return cache
+
+    def _restore_mesh_cache(self, cache):
+        """
+        Restores the cache saved by _mesh_cache. The curve parameters must be the same as on saving.
+        :param cache: dict of arrays
+        """
+        cdef:
+            TreeMesh1DUniform meshes_tree
+            Mesh1DUniform mesh
+            int i, position = 0
+        if 'mesh_levels' in cache:
+            tree = {}
+            for i in range(cache['mesh_levels'].shape[0]):
+                mesh = Mesh1DUniform(cache['mesh_bounds'][i, 0], cache['mesh_bounds'][i, 1],
+                                     boundary_condition_1=0.0,
+                                     boundary_condition_2=0.0,
+                                     physical_step=cache['mesh_steps'][i])
+                mesh.solution = np.array(cache['mesh_solution'][position:position + mesh.num])
+                mesh.residual = np.array(cache['mesh_residual'][position:position + mesh.num])
+                position += mesh.num
+                tree.setdefault(int(cache['mesh_levels'][i]), []).append(mesh)
+            meshes_tree = TreeMesh1DUniform(tree[0][0], refinement_coefficient=2, aligned=True)
+            meshes_tree.__tree = tree
+            self.__cached_mesh_tree = meshes_tree
+            self.__cached_mesh_tree_iterations = cache['mesh_iterations']
+        if 'length_s' in cache:
+            self.__length_table_t = np.array(cache['length_t'], dtype=np.double)
+            self.__length_table_s = np.array(cache['length_s'], dtype=np.double)
+            self.__length_table_dt_ds = np.array(cache['length_dt_ds'], dtype=np.double)
+
+    def _bounding_box_local(self):
+        """
+        Box enclosing the curve in its local coordinate system. Each segment between neighbouring nodes
+        of the length table deviates from its chord at most by the sag known from the segment length.
+        :return: 2x3 array of box minimal and maximal corners
+        """
+        t, s = self.length_table
+        points = np.asarray(self.generate_points(np.ascontiguousarray(t)))
+        if points.shape[0] < 2:
+            return np.array([points.min(axis=0), points.max(axis=0)])
+        chord = np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1))
+        length = np.maximum(np.diff(s), chord) * (1.0 + self.__precision)
+        sag = (np.sqrt(length * length - chord * chord) / 2)[:, np.newaxis]
+        return np.array([(np.minimum(points[:-1], points[1:]) - sag).min(axis=0),
+                         (np.maximum(points[:-1], points[1:]) + sag).max(axis=0)])
+
+    def distance(self, xyz):
+        """
+        Calculates distance from points to the curve.
+        :param xyz: array of points in global coordinate system shaped Nx3 (or a single 3D point)
+        :return: array of distances
+        """
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        return np.asarray(self.closest_points(xyz)[1])
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef void build_length_table(self, unsigned int max_iterations=100):
+        """
+        Builds cumulative arc-length table over the nodes of the curve mesh_tree.
+        Together with the node values the derivatives dt/ds are stored, limited to keep
+        cubic Hermite interpolation of t(s) monotone (Fritsch-Carlson).
+        :param max_iterations: max number of mesh_tree refinement iterations
+        """
+        cdef:
+            double[:] t = np.array(self.mesh_tree(max_iterations).flatten().physical_nodes, dtype=np.double)
+            double[:, :] xyz_t = self.tangent(t)
+            int i, s = t.shape[0]
+            double[:] s_table = np.empty(s, dtype=np.double)
+            double[:] speed = np.empty(s, dtype=np.double)
+            double[:] dt_ds = np.empty(s, dtype=np.double)
+            double delta, alpha, beta, tau
+        with nogil:
+            for i in prange(s):
+                speed[i] = sqrt(xyz_t[i, 0] * xyz_t[i, 0] + xyz_t[i, 1] * xyz_t[i, 1] + xyz_t[i, 2] * xyz_t[i, 2])
+                if speed[i] > 0:
+                    dt_ds[i] = 1.0 / speed[i]
+                else:
+                    dt_ds[i] = 0.0
+            s_table[0] = 0.0
+            for i in range(s - 1):
+                s_table[i + 1] = s_table[i] + fabs(t[i + 1] - t[i]) * (speed[i] + speed[i + 1]) / 2
+            if t[s - 1] < t[0]:
+                for i in range(s):
+                    dt_ds[i] = -dt_ds[i]
+            for i in range(s - 1):
+                if s_table[i + 1] == s_table[i]:
+                    continue
+                delta = (t[i + 1] - t[i]) / (s_table[i + 1] - s_table[i])
+                if delta == 0:
+                    dt_ds[i] = 0.0
+                    dt_ds[i + 1] = 0.0
+                    continue
+                alpha = dt_ds[i] / delta
+                beta = dt_ds[i + 1] / delta
+                if alpha < 0:
+                    dt_ds[i] = 0.0
+                    alpha = 0.0
+                if beta < 0:
+                    dt_ds[i + 1] = 0.0
+                    beta = 0.0
+                if alpha * alpha + beta * beta > 9:
+                    tau = 3.0 / sqrt(alpha * alpha + beta * beta)
+                    dt_ds[i] = tau * alpha * delta
+                    dt_ds[i + 1] = tau * beta * delta
+        self.__length_table_t = t
+        self.__length_table_s = s_table
+        self.__length_table_dt_ds = dt_ds
+
+    @property
+    def length_table(self):
+        """
+        Cumulative arc-length table (t, s) of the curve, built on demand and cached.
+        """
+        if self.__length_table_s is None:
+            self.build_length_table()
+        return np.asarray(self.__length_table_t), np.asarray(self.__length_table_s)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef double __t_at_length_point(self, double s) nogil:
+        cdef:
+            int lo = 0, hi = self.__length_table_s.shape[0] - 1, mid
+            double h, x, x2, x3
+        if s <= self.__length_table_s[lo]:
+            return self.__length_table_t[lo]
+        if s >= self.__length_table_s[hi]:
+            return self.__length_table_t[hi]
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.__length_table_s[mid] > s:
+                hi = mid
+            else:
+                lo = mid
+        h = self.__length_table_s[hi] - self.__length_table_s[lo]
+        if h == 0:
+            return self.__length_table_t[lo]
+        x = (s - self.__length_table_s[lo]) / h
+        x2 = x * x
+        x3 = x2 * x
+        return (2 * x3 - 3 * x2 + 1) * self.__length_table_t[lo] + (x3 - 2 * x2 + x) * h * self.__length_table_dt_ds[lo]\
+            + (-2 * x3 + 3 * x2) * self.__length_table_t[hi] + (x3 - x2) * h * self.__length_table_dt_ds[hi]
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef double[:] t_at_length(self, double[:] s):
+        """
+        Finds curve parameter t for given distances along the curve measured from the start point.
+        Distances outside of [0, length] are clipped to the curve ends.
+        :param s: array of distances along the curve
+        :return: array of curve parameter values
+        """
+        cdef:
+            int i, n = s.shape[0]
+            array[double] result, template = array('d')
+        if self.__length_table_s is None:
+            self.build_length_table()
+        result = clone(template, n, zero=False)
+        with nogil:
+            for i in prange(n):
+                result[i] = self.__t_at_length_point(s[i])
+        return result
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef tuple closest_points(self, double[:, :] xyz, unsigned int max_iterations=50, double tolerance=1.0e-12):
+        """
+        Finds the closest point of the curve for each of the given points.
+        Initial guess is the nearest node of the curve length table found with KD-tree,
+        then the minimum of the distance is located by safeguarded Newton iterations
+        inside the bracket formed by the neighbouring nodes. Newton iterations use
+        first and second derivatives of the curve (analytic where available).
+        The result is never farther than the nearest node of the table.
+        :param xyz: array of N points in global coordinate system with shape (N, 3)
+        :param max_iterations: max number of Newton iterations
+        :param tolerance: relative tolerance of curve parameter t
+        :return: tuple of arrays (t, distance) each of size N
+        """
+        cdef:
+            double[:, :] local_xyz = self.to_local_coordinate_system(xyz)
+            double[:] nodes_t, node_distance
+            long[:] idx, node_idx
+            int i, k, n = xyz.shape[0], last, iteration = 0, active = n
+            double[:] t = np.empty(n, dtype=np.double)
+            double[:] t_lo = np.empty(n, dtype=np.double)
+            double[:] t_hi = np.empty(n, dtype=np.double)
+            double[:] distance = np.empty(n, dtype=np.double)
+            unsigned char[:] converged = np.zeros(n, dtype=np.uint8)
+            double[:, :] r, r_t, r_tt
+            double f, g, t_new, t_first, t_last
+        if n == 0:
+            return t, distance
+        if self.__length_table_s is None:
+            self.build_length_table()
+        nodes_t = self.__length_table_t
+        last = nodes_t.shape[0] - 1
+        t_first = min(nodes_t[0], nodes_t[last])
+        t_last = max(nodes_t[0], nodes_t[last])
+        if self.__points_index is None:
+            self.__points_index = cKDTree(np.asarray(self.generate_points(nodes_t)))
+        nearest_nodes = self.__points_index.query(np.asarray(local_xyz))
+        node_distance = np.asarray(nearest_nodes[0], dtype=np.double)
+        idx = node_idx = np.asarray(nearest_nodes[1], dtype=np.int_)
+        with nogil:
+            for i in prange(n):
+                t[i] = nodes_t[idx[i]]
+                t_lo[i] = nodes_t[max(idx[i] - 1, 0)]
+                t_hi[i] = nodes_t[min(idx[i] + 1, last)]
+                if t_lo[i] > t_hi[i]:
+                    t_lo[i], t_hi[i] = t_hi[i], t_lo[i]
+        # the minimum may be at the curve start or stop point
+        r = self.generate_points(t_lo)
+        r_t = self.derivative(t_lo, 1)
+        with nogil:
+            for i in prange(n):
+                f = (r[i, 0] - local_xyz[i, 0]) * r_t[i, 0] + (r[i, 1] - local_xyz[i, 1]) * r_t[i, 1]\
+                    + (r[i, 2] - local_xyz[i, 2]) * r_t[i, 2]
+                if t_lo[i] == t_first and f >= 0:
+                    t[i] = t_lo[i]
+                    converged[i] = 1
+        r = self.generate_points(t_hi)
+        r_t = self.derivative(t_hi, 1)
+        with nogil:
+            for i in prange(n):
+                f = (r[i, 0] - local_xyz[i, 0]) * r_t[i, 0] + (r[i, 1] - local_xyz[i, 1]) * r_t[i, 1]\
+                    + (r[i, 2] - local_xyz[i, 2]) * r_t[i, 2]
+                if converged[i] == 0 and t_hi[i] == t_last and f <= 0:
+                    t[i] = t_hi[i]
+                    converged[i] = 1
+        while iteration < max_iterations:
+            active_idx = np.flatnonzero(np.asarray(converged) == 0).astype(np.int_)
+            active = active_idx.shape[0]
+            if active == 0:
+                break
+            iteration += 1
+            idx = active_idx
+            t_active = np.asarray(t)[active_idx]
+            r = self.generate_points(t_active)
+            r_t = self.derivative(t_active, 1)
+            r_tt = self.derivative(t_active, 2)
+            with nogil:
+                for k in prange(active):
+                    i = idx[k]
+                    f = (r[k, 0] - local_xyz[i, 0]) * r_t[k, 0] + (r[k, 1] - local_xyz[i, 1]) * r_t[k, 1]\
+                        + (r[k, 2] - local_xyz[i, 2]) * r_t[k, 2]
+                    g = r_t[k, 0] * r_t[k, 0] + r_t[k, 1] * r_t[k, 1] + r_t[k, 2] * r_t[k, 2]\
+                        + (r[k, 0] - local_xyz[i, 0]) * r_tt[k, 0] + (r[k, 1] - local_xyz[i, 1]) * r_tt[k, 1]\
+                        + (r[k, 2] - local_xyz[i, 2]) * r_tt[k, 2]
+                    if f < 0:
+                        t_lo[i] = t[i]
+                    else:
+                        t_hi[i] = t[i]
+                    if g > 0 and fabs(f / g) < tolerance * (1 + fabs(t[i])):
+                        t[i] = t[i] - f / g
+                        converged[i] = 1
+                        continue
+                    t_new = t_lo[i] - 1.0
+                    if g > 0:
+                        t_new = t[i] - f / g
+                    if t_new <= t_lo[i] or t_new >= t_hi[i]:
+                        t_new = (t_lo[i] + t_hi[i]) / 2
+                    if fabs(t_new - t[i]) < tolerance * (1 + fabs(t[i])):
+                        converged[i] = 1
+                    t[i] = t_new
+        r = self.generate_points(t)
+        with nogil:
+            for i in prange(n):
+                distance[i] = sqrt((r[i, 0] - local_xyz[i, 0]) * (r[i, 0] - local_xyz[i, 0])
+                                   + (r[i, 1] - local_xyz[i, 1]) * (r[i, 1] - local_xyz[i, 1])
+                                   + (r[i, 2] - local_xyz[i, 2]) * (r[i, 2] - local_xyz[i, 2]))
+                if distance[i] > node_distance[i]:
+                    t[i] = nodes_t[node_idx[i]]
+                    distance[i] = node_distance[i]
+        return t, distance
+
+    cpdef double[:, :] generate_points_uniform(self, int num):
+        """
+        Generates num points equally spaced along the curve arc length (both ends included).
+        :param num: number of points
+        :return: array of points shaped (num, 3)
+        """
+        if self.__length_table_s is None:
+            self.build_length_table()
+        return self.generate_points(self.t_at_length(
+            np.linspace(0.0, self.__length_table_s[self.__length_table_s.shape[0] - 1], num=num)))
+
 
 cdef class Line(ParametricCurve):
 
@@ -358,6 +850,10 @@ cdef class Line(ParametricCurve):
         super(Line, self).__init__(name=name, coordinate_system=coordinate_system,
                                    start=start, stop=stop)
 
+    def _pickle_parameters(self):
+        return Line, {'name': self.name, 'origin': np.array(self.__origin), 'a': self.__a, 'b': self.__b,
+                      'c': self.__c, 'start': self.start, 'stop': self.stop}
+
     @property
     def a(self):
         return self.__a
@@ -365,6 +861,7 @@ cdef class Line(ParametricCurve):
     @a.setter
     def a(self, double a):
         self.__a = a
+        self.invalidate_cache()
 
     @property
     def b(self):
@@ -373,6 +870,7 @@ cdef class Line(ParametricCurve):
     @b.setter
     def b(self, double b):
         self.__b = b
+        self.invalidate_cache()
 
     @property
     def c(self):
@@ -381,6 +879,7 @@ cdef class Line(ParametricCurve):
     @c.setter
     def c(self, double c):
         self.__c = c
+        self.invalidate_cache()
 
     @boundscheck(False)
     cdef double __x_point(self, double t) nogil:
@@ -403,6 +902,27 @@ cdef class Line(ParametricCurve):
     cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
         return self.__c
 
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__x_point(t)
+        elif order == 1:
+            return self.__a
+        return 0.0
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__y_point(t)
+        elif order == 1:
+            return self.__b
+        return 0.0
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__z_point(t)
+        elif order == 1:
+            return self.__c
+        return 0.0
+
 
 cdef class Arc(ParametricCurve):
 
@@ -418,6 +938,10 @@ cdef class Arc(ParametricCurve):
         super(Arc, self).__init__(name=name, coordinate_system=coordinate_system,
                                   start=start, stop=stop)
 
+    def _pickle_parameters(self):
+        return Arc, {'name': self.name, 'a': self.__a, 'b': self.__b, 'start': self.start, 'stop': self.stop,
+                     'right': self.__direction > 0}
+
     @property
     def a(self):
         return self.__a
@@ -425,6 +949,7 @@ cdef class Arc(ParametricCurve):
     @a.setter
     def a(self, double a):
         self.__a = a
+        self.invalidate_cache()
 
     @property
     def b(self):
@@ -433,6 +958,7 @@ cdef class Arc(ParametricCurve):
     @b.setter
     def b(self, double b):
         self.__b = b
+        self.invalidate_cache()
 
     @property
     def direction(self):
@@ -441,6 +967,7 @@ cdef class Arc(ParametricCurve):
     @direction.setter
     def direction(self, short direction):
         self.__direction = direction
+        self.invalidate_cache()
 
     @property
     def right(self):
@@ -454,6 +981,7 @@ cdef class Arc(ParametricCurve):
             self.__direction = 1
         else:
             self.__direction = -1
+        self.invalidate_cache()
 
     @property
     def left(self):
@@ -467,6 +995,7 @@ cdef class Arc(ParametricCurve):
             self.__direction = -1
         else:
             self.__direction = 1
+        self.invalidate_cache()
 
     cdef double __x_point(self, double t) nogil:
         return self.__a * cos(t)
@@ -486,6 +1015,27 @@ cdef class Arc(ParametricCurve):
     cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
         return 0.0
 
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        if order % 4 == 0:
+            return self.__a * cos(t)
+        elif order % 4 == 1:
+            return -self.__a * sin(t)
+        elif order % 4 == 2:
+            return -self.__a * cos(t)
+        return self.__a * sin(t)
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        if order % 4 == 0:
+            return self.__direction * self.__b * sin(t)
+        elif order % 4 == 1:
+            return self.__direction * self.__b * cos(t)
+        elif order % 4 == 2:
+            return -self.__direction * self.__b * sin(t)
+        return -self.__direction * self.__b * cos(t)
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        return 0.0
+
     cpdef double eccentricity(self):
         return sqrt((self.__a * self.__a - self.__b * self.__b) / (self.__a * self.__a))
 
@@ -507,6 +1057,10 @@ cdef class Helix(ParametricCurve):
         super(Helix, self).__init__(name=name, coordinate_system=coordinate_system,
                                     start=start, stop=stop)
 
+    def _pickle_parameters(self):
+        return Helix, {'name': self.name, 'radius': self.__radius, 'pitch': self.__pitch,
+                       'start': self.start, 'stop': self.stop, 'right': self.__direction > 0}
+
     @property
     def radius(self):
         return self.__radius
@@ -514,6 +1068,7 @@ cdef class Helix(ParametricCurve):
     @radius.setter
     def radius(self, double radius):
         self.__radius = radius
+        self.invalidate_cache()
 
     @property
     def pitch(self):
@@ -522,6 +1077,7 @@ cdef class Helix(ParametricCurve):
     @pitch.setter
     def pitch(self, double pitch):
         self.__pitch = pitch
+        self.invalidate_cache()
 
     @property
     def direction(self):
@@ -530,6 +1086,7 @@ cdef class Helix(ParametricCurve):
     @direction.setter
     def direction(self, short direction):
         self.__direction = direction
+        self.invalidate_cache()
 
     @property
     def right(self):
@@ -543,6 +1100,7 @@ cdef class Helix(ParametricCurve):
             self.__direction = 1
         else:
             self.__direction = -1
+        self.invalidate_cache()
 
     @property
     def left(self):
@@ -556,6 +1114,7 @@ cdef class Helix(ParametricCurve):
             self.__direction = -1
         else:
             self.__direction = 1
+        self.invalidate_cache()
 
     cdef double __x_point(self, double t) nogil:
         return self.__radius - self.__radius * cos(t)
@@ -574,3 +1133,788 @@ cdef class Helix(ParametricCurve):
 
     cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
         return self.__pitch / (2 * M_PI)
+
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__radius - self.__radius * cos(t)
+        elif order % 4 == 1:
+            return self.__radius * sin(t)
+        elif order % 4 == 2:
+            return self.__radius * cos(t)
+        elif order % 4 == 3:
+            return -self.__radius * sin(t)
+        return -self.__radius * cos(t)
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        if order % 4 == 0:
+            return self.__direction * self.__radius * sin(t)
+        elif order % 4 == 1:
+            return self.__direction * self.__radius * cos(t)
+        elif order % 4 == 2:
+            return -self.__direction * self.__radius * sin(t)
+        return -self.__direction * self.__radius * cos(t)
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__pitch / (2 * M_PI) * t
+        elif order == 1:
+            return self.__pitch / (2 * M_PI)
+        return 0.0
+
+
+cdef class PolylineCurve(ParametricCurve):
+    """
+    Piecewise linear curve through the given vertices parametrized by the arc length,
+    e.g. a traced field line. Consecutive coincident vertices are merged.
+    """
+
+    def __init__(self, points, str name='Polyline', Cartesian coordinate_system=None):
+        self.__set_points(points)
+        super(PolylineCurve, self).__init__(name=name, coordinate_system=coordinate_system,
+                                            start=0.0, stop=self.__lengths[self.__num - 1])
+
+    cdef void __set_points(self, points) except *:
+        points = np.array(points, dtype=np.double).reshape(-1, 3)
+        if points.shape[0] < 2:
+            raise ValueError('Polyline needs at least two vertices')
+        keep = np.ones(points.shape[0], dtype=bool)
+        keep[1:] = np.any(np.diff(points, axis=0) != 0, axis=1)
+        points = np.ascontiguousarray(points[keep])
+        if points.shape[0] < 2:
+            raise ValueError('Polyline needs at least two distinct vertices')
+        self.__points = points
+        self.__lengths = np.concatenate(([0.0], np.cumsum(np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1)))))
+        self.__num = points.shape[0]
+
+    @property
+    def points(self):
+        return np.array(self.__points)
+
+    @points.setter
+    def points(self, points):
+        self.__set_points(points)
+        self.start = 0.0
+        self.stop = self.__lengths[self.__num - 1]
+
+    def _pickle_parameters(self):
+        return PolylineCurve, {'points': np.array(self.__points), 'name': self.name}
+
+    def _pickle_state(self):
+        state = super(PolylineCurve, self)._pickle_state()
+        state['attributes'].update(start=self.start, stop=self.stop)
+        return state
+
+    @property
+    def vertices_t(self):
+        """
+        Values of the curve parameter (arc length) at the vertices.
+        """
+        return np.array(self.__lengths)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __segment(self, double t) nogil:
+        cdef:
+            int lo = 0, hi = self.__num - 1, mid
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.__lengths[mid] > t:
+                hi = mid
+            else:
+                lo = mid
+        return lo
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef double __coordinate(self, double t, int axis) nogil:
+        cdef:
+            int i = self.__segment(t)
+            double f = (t - self.__lengths[i]) / (self.__lengths[i + 1] - self.__lengths[i])
+        return self.__points[i, axis] + f * (self.__points[i + 1, axis] - self.__points[i, axis])
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef double __direction(self, double t, int axis) nogil:
+        cdef:
+            int i = self.__segment(t)
+        return (self.__points[i + 1, axis] - self.__points[i, axis]) / (self.__lengths[i + 1] - self.__lengths[i])
+
+    cdef double __x_point(self, double t) nogil:
+        return self.__coordinate(t, 0)
+
+    cdef double __y_point(self, double t) nogil:
+        return self.__coordinate(t, 1)
+
+    cdef double __z_point(self, double t) nogil:
+        return self.__coordinate(t, 2)
+
+    cdef double __tangent_x_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__direction(t, 0)
+
+    cdef double __tangent_y_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__direction(t, 1)
+
+    cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__direction(t, 2)
+
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__coordinate(t, 0)
+        elif order == 1:
+            return self.__direction(t, 0)
+        return 0.0
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__coordinate(t, 1)
+        elif order == 1:
+            return self.__direction(t, 1)
+        return 0.0
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        if order == 0:
+            return self.__coordinate(t, 2)
+        elif order == 1:
+            return self.__direction(t, 2)
+        return 0.0
+
+    cpdef double length(self, unsigned int max_iterations=100):
+        return self.__lengths[self.__num - 1]
+
+    cpdef TreeMesh1DUniform mesh_tree(self, unsigned int max_iterations=100):
+        """
+        Uniform arc-length mesh with twice as many nodes as the polyline has vertices.
+        Adaptive refinement is not used because the polyline is not smooth at the vertices.
+        :param max_iterations: not used
+        :return: meshes tree with a single root mesh
+        """
+        cdef:
+            Mesh1DUniform root_mesh
+        root_mesh = Mesh1DUniform(self.start, self.stop,
+                                  boundary_condition_1=0.0,
+                                  boundary_condition_2=0.0,
+                                  physical_step=(self.stop - self.start) / (2 * (self.__num - 1)))
+        self.__length_tangent_mesh(root_mesh)
+        return TreeMesh1DUniform(root_mesh, refinement_coefficient=2, aligned=True)
+
+
+
+cdef class CubicSplineCurve(ParametricCurve):
+    """
+    Cubic spline curve through the given vertices, e.g. a measured cable route.
+    By default the curve is parametrized by the cumulative chord length, consecutive coincident
+    vertices are merged. Polynomial coefficients of the segments are stored in a contiguous array,
+    points and analytic derivatives are evaluated in nogil kernels with binary search of the segment.
+    """
+
+    def __init__(self, points, knots=None, str boundary='natural', str name='Cubic spline',
+                 Cartesian coordinate_system=None):
+        """
+        :param points: array of curve vertices shaped Nx3
+        :param knots: increasing curve parameter values at the vertices, chord length by default
+        :param boundary: spline boundary condition, 'natural', 'clamped', 'not-a-knot' or 'periodic'
+        :param name: curve name
+        :param coordinate_system: curve coordinate system
+        """
+        self.__boundary = boundary
+        self.__set_points(points, knots)
+        super(CubicSplineCurve, self).__init__(name=name, coordinate_system=coordinate_system,
+                                               start=self.__knots[0], stop=self.__knots[self.__num - 1])
+
+    cdef void __set_points(self, points, knots) except *:
+        points = np.array(points, dtype=np.double).reshape(-1, 3)
+        if knots is None:
+            keep = np.ones(points.shape[0], dtype=bool)
+            keep[1:] = np.any(np.diff(points, axis=0) != 0, axis=1)
+            points = points[keep]
+            knots = np.concatenate(([0.0], np.cumsum(np.sqrt(np.sum(np.diff(points, axis=0) ** 2, axis=1)))))
+        knots = np.array(knots, dtype=np.double).ravel()
+        if points.shape[0] < 2:
+            raise ValueError('Spline needs at least two distinct vertices')
+        if knots.size != points.shape[0] or np.any(np.diff(knots) <= 0):
+            raise ValueError('Spline knots must be strictly increasing, one knot per vertex')
+        spline = CubicSpline(knots, points, axis=0, bc_type=self.__boundary)
+        self.__points = np.ascontiguousarray(points)
+        self.__knots = knots
+        # scipy coefficients are shaped (4, segments, 3) with the highest power first
+        self.__coefficients = np.ascontiguousarray(np.transpose(spline.c, (1, 0, 2)))
+        self.__num = points.shape[0]
+
+    @property
+    def points(self):
+        return np.array(self.__points)
+
+    @points.setter
+    def points(self, points):
+        self.__set_points(points, None)
+        self.start = self.__knots[0]
+        self.stop = self.__knots[self.__num - 1]
+
+    @property
+    def knots(self):
+        """
+        Values of the curve parameter at the vertices.
+        """
+        return np.array(self.__knots)
+
+    @property
+    def boundary(self):
+        return self.__boundary
+
+    def _pickle_parameters(self):
+        return CubicSplineCurve, {'points': np.array(self.__points), 'knots': np.array(self.__knots),
+                                  'boundary': self.__boundary, 'name': self.name}
+
+    def _pickle_state(self):
+        state = super(CubicSplineCurve, self)._pickle_state()
+        state['attributes'].update(start=self.start, stop=self.stop)
+        return state
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __segment(self, double t) nogil:
+        cdef:
+            int lo = 0, hi = self.__num - 1, mid
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.__knots[mid] > t:
+                hi = mid
+            else:
+                lo = mid
+        return lo
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef double __polynomial(self, double t, int axis, int order) nogil:
+        cdef:
+            int i = self.__segment(t)
+            double u = t - self.__knots[i]
+            double c3 = self.__coefficients[i, 0, axis], c2 = self.__coefficients[i, 1, axis]
+            double c1 = self.__coefficients[i, 2, axis], c0 = self.__coefficients[i, 3, axis]
+        if order == 0:
+            return ((c3 * u + c2) * u + c1) * u + c0
+        elif order == 1:
+            return (3 * c3 * u + 2 * c2) * u + c1
+        elif order == 2:
+            return 6 * c3 * u + 2 * c2
+        elif order == 3:
+            return 6 * c3
+        return 0.0
+
+    cdef double __x_point(self, double t) nogil:
+        return self.__polynomial(t, 0, 0)
+
+    cdef double __y_point(self, double t) nogil:
+        return self.__polynomial(t, 1, 0)
+
+    cdef double __z_point(self, double t) nogil:
+        return self.__polynomial(t, 2, 0)
+
+    cdef double __tangent_x_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__polynomial(t, 0, 1)
+
+    cdef double __tangent_y_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__polynomial(t, 1, 1)
+
+    cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__polynomial(t, 2, 1)
+
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        return self.__polynomial(t, 0, order)
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        return self.__polynomial(t, 1, order)
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        return self.__polynomial(t, 2, order)
+
+def _evaluate(function, t):
+    return np.require(np.broadcast_to(np.asarray(function(t), dtype=np.double), t.shape), requirements=['C', 'W'])
+
+
+def _stencil_derivative(function, t, int order):
+    t = np.asarray(t, dtype=np.double)
+    if order == 0:
+        return _evaluate(function, t)
+    scale = np.maximum(1.0, np.abs(t))
+    if order == 1:
+        h = 7.0e-4 * scale
+        f = _evaluate(function, np.concatenate((t - 2 * h, t - h, t + h, t + 2 * h))).reshape((4, t.size))
+        return (f[0] - 8 * f[1] + 8 * f[2] - f[3]) / (12 * h)
+    elif order == 2:
+        h = 2.5e-3 * scale
+        f = _evaluate(function, np.concatenate((t - 2 * h, t - h, t, t + h, t + 2 * h))).reshape((5, t.size))
+        return (-f[0] + 16 * f[1] - 30 * f[2] + 16 * f[3] - f[4]) / (12 * h * h)
+    elif order == 3:
+        h = 7.0e-3 * scale
+        f = _evaluate(function, np.concatenate((t - 3 * h, t - 2 * h, t - h,
+                                                t + h, t + 2 * h, t + 3 * h))).reshape((6, t.size))
+        return (f[0] - 8 * f[1] + 13 * f[2] - 13 * f[3] + 8 * f[4] - f[5]) / (8 * h * h * h)
+    return np.zeros_like(t)
+
+
+def _component_derivative(function, derivative, t, int order):
+    """
+    Derivative of one coordinate given by its vectorized callable, evaluated by the callable of the first
+    derivative where it is provided, otherwise by the finite difference stencils.
+    """
+    if order == 0 or derivative is None:
+        return _stencil_derivative(function, t, order)
+    elif order == 1:
+        return _evaluate(derivative, t)
+    return _stencil_derivative(derivative, t, order - 1)
+
+
+cdef class VectorizedParametricCurve(ParametricCurve):
+    """
+    Parametric curve defined by NumPy-vectorized python callables x(t), y(t), z(t).
+    Each callable takes an array of parameter values and returns an array of coordinates.
+    Optional callables dx(t), dy(t), dz(t) provide the first derivatives,
+    otherwise derivatives are calculated with finite difference stencils evaluated in one batch call.
+    All array methods of the curve call the callables once per batch, so mesh_tree, length,
+    closest points and Frenet frame calculations work without compiling a new curve class.
+    """
+
+    def __init__(self, x, y, z, str name='Vectorized curve', Cartesian coordinate_system=None,
+                 double start=0.0, double stop=1.0, dx=None, dy=None, dz=None):
+        self.__x_function = x
+        self.__y_function = y
+        self.__z_function = z
+        self.__dx_function = dx
+        self.__dy_function = dy
+        self.__dz_function = dz
+        super(VectorizedParametricCurve, self).__init__(name=name, coordinate_system=coordinate_system,
+                                                        start=start, stop=stop)
+
+    def _pickle_parameters(self):
+        # the callables must be picklable, e.g. module level functions or NumPy ufuncs
+        return VectorizedParametricCurve, {'x': self.__x_function, 'y': self.__y_function,
+                                           'z': self.__z_function, 'name': self.name,
+                                           'start': self.start, 'stop': self.stop,
+                                           'dx': self.__dx_function, 'dy': self.__dy_function,
+                                           'dz': self.__dz_function}
+
+    @property
+    def x_function(self):
+        return self.__x_function
+
+    @x_function.setter
+    def x_function(self, x):
+        self.__x_function = x
+        self.invalidate_cache()
+
+    @property
+    def y_function(self):
+        return self.__y_function
+
+    @y_function.setter
+    def y_function(self, y):
+        self.__y_function = y
+        self.invalidate_cache()
+
+    @property
+    def z_function(self):
+        return self.__z_function
+
+    @z_function.setter
+    def z_function(self, z):
+        self.__z_function = z
+        self.invalidate_cache()
+
+    cdef double __component(self, double t, int order, int axis):
+        """
+        Single component of the radius vector or of its derivative evaluated by the array callables
+        with a one-element array. Only the per-point methods use it, all array methods evaluate in batches.
+        """
+        functions = (self.__x_function, self.__y_function, self.__z_function)
+        derivatives = (self.__dx_function, self.__dy_function, self.__dz_function)
+        return _component_derivative(functions[axis], derivatives[axis], np.array([t], dtype=np.double), order)[0]
+
+    cdef double __x_point(self, double t) nogil:
+        with gil:
+            return self.__component(t, 0, 0)
+
+    cpdef double x_point(self, double t):
+        return self.__component(t, 0, 0)
+
+    cdef double __y_point(self, double t) nogil:
+        with gil:
+            return self.__component(t, 0, 1)
+
+    cpdef double y_point(self, double t):
+        return self.__component(t, 0, 1)
+
+    cdef double __z_point(self, double t) nogil:
+        with gil:
+            return self.__component(t, 0, 2)
+
+    cpdef double z_point(self, double t):
+        return self.__component(t, 0, 2)
+
+    cpdef double[:] x(self, double[:] t):
+        return _evaluate(self.__x_function, np.asarray(t))
+
+    cpdef double[:] y(self, double[:] t):
+        return _evaluate(self.__y_function, np.asarray(t))
+
+    cpdef double[:] z(self, double[:] t):
+        return _evaluate(self.__z_function, np.asarray(t))
+
+    cpdef double[:, :] generate_points(self, double[:] t):
+        return np.ascontiguousarray(np.stack((self.x(t), self.y(t), self.z(t)), axis=1))
+
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        with gil:
+            return self.__component(t, order, 0)
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        with gil:
+            return self.__component(t, order, 1)
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        with gil:
+            return self.__component(t, order, 2)
+
+    cdef double __tangent_x_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_x_point(t, 1)
+
+    cpdef double tangent_x_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_x_point(t, 1)
+
+    cdef double __tangent_y_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_y_point(t, 1)
+
+    cpdef double tangent_y_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_y_point(t, 1)
+
+    cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_z_point(t, 1)
+
+    cpdef double tangent_z_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_z_point(t, 1)
+
+    cpdef double[:] tangent_x(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 0])
+
+    cpdef double[:] tangent_y(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 1])
+
+    cpdef double[:] tangent_z(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 2])
+
+    cpdef double[:, :] tangent(self, double[:] t):
+        return self.derivative(t, 1)
+
+    cpdef double[:, :] derivative(self, double[:] t, int order=1):
+        t_array = np.asarray(t)
+        result = np.empty((t_array.size, 3), dtype=np.double)
+        functions = (self.__x_function, self.__y_function, self.__z_function)
+        derivatives = (self.__dx_function, self.__dy_function, self.__dz_function)
+        for i in range(3):
+            result[:, i] = _component_derivative(functions[i], derivatives[i], t_array, order)
+        return result
+
+
+cdef class CompositeCurve(ParametricCurve):
+    """
+    Curve made of several parametric curves joined end to end, e.g. a planned route of lines and arcs.
+    The parameter of the composite curve runs from zero through the parameter spans of the pieces in turn,
+    so one mesh_tree, length table and CurveField cover the whole path. Coordinate systems of the pieces
+    are treated as given relative to the coordinate system of the composite curve.
+    Piece offsets and frames are kept in contiguous arrays, the piece of each parameter value is found
+    by binary search in a nogil kernel and every piece evaluates its parameter values in one batch.
+    """
+
+    def __init__(self, curves, str name='Composite curve', Cartesian coordinate_system=None):
+        """
+        :param curves: sequence of ParametricCurve objects in the order of the path
+        :param name: curve name
+        :param coordinate_system: curve coordinate system
+        """
+        curves = list(curves)
+        if not curves or not all(isinstance(curve, ParametricCurve) for curve in curves):
+            raise ValueError('Composite curve needs a non-empty sequence of parametric curves')
+        self.__curves = curves
+        self.__pieces_state = None
+        self.__update()
+        super(CompositeCurve, self).__init__(name=name, coordinate_system=coordinate_system,
+                                             start=0.0, stop=self.__offsets[len(curves)])
+
+    @property
+    def curves(self):
+        return list(self.__curves)
+
+    def _pickle_parameters(self):
+        return CompositeCurve, {'curves': list(self.__curves), 'name': self.name}
+
+    def _pickle_state(self):
+        state = super(CompositeCurve, self)._pickle_state()
+        state['attributes'].update(start=self.start)
+        return state
+
+    @property
+    def global_state(self):
+        """
+        Global state of the composite curve including versions of all pieces and their coordinate systems.
+        """
+        state = super(CompositeCurve, self).global_state
+        for curve in self.__curves:
+            state += (curve.version, curve.coordinate_system.version)
+        return state
+
+    @property
+    def offsets(self):
+        """
+        Values of the curve parameter at the pieces boundaries.
+        """
+        self.__update()
+        return np.array(self.__offsets)
+
+    @property
+    def vertices_t(self):
+        """
+        Values of the curve parameter at the pieces boundaries and at the vertices of polyline pieces.
+        """
+        self.__update()
+        t = [np.asarray(self.__offsets)]
+        for i, curve in enumerate(self.__curves):
+            vertices = getattr(curve, 'vertices_t', None)
+            if vertices is not None:
+                t.append(self.__offsets[i] + self.__signs[i] * (np.asarray(vertices) - self.__starts[i]))
+        t = np.unique(np.concatenate(t))
+        return t[(t >= self.__offsets[0]) & (t <= self.__offsets[len(self.__curves)])]
+
+    cdef void __update(self) except *:
+        """
+        Refreshes piece offsets and frames whenever any piece or its coordinate system changes.
+        """
+        state = tuple((curve.version, curve.coordinate_system.version, curve.start, curve.stop)
+                      for curve in self.__curves)
+        if state == self.__pieces_state:
+            return
+        starts = np.array([curve.start for curve in self.__curves], dtype=np.double)
+        stops = np.array([curve.stop for curve in self.__curves], dtype=np.double)
+        self.__starts = starts
+        self.__signs = np.where(stops >= starts, 1.0, -1.0)
+        self.__offsets = np.concatenate(([0.0], np.cumsum(np.abs(stops - starts))))
+        self.__bases = np.ascontiguousarray([np.asarray(curve.coordinate_system.basis, dtype=np.double)
+                                             for curve in self.__curves])
+        self.__origins = np.ascontiguousarray([np.asarray(curve.coordinate_system.origin, dtype=np.double)
+                                               for curve in self.__curves])
+        initialized = self.__pieces_state is not None
+        self.__pieces_state = state
+        if initialized:
+            ParametricCurve.stop.__set__(self, self.__offsets[len(self.__curves)])
+
+    @property
+    def stop(self):
+        """
+        End value of the curve parameter, the sum of the parameter spans of the pieces.
+        """
+        self.__update()
+        return ParametricCurve.stop.__get__(self)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __piece(self, double t) nogil:
+        cdef:
+            int lo = 0, hi = self.__offsets.shape[0] - 1, mid
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.__offsets[mid] > t:
+                hi = mid
+            else:
+                lo = mid
+        return lo
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef tuple locate(self, double[:] t):
+        """
+        Finds the pieces and their own parameter values for the composite curve parameter values.
+        :param t: array of curve parameter values
+        :return: tuple of arrays (piece index, piece parameter value)
+        """
+        cdef:
+            int i, k, n = t.shape[0]
+            int[::1] pieces = np.empty(n, dtype=np.intc)
+            double[::1] local = np.empty(n, dtype=np.double)
+        self.__update()
+        with nogil:
+            for i in prange(n):
+                k = self.__piece(t[i])
+                pieces[i] = k
+                local[i] = self.__starts[k] + self.__signs[k] * (t[i] - self.__offsets[k])
+        return np.asarray(pieces), np.asarray(local)
+
+    cpdef double[:, :] derivative(self, double[:] t, int order=1):
+        pieces, local = self.locate(t)
+        result = np.empty((pieces.size, 3), dtype=np.double)
+        bases = np.asarray(self.__bases)
+        signs = np.asarray(self.__signs)
+        order_of_points = np.argsort(pieces, kind='stable')
+        bounds = np.searchsorted(pieces[order_of_points], np.arange(len(self.__curves) + 1))
+        for i in range(len(self.__curves)):
+            if bounds[i] == bounds[i + 1]:
+                continue
+            selection = order_of_points[bounds[i]:bounds[i + 1]]
+            values = np.asarray(self.__curves[i].derivative(np.ascontiguousarray(local[selection]), order))
+            values = values @ bases[i] * signs[i] ** order
+            if order == 0:
+                values += self.__origins[i]
+            result[selection] = values
+        return result
+
+    cpdef double[:, :] generate_points(self, double[:] t):
+        return self.derivative(t, 0)
+
+    cpdef double[:, :] tangent(self, double[:] t):
+        return self.derivative(t, 1)
+
+    cpdef double[:] x(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 0))[:, 0])
+
+    cpdef double[:] y(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 0))[:, 1])
+
+    cpdef double[:] z(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 0))[:, 2])
+
+    cpdef double[:] tangent_x(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 0])
+
+    cpdef double[:] tangent_y(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 1])
+
+    cpdef double[:] tangent_z(self, double[:] t):
+        return np.ascontiguousarray(np.asarray(self.derivative(t, 1))[:, 2])
+
+    cdef double __x_point(self, double t) nogil:
+        with gil:
+            return self.x_point(t)
+
+    cpdef double x_point(self, double t):
+        return self.derivative(np.array([t], dtype=np.double), 0)[0, 0]
+
+    cdef double __y_point(self, double t) nogil:
+        with gil:
+            return self.y_point(t)
+
+    cpdef double y_point(self, double t):
+        return self.derivative(np.array([t], dtype=np.double), 0)[0, 1]
+
+    cdef double __z_point(self, double t) nogil:
+        with gil:
+            return self.z_point(t)
+
+    cpdef double z_point(self, double t):
+        return self.derivative(np.array([t], dtype=np.double), 0)[0, 2]
+
+    cdef double __derivative_x_point(self, double t, int order) nogil:
+        with gil:
+            return self.derivative(np.array([t], dtype=np.double), order)[0, 0]
+
+    cdef double __derivative_y_point(self, double t, int order) nogil:
+        with gil:
+            return self.derivative(np.array([t], dtype=np.double), order)[0, 1]
+
+    cdef double __derivative_z_point(self, double t, int order) nogil:
+        with gil:
+            return self.derivative(np.array([t], dtype=np.double), order)[0, 2]
+
+    cdef double __tangent_x_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_x_point(t, 1)
+
+    cpdef double tangent_x_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_x_point(t, 1)
+
+    cdef double __tangent_y_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_y_point(t, 1)
+
+    cpdef double tangent_y_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_y_point(t, 1)
+
+    cdef double __tangent_z_point(self, double t, bint left=True, bint right=True) nogil:
+        return self.__derivative_z_point(t, 1)
+
+    cpdef double tangent_z_point(self, double t, bint left=True, bint right=True):
+        return self.__derivative_z_point(t, 1)
+
+    cpdef double length(self, unsigned int max_iterations=100):
+        """
+        Sum of the pieces lengths, so analytic lengths of lines and polylines are used directly.
+        """
+        cdef:
+            double result = 0.0
+        self.__update()
+        for curve in self.__curves:
+            result += curve.length(max_iterations)
+        return result
+
+    cpdef void build_length_table(self, unsigned int max_iterations=100):
+        """
+        Builds cumulative arc-length table by joining the tables of the pieces. The joints are kept
+        as duplicated nodes, so the table stays exact where the speed of the curve jumps between the pieces.
+        :param max_iterations: max number of mesh_tree refinement iterations of the pieces
+        """
+        cdef:
+            ParametricCurve piece
+            double length = 0.0
+        self.__update()
+        t, s, dt_ds = [], [], []
+        for i in range(len(self.__curves)):
+            piece = self.__curves[i]
+            if piece.__length_table_s is None:
+                piece.build_length_table(max_iterations)
+            piece_t = self.__offsets[i] + self.__signs[i] * (np.asarray(piece.__length_table_t) - self.__starts[i])
+            piece_s = np.asarray(piece.__length_table_s)
+            piece_dt_ds = self.__signs[i] * np.asarray(piece.__length_table_dt_ds)
+            if piece_t[0] > piece_t[piece_t.size - 1]:
+                # the table of the piece runs against the composite curve parameter
+                piece_t = piece_t[::-1]
+                piece_s = piece_s[piece_s.size - 1] - piece_s[::-1]
+                piece_dt_ds = -piece_dt_ds[::-1]
+            t.append(piece_t)
+            s.append(length + piece_s)
+            dt_ds.append(piece_dt_ds)
+            length += piece_s[piece_s.size - 1]
+        self.__length_table_t = np.concatenate(t)
+        self.__length_table_s = np.concatenate(s)
+        self.__length_table_dt_ds = np.concatenate(dt_ds)
+
+    cpdef TreeMesh1DUniform mesh_tree(self, unsigned int max_iterations=100):
+        """
+        Uniform mesh with as many nodes as the length tables of the pieces together.
+        Adaptive refinement is not used because the curve is not smooth at the joints, the mesh solution
+        (lengths of the mesh intervals) is interpolated from the exact arc-length table of the pieces.
+        :param max_iterations: max number of mesh_tree refinement iterations of the pieces
+        :return: meshes tree with a single root mesh
+        """
+        cdef:
+            Mesh1DUniform root_mesh
+        self.build_length_table(max_iterations)
+        table_t = np.asarray(self.__length_table_t)
+        table_s = np.asarray(self.__length_table_s)
+        intervals = max(2, table_t.size - len(self.__curves))
+        root_mesh = Mesh1DUniform(self.start, self.stop,
+                                  boundary_condition_1=0.0,
+                                  boundary_condition_2=0.0,
+                                  physical_step=(self.stop - self.start) / intervals)
+        s = np.interp(np.asarray(root_mesh.physical_nodes), table_t, table_s)
+        root_mesh.solution = np.concatenate(([0.0], np.diff(s)))
+        root_mesh.residual = np.zeros(s.size)
+        return TreeMesh1DUniform(root_mesh, refinement_coefficient=2, aligned=True)
+
+    def _bounding_box_local(self):
+        """
+        Box enclosing the local boxes of the pieces transformed to the composite curve coordinate system.
+        """
+        self.__update()
+        corners = []
+        for i, curve in enumerate(self.__curves):
+            box = np.asarray(curve._bounding_box_local(), dtype=np.double)
+            box_corners = np.array([[box[a, 0], box[b, 1], box[c, 2]]
+                                    for a in (0, 1) for b in (0, 1) for c in (0, 1)])
+            corners.append(box_corners @ np.asarray(self.__bases[i]) + np.asarray(self.__origins[i]))
+        corners = np.vstack(corners)
+        return np.array([corners.min(axis=0), corners.max(axis=0)])
@@ -1,3 +1,6 @@
-from .Parametric import ParametricCurve, Line, Arc, Helix
+from .Parametric import ParametricCurve, Line, Arc, Helix, PolylineCurve, CubicSplineCurve, \
+    VectorizedParametricCurve, CompositeCurve
+from .BVH import CurveBVH
 
-__all__ = ['ParametricCurve', 'Line', 'Arc', 'Helix']
+__all__ = ['ParametricCurve', 'Line', 'Arc', 'Helix', 'PolylineCurve', 'CubicSplineCurve', 'VectorizedParametricCurve',
+           'CompositeCurve', 'CurveBVH']
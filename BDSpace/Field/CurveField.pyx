@@ -31,6 +31,26 @@ cdef class CurveField(Field):
         self.__tree_mesh = self.__curve.mesh_tree()
         self.__flat_mesh = self.__tree_mesh.flatten()
         self.__curve.add_element(self)
+        self.invalidate_bounding_box()
+
+    def _bounding_box_local(self):
+        """
+        Box enclosing the curve in local coordinate system of the field, inflated by the cutoff distance.
+        """
+        cutoff = self.cutoff
+        if not np.isfinite(cutoff):
+            return np.array([[-np.inf] * 3, [np.inf] * 3])
+        box = self.__curve._bounding_box_local()
+        corners = np.array([[box[i, 0], box[j, 1], box[k, 2]]
+                            for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.double)
+        corners = np.asarray(self.coordinate_system.to_local(corners))
+        return np.array([corners.min(axis=0) - cutoff, corners.max(axis=0) + cutoff])
+
+    def distance(self, xyz):
+        """
+        Distance from points to the region within cutoff distance from the curve.
+        """
+        return np.maximum(np.asarray(self.__curve.distance(xyz)) - self.cutoff, 0.0)
 
     @property
     def a(self):
@@ -39,6 +59,24 @@ cdef class CurveField(Field):
     @a.setter
     def a(self, double a):
         self.__a = a
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        # the curve is the parent of the field, it is linked in __setstate__
+        return Field, {'name': self.name, 'field_type': self.type}
+
+    def _pickle_state(self):
+        state = super(CurveField, self)._pickle_state()
+        state['attributes'].update(a=self.__a)
+        state['curve'] = self.__curve
+        return state
+
+    def __setstate__(self, state):
+        super(CurveField, self).__setstate__(state)
+        self.__curve = state['curve']
+        self.__tree_mesh = self.__curve.mesh_tree()
+        self.__flat_mesh = self.__tree_mesh.flatten()
+        self.__curve.add_element(self)
 
     cdef double __linear_density_point(self, double t) nogil:
         return self.__a
@@ -72,6 +110,12 @@ cdef class HyperbolicPotentialCurveConservativeField(CurveField):
     @r.setter
     def r(self, double r):
         self.__r = r
+        self.invalidate_bounding_box()
+
+    def _pickle_state(self):
+        state = super(HyperbolicPotentialCurveConservativeField, self)._pickle_state()
+        state['attributes'].update(r=self.__r)
+        return state
 
     @boundscheck(False)
     @wraparound(False)
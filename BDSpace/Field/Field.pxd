@@ -3,6 +3,8 @@ from BDSpace.Space cimport Space
 cdef class Field(Space):
     cdef:
         str __type
+        double __cutoff
+        object __batcher
 
     cdef double[:] __points_scalar(self, double[:, :] xyz, double value)  # nogil
     cdef double[:, :] __points_vector(self, double[:, :] xyz, double[:] value)  # nogil
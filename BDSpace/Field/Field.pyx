@@ -4,15 +4,19 @@ from cython import boundscheck, wraparound
 from cython.parallel import prange
 
 from cpython.array cimport array, clone
+from libc.math cimport INFINITY
 
 from BDSpace.Space cimport Space
 from BDSpace.Coordinates.transforms cimport spherical_to_cartesian_point, spherical_to_cartesian
+from ._line_integral import line_integrals
+from ._batching import FieldBatcher
 
 
 cdef class Field(Space):
 
     def __init__(self, str name, str field_type):
         self.__type = field_type
+        self.__cutoff = INFINITY
         super(Field, self).__init__(name, coordinate_system=None)
 
     @property
@@ -22,6 +26,44 @@ cdef class Field(Space):
     @type.setter
     def type(self, str field_type):
         self.__type = field_type
+        self.invalidate_bounding_box()
+
+    @property
+    def cutoff(self):
+        """
+        Distance from the field source beyond which the field is negligible, infinite by default.
+        Bounding box of the field and spatial queries are based on it.
+        """
+        return self.__cutoff
+
+    @cutoff.setter
+    def cutoff(self, double cutoff):
+        if cutoff < 0:
+            raise ValueError('Cutoff distance must be non-negative')
+        self.__cutoff = cutoff
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return Field, {'name': self.name, 'field_type': self.__type}
+
+    def _pickle_state(self):
+        state = super(Field, self)._pickle_state()
+        state['attributes'].update(cutoff=self.__cutoff)
+        return state
+
+    def _bounding_box_local(self):
+        return np.array([[-self.__cutoff] * 3, [self.__cutoff] * 3], dtype=np.double)
+
+    def distance(self, xyz):
+        """
+        Distance from points to the region where the field is significant,
+        i.e. to the sphere of cutoff radius around the field origin.
+        :param xyz: array of points in global coordinate system shaped Nx3 (or a single 3D point)
+        :return: array of distances, zero inside the cutoff region
+        """
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        local_xyz = np.asarray(self.to_local_coordinate_system(xyz))
+        return np.maximum(np.sqrt(np.sum(local_xyz * local_xyz, axis=1)) - self.__cutoff, 0.0)
 
     def __str__(self):
         description = 'Field: %s (%s)\n' % (self.name, self.type)
@@ -32,6 +74,22 @@ cdef class Field(Space):
             description += str(self.coordinate_system)
         return description
 
+    def line_integral(self, curves, double rtol=1.0e-8, double atol=1.0e-12, int max_evaluations=1000000):
+        """
+        Integrates vector field along the curve from its start to stop (e.g. potential drop or EMF along the path).
+        Adaptive Gauss-Kronrod quadrature runs over the curve mesh tree segments, the field is evaluated
+        in one batch per refinement pass for all curves.
+        :param curves: ParametricCurve object or sequence of curves
+        :param rtol: relative tolerance
+        :param atol: absolute tolerance
+        :param max_evaluations: maximal number of field evaluations
+        :return: integral value, or array of values for sequence of curves
+        """
+        single = not isinstance(curves, (list, tuple))
+        values, _ = line_integrals(self, [curves] if single else list(curves), rtol=rtol, atol=atol,
+                                   max_evaluations=max_evaluations)
+        return values[0] if single else values
+
     cpdef bint add_element(self, Space element):
         return False
 
@@ -139,6 +197,40 @@ cdef class Field(Space):
             double[:, :] xyz = spherical_to_cartesian(rtp)
         return self.vector_field(xyz)
 
+    @property
+    def batcher(self):
+        """
+        FieldBatcher serving scalar_field_async and vector_field_async calls, created on first use.
+        Assign a new FieldBatcher to change its latency and batch size bounds or the executor.
+        """
+        if self.__batcher is None:
+            self.__batcher = FieldBatcher(self)
+        return self.__batcher
+
+    @batcher.setter
+    def batcher(self, batcher):
+        if batcher.field is not self:
+            raise ValueError('Batcher must be created for this field')
+        self.__batcher = batcher
+
+    def scalar_field_async(self, xyz):
+        """
+        Calculates scalar field value at points xyz in the executor thread without blocking the event loop.
+        Small concurrent requests are evaluated together in one batch, see batcher.
+        :param xyz: array of N points with shape (N, 3)
+        :return: awaitable scalar values array
+        """
+        return self.batcher.scalar_field(xyz)
+
+    def vector_field_async(self, xyz):
+        """
+        Calculates vector field value at points xyz in the executor thread without blocking the event loop.
+        Small concurrent requests are evaluated together in one batch, see batcher.
+        :param xyz: array of N points with shape (N, 3)
+        :return: awaitable vector field values array
+        """
+        return self.batcher.vector_field(xyz)
+
 
 cdef class ConstantScalarConservativeField(Field):
 
@@ -153,6 +245,11 @@ cdef class ConstantScalarConservativeField(Field):
     @potential.setter
     def potential(self, double potential):
         self.__potential = potential
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return ConstantScalarConservativeField, {'name': self.name, 'field_type': self.type,
+                                                 'potential': self.__potential}
 
     cpdef double scalar_field_point(self, double[:] xyz):
         return self.__potential
@@ -174,6 +271,11 @@ cdef class ConstantVectorConservativeField(Field):
     @potential.setter
     def potential(self, double[:] potential):
         self.__potential = potential
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return ConstantVectorConservativeField, {'name': self.name, 'field_type': self.type,
+                                                 'potential': np.array(self.__potential)}
 
     cpdef double scalar_field_point(self, double[:] xyz):
         return xyz[0] * self.__potential[0] + xyz[1] * self.__potential[1] + xyz[2] * self.__potential[2]
@@ -0,0 +1,12 @@
+from .Field cimport Field
+
+cdef class OctreeField(Field):
+    cdef:
+        double[:, ::1] __box
+        int __base_resolution
+        int __depth
+        int __num_samples
+        int[:, ::1] __children
+        double[:, :, ::1] __values
+
+    cdef void __interpolate(self, double[:, :] xyz, double[:, ::1] result, int first, int count) nogil
@@ -0,0 +1,214 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from libc.math cimport INFINITY
+
+from .Field cimport Field
+from ._particles import global_vector_field
+from ._isosurface import _LatticeValues, _CORNERS
+
+
+# nodes of the cell bisection which are not the cell corners, in units of half of the cell size
+_MIDPOINTS = np.array([[i, j, k] for i in range(3) for j in range(3) for k in range(3)
+                       if i == 1 or j == 1 or k == 1], dtype=np.int64)
+# trilinear interpolation weights of the cell corners at the midpoints
+_MIDPOINTS_WEIGHTS = np.prod(np.where(_CORNERS[np.newaxis, :, :] == 1,
+                                      _MIDPOINTS[:, np.newaxis, :] / 2.0,
+                                      1.0 - _MIDPOINTS[:, np.newaxis, :] / 2.0), axis=2)
+
+
+def _magnitudes(values):
+    """
+    Absolute values of the scalar field and magnitudes of the vector field of samples shaped (..., 4).
+    """
+    return np.abs(values[..., 0]), np.sqrt(np.sum(values[..., 1:] ** 2, axis=-1))
+
+
+def _build_octree(field, box, int base_resolution, int max_depth, double rtol, double atol, double max_gradient):
+    """
+    Samples scalar and vector field on the octree refined level by level.
+    A cell is bisected if trilinear interpolation of its corner values misses the field at any of
+    19 bisection nodes by more than atol + rtol * |field|, or if the field changes over the cell
+    faster than max_gradient. Each level is sampled with one batched call of the field methods,
+    samples shared by neighbouring cells and levels are evaluated once.
+    :return: tuple of children indices array shaped Mx8 (-1 for leaves), corner values array shaped Mx8x4,
+             number of samples and depth of the octree
+    """
+
+    def sample(xyz):
+        values = np.empty((xyz.shape[0], 4), dtype=np.double)
+        values[:, 0] = field.scalar_field(field.to_local_coordinate_system(xyz))
+        values[:, 1:] = global_vector_field(field, xyz)
+        return values
+
+    divisions = base_resolution * 2 ** max_depth
+    lattice = _LatticeValues(sample, box[0], (box[1] - box[0]) / divisions, divisions + 1)
+    size = 2 ** max_depth
+    axis = np.arange(base_resolution, dtype=np.int64) * size
+    origins = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    nodes = np.arange(origins.shape[0])
+    children = [np.full((nodes.size, 8), -1, dtype=np.intc)]
+    values = [lattice(origins[:, np.newaxis, :] + size * _CORNERS)]
+    level_start = 0
+    depth = 0
+    while size > 1:
+        corners = values[-1]
+        half = size // 2
+        exact = lattice(origins[:, np.newaxis, :] + half * _MIDPOINTS)
+        interpolated = np.einsum('tc,ncv->ntv', _MIDPOINTS_WEIGHTS, corners)
+        error_scalar, error_vector = _magnitudes(exact - interpolated)
+        scalar, vector = _magnitudes(exact)
+        refine = ~np.all((error_scalar <= atol + rtol * scalar) & (error_vector <= atol + rtol * vector), axis=1)
+        if np.isfinite(max_gradient):
+            h = np.min(lattice.step) * size
+            scalar_range = np.ptp(corners[:, :, 0], axis=1)
+            vector_range = np.sqrt(np.sum(np.ptp(corners[:, :, 1:], axis=1) ** 2, axis=1))
+            refine |= np.maximum(scalar_range, vector_range) > max_gradient * h
+        if not np.any(refine):
+            break
+        depth += 1
+        size = half
+        parents = np.flatnonzero(refine)
+        next_start = level_start + nodes.size
+        nodes = next_start + np.arange(8 * parents.size)
+        children[-1][parents] = nodes.reshape(-1, 8)
+        level_start = next_start
+        origins = (origins[parents][:, np.newaxis, :] + size * _CORNERS).reshape(-1, 3)
+        children.append(np.full((nodes.size, 8), -1, dtype=np.intc))
+        values.append(lattice(origins[:, np.newaxis, :] + size * _CORNERS))
+    return np.concatenate(children), np.concatenate(values), lattice.evaluations, depth
+
+
+cdef class OctreeField(Field):
+
+    def __init__(self, str name, Field field, box, int base_resolution=4, int max_depth=6,
+                 double rtol=1.0e-3, double atol=0.0, double max_gradient=INFINITY):
+        """
+        Field sampled from another field on the adaptive octree over the box and interpolated trilinearly
+        inside the octree leaves. Cells are refined only where the interpolation error or the field gradient
+        exceed the tolerance, so smooth regions are covered by few large cells while the cells shrink near
+        sources and wires. Outside the box both scalar and vector fields are zero.
+        :param name: name of the field
+        :param field: sampled Field object
+        :param box: box in global coordinate system given as 2x3 array of its minimal and maximal corners,
+                    which is the local coordinate system of the octree field after creation
+        :param base_resolution: number of the coarse cells along each axis
+        :param max_depth: maximal number of cells bisections
+        :param rtol: relative tolerance of the interpolation
+        :param atol: absolute tolerance of the interpolation
+        :param max_gradient: cells where the field changes faster than max_gradient are refined
+        """
+        box = np.array(box, dtype=np.double)
+        if box.shape != (2, 3) or not np.all(np.isfinite(box)) or np.any(box[1] <= box[0]):
+            raise ValueError('Octree field needs finite non-empty box')
+        if base_resolution < 1 or max_depth < 0:
+            raise ValueError('Base resolution must be positive and maximal depth non-negative')
+        super(OctreeField, self).__init__(name, field.type)
+        self.__box = box
+        self.__base_resolution = base_resolution
+        self.__children, self.__values, self.__num_samples, self.__depth = _build_octree(
+            field, box, base_resolution, max_depth, rtol, atol, max_gradient)
+
+    @property
+    def box(self):
+        return np.asarray(self.__box)
+
+    @property
+    def depth(self):
+        """
+        Number of cells bisections down to the finest leaves.
+        """
+        return self.__depth
+
+    @property
+    def num_samples(self):
+        """
+        Number of points where the sampled field was evaluated.
+        """
+        return self.__num_samples
+
+    @property
+    def num_leaves(self):
+        return int(np.sum(np.asarray(self.__children)[:, 0] < 0))
+
+    def _bounding_box_local(self):
+        return np.array(self.__box)
+
+    def _pickle_parameters(self):
+        # the sampled field is not shipped, the octree samples are restored from the state
+        return Field, {'name': self.name, 'field_type': self.type}
+
+    def _pickle_state(self):
+        state = super(OctreeField, self)._pickle_state()
+        state['octree'] = (np.array(self.__box), self.__base_resolution, self.__depth, self.__num_samples,
+                           np.array(self.__children), np.array(self.__values))
+        return state
+
+    def __setstate__(self, state):
+        (self.__box, self.__base_resolution, self.__depth, self.__num_samples,
+         self.__children, self.__values) = state['octree']
+        super(OctreeField, self).__setstate__(state)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef void __interpolate(self, double[:, :] xyz, double[:, ::1] result, int first, int count) nogil:
+        cdef:
+            int i, j, c, node, bits, s = xyz.shape[0], n = self.__base_resolution
+            int cx, cy, cz
+            double ux, uy, uz, weight
+        for i in prange(s):
+            ux = (xyz[i, 0] - self.__box[0, 0]) / (self.__box[1, 0] - self.__box[0, 0]) * n
+            uy = (xyz[i, 1] - self.__box[0, 1]) / (self.__box[1, 1] - self.__box[0, 1]) * n
+            uz = (xyz[i, 2] - self.__box[0, 2]) / (self.__box[1, 2] - self.__box[0, 2]) * n
+            for j in range(count):
+                result[i, j] = 0.0
+            if not (0 <= ux <= n and 0 <= uy <= n and 0 <= uz <= n):
+                continue
+            cx = min(<int> ux, n - 1)
+            cy = min(<int> uy, n - 1)
+            cz = min(<int> uz, n - 1)
+            ux = ux - cx
+            uy = uy - cy
+            uz = uz - cz
+            node = (cx * n + cy) * n + cz
+            while self.__children[node, 0] >= 0:
+                bits = 0
+                ux = 2 * ux
+                uy = 2 * uy
+                uz = 2 * uz
+                if ux >= 1:
+                    bits = bits + 1
+                    ux = ux - 1
+                if uy >= 1:
+                    bits = bits + 2
+                    uy = uy - 1
+                if uz >= 1:
+                    bits = bits + 4
+                    uz = uz - 1
+                node = self.__children[node, bits]
+            for c in range(8):
+                weight = (ux if c & 1 else 1 - ux) * (uy if c & 2 else 1 - uy) * (uz if c & 4 else 1 - uz)
+                for j in range(count):
+                    result[i, j] = result[i, j] + weight * self.__values[node, c, first + j]
+
+    cpdef double scalar_field_point(self, double[:] xyz):
+        return self.scalar_field(np.asarray(xyz).reshape(1, 3))[0]
+
+    cpdef double[:] scalar_field(self, double[:, :] xyz):
+        cdef:
+            double[:, ::1] result = np.empty((xyz.shape[0], 1), dtype=np.double)
+        with nogil:
+            self.__interpolate(xyz, result, 0, 1)
+        return np.asarray(result)[:, 0]
+
+    cpdef double[:] vector_field_point(self, double[:] xyz):
+        return self.vector_field(np.asarray(xyz).reshape(1, 3))[0]
+
+    cpdef double[:, :] vector_field(self, double[:, :] xyz):
+        cdef:
+            double[:, ::1] result = np.empty((xyz.shape[0], 3), dtype=np.double)
+        with nogil:
+            self.__interpolate(xyz, result, 1, 3)
+        return result
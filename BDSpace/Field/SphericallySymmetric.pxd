@@ -16,3 +16,8 @@ cdef class SphericallySymmetric(Field):
 cdef class HyperbolicPotentialSphericalConservativeField(SphericallySymmetric):
     cdef:
         double __a
+
+cdef class VectorizedSphericallySymmetric(SphericallySymmetric):
+    cdef:
+        object __scalar_law
+        object __vector_law
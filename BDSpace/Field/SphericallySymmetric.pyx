@@ -24,6 +24,10 @@ cdef class SphericallySymmetric(Field):
     @r.setter
     def r(self, double r):
         self.__r = r
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return SphericallySymmetric, {'name': self.name, 'field_type': self.type, 'r': self.__r}
 
     @boundscheck(False)
     @wraparound(False)
@@ -201,6 +205,11 @@ cdef class HyperbolicPotentialSphericalConservativeField(SphericallySymmetric):
     @a.setter
     def a(self, double a):
         self.__a = a
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return HyperbolicPotentialSphericalConservativeField, {'name': self.name, 'field_type': self.type,
+                                                               'r': self.__r, 'a': self.__a}
 
     cdef double scalar_field_r_law(self, double r) nogil:
         if r < self.__r:
@@ -211,3 +220,108 @@ cdef class HyperbolicPotentialSphericalConservativeField(SphericallySymmetric):
         if r < self.__r:
             return 0.0
         return self.__a / (r * r)
+
+
+cdef class VectorizedSphericallySymmetric(SphericallySymmetric):
+    """
+    Spherically symmetric field with radial laws given by NumPy-vectorized python callables.
+    scalar_law(r) takes an array of distances and returns an array of scalar field values,
+    optional vector_law(r) returns radial component of the vector field.
+    If vector_law is not provided the field is treated as conservative and
+    the vector field is calculated as minus derivative of the scalar law with a finite difference stencil.
+    Laws are called once per batch of points.
+    """
+
+    def __init__(self, str name, str field_type, scalar_law, vector_law=None, double r=0.0):
+        self.__scalar_law = scalar_law
+        self.__vector_law = vector_law
+        super(VectorizedSphericallySymmetric, self).__init__(name, field_type, r)
+
+    @property
+    def scalar_law(self):
+        return self.__scalar_law
+
+    @scalar_law.setter
+    def scalar_law(self, scalar_law):
+        self.__scalar_law = scalar_law
+        self.invalidate_bounding_box()
+
+    @property
+    def vector_law(self):
+        return self.__vector_law
+
+    @vector_law.setter
+    def vector_law(self, vector_law):
+        self.__vector_law = vector_law
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        # the laws must be picklable, e.g. module level functions or NumPy ufuncs
+        return VectorizedSphericallySymmetric, {'name': self.name, 'field_type': self.type,
+                                                'scalar_law': self.__scalar_law, 'vector_law': self.__vector_law,
+                                                'r': self.r}
+
+    cdef double scalar_field_r_law(self, double r) nogil:
+        with gil:
+            return self.scalar_field_r(np.array([r], dtype=np.double))[0]
+
+    cpdef double scalar_field_r_point(self, double r):
+        return self.scalar_field_r(np.array([r], dtype=np.double))[0]
+
+    cpdef double[:] scalar_field_r(self, double[:] r):
+        r_array = np.asarray(r)
+        return np.require(np.broadcast_to(np.asarray(self.__scalar_law(r_array), dtype=np.double), r_array.shape),
+                          requirements=['C', 'W'])
+
+    cdef double vector_field_r_law(self, double r) nogil:
+        with gil:
+            return self.vector_field_r(np.array([r], dtype=np.double))[0]
+
+    cpdef double vector_field_r_point(self, double r):
+        return self.vector_field_r(np.array([r], dtype=np.double))[0]
+
+    cpdef double[:] vector_field_r(self, double[:] r):
+        cdef:
+            int n
+        r_array = np.asarray(r)
+        if self.__vector_law is not None:
+            return np.require(np.broadcast_to(np.asarray(self.__vector_law(r_array), dtype=np.double),
+                                              r_array.shape), requirements=['C', 'W'])
+        n = r_array.size
+        h = 7.0e-4 * np.maximum(1.0, np.abs(r_array))
+        f = np.asarray(self.scalar_field_r(np.concatenate((r_array - 2 * h, r_array - h,
+                                                           r_array + h, r_array + 2 * h)))).reshape((4, n))
+        return -(f[0] - 8 * f[1] + 8 * f[2] - f[3]) / (12 * h)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef double[:] scalar_field(self, double[:, :] xyz):
+        cdef:
+            int i, s = xyz.shape[0]
+            double[:] r = np.empty(s, dtype=np.double)
+        with nogil:
+            for i in prange(s):
+                r[i] = self.__get_r(xyz[i])
+        return self.scalar_field_r(r)
+
+    cpdef double[:] scalar_field_polar(self, double[:, :] rtp):
+        return self.scalar_field_r(np.ascontiguousarray(np.asarray(rtp)[:, 0]))
+
+    @boundscheck(False)
+    @wraparound(False)
+    cpdef double[:, :] vector_field_polar(self, double[:, :] rtp):
+        cdef:
+            int i, s = rtp.shape[0]
+            double[:] mag = self.vector_field_r(np.ascontiguousarray(np.asarray(rtp)[:, 0]))
+            double[:, :] result = np.empty((s, 3), dtype=np.double)
+        with nogil:
+            for i in prange(s):
+                if mag[i] < 0:
+                    result[i, 0] = fabs(mag[i])
+                    result[i, 1] = M_PI - rtp[i, 1]
+                    result[i, 2] = fmod((rtp[i, 2] + M_PI), (2 * M_PI))
+                else:
+                    result[i, 0] = mag[i]
+                    result[i, 1] = rtp[i, 1]
+                    result[i, 2] = rtp[i, 2]
+        return result
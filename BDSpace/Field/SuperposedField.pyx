@@ -1,3 +1,5 @@
+import numpy as np
+
 from cython import boundscheck, wraparound
 from cython.parallel import prange
 
@@ -20,6 +22,9 @@ cdef class SuperposedField(Field):
     def fields(self):
         return self.__fields
 
+    def _pickle_parameters(self):
+        return SuperposedField, {'name': self.name, 'fields': list(self.__fields)}
+
     @fields.setter
     def fields(self, list fields):
         self.__fields = []
@@ -31,6 +36,42 @@ cdef class SuperposedField(Field):
             if self.type != field.type:
                 raise ValueError('All fields must be iterable of Field class instances')
             self.__fields.append(field)
+        self.invalidate_bounding_box()
+
+    @property
+    def global_state(self):
+        """
+        Global state of the superposed field including global states of all its fields.
+        """
+        state = super(SuperposedField, self).global_state
+        for field in self.__fields:
+            state += field.global_state
+        return state
+
+    def _bounding_box_local(self):
+        """
+        Box enclosing bounding boxes of all superposed fields in local coordinate system.
+        """
+        boxes = [field.bounding_box() for field in self.__fields]
+        boxes = [box for box in boxes if box is not None]
+        if not boxes:
+            return None
+        boxes = np.array(boxes)
+        if not np.all(np.isfinite(boxes)):
+            return np.array([[-np.inf] * 3, [np.inf] * 3])
+        corners = np.array([[box[i, 0], box[j, 1], box[k, 2]] for box in boxes
+                            for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.double)
+        corners = np.asarray(self.to_local_coordinate_system(corners))
+        return np.array([corners.min(axis=0), corners.max(axis=0)])
+
+    def distance(self, xyz):
+        """
+        Distance from points to the nearest significant region of the superposed fields.
+        """
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        if not self.__fields:
+            return np.full(xyz.shape[0], np.inf, dtype=np.double)
+        return np.min([field.distance(xyz) for field in self.__fields], axis=0)
 
     @boundscheck(False)
     @wraparound(False)
@@ -1,9 +1,19 @@
 from .Field import Field, ConstantScalarConservativeField, ConstantVectorConservativeField
 from .SphericallySymmetric import SphericallySymmetric, HyperbolicPotentialSphericalConservativeField
+from .SphericallySymmetric import VectorizedSphericallySymmetric
 from .SuperposedField import SuperposedField
 from .CurveField import CurveField, HyperbolicPotentialCurveConservativeField
+from .OctreeField import OctreeField
+from ._tracing import trace_field_lines
+from ._particles import push_particles
+from ._process_pool import ProcessPoolFieldEvaluator
+from ._batching import FieldBatcher
+from ._isosurface import extract_isosurface
 
 __all__ = ['Field', 'ConstantScalarConservativeField', 'ConstantVectorConservativeField',
-           'SphericallySymmetric', 'HyperbolicPotentialSphericalConservativeField',
+           'SphericallySymmetric', 'HyperbolicPotentialSphericalConservativeField', 'VectorizedSphericallySymmetric',
            'SuperposedField',
-           'CurveField', 'HyperbolicPotentialCurveConservativeField']
+           'CurveField', 'HyperbolicPotentialCurveConservativeField',
+           'OctreeField',
+           'trace_field_lines', 'push_particles', 'extract_isosurface',
+           'ProcessPoolFieldEvaluator', 'FieldBatcher']
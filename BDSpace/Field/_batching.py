@@ -0,0 +1,152 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+
+_executor = None
+
+
+def default_executor():
+    """
+    Thread pool shared by the field batchers, bounded by the number of CPUs.
+    Field kernels release the GIL, so batches of different fields are evaluated in parallel.
+    :return: ThreadPoolExecutor object
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='BDSpace')
+    return _executor
+
+
+def _evaluate(method, xyz):
+    return np.asarray(method(xyz))
+
+
+class FieldBatcher(object):
+    """
+    Asyncio facade of a field which joins small concurrent requests into one kernel call.
+    Requests for the same field are collected for at most max_delay seconds or until max_batch points,
+    then the points are evaluated in one batch in the executor thread, so the event loop is never blocked,
+    and the results are split back to the callers. Requests larger than max_batch are evaluated alone.
+    A batcher serves one event loop at a time and must be used from the thread of the loop.
+    """
+
+    def __init__(self, field, max_batch=65536, max_delay=0.001, executor=None):
+        """
+        :param field: Field object to evaluate
+        :param max_batch: number of points which triggers the batch evaluation immediately
+        :param max_delay: maximal time in seconds a request waits for other requests to join the batch
+        :param executor: concurrent.futures executor for the kernel calls, default_executor() if None
+        """
+        if max_batch < 1 or max_delay < 0:
+            raise ValueError('Batch size must be positive and delay non-negative')
+        self.__field = field
+        self.__max_batch = max_batch
+        self.__max_delay = max_delay
+        self.__executor = executor
+        self.__loop = None
+        self.__pending = {'scalar': [], 'vector': []}
+        self.__pending_points = {'scalar': 0, 'vector': 0}
+        self.__timers = {'scalar': None, 'vector': None}
+
+    @property
+    def field(self):
+        return self.__field
+
+    @property
+    def max_batch(self):
+        return self.__max_batch
+
+    @property
+    def max_delay(self):
+        return self.__max_delay
+
+    def __submit(self, kind, xyz):
+        loop = asyncio.get_running_loop()
+        if loop is not self.__loop:
+            self.__loop = loop
+            self.__pending = {'scalar': [], 'vector': []}
+            self.__pending_points = {'scalar': 0, 'vector': 0}
+            self.__timers = {'scalar': None, 'vector': None}
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        n = xyz.shape[0]
+        future = loop.create_future()
+        if n == 0:
+            future.set_result(np.zeros((0,) if kind == 'scalar' else (0, 3), dtype=np.double))
+        elif n >= self.__max_batch:
+            self.__run(kind, [(xyz, future)])
+        else:
+            if self.__pending_points[kind] + n > self.__max_batch:
+                self.flush(kind)
+            self.__pending[kind].append((xyz, future))
+            self.__pending_points[kind] += n
+            if self.__pending_points[kind] >= self.__max_batch:
+                self.flush(kind)
+            elif self.__timers[kind] is None:
+                self.__timers[kind] = loop.call_later(self.__max_delay, self.flush, kind)
+        return future
+
+    def flush(self, kind=None):
+        """
+        Starts evaluation of the collected requests without waiting for the delay to expire.
+        :param kind: 'scalar' or 'vector', both if None
+        """
+        for kind in (('scalar', 'vector') if kind is None else (kind,)):
+            if self.__timers[kind] is not None:
+                self.__timers[kind].cancel()
+                self.__timers[kind] = None
+            requests = self.__pending[kind]
+            self.__pending[kind] = []
+            self.__pending_points[kind] = 0
+            if requests:
+                self.__run(kind, requests)
+
+    def __run(self, kind, requests):
+        if len(requests) == 1:
+            xyz = requests[0][0]
+        else:
+            xyz = np.concatenate([request[0] for request in requests])
+        method = self.__field.scalar_field if kind == 'scalar' else self.__field.vector_field
+        executor = self.__executor if self.__executor is not None else default_executor()
+        task = self.__loop.run_in_executor(executor, _evaluate, method, xyz)
+        task.add_done_callback(partial(_dispatch, requests))
+
+    async def scalar_field(self, xyz):
+        """
+        Scalar field values at the points.
+        :param xyz: array of points in local coordinate system of the field shaped Nx3
+        :return: array of N values
+        """
+        return await self.__submit('scalar', xyz)
+
+    async def vector_field(self, xyz):
+        """
+        Vector field values at the points.
+        :param xyz: array of points in local coordinate system of the field shaped Nx3
+        :return: array of vectors shaped Nx3
+        """
+        return await self.__submit('vector', xyz)
+
+
+def _dispatch(requests, task):
+    """
+    Splits the result of the batch between the futures of the requests, callers which cancelled
+    their requests are skipped.
+    """
+    if task.cancelled():
+        for _, future in requests:
+            future.cancel()
+        return
+    error = task.exception()
+    start = 0
+    for xyz, future in requests:
+        stop = start + xyz.shape[0]
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(task.result()[start:stop])
+        start = stop
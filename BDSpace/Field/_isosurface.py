@@ -0,0 +1,169 @@
+import numpy as np
+
+from BDSpace.Figure._meshing import _KUHN_TETRAHEDRA, merge_vertices, merging_tolerance, compact
+
+
+# corners of the unit cube cell enumerated by bits (u + 2 * v + 4 * w)
+_CORNERS = np.array([[(bits >> d) & 1 for d in range(3)] for bits in range(8)], dtype=np.int64)
+
+
+class _LatticeValues(object):
+    """
+    Field values at the nodes of the regular lattice evaluated on demand and kept for reuse.
+    Function may return one value or an array of values per point.
+    """
+
+    def __init__(self, function, origin, step, nodes):
+        self.function = function
+        self.origin = origin
+        self.step = step
+        self.nodes = nodes
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = None
+        self.evaluations = 0
+
+    def key(self, ijk):
+        return (ijk[..., 0] * self.nodes + ijk[..., 1]) * self.nodes + ijk[..., 2]
+
+    def points(self, ijk):
+        return self.origin + ijk * self.step
+
+    def __call__(self, ijk):
+        keys = self.key(ijk)
+        flat = keys.ravel()
+        known = np.zeros(flat.size, dtype=bool)
+        if self.keys.size > 0:
+            position = np.minimum(np.searchsorted(self.keys, flat), self.keys.size - 1)
+            known = self.keys[position] == flat
+        if not np.all(known):
+            missing, first = np.unique(flat[~known], return_index=True)
+            xyz = self.points(ijk.reshape(-1, 3)[~known][first].astype(np.double))
+            values = np.asarray(self.function(np.ascontiguousarray(xyz)), dtype=np.double)
+            self.evaluations += missing.size
+            merged = np.concatenate((self.keys, missing))
+            order = np.argsort(merged, kind='stable')
+            self.keys = merged[order]
+            if self.values is not None:
+                values = np.concatenate((self.values, values))
+            self.values = values[order]
+            position = np.searchsorted(self.keys, flat)
+        return self.values[position].reshape(keys.shape + self.values.shape[1:])
+
+
+def _marching_tetrahedra(lattice, ijk, values, level):
+    """
+    Triangulates the level set inside the tetrahedra given by lattice nodes.
+    Vertices on the same lattice edge are shared, triangles are oriented along the field growth.
+    """
+    above = values > level
+    count = above.sum(axis=1)
+    order = np.argsort(~above, axis=1, kind='stable')  # vertices above the level first
+    triangles_edges = []
+    single = (count == 1) | (count == 3)
+    if np.any(single):
+        o = order[single]
+        lone = np.where(count[single] == 1, o[:, 0], o[:, 3])
+        others = np.where((count[single] == 1)[:, np.newaxis], o[:, 1:], o[:, :3])
+        tetrahedra = np.flatnonzero(single)
+        triangles_edges.append((tetrahedra, np.stack([np.stack((lone, others[:, i]), axis=1)
+                                                      for i in range(3)], axis=1)))
+    double = count == 2
+    if np.any(double):
+        o = order[double]
+        tetrahedra = np.flatnonzero(double)
+        quad = np.stack((o[:, [0, 2]], o[:, [0, 3]], o[:, [1, 3]], o[:, [1, 2]]), axis=1)
+        triangles_edges.append((tetrahedra, quad[:, [0, 1, 2]]))
+        triangles_edges.append((tetrahedra, quad[:, [0, 2, 3]]))
+    if not triangles_edges:
+        return np.zeros((0, 3), dtype=np.double), np.zeros((0, 3), dtype=np.int64)
+    tetrahedra = np.concatenate([t for t, _ in triangles_edges])
+    local = np.concatenate([e for _, e in triangles_edges])  # triangles x 3 edges x 2 local vertices
+    t = tetrahedra[:, np.newaxis]
+    a = ijk[t, local[..., 0]].reshape(-1, 3)
+    b = ijk[t, local[..., 1]].reshape(-1, 3)
+    fa = values[t, local[..., 0]].ravel()
+    fb = values[t, local[..., 1]].ravel()
+    # edges of Kuhn tetrahedra are monotone lattice steps: edge key is its lower node key and step bits
+    key_a = lattice.key(a)
+    key_b = lattice.key(b)
+    step = np.abs(b - a)
+    edge_keys = np.minimum(key_a, key_b) * 8 + step[:, 0] + 2 * step[:, 1] + 4 * step[:, 2]
+    unique_edges, index = np.unique(edge_keys, return_inverse=True)
+    fraction = ((level - fa) / (fb - fa))[:, np.newaxis]
+    points = lattice.points(a + fraction * (b - a))
+    vertices = np.empty((unique_edges.shape[0], 3), dtype=np.double)
+    vertices[index.ravel()] = points
+    faces = index.reshape(-1, 3)
+    # orientation: normals point from the centroid of the vertices below the level to the centroid of those above
+    upper = above[tetrahedra]
+    weights = np.where(upper, 1.0 / count[tetrahedra, np.newaxis], -1.0 / (4 - count[tetrahedra, np.newaxis]))
+    weights = weights[:, :, np.newaxis]
+    growth = np.sum(weights * ijk[tetrahedra], axis=1) * lattice.step
+    normals = np.cross(vertices[faces[:, 1]] - vertices[faces[:, 0]], vertices[faces[:, 2]] - vertices[faces[:, 0]])
+    flip = np.einsum('ij,ij->i', normals, growth) < 0
+    faces[flip] = faces[flip][:, [0, 2, 1]]
+    return vertices, faces
+
+
+def extract_isosurface(field, level, domain, resolution=64, base_resolution=8, margin=0.5):
+    """
+    Extracts the surface where the scalar field equals the level (e.g. an equipotential) by marching tetrahedra
+    (each lattice cube is split into six tetrahedra). The field is sampled on the coarse grid first,
+    then only the cells which straddle the level, or are close to it relative to the spread of their
+    corner values, are bisected until the finest resolution is reached. Field values are evaluated
+    in one batch per refinement level and only at the new nodes, so the cost grows with the surface
+    area rather than with the volume of the domain.
+    :param field: Field object
+    :param level: value of the scalar field on the surface
+    :param domain: Figure (only triangles with centroids inside it are kept) or bounding box in global coordinates
+                   given as 2x3 array of its minimal and maximal corners
+    :param resolution: number of the finest cells along each axis of the bounding box,
+                       rounded up to base_resolution times a power of two
+    :param base_resolution: number of the coarse cells along each axis
+    :param margin: cells are refined if the level is within their corner values range extended by margin times
+                   the range, features smaller than the coarse cells may be missed if it is too small
+    :return: tuple of read-only vertices (global coordinates) and triangles arrays,
+             triangles normals point in the direction of the field growth
+    """
+    figure = domain if hasattr(domain, 'contains') else None
+    box = np.asarray(figure.bounding_box() if figure is not None else domain, dtype=np.double)
+    if box.shape != (2, 3) or not np.all(np.isfinite(box)) or np.any(box[1] <= box[0]):
+        raise ValueError('Isosurface extraction needs finite non-empty bounding box')
+    levels = max(int(np.ceil(np.log2(max(resolution / float(base_resolution), 1.0)))), 0)
+    divisions = base_resolution * 2 ** levels
+
+    def scalar_field(xyz):
+        return field.scalar_field(field.to_local_coordinate_system(xyz))
+
+    lattice = _LatticeValues(scalar_field, box[0], (box[1] - box[0]) / divisions, divisions + 1)
+    size = 2 ** levels
+    axis = np.arange(base_resolution, dtype=np.int64) * size
+    cells = np.stack(np.meshgrid(axis, axis, axis, indexing='ij'), axis=-1).reshape(-1, 3)
+    while True:
+        corners = cells[:, np.newaxis, :] + size * _CORNERS
+        values = lattice(corners)
+        low = values.min(axis=1)
+        high = values.max(axis=1)
+        if size == 1:
+            keep = (low <= level) & (high > level)
+            break
+        spread = margin * (high - low)
+        keep = (low - spread <= level) & (high + spread >= level)
+        size //= 2
+        cells = (cells[keep][:, np.newaxis, :] + size * _CORNERS).reshape(-1, 3)
+        if cells.shape[0] == 0:
+            break
+    if cells.shape[0] == 0 or not np.any(keep):
+        return compact(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32))
+    corners = corners[keep]
+    values = values[keep]
+    ijk = corners[:, _KUHN_TETRAHEDRA].reshape(-1, 4, 3)
+    vertices, faces = _marching_tetrahedra(lattice, ijk, values[:, _KUHN_TETRAHEDRA].reshape(-1, 4), level)
+    if figure is not None and faces.shape[0] > 0:
+        centroids = np.ascontiguousarray(vertices[faces].mean(axis=1))
+        faces = faces[np.asarray(figure.contains(centroids)).astype(bool)]
+    if faces.shape[0] == 0:
+        return compact(np.zeros((0, 3)), np.zeros((0, 3), dtype=np.int32))
+    vertices, faces = merge_vertices(vertices, faces, merging_tolerance(vertices))
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    return compact(vertices, faces)
@@ -0,0 +1,111 @@
+import numpy as np
+
+from ._particles import global_vector_field
+
+
+# Gauss-Kronrod 7-15 rule on [-1, 1]: Kronrod nodes and weights, Gauss weights on every second node
+_NODES = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                   0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                   0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                   0.207784955007898467600689403773245, 0.0])
+_KRONROD_WEIGHTS = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                             0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                             0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                             0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_GAUSS_WEIGHTS = np.array([0.0, 0.129484966168869693270611432679082, 0.0, 0.279705391489276667901467771423780,
+                           0.0, 0.381830050505118944950369775488975, 0.0, 0.417959183673469387755102040816327])
+
+
+def gauss_kronrod_rule():
+    """
+    Gauss-Kronrod 7-15 rule on [-1, 1].
+    :return: tuple of 15 nodes, Kronrod weights and Gauss weights (zero at Kronrod-only nodes)
+    """
+    nodes = np.concatenate((-_NODES[:-1], _NODES[::-1]))
+    kronrod = np.concatenate((_KRONROD_WEIGHTS[:-1], _KRONROD_WEIGHTS[::-1]))
+    gauss = np.concatenate((_GAUSS_WEIGHTS[:-1], _GAUSS_WEIGHTS[::-1]))
+    return nodes, kronrod, gauss
+
+
+def _global_vectors(space, vectors):
+    """
+    Converts vectors components from local coordinate system of the space to global coordinate system.
+    """
+    origin = np.asarray(space.to_global_coordinate_system_vector(np.zeros(3, dtype=np.double)))
+    return np.asarray(space.to_global_coordinate_system(np.ascontiguousarray(vectors))) - origin
+
+
+def _breakpoints(curve, max_iterations):
+    """
+    Initial partition of the curve parameter range: nodes of the flattened mesh tree of the curve
+    (dense where the curve bends) and polyline vertices.
+    """
+    start, stop = min(curve.start, curve.stop), max(curve.start, curve.stop)
+    t = [np.array([start, stop])]
+    if curve.start < curve.stop:
+        t.append(np.asarray(curve.mesh_tree(max_iterations).flatten().physical_nodes, dtype=np.double))
+    vertices = getattr(curve, 'vertices_t', None)
+    if vertices is not None:
+        t.append(np.asarray(vertices, dtype=np.double))
+    t = np.unique(np.concatenate(t))
+    return t[(t >= start) & (t <= stop)]
+
+
+def line_integrals(field, curves, rtol=1e-8, atol=1e-12, max_evaluations=1000000, max_iterations=100):
+    """
+    Integrates the vector field along the curves from start to stop of each curve: sum of E(r(t)) * r'(t) dt.
+    Segments of the curves mesh trees are integrated by the Gauss-Kronrod 7-15 rule and bisected
+    while the difference of Gauss and Kronrod estimates exceeds the share of the tolerance proportional
+    to the segment length. Each refinement pass evaluates the field once for all segments of all curves.
+    :param field: Field object
+    :param curves: list of ParametricCurve objects
+    :param rtol: relative tolerance of each integral
+    :param atol: absolute tolerance of each integral
+    :param max_evaluations: refinement stops when the total number of field evaluations exceeds this limit
+    :param max_iterations: maximal number of iterations of the curves mesh trees refinement
+    :return: tuple of arrays of integrals and their error estimates
+    """
+    nodes, kronrod_weights, gauss_weights = gauss_kronrod_rule()
+    n = len(curves)
+    spans = np.array([abs(curve.stop - curve.start) for curve in curves], dtype=np.double)
+    signs = np.array([1.0 if curve.stop >= curve.start else -1.0 for curve in curves])
+    breakpoints = [_breakpoints(curve, max_iterations) for curve in curves]
+    owners = np.concatenate([np.full(t.size - 1, i) for i, t in enumerate(breakpoints)]).astype(np.intp)
+    lo = np.concatenate([t[:-1] for t in breakpoints])
+    hi = np.concatenate([t[1:] for t in breakpoints])
+    accepted = np.zeros(n, dtype=np.double)
+    error = np.zeros(n, dtype=np.double)
+    evaluations = 0
+    while owners.size > 0:
+        middle = 0.5 * (lo + hi)
+        half = 0.5 * (hi - lo)
+        t = middle[:, np.newaxis] + half[:, np.newaxis] * nodes
+        order = np.argsort(owners, kind='stable')
+        bounds = np.searchsorted(owners[order], np.arange(n + 1))
+        points = np.empty((owners.size, nodes.size, 3), dtype=np.double)
+        tangents = np.empty((owners.size, nodes.size, 3), dtype=np.double)
+        for i in np.flatnonzero(np.diff(bounds)):
+            curve = curves[i]
+            selection = order[bounds[i]:bounds[i + 1]]
+            t_curve = np.ascontiguousarray(t[selection].ravel())
+            xyz = np.asarray(curve.to_global_coordinate_system(curve.generate_points(t_curve)))
+            points[selection] = xyz.reshape(-1, nodes.size, 3)
+            tangents[selection] = _global_vectors(curve, curve.derivative(t_curve)).reshape(-1, nodes.size, 3)
+        vectors = global_vector_field(field, points.reshape(-1, 3)).reshape(tangents.shape)
+        values = np.sum(vectors * tangents, axis=2)
+        evaluations += values.size
+        kronrod = half * np.dot(values, kronrod_weights)
+        differences = np.abs(kronrod - half * np.dot(values, gauss_weights))
+        totals = accepted + np.bincount(owners, weights=kronrod, minlength=n)
+        tolerance = np.maximum(atol, rtol * np.abs(totals)) / np.where(spans > 0, spans, 1.0)
+        converged = differences <= tolerance[owners] * (hi - lo)
+        converged |= half <= 1e-15 * np.maximum(np.abs(middle), spans[owners])
+        if evaluations >= max_evaluations:
+            converged[:] = True
+        accepted += np.bincount(owners[converged], weights=kronrod[converged], minlength=n)
+        error += np.bincount(owners[converged], weights=differences[converged], minlength=n)
+        active = ~converged
+        owners = np.repeat(owners[active], 2)
+        lo, hi = (np.column_stack((lo[active], middle[active])).ravel(),
+                  np.column_stack((middle[active], hi[active])).ravel())
+    return signs * accepted, error
@@ -0,0 +1,7 @@
+cdef void boris_velocity(double[:, ::1] v, Py_ssize_t p, double[:, ::1] e, double[:, ::1] b, int i,
+                         double h, bint magnetic) nogil
+cpdef void kick(double[:, ::1] v, double[:, ::1] e, double[:, ::1] b, double[::1] qm, double dt,
+                Py_ssize_t[::1] index)
+cpdef void drift(double[:, ::1] x, double[:, ::1] v, double dt, Py_ssize_t[::1] index)
+cpdef void boris_push(double[:, ::1] x, double[:, ::1] v, double[:, ::1] e, double[:, ::1] b, double[::1] qm,
+                      double dt, Py_ssize_t[::1] index)
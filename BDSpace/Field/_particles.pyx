@@ -0,0 +1,214 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from ._tracing import boundary_points
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef inline void boris_velocity(double[:, ::1] v, Py_ssize_t p, double[:, ::1] e, double[:, ::1] b, int i,
+                                double h, bint magnetic) nogil:
+    cdef:
+        double vx, vy, vz, tx, ty, tz, sx, sy, sz, wx, wy, wz, f
+    vx = v[p, 0] + h * e[i, 0]
+    vy = v[p, 1] + h * e[i, 1]
+    vz = v[p, 2] + h * e[i, 2]
+    if magnetic:
+        tx = h * b[i, 0]
+        ty = h * b[i, 1]
+        tz = h * b[i, 2]
+        f = 2.0 / (1.0 + tx * tx + ty * ty + tz * tz)
+        sx = f * tx
+        sy = f * ty
+        sz = f * tz
+        wx = vx + vy * tz - vz * ty
+        wy = vy + vz * tx - vx * tz
+        wz = vz + vx * ty - vy * tx
+        vx = vx + wy * sz - wz * sy
+        vy = vy + wz * sx - wx * sz
+        vz = vz + wx * sy - wy * sx
+    v[p, 0] = vx + h * e[i, 0]
+    v[p, 1] = vy + h * e[i, 1]
+    v[p, 2] = vz + h * e[i, 2]
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void kick(double[:, ::1] v, double[:, ::1] e, double[:, ::1] b, double[::1] qm, double dt,
+                Py_ssize_t[::1] index):
+    """
+    Boris velocity update of the particles selected by index without drift:
+    half electric kick, magnetic rotation and half electric kick over time dt.
+    :param v: array of velocities of all particles shaped Nx3, updated in place
+    :param e: array of electric field at the selected particles shaped Mx3
+    :param b: array of magnetic field at the selected particles shaped Mx3 or None
+    :param qm: array of charge to mass ratios of all particles
+    :param dt: time step, may be negative
+    :param index: indices of the selected particles
+    """
+    cdef:
+        int i, m = index.shape[0]
+        bint magnetic = b is not None
+    with nogil:
+        for i in prange(m):
+            boris_velocity(v, index[i], e, b, i, 0.5 * qm[index[i]] * dt, magnetic)
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void drift(double[:, ::1] x, double[:, ::1] v, double dt, Py_ssize_t[::1] index):
+    """
+    Moves the particles selected by index with their velocities: x += v * dt.
+    :param x: array of positions of all particles shaped Nx3, updated in place
+    :param v: array of velocities of all particles shaped Nx3
+    :param dt: time step
+    :param index: indices of the selected particles
+    """
+    cdef:
+        int i, m = index.shape[0]
+        Py_ssize_t p
+    with nogil:
+        for i in prange(m):
+            p = index[i]
+            x[p, 0] = x[p, 0] + v[p, 0] * dt
+            x[p, 1] = x[p, 1] + v[p, 1] * dt
+            x[p, 2] = x[p, 2] + v[p, 2] * dt
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void boris_push(double[:, ::1] x, double[:, ::1] v, double[:, ::1] e, double[:, ::1] b, double[::1] qm,
+                      double dt, Py_ssize_t[::1] index):
+    """
+    Boris step of the particles selected by index: velocity update (see kick) followed by the drift.
+    Velocities are staggered by half a step from positions.
+    :param x: array of positions of all particles shaped Nx3, updated in place
+    :param v: array of velocities of all particles shaped Nx3, updated in place
+    :param e: array of electric field at the selected particles shaped Mx3
+    :param b: array of magnetic field at the selected particles shaped Mx3 or None
+    :param qm: array of charge to mass ratios of all particles
+    :param dt: time step
+    :param index: indices of the selected particles
+    """
+    cdef:
+        int i, m = index.shape[0]
+        Py_ssize_t p
+        bint magnetic = b is not None
+    with nogil:
+        for i in prange(m):
+            p = index[i]
+            boris_velocity(v, p, e, b, i, 0.5 * qm[p] * dt, magnetic)
+            x[p, 0] = x[p, 0] + v[p, 0] * dt
+            x[p, 1] = x[p, 1] + v[p, 1] * dt
+            x[p, 2] = x[p, 2] + v[p, 2] * dt
+
+
+def global_vector_field(field, xyz):
+    """
+    Calculates vector field at points given in global coordinate system
+    with vectors components converted to global coordinate system.
+    :param field: Field object
+    :param xyz: array of points in global coordinate system shaped Nx3
+    :return: array of field vectors in global coordinate system shaped Nx3
+    """
+    vectors = field.vector_field(field.to_local_coordinate_system(np.ascontiguousarray(xyz)))
+    origin = np.asarray(field.to_global_coordinate_system_vector(np.zeros(3, dtype=np.double)))
+    return np.ascontiguousarray(np.asarray(field.to_global_coordinate_system(vectors)) - origin)
+
+
+def push_particles(positions, velocities, charges, masses, double dt, int num_steps,
+                   electric_field=None, magnetic_field=None, str method='boris', absorbers=None,
+                   trajectory=None, int snapshot_every=1):
+    """
+    Advances charged particles in lockstep through electric and magnetic fields.
+    Each step evaluates every field once in a batch for all particles still in flight,
+    particle updates run in parallel without GIL.
+    Boris method handles both fields, leapfrog (kick-drift-kick) method handles electric field only.
+    Particles entering any of absorbers figures stop at the crossing of the figure surface.
+    :param positions: array of initial positions in global coordinate system shaped Nx3
+    :param velocities: array of initial velocities shaped Nx3
+    :param charges: charges of the particles (array or scalar)
+    :param masses: masses of the particles (array or scalar)
+    :param dt: time step
+    :param num_steps: number of steps
+    :param electric_field: Field object giving electric field as its vector field
+    :param magnetic_field: Field object giving magnetic field as its vector field
+    :param method: 'boris' or 'leapfrog'
+    :param absorbers: iterable of Figure objects absorbing particles
+    :param trajectory: buffer for positions snapshots shaped (num_steps // snapshot_every + 1)xNx3,
+                       e.g. numpy.memmap, or a file name to create .npy memory-mapped file.
+                       Absorbed particles keep their last position in subsequent snapshots
+    :param snapshot_every: number of steps between snapshots
+    :return: tuple of final positions and velocities arrays, indices of absorbers
+             which absorbed the particles (-1 for free particles) and steps of absorption
+    """
+    if method not in ('boris', 'leapfrog'):
+        raise ValueError('Unknown method %s, use boris or leapfrog' % method)
+    if method == 'leapfrog' and magnetic_field is not None:
+        raise ValueError('Leapfrog method supports electric field only, use boris method with magnetic field')
+    if snapshot_every < 1:
+        raise ValueError('Snapshot interval must be positive')
+    x = np.array(np.asarray(positions, dtype=np.double).reshape(-1, 3), order='C')
+    n = x.shape[0]
+    v = np.array(np.broadcast_to(np.asarray(velocities, dtype=np.double).reshape(-1, 3), (n, 3)), order='C')
+    qm = np.array(np.broadcast_to(np.asarray(charges, dtype=np.double) / np.asarray(masses, dtype=np.double), (n,)),
+                  order='C')
+    absorbers = list(absorbers) if absorbers is not None else []
+    absorbed_by = np.full(n, -1, dtype=np.intc)
+    absorbed_step = np.full(n, -1, dtype=np.intc)
+    if trajectory is not None:
+        shape = (num_steps // snapshot_every + 1, n, 3)
+        if isinstance(trajectory, str):
+            trajectory = np.lib.format.open_memmap(trajectory, mode='w+', dtype=np.double, shape=shape)
+        elif tuple(trajectory.shape) != shape:
+            raise ValueError('Trajectory buffer must be shaped %s' % str(shape))
+        trajectory[0] = x
+
+    def fields(index):
+        xyz = x[index]
+        if electric_field is not None:
+            e = global_vector_field(electric_field, xyz)
+        else:
+            e = np.zeros((index.size, 3), dtype=np.double)
+        b = global_vector_field(magnetic_field, xyz) if magnetic_field is not None else None
+        return e, b
+
+    def absorb(index, previous, step):
+        hit = np.zeros(index.size, dtype=bool)
+        for j, figure in enumerate(absorbers):
+            candidates = np.flatnonzero(~hit)
+            inside = np.asarray(figure.contains(np.ascontiguousarray(x[index[candidates]]))).astype(bool)
+            entered = candidates[inside]
+            if entered.size > 0:
+                x[index[entered]] = boundary_points(figure, previous[entered], x[index[entered]],
+                                                    np.zeros(entered.size, dtype=bool))
+                absorbed_by[index[entered]] = j
+                absorbed_step[index[entered]] = step
+                hit[entered] = True
+        return ~hit
+
+    alive = np.flatnonzero(absorb(np.arange(n, dtype=np.intp), x.copy(), 0)).astype(np.intp)
+    e, b = fields(alive)
+    if method == 'boris':
+        kick(v, e, b, qm, -0.5 * dt, alive)
+    for step in range(1, num_steps + 1):
+        previous = x[alive]
+        if method == 'boris':
+            boris_push(x, v, e, b, qm, dt, alive)
+        else:
+            kick(v, e, None, qm, 0.5 * dt, alive)
+            drift(x, v, dt, alive)
+        if absorbers:
+            alive = alive[absorb(alive, previous, step)]
+        e, b = fields(alive)
+        if method == 'leapfrog':
+            kick(v, e, None, qm, 0.5 * dt, alive)
+        if trajectory is not None and step % snapshot_every == 0:
+            trajectory[step // snapshot_every] = x
+    if method == 'boris':
+        kick(v, e, b, qm, 0.5 * dt, alive)
+    if isinstance(trajectory, np.memmap):
+        trajectory.flush()
+    return x, v, absorbed_by, absorbed_step
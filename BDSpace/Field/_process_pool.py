@@ -0,0 +1,149 @@
+import os
+import pickle
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# field unpickled once per worker process by the pool initializer
+_worker_field = None
+
+
+def _initialize_worker(data):
+    global _worker_field
+    _worker_field = pickle.loads(data)
+
+
+def _attach(name):
+    """
+    Attaches to the shared memory block created by the parent process.
+    The parent owns the block and unlinks it, so the worker does not register it for tracking where possible.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python before 3.13, workers share the resource tracker of the parent, registering twice is harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+def _evaluate_chunk(task):
+    """
+    Evaluates the field of the worker on a slice of points in shared memory and writes the slice of the result.
+    :param task: tuple of field kind ('scalar' or 'vector'), names of points and result memory blocks,
+                 number of points and the slice bounds
+    """
+    kind, names, n, start, stop = task
+    points_memory = _attach(names[0])
+    result_memory = _attach(names[1])
+    try:
+        xyz = np.ndarray((n, 3), dtype=np.double, buffer=points_memory.buf)
+        if kind == 'scalar':
+            result = np.ndarray((n,), dtype=np.double, buffer=result_memory.buf)
+            result[start:stop] = np.asarray(_worker_field.scalar_field(xyz[start:stop]))
+        else:
+            result = np.ndarray((n, 3), dtype=np.double, buffer=result_memory.buf)
+            result[start:stop] = np.asarray(_worker_field.vector_field(xyz[start:stop]))
+        # views must be released before the blocks are closed
+        del xyz, result
+    finally:
+        points_memory.close()
+        result_memory.close()
+    return stop - start
+
+
+class ProcessPoolFieldEvaluator(object):
+    """
+    Evaluates a field on large batches of points in a pool of worker processes.
+    The field with its whole Space tree is pickled once and unpickled in every worker when the pool starts,
+    the pool is restarted only when the global state of the field changes.
+    Points and results are passed through shared memory blocks, workers get only the names of the blocks
+    and the bounds of their chunks, so no arrays are pickled per call.
+    Fields defined by python callables need picklable callables, e.g. module level functions or NumPy ufuncs.
+    """
+
+    def __init__(self, field, processes=None, context=None):
+        """
+        :param field: Field object to evaluate
+        :param processes: number of worker processes, number of CPUs by default
+        :param context: multiprocessing context or start method name, default context if None
+        """
+        self.__field = field
+        self.__processes = processes or os.cpu_count() or 1
+        if context is None or isinstance(context, str):
+            context = multiprocessing.get_context(context)
+        self.__context = context
+        self.__pool = None
+        self.__pool_state = None
+
+    @property
+    def field(self):
+        return self.__field
+
+    @property
+    def processes(self):
+        return self.__processes
+
+    def __get_pool(self):
+        state = self.__field.global_state
+        if self.__pool is None or self.__pool_state != state:
+            self.close()
+            self.__pool = self.__context.Pool(self.__processes, initializer=_initialize_worker,
+                                              initargs=(pickle.dumps(self.__field),))
+            self.__pool_state = state
+        return self.__pool
+
+    def __evaluate(self, kind, xyz):
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        n = xyz.shape[0]
+        shape = (n,) if kind == 'scalar' else (n, 3)
+        if n == 0:
+            return np.zeros(shape, dtype=np.double)
+        pool = self.__get_pool()
+        points_memory = shared_memory.SharedMemory(create=True, size=xyz.nbytes)
+        result_memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            np.ndarray(xyz.shape, dtype=np.double, buffer=points_memory.buf)[:] = xyz
+            chunk = max(1, -(-n // (4 * self.__processes)))
+            names = (points_memory.name, result_memory.name)
+            tasks = [(kind, names, n, start, min(start + chunk, n)) for start in range(0, n, chunk)]
+            pool.map(_evaluate_chunk, tasks)
+            result = np.array(np.ndarray(shape, dtype=np.double, buffer=result_memory.buf))
+        finally:
+            points_memory.close()
+            points_memory.unlink()
+            result_memory.close()
+            result_memory.unlink()
+        return result
+
+    def scalar_field(self, xyz):
+        """
+        Scalar field values at the points.
+        :param xyz: array of points in local coordinate system of the field shaped Nx3
+        :return: array of N values
+        """
+        return self.__evaluate('scalar', xyz)
+
+    def vector_field(self, xyz):
+        """
+        Vector field values at the points.
+        :param xyz: array of points in local coordinate system of the field shaped Nx3
+        :return: array of vectors shaped Nx3
+        """
+        return self.__evaluate('vector', xyz)
+
+    def close(self):
+        """
+        Terminates worker processes.
+        """
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+            self.__pool_state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
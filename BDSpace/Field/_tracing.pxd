@@ -0,0 +1,12 @@
+cpdef enum TraceStop:
+    TRACE_MAX_STEPS = 0
+    TRACE_MAX_LENGTH = 1
+    TRACE_WEAK_FIELD = 2
+    TRACE_FIGURE_BOUNDARY = 3
+    TRACE_STEP_UNDERFLOW = 4
+
+cpdef void directions(double[:, ::1] vectors, double[::1] magnitudes, double sign, bint normalize)
+cpdef void dormand_prince_stage(double[:, ::1] y, double[:, :, ::1] k, double[::1] h, int stage,
+                                double[:, ::1] result)
+cpdef void dormand_prince_error(double[:, ::1] y, double[:, ::1] y_new, double[:, :, ::1] k, double[::1] h,
+                                double rtol, double atol, double[::1] error)
@@ -0,0 +1,257 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from libc.math cimport sqrt, fabs, fmax, INFINITY
+
+from BDSpace.Curve.Parametric import PolylineCurve
+
+
+cdef double _a[7][6]
+cdef double _e[7]
+
+_tableau = [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+            [1.0 / 5, 0.0, 0.0, 0.0, 0.0, 0.0],
+            [3.0 / 40, 9.0 / 40, 0.0, 0.0, 0.0, 0.0],
+            [44.0 / 45, -56.0 / 15, 32.0 / 9, 0.0, 0.0, 0.0],
+            [19372.0 / 6561, -25360.0 / 2187, 64448.0 / 6561, -212.0 / 729, 0.0, 0.0],
+            [9017.0 / 3168, -355.0 / 33, 46732.0 / 5247, 49.0 / 176, -5103.0 / 18656, 0.0],
+            [35.0 / 384, 0.0, 500.0 / 1113, 125.0 / 192, -2187.0 / 6784, 11.0 / 84]]
+_error_weights = [71.0 / 57600, 0.0, -71.0 / 16695, 71.0 / 1920, -17253.0 / 339200, 22.0 / 525, -1.0 / 40]
+for _i in range(7):
+    for _j in range(6):
+        _a[_i][_j] = _tableau[_i][_j]
+    _e[_i] = _error_weights[_i]
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void directions(double[:, ::1] vectors, double[::1] magnitudes, double sign, bint normalize):
+    """
+    Calculates magnitudes of the vectors and replaces vectors by the tracing directions in place.
+    :param vectors: array of field vectors shaped Nx3
+    :param magnitudes: output array of vectors magnitudes
+    :param sign: 1 to trace along the field, -1 to trace against it
+    :param normalize: if True directions are unit vectors (tracing parameter is the arc length)
+    """
+    cdef:
+        int i, n = vectors.shape[0]
+        double scale
+    with nogil:
+        for i in prange(n):
+            magnitudes[i] = sqrt(vectors[i, 0] * vectors[i, 0] + vectors[i, 1] * vectors[i, 1]
+                                 + vectors[i, 2] * vectors[i, 2])
+            scale = sign
+            if normalize:
+                if magnitudes[i] > 0:
+                    scale = sign / magnitudes[i]
+                else:
+                    scale = 0.0
+            vectors[i, 0] = scale * vectors[i, 0]
+            vectors[i, 1] = scale * vectors[i, 1]
+            vectors[i, 2] = scale * vectors[i, 2]
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void dormand_prince_stage(double[:, ::1] y, double[:, :, ::1] k, double[::1] h, int stage,
+                                double[:, ::1] result):
+    """
+    Calculates points of the Dormand-Prince stage from the slopes of the previous stages.
+    Stage 6 gives the fifth order solution at the end of the step.
+    :param y: array of points at the beginning of the step shaped Nx3
+    :param k: array of stages slopes shaped 7xNx3
+    :param h: array of step sizes
+    :param stage: stage number from 1 to 6
+    :param result: output array of points shaped Nx3
+    """
+    cdef:
+        int i, j, n = y.shape[0]
+        double x_acc, y_acc, z_acc
+    with nogil:
+        for i in prange(n):
+            x_acc = 0.0
+            y_acc = 0.0
+            z_acc = 0.0
+            for j in range(stage):
+                x_acc = x_acc + _a[stage][j] * k[j, i, 0]
+                y_acc = y_acc + _a[stage][j] * k[j, i, 1]
+                z_acc = z_acc + _a[stage][j] * k[j, i, 2]
+            result[i, 0] = y[i, 0] + h[i] * x_acc
+            result[i, 1] = y[i, 1] + h[i] * y_acc
+            result[i, 2] = y[i, 2] + h[i] * z_acc
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef void dormand_prince_error(double[:, ::1] y, double[:, ::1] y_new, double[:, :, ::1] k, double[::1] h,
+                                double rtol, double atol, double[::1] error):
+    """
+    Calculates RMS norm of the embedded error estimate of Dormand-Prince step scaled by the tolerance.
+    Step is accepted if the norm does not exceed one.
+    :param y: array of points at the beginning of the step shaped Nx3
+    :param y_new: array of points at the end of the step shaped Nx3
+    :param k: array of all seven stages slopes shaped 7xNx3
+    :param h: array of step sizes
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :param error: output array of scaled error norms
+    """
+    cdef:
+        int i, j, c, n = y.shape[0]
+        double acc, scale, total
+    with nogil:
+        for i in prange(n):
+            total = 0.0
+            for c in range(3):
+                acc = 0.0
+                for j in range(7):
+                    acc = acc + _e[j] * k[j, i, c]
+                scale = atol + rtol * fmax(fabs(y[i, c]), fabs(y_new[i, c]))
+                acc = h[i] * acc / scale
+                total = total + acc * acc
+            error[i] = sqrt(total / 3)
+
+
+def boundary_points(figure, start, stop, inside, int iterations=40):
+    """
+    Finds crossings of the figure boundary on the segments by bisection, all segments in one batch.
+    """
+    lo = np.array(start)
+    hi = np.array(stop)
+    for _ in range(iterations):
+        middle = np.ascontiguousarray(0.5 * (lo + hi))
+        same = np.asarray(figure.contains(middle)).astype(bool) == inside
+        lo[same] = middle[same]
+        hi[~same] = middle[~same]
+    return 0.5 * (lo + hi)
+
+
+def trace_field_lines(field, seeds, double direction=1.0, double max_length=INFINITY, int max_steps=10000,
+                      double step=1.0e-2, double max_step=INFINITY, double rtol=1.0e-6, double atol=1.0e-9,
+                      double min_magnitude=0.0, figure=None, bint normalize=True, bint curves=False):
+    """
+    Traces field lines (streamlines) of the vector field from all seed points simultaneously
+    with the adaptive Dormand-Prince RK45 method. Each of seven stages of a step evaluates the field
+    in one batch call for all active lines, stage arithmetic and error control run in parallel without GIL.
+    A line stops when it reaches max_length, makes max_steps steps, meets a point where the field magnitude
+    does not exceed min_magnitude, or crosses the boundary of the figure (the crossing point is the last point).
+    :param field: Field object
+    :param seeds: array of seed points in global coordinate system shaped Nx3
+    :param direction: 1 to trace along the field, -1 to trace against it
+    :param max_length: maximal length of the lines (tracing parameter if normalize is False)
+    :param max_steps: maximal number of steps per line
+    :param step: initial step size
+    :param max_step: maximal step size
+    :param rtol: relative tolerance of the steps
+    :param atol: absolute tolerance of the steps
+    :param min_magnitude: lines stop where the field magnitude drops to this value
+    :param figure: optional Figure, lines stop on crossing its surface
+    :param normalize: if True the lines are traced along unit field directions parametrized by the arc length,
+                      otherwise the field itself is integrated (e.g. a velocity field over time)
+    :param curves: if True the list of PolylineCurve objects (None for lines with less than two distinct points)
+                   is returned as the fourth element
+    :return: tuple of ragged arrays: points in global coordinate system shaped Mx3,
+             offsets shaped N+1 (points of line i are points[offsets[i]:offsets[i + 1]]),
+             and stop reasons (TraceStop values) of the lines
+    """
+    seeds = np.ascontiguousarray(seeds, dtype=np.double).reshape(-1, 3)
+    n = seeds.shape[0]
+
+    def slopes(xyz):
+        vectors = np.array(field.vector_field(xyz), dtype=np.double)
+        magnitudes = np.empty(xyz.shape[0], dtype=np.double)
+        directions(vectors, magnitudes, direction, normalize)
+        return vectors, magnitudes
+
+    y = np.array(field.to_local_coordinate_system(seeds), dtype=np.double)
+    last = seeds.copy()
+    k_first, magnitude = slopes(y)
+    h = np.full(n, min(step, max_step), dtype=np.double)
+    length = np.zeros(n, dtype=np.double)
+    steps = np.zeros(n, dtype=np.intc)
+    reasons = np.full(n, TRACE_MAX_STEPS, dtype=np.intc)
+    inside = np.asarray(figure.contains(seeds)).astype(bool) if figure is not None else None
+    lines = [np.arange(n)]
+    chunks = [seeds]
+    weak = magnitude <= min_magnitude
+    reasons[weak] = TRACE_WEAK_FIELD
+    if max_length <= 0:
+        reasons[~weak] = TRACE_MAX_LENGTH
+        weak[:] = True
+    active = np.flatnonzero(~weak)
+    if max_steps <= 0:
+        active = active[:0]
+    while active.size > 0:
+        m = active.size
+        y_active = np.ascontiguousarray(y[active])
+        h_active = np.minimum(h[active], max_length - length[active]) if normalize else h[active]
+        h_active = np.ascontiguousarray(h_active)
+        k = np.empty((7, m, 3), dtype=np.double)
+        k[0] = k_first[active]
+        stage_points = np.empty((m, 3), dtype=np.double)
+        for stage in range(1, 6):
+            dormand_prince_stage(y_active, k, h_active, stage, stage_points)
+            k[stage] = slopes(stage_points)[0]
+        y_new = np.empty((m, 3), dtype=np.double)
+        dormand_prince_stage(y_active, k, h_active, 6, y_new)
+        k[6], magnitude_new = slopes(y_new)
+        error = np.empty(m, dtype=np.double)
+        dormand_prince_error(y_active, y_new, k, h_active, rtol, atol, error)
+        accepted = error <= 1.0
+        with np.errstate(divide='ignore'):
+            factor = np.clip(0.9 * error ** -0.2, 0.2, 5.0)
+        factor[~accepted] = np.minimum(factor[~accepted], 1.0)
+        h[active] = np.minimum(h_active * factor, max_step)
+        underflow = ~accepted & (h[active] <= 1.0e-12 * np.maximum(1.0, np.max(np.abs(y_active), axis=1)))
+        reasons[active[underflow]] = TRACE_STEP_UNDERFLOW
+        stopped = underflow
+
+        done = active[accepted]
+        if done.size > 0:
+            y_done = y_new[accepted]
+            points = np.array(field.to_global_coordinate_system(y_done), dtype=np.double)
+            if normalize:
+                length[done] += h_active[accepted]
+            else:
+                length[done] += np.sqrt(np.sum((y_done - y_active[accepted]) ** 2, axis=1))
+            steps[done] += 1
+            finished = np.zeros(done.size, dtype=bool)
+            if figure is not None:
+                crossed = np.asarray(figure.contains(points)).astype(bool) != inside[done]
+                if np.any(crossed):
+                    points[crossed] = boundary_points(figure, last[done[crossed]], points[crossed],
+                                                      inside[done[crossed]])
+                    reasons[done[crossed]] = TRACE_FIGURE_BOUNDARY
+                    finished |= crossed
+            weak = ~finished & (magnitude_new[accepted] <= min_magnitude)
+            reasons[done[weak]] = TRACE_WEAK_FIELD
+            finished |= weak
+            too_long = ~finished & (length[done] >= max_length * (1.0 - 1.0e-12))
+            reasons[done[too_long]] = TRACE_MAX_LENGTH
+            finished |= too_long
+            finished |= steps[done] >= max_steps
+            y[done] = y_done
+            k_first[done] = k[6][accepted]
+            last[done] = points
+            lines.append(done)
+            chunks.append(points)
+            stopped = stopped.copy()
+            stopped[np.flatnonzero(accepted)[finished]] = True
+        active = active[~stopped]
+    lines = np.concatenate(lines)
+    order = np.argsort(lines, kind='stable')
+    points = np.ascontiguousarray(np.concatenate(chunks)[order])
+    offsets = np.zeros(n + 1, dtype=np.intp)
+    offsets[1:] = np.cumsum(np.bincount(lines, minlength=n))
+    if not curves:
+        return points, offsets, reasons
+    polylines = []
+    for i in range(n):
+        line = points[offsets[i]:offsets[i + 1]]
+        if line.shape[0] > 1 and np.any(line[1:] != line[0]):
+            polylines.append(PolylineCurve(line, name='Field line %d' % i))
+        else:
+            polylines.append(None)
+    return points, offsets, reasons, polylines
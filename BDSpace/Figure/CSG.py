@@ -0,0 +1,274 @@
+import numpy as np
+from scipy.stats import qmc
+
+from BDSpace.Figure import Figure
+from BDSpace.Figure._helpers import csg_contains, csg_distance
+from BDSpace.Figure._helpers import CSG_UNION, CSG_INTERSECTION, CSG_DIFFERENCE
+
+CSG_STACK_SIZE = 64  # size of the evaluation stack of compiled kernels, see _helpers.pxd
+
+
+class CSGFigure(Figure):
+    """
+    Base class of constructive solid geometry nodes.
+    Operand figures become elements of the node and are positioned by their coordinate systems
+    relative to the node. The whole expression tree is compiled to a flat postfix program
+    evaluated for batches of points by a single nogil loop.
+    Volume and surface area are estimated by randomized quasi-Monte-Carlo integration.
+    """
+
+    operation = None
+
+    def __init__(self, name='CSG figure', coordinate_system=None, figures=None):
+        super(CSGFigure, self).__init__(name, coordinate_system=coordinate_system)
+        self.__operands = []
+        self.__signature = None
+        self.__estimates = {}
+        self.__program = None
+        self.__program_state = None
+        if figures is not None:
+            for figure in figures:
+                self.add_operand(figure)
+
+    @property
+    def operands(self):
+        return tuple(self.__operands)
+
+    @property
+    def global_state(self):
+        """
+        Global state of the node including versions of all operands and their coordinate systems.
+        """
+        return super(CSGFigure, self).global_state + self._operands_state()
+
+    def _operands_state(self):
+        state = ()
+        for operand in self.__operands:
+            state += (operand.version, operand.coordinate_system.version)
+            if isinstance(operand, CSGFigure):
+                state += operand._operands_state()
+        return state
+
+    def _pickle_parameters(self):
+        return type(self), {'name': self.name}
+
+    def _pickle_state(self):
+        state = super(CSGFigure, self)._pickle_state()
+        state['operands'] = list(self.__operands)
+        return state
+
+    def __setstate__(self, state):
+        super(CSGFigure, self).__setstate__(state)
+        for figure in state['operands']:
+            self.add_operand(figure)
+
+    def add_operand(self, figure):
+        """
+        Appends figure to the operands of the node. The figure is detached from its previous parent
+        and becomes an element of the node, its coordinate system is then relative to the node.
+        :param figure: Figure (primitive or another CSG node)
+        """
+        if not isinstance(figure, Figure):
+            raise ValueError('Only Figure objects can be CSG operands, received %s' % str(figure))
+        if figure is self:
+            raise ValueError('CSG figure can not be its own operand')
+        if figure.parent is not self:
+            figure.detach_from_parent()
+            self.add_element(figure)
+        self.__operands.append(figure)
+
+    def _emit(self, root, program):
+        if not self.__operands:
+            raise ValueError('CSG figure %s has no operands' % self.name)
+        for i, operand in enumerate(self.__operands):
+            if isinstance(operand, CSGFigure):
+                operand._emit(root, program)
+            else:
+                primitive = operand._primitive()
+                if primitive is None:
+                    raise ValueError('Figure %s can not be used in CSG expression' % operand.name)
+                kind, params = primitive
+                matrix, translation = _local_affine(operand, root)
+                program.append((kind, np.concatenate((matrix.ravel(), translation, params))))
+            if i > 0:
+                program.append((self.operation, None))
+
+    def compile(self):
+        """
+        Compiles the expression tree to postfix program in the local coordinate system of the node.
+        The program is cached until the global state of the node changes.
+        :return: tuple of instruction codes, parameters offsets and parameters arrays
+        """
+        state = self.global_state
+        if self.__program is not None and state == self.__program_state:
+            return self.__program
+        program = []
+        if self.__operands:
+            self._emit(self, program)
+        codes = np.empty(len(program), dtype=np.intc)
+        offsets = np.zeros(len(program), dtype=np.intc)
+        blocks = []
+        offset = 0
+        depth = 0
+        for i, (code, params) in enumerate(program):
+            codes[i] = code
+            if params is None:
+                depth -= 1
+            else:
+                offsets[i] = offset
+                offset += params.size
+                blocks.append(params)
+                depth += 1
+                if depth > CSG_STACK_SIZE:
+                    raise ValueError('CSG expression of %s is too deep' % self.name)
+        params = np.concatenate(blocks) if blocks else np.zeros(1, dtype=np.double)
+        self.__program = codes, offsets, np.ascontiguousarray(params, dtype=np.double)
+        self.__program_state = state
+        return self.__program
+
+    def _contains_local(self, xyz):
+        codes, offsets, params = self.compile()
+        return csg_contains(xyz, codes, offsets, params)
+
+    def _signed_distance_local(self, xyz):
+        codes, offsets, params = self.compile()
+        return csg_distance(xyz, codes, offsets, params)
+
+    def _bounding_box_local(self):
+        boxes = []
+        for operand in self.__operands:
+            box = operand._bounding_box_local()
+            if box is None:
+                continue
+            corners = np.array([[box[i, 0], box[j, 1], box[k, 2]]
+                                for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.double)
+            corners = np.asarray(operand.coordinate_system.to_parent(corners))
+            boxes.append(np.array([corners.min(axis=0), corners.max(axis=0)]))
+        if not boxes:
+            return None
+        return self._combine_boxes(np.array(boxes))
+
+    def _combine_boxes(self, boxes):
+        return np.array([boxes[:, 0].min(axis=0), boxes[:, 1].max(axis=0)])
+
+    def volume_estimate(self, num_points=2 ** 16, scrambles=16, seed=0):
+        """
+        Estimates volume of the figure by randomized quasi-Monte-Carlo integration over its bounding box.
+        Results are cached until any parameter or position of the operands changes.
+        :param num_points: number of scrambled Sobol points per replicate, rounded up to a power of two
+        :param scrambles: number of independently scrambled replicates
+        :param seed: seed of the scrambling
+        :return: tuple of volume estimate and its standard error
+        """
+        return self.__estimate('volume', num_points, scrambles, seed, None)
+
+    def surface_area_estimate(self, num_points=2 ** 18, scrambles=16, seed=0, band=None):
+        """
+        Estimates surface area of the figure as volume of the thin band |sdf| < band divided by 2 * band.
+        The volume of the band is integrated by randomized quasi-Monte-Carlo method.
+        Results are cached until any parameter or position of the operands changes.
+        :param num_points: number of scrambled Sobol points per replicate, rounded up to a power of two
+        :param scrambles: number of independently scrambled replicates
+        :param seed: seed of the scrambling
+        :param band: band half-width, 1e-3 of the bounding box diagonal by default
+        :return: tuple of surface area estimate and its standard error
+        """
+        return self.__estimate('surface', num_points, scrambles, seed, band)
+
+    def __estimate(self, quantity, num_points, scrambles, seed, band):
+        if scrambles < 2:
+            raise ValueError('At least two scrambles are needed for the error estimate')
+        codes, offsets, params = self.compile()
+        box = self._bounding_box_local()
+        if codes.size == 0 or box is None or np.any(box[1] <= box[0]):
+            return 0.0, 0.0
+        signature = codes.tobytes() + offsets.tobytes() + params.tobytes()
+        if signature != self.__signature:
+            self.__signature = signature
+            self.__estimates = {}
+        size = box[1] - box[0]
+        if band is None and quantity == 'surface':
+            band = 1.0e-3 * np.sqrt(np.dot(size, size))
+        key = (quantity, num_points, scrambles, seed, band)
+        if key not in self.__estimates:
+            if quantity == 'surface':
+                # outer half of the band sticks out of the bounding box
+                box = box + np.array([[-band], [band]])
+                size = box[1] - box[0]
+            m = int(np.ceil(np.log2(max(num_points, 2))))
+            box_volume = np.prod(size)
+            values = np.empty(scrambles, dtype=np.double)
+            for i, child_seed in enumerate(np.random.SeedSequence(seed).spawn(scrambles)):
+                sampler = qmc.Sobol(d=3, scramble=True, seed=np.random.default_rng(child_seed))
+                xyz = np.ascontiguousarray(box[0] + sampler.random_base2(m) * size)
+                if quantity == 'volume':
+                    hits = np.count_nonzero(np.asarray(csg_contains(xyz, codes, offsets, params)))
+                    values[i] = box_volume * hits / xyz.shape[0]
+                else:
+                    hits = np.count_nonzero(np.abs(np.asarray(csg_distance(xyz, codes, offsets, params))) < band)
+                    values[i] = box_volume * hits / xyz.shape[0] / (2 * band)
+            self.__estimates[key] = (values.mean(), values.std(ddof=1) / np.sqrt(scrambles))
+        return self.__estimates[key]
+
+    def external_volume(self):
+        return self.volume_estimate()[0]
+
+    def external_surface_area(self):
+        return self.surface_area_estimate()[0]
+
+
+class Union(CSGFigure):
+
+    operation = CSG_UNION
+
+    def __init__(self, name='Union', coordinate_system=None, figures=None):
+        super(Union, self).__init__(name, coordinate_system=coordinate_system, figures=figures)
+
+
+class Intersection(CSGFigure):
+
+    operation = CSG_INTERSECTION
+
+    def __init__(self, name='Intersection', coordinate_system=None, figures=None):
+        super(Intersection, self).__init__(name, coordinate_system=coordinate_system, figures=figures)
+
+    def _combine_boxes(self, boxes):
+        box = np.array([boxes[:, 0].max(axis=0), boxes[:, 1].min(axis=0)])
+        if np.any(box[0] > box[1]):
+            # boxes of the operands do not overlap, the intersection is empty
+            return None
+        return box
+
+
+class Difference(CSGFigure):
+    """
+    First operand with all other operands subtracted.
+    """
+
+    operation = CSG_DIFFERENCE
+
+    def __init__(self, name='Difference', coordinate_system=None, figures=None):
+        super(Difference, self).__init__(name, coordinate_system=coordinate_system, figures=figures)
+
+    def _combine_boxes(self, boxes):
+        return boxes[0]
+
+
+def _local_affine(figure, root):
+    """
+    Affine map from the local coordinate system of root to the local coordinate system of its descendant figure.
+    :param figure: descendant Figure
+    :param root: ancestor Space
+    :return: 3x3 matrix and translation vector
+    """
+    chain = []
+    space = figure
+    while space is not root:
+        if space is None:
+            raise ValueError('Figure %s is not an element of %s' % (figure.name, root.name))
+        chain.append(space.coordinate_system)
+        space = space.parent
+    points = np.vstack((np.zeros(3), np.eye(3)))
+    for coordinate_system in reversed(chain):
+        points = np.asarray(coordinate_system.to_local(points))
+    return (points[1:] - points[0]).T, points[0]
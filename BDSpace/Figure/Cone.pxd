@@ -0,0 +1,13 @@
+from BDSpace.Figure.Figure cimport Figure
+
+cdef class ConicalWedge(Figure):
+    cdef:
+        double __theta
+        double __phi
+        double __r_min
+        double __z_offset
+        double __z_min
+        double __z_max
+
+    cdef double __z_cut(self)
+    cdef tuple __radii(self, z)
@@ -0,0 +1,177 @@
+import numpy as np
+
+from BDSpace.Coordinates.transforms import reduce_angle
+from BDSpace.Figure.Figure cimport Figure
+from BDSpace.Figure.Figure import batch_parameters, batch_angles
+from BDSpace.Figure._helpers import conical_wedge_contains, conical_wedge_distance, CONICAL_WEDGE
+from BDSpace.Figure._sampling import invert_cdf, even_integral, polar_points, polar_vectors, wedge_side_patches
+
+
+cdef class ConicalWedge(Figure):
+
+    def __init__(self, str name='Conical wedge', coordinate_system=None,
+                 double phi=np.pi/2, double theta=np.pi/6, z=np.array([0.0, 1.0]),
+                 double z_offset=0.0, double r_min=0.0):
+        self.theta = theta
+        self.phi = phi
+        self.r_min = r_min
+        self.z_offset = z_offset
+        self.z = z
+        super(ConicalWedge, self).__init__(name, coordinate_system=coordinate_system)
+
+    def _pickle_parameters(self):
+        return ConicalWedge, {'name': self.name, 'phi': self.phi, 'theta': self.theta, 'z': np.array(self.z),
+                              'z_offset': self.z_offset, 'r_min': self.r_min}
+
+    @property
+    def theta(self):
+        return self.__theta
+
+    @theta.setter
+    def theta(self, double theta):
+        reduced_angle = reduce_angle(theta)
+        if reduced_angle > np.pi / 2:
+            raise ValueError('Cone half angle should be between 0 and 2*pi radians')
+        self.__theta = reduced_angle
+        self.invalidate_cache()
+
+    @property
+    def phi(self):
+        return self.__phi
+
+    @phi.setter
+    def phi(self, double phi):
+        self.__phi = reduce_angle(phi)
+        self.invalidate_cache()
+
+    @property
+    def r_min(self):
+        return self.__r_min
+
+    @r_min.setter
+    def r_min(self, double r_min):
+        self.__r_min = abs(r_min)
+        self.invalidate_cache()
+
+    @property
+    def z_offset(self):
+        return self.__z_offset
+
+    @z_offset.setter
+    def z_offset(self, double z_offset):
+        self.__z_offset = abs(z_offset)
+        self.invalidate_cache()
+
+    @property
+    def z(self):
+        return np.array([self.__z_min, self.__z_max])
+
+    @z.setter
+    def z(self, z):
+        self.__z_min = min(z)
+        self.__z_max = max(z)
+        self.invalidate_cache()
+
+    def _contains_local(self, xyz):
+        return conical_wedge_contains(xyz, self.__theta, self.__phi, self.__z_min, self.__z_max,
+                                      self.__z_offset, self.__r_min)
+
+    def _signed_distance_local(self, xyz):
+        return conical_wedge_distance(xyz, self.__theta, self.__phi, self.__z_min, self.__z_max,
+                                      self.__z_offset, self.__r_min)
+
+    def _primitive(self):
+        return CONICAL_WEDGE, np.array([np.sin(self.__theta), np.cos(self.__theta), np.tan(self.__theta), self.__phi,
+                                        self.__z_min, self.__z_max, self.__z_offset, self.__z_cut()])
+
+    @staticmethod
+    def _primitive_batch(phi=np.pi/2, theta=np.pi/6, z=np.array([0.0, 1.0]), z_offset=0.0, r_min=0.0):
+        z = np.asarray(z, dtype=np.double)
+        phi, theta, z_min, z_max, z_offset, r_min = batch_parameters(phi, theta, z.min(axis=-1), z.max(axis=-1),
+                                                                     z_offset, r_min)
+        theta = batch_angles(theta)
+        if np.any(theta > np.pi / 2):
+            raise ValueError('Cone half angle should be between 0 and 2*pi radians')
+        tan_theta = np.tan(theta)
+        z_cut = np.abs(r_min) / np.where(theta > 0, tan_theta, 1.0) * (theta > 0)
+        return CONICAL_WEDGE, np.stack((np.sin(theta), np.cos(theta), tan_theta, batch_angles(phi),
+                                        z_min, z_max, np.abs(z_offset), z_cut), axis=-1)
+
+    def _bounding_box_local(self):
+        r_max = self.__r_min + max(abs(self.__z_min), abs(self.__z_max)) * np.tan(self.__theta)
+        return np.array([[-r_max, -r_max, self.__z_min], [r_max, r_max, self.__z_max]])
+
+    cdef double __z_cut(self):
+        return self.__r_min / np.tan(self.__theta) if self.__theta > 0 else 0.0
+
+    cdef tuple __radii(self, z):
+        h = np.abs(z) + self.__z_cut()
+        return h * np.tan(self.__theta), np.maximum(h - self.__z_offset, 0.0) * np.tan(self.__theta)
+
+    def _volume_map(self, uvw):
+        z_cut = self.__z_cut()
+        z_min, z_max = self.__z_min, self.__z_max
+
+        def antiderivative(h):
+            return h**3 / 3 - np.maximum(h - self.__z_offset, 0.0)**3 / 3
+
+        def cdf(z):
+            return even_integral(antiderivative, z, z_cut)
+
+        def pdf(z):
+            h = np.abs(z) + z_cut
+            return h**2 - np.maximum(h - self.__z_offset, 0.0)**2
+
+        z = invert_cdf(cdf, pdf, cdf(z_min) + uvw[:, 0] * (cdf(z_max) - cdf(z_min)), z_min, z_max)
+        rho_outer, rho_inner = self.__radii(z)
+        rho = np.sqrt(rho_inner**2 + uvw[:, 1] * (rho_outer**2 - rho_inner**2))
+        return polar_points(rho, uvw[:, 2] * self.__phi, z)
+
+    def _surface_patches(self):
+        z_cut = self.__z_cut()
+        z_min, z_max = self.__z_min, self.__z_max
+        tan_theta, sin_theta, cos_theta = np.tan(self.__theta), np.sin(self.__theta), np.cos(self.__theta)
+
+        def lateral(shift, orientation):
+            # cone surface rho = max(|z| + z_cut - shift, 0) * tan(theta)
+            def cdf(z):
+                return even_integral(lambda h: np.maximum(h - shift, 0.0)**2 / 2, z, z_cut)
+
+            def pdf(z):
+                return np.maximum(np.abs(z) + z_cut - shift, 0.0)
+
+            def patch(uv):
+                z = invert_cdf(cdf, pdf, cdf(z_min) + uv[:, 0] * (cdf(z_max) - cdf(z_min)), z_min, z_max)
+                phi = uv[:, 1] * self.__phi
+                points = polar_points(pdf(z) * tan_theta, phi, z)
+                normals = polar_vectors(np.full(z.shape, orientation * cos_theta), phi,
+                                        -orientation * np.where(z < 0, -1.0, 1.0) * sin_theta)
+                return points, normals
+            return self.__phi * tan_theta / cos_theta * (cdf(z_max) - cdf(z_min)), patch
+
+        def base(z, orientation):
+            def patch(uv):
+                rho_outer, rho_inner = self.__radii(z)
+                rho = np.sqrt(rho_inner**2 + uv[:, 0] * (rho_outer**2 - rho_inner**2))
+                points = polar_points(rho, uv[:, 1] * self.__phi, np.full(rho.shape, z))
+                return points, np.broadcast_to(np.array([0.0, 0.0, orientation]), points.shape)
+            rho_outer, rho_inner = self.__radii(z)
+            return self.__phi / 2 * (rho_outer**2 - rho_inner**2), patch
+
+        def width_integral(z):
+            return tan_theta * even_integral(lambda h: h**2 / 2 - np.maximum(h - self.__z_offset, 0.0)**2 / 2,
+                                             z, z_cut)
+
+        def width(z):
+            rho_outer, rho_inner = self.__radii(z)
+            return rho_outer - rho_inner
+
+        def meridional_map(uv):
+            target = width_integral(z_min) + uv[:, 0] * (width_integral(z_max) - width_integral(z_min))
+            z = invert_cdf(width_integral, width, target, z_min, z_max)
+            rho_outer, rho_inner = self.__radii(z)
+            return rho_inner + uv[:, 1] * (rho_outer - rho_inner), z
+
+        patches = [lateral(0.0, 1.0), lateral(self.__z_offset, -1.0), base(z_min, -1.0), base(z_max, 1.0)]
+        patches += wedge_side_patches(self.__phi, width_integral(z_max) - width_integral(z_min), meridional_map)
+        return [patch for patch in patches if patch[0] > 0]
@@ -0,0 +1,25 @@
+from BDSpace.Figure.Figure cimport Figure
+
+cdef class Parallelepiped(Figure):
+    cdef:
+        double[:, ::1] __vectors
+
+
+cdef class ParallelepipedTriclinic(Parallelepiped):
+    cdef:
+        double __a
+        double __b
+        double __c
+        double __alpha
+        double __beta
+        double __gamma
+
+    cdef void __update_vectors(self)
+
+
+cdef class Cuboid(ParallelepipedTriclinic):
+    pass
+
+
+cdef class Cube(Cuboid):
+    pass
@@ -0,0 +1,206 @@
+import numpy as np
+
+from BDSpace.Figure.Figure cimport Figure
+from BDSpace.Figure.Figure import batch_parameters
+from BDSpace.Figure._helpers import parallelepiped_contains, parallelepiped_distance, parallelepiped_frame
+from BDSpace.Figure._helpers import PARALLELEPIPED
+
+
+cdef class Parallelepiped(Figure):
+
+    def __init__(self, str name='Parallelepiped', coordinate_system=None,
+                 vectors=np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)):
+        self.vectors = vectors
+        super(Parallelepiped, self).__init__(name, coordinate_system=coordinate_system)
+
+    def _pickle_parameters(self):
+        return Parallelepiped, {'name': self.name, 'vectors': self.vectors}
+
+    @property
+    def vectors(self):
+        return np.array(self.__vectors)
+
+    @vectors.setter
+    def vectors(self, vectors):
+        if isinstance(vectors, (tuple, list, np.ndarray)):
+            v = np.array(vectors, dtype=np.float64)
+            if v.shape == (3, 3):
+                self.__vectors = v
+                self.invalidate_cache()
+            else:
+                raise ValueError('Needed 3 vectors, received %s' % str(vectors))
+        else:
+            raise ValueError('Needed 3 vectors, received %s' % str(vectors))
+
+    def _contains_local(self, xyz):
+        return parallelepiped_contains(xyz, self.__vectors)
+
+    def _signed_distance_local(self, xyz):
+        return parallelepiped_distance(xyz, self.__vectors)
+
+    def _primitive(self):
+        return PARALLELEPIPED, np.asarray(parallelepiped_frame(self.__vectors))
+
+    @staticmethod
+    def _primitive_batch(vectors=np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)):
+        vectors = np.asarray(vectors, dtype=np.double)
+        if vectors.shape[-2:] != (3, 3):
+            raise ValueError('Needed arrays of 3 vectors, received shape %s' % str(vectors.shape))
+        # vectorized parallelepiped_frame
+        normals = np.linalg.inv(np.swapaxes(vectors, -1, -2))
+        heights = 1.0 / np.linalg.norm(normals, axis=-1)
+        normals *= heights[..., np.newaxis]
+        orthogonal = np.all(np.abs(np.matmul(normals, np.swapaxes(normals, -1, -2)) - np.eye(3)) <= 1.0e-12,
+                            axis=(-2, -1))
+        return PARALLELEPIPED, np.concatenate((normals.reshape(normals.shape[:-2] + (9,)), heights,
+                                               orthogonal[..., np.newaxis].astype(np.double)), axis=-1)
+
+    def _bounding_box_local(self):
+        corners = np.dot(np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.float64),
+                         self.__vectors)
+        return np.array([corners.min(axis=0), corners.max(axis=0)])
+
+    def _volume_map(self, uvw):
+        return np.dot(uvw, self.__vectors)
+
+    def _surface_patches(self):
+        vectors = np.asarray(self.__vectors)
+
+        def face(i, j, origin, normal):
+            def patch(uv):
+                points = origin + np.outer(uv[:, 0], vectors[i]) + np.outer(uv[:, 1], vectors[j])
+                return points, np.broadcast_to(normal, points.shape)
+            return patch
+
+        patches = []
+        for i, j, k in ((0, 1, 2), (0, 2, 1), (1, 2, 0)):
+            normal = np.cross(vectors[i], vectors[j])
+            area = np.sqrt(np.dot(normal, normal))
+            if area > 0:
+                normal /= area
+                if np.dot(normal, vectors[k]) > 0:
+                    normal = -normal
+                patches.append((area, face(i, j, np.zeros(3), normal)))
+                patches.append((area, face(i, j, vectors[k], -normal)))
+        return patches
+
+
+cdef class ParallelepipedTriclinic(Parallelepiped):
+
+    def __init__(self, str name='Parallelepiped', coordinate_system=None,
+                 double a=1.0, double b=1.0, double c=1.0,
+                 double alpha=np.pi/2, double beta=np.pi/2, double gamma=np.pi/2):
+        self.__a = a
+        self.__b = b
+        self.__c = c
+        self.__alpha = alpha
+        self.__beta = beta
+        self.__gamma = gamma
+        super(ParallelepipedTriclinic, self).__init__(name, coordinate_system=coordinate_system,
+                                                      vectors=triclinic_vectors(a, b, c, alpha, beta, gamma))
+
+    def _pickle_parameters(self):
+        return ParallelepipedTriclinic, {'name': self.name, 'a': self.__a, 'b': self.__b, 'c': self.__c,
+                                         'alpha': self.__alpha, 'beta': self.__beta, 'gamma': self.__gamma}
+
+    cdef void __update_vectors(self):
+        self.vectors = triclinic_vectors(self.__a, self.__b, self.__c, self.__alpha, self.__beta, self.__gamma)
+
+    @property
+    def a(self):
+        return self.__a
+
+    @a.setter
+    def a(self, double a):
+        self.__a = a
+        self.__update_vectors()
+
+    @property
+    def b(self):
+        return self.__b
+
+    @b.setter
+    def b(self, double b):
+        self.__b = b
+        self.__update_vectors()
+
+    @property
+    def c(self):
+        return self.__c
+
+    @c.setter
+    def c(self, double c):
+        self.__c = c
+        self.__update_vectors()
+
+    @property
+    def alpha(self):
+        return self.__alpha
+
+    @alpha.setter
+    def alpha(self, double alpha):
+        self.__alpha = alpha
+        self.__update_vectors()
+
+    @property
+    def beta(self):
+        return self.__beta
+
+    @beta.setter
+    def beta(self, double beta):
+        self.__beta = beta
+        self.__update_vectors()
+
+    @property
+    def gamma(self):
+        return self.__gamma
+
+    @gamma.setter
+    def gamma(self, double gamma):
+        self.__gamma = gamma
+        self.__update_vectors()
+
+    @staticmethod
+    def _primitive_batch(a=1.0, b=1.0, c=1.0, alpha=np.pi/2, beta=np.pi/2, gamma=np.pi/2):
+        return Parallelepiped._primitive_batch(triclinic_vectors(a, b, c, alpha, beta, gamma))
+
+
+cdef class Cuboid(ParallelepipedTriclinic):
+
+    def __init__(self, str name='Cuboid', coordinate_system=None, double a=1.0, double b=1.0, double c=1.0):
+        super(Cuboid, self).__init__(name, coordinate_system=coordinate_system,
+                                     a=a, b=b, c=c,
+                                     alpha=np.pi/2, beta=np.pi/2, gamma=np.pi/2)
+
+    @staticmethod
+    def _primitive_batch(a=1.0, b=1.0, c=1.0):
+        return ParallelepipedTriclinic._primitive_batch(a, b, c)
+
+
+cdef class Cube(Cuboid):
+
+    def __init__(self, str name='Cube', coordinate_system=None, double a=1.0):
+        super(Cube, self).__init__(name, coordinate_system=coordinate_system, a=a, b=a, c=a)
+
+    @staticmethod
+    def _primitive_batch(a=1.0):
+        return Cuboid._primitive_batch(a, a, a)
+
+
+def triclinic_vectors(a, b, c, alpha, beta, gamma):
+    """
+    Edge vectors of triclinic cell given by lengths of its edges and angles between them.
+    :return: array of edge vectors (rows) shaped (..., 3, 3)
+    """
+    a, b, c, alpha, beta, gamma = batch_parameters(a, b, c, alpha, beta, gamma)
+    v = np.sqrt(np.abs(1 - np.cos(alpha)**2 - np.cos(beta)**2 - np.cos(gamma)**2 +
+                       2 * np.cos(alpha) * np.cos(beta) * np.cos(gamma)))
+    v *= a * b * c
+    vectors = np.zeros(a.shape + (3, 3), dtype=np.double)
+    vectors[..., 0, 0] = a
+    vectors[..., 1, 0] = b * np.cos(gamma)
+    vectors[..., 1, 1] = b * np.sin(gamma)
+    vectors[..., 2, 0] = c * np.cos(beta)
+    vectors[..., 2, 1] = c * (np.cos(alpha) - np.cos(beta) * np.cos(gamma)) / np.sin(gamma)
+    vectors[..., 2, 2] = v / (a * b * np.sin(gamma))
+    return vectors
@@ -0,0 +1,13 @@
+from BDSpace.Figure.Figure cimport Figure
+
+cdef class CylindricalWedge(Figure):
+    cdef:
+        double __r_inner
+        double __r_outer
+        double __phi
+        double __z_min
+        double __z_max
+
+
+cdef class Cylinder(CylindricalWedge):
+    pass
@@ -0,0 +1,125 @@
+import numpy as np
+
+from BDSpace.Coordinates.transforms import reduce_angle
+from BDSpace.Figure.Figure cimport Figure
+from BDSpace.Figure.Figure import batch_parameters, batch_angles
+from BDSpace.Figure._helpers import cylindrical_wedge_contains, cylindrical_wedge_distance, CYLINDRICAL_WEDGE
+from BDSpace.Figure._sampling import polar_points, polar_vectors, wedge_side_patches
+
+
+cdef class CylindricalWedge(Figure):
+
+    def __init__(self, str name='Cylindrical wedge', coordinate_system=None,
+                 double r_inner=0.0, double r_outer=1.0, double phi=np.pi/2, z=np.array([0.0, 1.0])):
+        self.r_inner = r_inner
+        self.r_outer = r_outer
+        self.phi = phi
+        self.z = z
+        super(CylindricalWedge, self).__init__(name, coordinate_system=coordinate_system)
+
+    def _pickle_parameters(self):
+        return CylindricalWedge, {'name': self.name, 'r_inner': self.__r_inner, 'r_outer': self.__r_outer,
+                                  'phi': self.__phi, 'z': self.z}
+
+    @property
+    def r_inner(self):
+        return self.__r_inner
+
+    @r_inner.setter
+    def r_inner(self, double r_inner):
+        self.__r_inner = r_inner
+        self.invalidate_cache()
+
+    @property
+    def r_outer(self):
+        return self.__r_outer
+
+    @r_outer.setter
+    def r_outer(self, double r_outer):
+        self.__r_outer = r_outer
+        self.invalidate_cache()
+
+    @property
+    def phi(self):
+        return self.__phi
+
+    @phi.setter
+    def phi(self, double phi):
+        self.__phi = reduce_angle(phi)
+        self.invalidate_cache()
+
+    @property
+    def z(self):
+        return np.array([self.__z_min, self.__z_max])
+
+    @z.setter
+    def z(self, z):
+        self.__z_min = min(z)
+        self.__z_max = max(z)
+        self.invalidate_cache()
+
+    def _contains_local(self, xyz):
+        return cylindrical_wedge_contains(xyz, self.__r_inner, self.__r_outer, self.__phi, self.__z_min, self.__z_max)
+
+    def _signed_distance_local(self, xyz):
+        return cylindrical_wedge_distance(xyz, self.__r_inner, self.__r_outer, self.__phi, self.__z_min, self.__z_max)
+
+    def _primitive(self):
+        return CYLINDRICAL_WEDGE, np.array([self.__r_inner, self.__r_outer, self.__phi, self.__z_min, self.__z_max])
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, phi=np.pi/2, z=np.array([0.0, 1.0])):
+        z = np.asarray(z, dtype=np.double)
+        r_inner, r_outer, phi, z_min, z_max = batch_parameters(r_inner, r_outer, phi, z.min(axis=-1), z.max(axis=-1))
+        return CYLINDRICAL_WEDGE, np.stack((r_inner, r_outer, batch_angles(phi), z_min, z_max), axis=-1)
+
+    def _bounding_box_local(self):
+        return np.array([[-self.__r_outer, -self.__r_outer, self.__z_min],
+                         [self.__r_outer, self.__r_outer, self.__z_max]])
+
+    def _volume_map(self, uvw):
+        r_inner, r_outer, phi, z_min, z_max = self.__r_inner, self.__r_outer, self.__phi, self.__z_min, self.__z_max
+        rho = np.sqrt(r_inner**2 + uvw[:, 0] * (r_outer**2 - r_inner**2))
+        return polar_points(rho, uvw[:, 1] * phi, z_min + uvw[:, 2] * (z_max - z_min))
+
+    def _surface_patches(self):
+        r_inner, r_outer, phi = self.__r_inner, self.__r_outer, self.__phi
+        z_min = self.__z_min
+        h = self.__z_max - z_min
+
+        def side(r, orientation):
+            def patch(uv):
+                azimuth = uv[:, 0] * phi
+                points = polar_points(np.full(azimuth.shape, r), azimuth, z_min + uv[:, 1] * h)
+                return points, polar_vectors(np.full(azimuth.shape, orientation), azimuth, np.zeros(azimuth.shape))
+            return patch
+
+        def base(z, orientation):
+            def patch(uv):
+                rho = np.sqrt(r_inner**2 + uv[:, 0] * (r_outer**2 - r_inner**2))
+                points = polar_points(rho, uv[:, 1] * phi, np.full(rho.shape, z))
+                return points, np.broadcast_to(np.array([0.0, 0.0, orientation]), points.shape)
+            return patch
+
+        def meridional_map(uv):
+            return r_inner + uv[:, 0] * (r_outer - r_inner), z_min + uv[:, 1] * h
+
+        base_area = phi / 2 * (r_outer**2 - r_inner**2)
+        patches = [(r_outer * phi * h, side(r_outer, 1.0)),
+                   (r_inner * phi * h, side(r_inner, -1.0)),
+                   (base_area, base(z_min, -1.0)),
+                   (base_area, base(z_min + h, 1.0))]
+        patches += wedge_side_patches(phi, (r_outer - r_inner) * h, meridional_map)
+        return [patch for patch in patches if patch[0] > 0]
+
+
+cdef class Cylinder(CylindricalWedge):
+
+    def __init__(self, str name='Cylinder', coordinate_system=None,
+                 double r_inner=0.0, double r_outer=1.0, z=np.array([0.0, 1.0])):
+        super(Cylinder, self).__init__(name, coordinate_system=coordinate_system,
+                                       r_inner=r_inner, r_outer=r_outer, phi=np.pi*2, z=z)
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, z=np.array([0.0, 1.0])):
+        return CylindricalWedge._primitive_batch(r_inner, r_outer, 2*np.pi, z)
@@ -0,0 +1,17 @@
+from BDSpace.Space cimport Space
+
+cdef class Figure(Space):
+    cdef:
+        dict __meshes
+        bint __measured
+        double __measures[4]
+
+    cpdef void invalidate_cache(self)
+    cdef double __measure(self, int i)
+    cpdef double inner_volume(self)
+    cpdef double external_volume(self)
+    cpdef double volume(self)
+    cpdef double inner_surface_area(self)
+    cpdef double external_surface_area(self)
+    cpdef double surface_area(self)
+    cdef tuple __mesh_in(self, tuple mesh, bint global_coordinates)
@@ -0,0 +1,415 @@
+import numpy as np
+
+from BDSpace.Space cimport Space
+from BDSpace.Coordinates.transforms cimport reduce_angles
+from BDSpace.Figure._helpers cimport primitive_measures, primitive_measures_batch
+from BDSpace.Figure._helpers import csg_ray_cast
+from BDSpace.Figure._sampling import unit_cube_sampler
+from BDSpace.Figure._meshing import triangulate_patches, mesh_volume_map
+
+_REJECTION_DRAWS = 1 << 20  # points drawn without a hit after which rejection sampling gives up
+
+
+cdef class Figure(Space):
+
+    def __init__(self, str name, coordinate_system=None):
+        super(Figure, self).__init__(name, coordinate_system=coordinate_system)
+        self.invalidate_cache()
+
+    cpdef void invalidate_cache(self):
+        """
+        Drops cached volume, surface area, meshes and bounding box of the Figure.
+        Called by all setters of the Figure parameters.
+        """
+        self.__meshes = {}
+        self.__measured = False
+        self.invalidate_bounding_box()
+
+    def _pickle_parameters(self):
+        return Figure, {'name': self.name}
+
+    def __str__(self):
+        description = 'Figure: %s\n' % self.name
+        description += str(self.coordinate_system)
+        return description
+
+    cdef double __measure(self, int i):
+        cdef:
+            double[::1] params
+        if not self.__measured:
+            primitive = self._primitive()
+            if primitive is None:
+                self.__measures[:] = [0.0, 0.0, 0.0, 0.0]
+            else:
+                params = np.ascontiguousarray(primitive[1], dtype=np.double)
+                primitive_measures(primitive[0], &params[0], self.__measures)
+            self.__measured = True
+        return self.__measures[i]
+
+    cpdef double inner_volume(self):
+        """
+        Calculates volume of the closed inner cavity of the Figure (zero if no such cavity).
+        :return: Volume float
+        """
+        return self.__measure(0)
+
+    cpdef double external_volume(self):
+        """
+        Calculates volume enclosed by the outer shell of the Figure.
+        For figures without voids and inner cavities returns the same value as volume function.
+        :return: Volume float
+        """
+        return self.__measure(1)
+
+    cpdef double volume(self):
+        """
+        Calculates volume of the Figure. The value is cached until any parameter of the Figure changes.
+        :return: Volume (float)
+        """
+        return self.external_volume() - self.inner_volume()
+
+    cpdef double inner_surface_area(self):
+        """
+        Calculates area of inner surface (zero if no such surface)
+        :return: Area of inner surface if any exist.
+        """
+        return self.__measure(2)
+
+    cpdef double external_surface_area(self):
+        """
+        Calculates external surface area of the Figure.
+        :return: Area of external surface.
+        """
+        return self.__measure(3)
+
+    cpdef double surface_area(self):
+        """
+        Calculates surface area of the Figure. The value is cached until any parameter of the Figure changes.
+        :return: Area (float)
+        """
+        return self.inner_surface_area() + self.external_surface_area()
+
+    @classmethod
+    def _primitive_batch(cls, *args, **kwargs):
+        """
+        Vectorized counterpart of _primitive method for arrays of the Figure parameters.
+        :return: tuple of primitive kind code and parameters array shaped (..., K)
+        """
+        raise NotImplementedError('Batch evaluation is not available for %s' % cls.__name__)
+
+    @classmethod
+    def _measures_batch(cls, *args, **kwargs):
+        kind, params = cls._primitive_batch(*args, **kwargs)
+        params = np.asarray(params, dtype=np.double)
+        flat = np.ascontiguousarray(params.reshape(-1, params.shape[-1]))
+        return np.asarray(primitive_measures_batch(kind, flat)).reshape(params.shape[:-1] + (4,))
+
+    @classmethod
+    def volume_batch(cls, *args, **kwargs):
+        """
+        Calculates volumes of many figures of this class without creating them, e.g. for parameters sweeps.
+        Takes the same parameters as the class constructor (except name and coordinate system)
+        given as arrays broadcastable to common shape.
+        :return: array of volumes
+        """
+        measures = cls._measures_batch(*args, **kwargs)
+        return measures[..., 1] - measures[..., 0]
+
+    @classmethod
+    def surface_area_batch(cls, *args, **kwargs):
+        """
+        Calculates surface areas of many figures of this class without creating them, e.g. for parameters sweeps.
+        Takes the same parameters as the class constructor (except name and coordinate system)
+        given as arrays broadcastable to common shape.
+        :return: array of surface areas
+        """
+        measures = cls._measures_batch(*args, **kwargs)
+        return measures[..., 2] + measures[..., 3]
+
+    def _contains_local(self, xyz):
+        """
+        Point membership test in the local coordinate system of the Figure.
+        Figures override this method with the nogil kernel of their shape.
+        :param xyz: array of points in local coordinate system shaped Nx3
+        :return: uint8 mask array, 1 for points inside the Figure
+        """
+        return np.zeros(xyz.shape[0], dtype=np.uint8)
+
+    def contains(self, xyz):
+        """
+        Checks which points are inside the Figure.
+        Points are given in the global coordinate system of the Space tree the Figure belongs to.
+        :param xyz: array of points shaped Nx3 (or a single 3D point)
+        :return: boolean mask array
+        """
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        local_xyz = self.to_local_coordinate_system(xyz)
+        return np.asarray(self._contains_local(local_xyz)).view(np.bool_)
+
+    def _primitive(self):
+        """
+        Description of the Figure for compiled CSG programs.
+        :return: tuple of primitive kind code and parameters array, or None if the Figure is not a primitive
+        """
+        return None
+
+    def compile(self):
+        """
+        Compiles the Figure to program of nogil signed distance kernels in its local coordinate system.
+        Primitive figures compile to a single instruction.
+        :return: tuple of instruction codes, parameters offsets and parameters arrays, or None
+        """
+        primitive = self._primitive()
+        if primitive is None:
+            return None
+        kind, params = primitive
+        params = np.concatenate((np.eye(3).ravel(), np.zeros(3), params))
+        return np.array([kind], dtype=np.intc), np.zeros(1, dtype=np.intc), np.ascontiguousarray(params, dtype=np.double)
+
+    def intersect_rays(self, origins, directions, t_max=np.inf, tolerance=None, max_steps=10000):
+        """
+        Finds where rays enter and exit the Figure and the total path length inside it.
+        Rays are transformed to the local coordinate system of the Figure and clipped by its local bounding box,
+        then the conservative signed distance is sphere traced and its sign changes are located by bisection,
+        so rays may cross non-convex figures (shells, wedges, CSG expressions) several times.
+        :param origins: array of ray origins in global coordinate system shaped Nx3 (or a single 3D point)
+        :param directions: array of ray directions shaped Nx3 (or a single 3D vector), not necessarily unit
+        :param t_max: maximal distance along the rays
+        :param tolerance: accuracy of surface crossings, features thinner than tolerance may be missed,
+                          1e-6 of the bounding box diagonal by default
+        :param max_steps: maximal number of marching steps per ray
+        :return: tuple of arrays of entry distances, exit distances (NaN for missing rays) and path lengths
+        """
+        program = self.compile()
+        if program is None:
+            raise NotImplementedError('Ray casting is not available for %s' % self.name)
+        codes, offsets, params = program
+        origins = np.ascontiguousarray(origins, dtype=np.double).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.double).reshape(-1, 3), origins.shape)
+        directions = directions / np.sqrt(np.sum(directions * directions, axis=1))[:, np.newaxis]
+        local_origins = np.asarray(self.to_local_coordinate_system(origins))
+        local_directions = np.asarray(self.to_local_coordinate_system(np.ascontiguousarray(origins + directions)))
+        local_directions = np.ascontiguousarray(local_directions - local_origins)
+        box = self._bounding_box_local()
+        if box is None:
+            return (np.full(origins.shape[0], np.nan), np.full(origins.shape[0], np.nan),
+                    np.zeros(origins.shape[0]))
+        box = np.asarray(box, dtype=np.double)
+        if tolerance is None:
+            tolerance = 1.0e-6 * np.sqrt(np.sum((box[1] - box[0]) ** 2))
+        t_start, t_stop = _ray_box_range(local_origins, local_directions, box, tolerance, t_max)
+        result = np.asarray(csg_ray_cast(local_origins, local_directions, t_start, t_stop,
+                                         codes, offsets, params, tolerance, max_steps))
+        return result[:, 0], result[:, 1], result[:, 2]
+
+    def _volume_map(self, uvw):
+        """
+        Maps points of the unit cube to points inside the Figure (local coordinates)
+        preserving uniform distribution, i.e. the map has constant Jacobian equal to the Figure volume.
+        :param uvw: array of unit cube points shaped Nx3
+        :return: array of points in local coordinate system shaped Nx3, or None if the Figure has no such map
+        """
+        return None
+
+    def _surface_patches(self):
+        """
+        Surface of the Figure as a list of patches with uniform unit square parametrization.
+        Each patch is a tuple of its area and a function mapping unit square points shaped Nx2
+        to a tuple of local points and outward unit normals arrays shaped Nx3.
+        :return: list of patches, or None if the Figure has no such parametrization
+        """
+        return None
+
+    def sample_volume(self, num_points, chunk_size=65536, method='random', seed=None):
+        """
+        Generates points uniformly distributed inside the Figure.
+        Points are produced by inverse-CDF maps of the unit cube to natural coordinates of the Figure.
+        Figures without such map fall back to rejection sampling in their bounding box,
+        ValueError is raised if the Figure is empty or no point of many draws falls inside it.
+        :param num_points: total number of points
+        :param chunk_size: number of points in each chunk, the last chunk may be smaller
+        :param method: 'random' for pseudo-random, 'sobol' or 'halton' for scrambled quasi-random sequences
+        :param seed: seed for reproducible sampling
+        :return: generator of arrays of points in global coordinate system shaped Mx3
+        """
+        draw = unit_cube_sampler(method, 3, seed)
+        remaining = num_points
+        if self._volume_map(np.zeros((1, 3))) is None:
+            box = self._bounding_box_local()
+            if box is None:
+                if self.compile() is None:
+                    raise NotImplementedError('Volume sampling is not available for %s' % self.name)
+                raise ValueError('Figure %s is empty' % self.name)
+            buffer = np.empty((0, 3), dtype=np.double)
+            misses = 0
+            while remaining > 0:
+                size = min(chunk_size, remaining)
+                while buffer.shape[0] < size:
+                    xyz = np.ascontiguousarray(box[0] + draw(chunk_size) * (box[1] - box[0]))
+                    inside = np.asarray(self._contains_local(xyz)).view(np.bool_)
+                    if not inside.any():
+                        misses += chunk_size
+                        if misses >= _REJECTION_DRAWS:
+                            raise ValueError('No point of %d draws fell inside %s, the figure may be empty'
+                                             % (misses, self.name))
+                        continue
+                    misses = 0
+                    buffer = np.vstack((buffer, xyz[inside]))
+                remaining -= size
+                yield np.asarray(self.to_global_coordinate_system(np.ascontiguousarray(buffer[:size])))
+                buffer = buffer[size:]
+        else:
+            while remaining > 0:
+                size = min(chunk_size, remaining)
+                remaining -= size
+                xyz = np.ascontiguousarray(self._volume_map(draw(size)))
+                yield np.asarray(self.to_global_coordinate_system(xyz))
+
+    def sample_surface(self, num_points, chunk_size=65536, method='random', seed=None, normals=False):
+        """
+        Generates points uniformly distributed over the surface of the Figure.
+        The first coordinate of each unit cube sample selects a surface patch with probability
+        proportional to its area, two others are mapped to the patch by its inverse-CDF map.
+        :param num_points: total number of points
+        :param chunk_size: number of points in each chunk, the last chunk may be smaller
+        :param method: 'random' for pseudo-random, 'sobol' or 'halton' for scrambled quasi-random sequences
+        :param seed: seed for reproducible sampling
+        :param normals: if True generate tuples of points and outward unit normals
+        :return: generator of arrays of points in global coordinate system shaped Mx3
+        """
+        patches = self._surface_patches()
+        if not patches:
+            raise NotImplementedError('Surface sampling is not available for %s' % self.name)
+        areas = np.array([patch[0] for patch in patches], dtype=np.double)
+        bounds = np.cumsum(areas) / np.sum(areas)
+        draw = unit_cube_sampler(method, 3, seed)
+        remaining = num_points
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            remaining -= size
+            samples = draw(size)
+            selection = np.minimum(np.searchsorted(bounds, samples[:, 0], side='right'), len(patches) - 1)
+            xyz = np.empty((size, 3), dtype=np.double)
+            directions = np.empty((size, 3), dtype=np.double)
+            for i in np.unique(selection):
+                mask = selection == i
+                xyz[mask], directions[mask] = patches[i][1](samples[mask, 1:])
+            points = np.asarray(self.to_global_coordinate_system(xyz))
+            if normals:
+                tips = np.asarray(self.to_global_coordinate_system(xyz + directions))
+                yield points, tips - points
+            else:
+                yield points
+
+    def surface_mesh(self, resolution=16, global_coordinates=True):
+        """
+        Triangulates surface of the Figure on uniform grids of its surface patches parametrization.
+        Coincident vertices (patch seams, poles) are merged and degenerate triangles are removed.
+        Patches are meshed independently, so seams of patches with different parametrizations
+        are not necessarily conforming.
+        Triangles are oriented counterclockwise when seen from outside.
+        The mesh is cached until any geometric property of the Figure changes.
+        :param resolution: number of grid divisions per patch parameter (int or pair of ints)
+        :param global_coordinates: if True vertices are given in global coordinate system, otherwise in local one
+        :return: tuple of read-only vertices array shaped Nx3 (float64) and triangles array shaped Mx3 (int32)
+        """
+        key = ('surface', tuple(np.broadcast_to(np.asarray(resolution, dtype=int), (2,))))
+        if key not in self.__meshes:
+            patches = self._surface_patches()
+            if not patches:
+                raise NotImplementedError('Surface meshing is not available for %s' % self.name)
+            self.__meshes[key] = triangulate_patches(patches, key[1])
+        return self.__mesh_in(self.__meshes[key], global_coordinates)
+
+    def volume_mesh(self, resolution=8, cell_type='tetrahedron', global_coordinates=True):
+        """
+        Structured volume mesh of the Figure built by its unit cube volume map, so all cells of the
+        underlying grid have equal volume. Coincident vertices are merged and cells are positively oriented.
+        Hexahedra follow VTK vertices ordering and may be degenerate at the axes and poles of the Figure,
+        degenerate tetrahedra are removed.
+        The mesh is cached until any geometric property of the Figure changes.
+        :param resolution: number of grid divisions per unit cube axis (int or triple of ints)
+        :param cell_type: 'tetrahedron' or 'hexahedron'
+        :param global_coordinates: if True vertices are given in global coordinate system, otherwise in local one
+        :return: tuple of read-only vertices array shaped Nx3 (float64) and cells array shaped Mx4 or Mx8 (int32)
+        """
+        key = (cell_type, tuple(np.broadcast_to(np.asarray(resolution, dtype=int), (3,))))
+        if key not in self.__meshes:
+            if self._volume_map(np.zeros((1, 3))) is None:
+                raise NotImplementedError('Volume meshing is not available for %s' % self.name)
+            self.__meshes[key] = mesh_volume_map(self._volume_map, key[1], cell_type)
+        return self.__mesh_in(self.__meshes[key], global_coordinates)
+
+    cdef tuple __mesh_in(self, tuple mesh, bint global_coordinates):
+        vertices, cells = mesh
+        if global_coordinates:
+            vertices = np.asarray(self.to_global_coordinate_system(np.array(vertices)))
+        return vertices, cells
+
+    def _signed_distance_local(self, xyz):
+        """
+        Signed distance to the Figure surface in the local coordinate system of the Figure.
+        Figures override this method with the nogil kernel of their shape.
+        :param xyz: array of points in local coordinate system shaped Nx3
+        :return: array of signed distances, negative inside the Figure
+        """
+        return np.full(xyz.shape[0], np.inf, dtype=np.double)
+
+    def signed_distance(self, xyz):
+        """
+        Calculates signed distance from points to the Figure surface, negative inside the Figure.
+        The distance is exact or conservative: its magnitude never exceeds the true distance,
+        so results of several figures may be combined with sdf_union, sdf_intersection and sdf_difference.
+        :param xyz: array of points in global coordinate system shaped Nx3 (or a single 3D point)
+        :return: array of signed distances
+        """
+        xyz = np.ascontiguousarray(xyz, dtype=np.double).reshape(-1, 3)
+        local_xyz = self.to_local_coordinate_system(xyz)
+        return np.asarray(self._signed_distance_local(local_xyz))
+
+    def distance(self, xyz):
+        """
+        Calculates distance from points to the Figure, zero inside the Figure.
+        :param xyz: array of points in global coordinate system shaped Nx3 (or a single 3D point)
+        :return: array of distances
+        """
+        return np.maximum(self.signed_distance(xyz), 0.0)
+
+
+def batch_parameters(*parameters):
+    """
+    Broadcasts arrays of figure parameters to common shape.
+    :param parameters: scalars or arrays of parameters
+    :return: list of float64 arrays of common shape
+    """
+    return [np.array(parameter, dtype=np.double) for parameter in np.broadcast_arrays(*parameters)]
+
+
+def batch_angles(angles, bint keep_sign=False):
+    """
+    Vectorized reduce_angle for arrays of any shape.
+    :param angles: array of angles
+    :param keep_sign: if True negative angles are kept negative
+    :return: array of reduced angles
+    """
+    angles = np.asarray(angles, dtype=np.double)
+    reduced = np.asarray(reduce_angles(np.ascontiguousarray(angles.ravel()), keep_sign=keep_sign))
+    return reduced.reshape(angles.shape)
+
+
+def _ray_box_range(origins, directions, box, margin, t_max):
+    """
+    Range of ray parameters inside the box inflated by margin (empty range if the ray misses the box).
+    """
+    lo = box[0] - margin
+    hi = box[1] + margin
+    parallel = directions == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (lo - origins) / directions
+        t2 = (hi - origins) / directions
+    inside = (origins >= lo) & (origins <= hi)
+    t_near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    t_far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    t_start = np.maximum(t_near.max(axis=1), 0.0)
+    t_stop = np.minimum(t_far.min(axis=1), t_max)
+    return np.ascontiguousarray(t_start), np.ascontiguousarray(np.maximum(t_stop, t_start))
@@ -0,0 +1,38 @@
+from BDSpace.Figure.Figure cimport Figure
+
+cdef class SphericalShape(Figure):
+    cdef:
+        double __r_inner
+        double __r_outer
+        double __phi
+
+
+cdef class SphericalWedge(SphericalShape):
+    cdef:
+        double __theta_min
+        double __theta_max
+
+
+cdef class SphericalCone(SphericalWedge):
+    pass
+
+
+cdef class Sphere(SphericalCone):
+    pass
+
+
+cdef class SphericalSegmentWedge(SphericalShape):
+    cdef:
+        double __h1
+        double __h2
+
+    cdef tuple __z_range(self, double r)
+    cdef tuple __rho2(self, z)
+
+
+cdef class SphericalSegment(SphericalSegmentWedge):
+    pass
+
+
+cdef class SphericalCap(SphericalSegment):
+    pass
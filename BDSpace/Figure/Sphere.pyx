@@ -0,0 +1,328 @@
+import numpy as np
+
+from BDSpace.Coordinates.transforms import reduce_angle
+from BDSpace.Figure.Figure cimport Figure
+from BDSpace.Figure.Figure import batch_parameters, batch_angles
+from BDSpace.Figure._helpers import spherical_wedge_contains, spherical_segment_wedge_contains
+from BDSpace.Figure._helpers import spherical_wedge_distance, spherical_segment_wedge_distance
+from BDSpace.Figure._helpers import SPHERICAL_WEDGE, SPHERICAL_SEGMENT_WEDGE
+from BDSpace.Figure._sampling import invert_cdf, polar_points, polar_vectors, wedge_side_patches
+
+
+cdef class SphericalShape(Figure):
+
+    def __init__(self, str name='Spherical shape', coordinate_system=None,
+                 double r_inner=0.0, double r_outer=1.0, double phi=np.pi/2):
+        self.r_inner = max(min(r_inner, r_outer), 0.0)
+        self.r_outer = max(max(r_inner, r_outer), 0.0)
+        self.phi = phi
+        super(SphericalShape, self).__init__(name, coordinate_system=coordinate_system)
+
+    def _pickle_parameters(self):
+        return SphericalShape, {'name': self.name, 'r_inner': self.r_inner, 'r_outer': self.r_outer, 'phi': self.phi}
+
+    @property
+    def r_inner(self):
+        return self.__r_inner
+
+    @r_inner.setter
+    def r_inner(self, double r_inner):
+        self.__r_inner = r_inner
+        self.invalidate_cache()
+
+    @property
+    def r_outer(self):
+        return self.__r_outer
+
+    @r_outer.setter
+    def r_outer(self, double r_outer):
+        self.__r_outer = r_outer
+        self.invalidate_cache()
+
+    @property
+    def phi(self):
+        return self.__phi
+
+    @phi.setter
+    def phi(self, double phi):
+        self.__phi = reduce_angle(phi)
+        self.invalidate_cache()
+
+    @staticmethod
+    def _radii_batch(r_inner, r_outer):
+        r_inner, r_outer = batch_parameters(r_inner, r_outer)
+        return np.maximum(np.minimum(r_inner, r_outer), 0.0), np.maximum(np.maximum(r_inner, r_outer), 0.0)
+
+
+cdef class SphericalWedge(SphericalShape):
+
+    def __init__(self, str name='Spherical wedge', coordinate_system=None,
+                 double r_inner=0.0, double r_outer=1.0, double phi=np.pi/2, theta=np.array([0.0, np.pi/2])):
+        self.theta = theta
+        super(SphericalWedge, self).__init__(name, coordinate_system=coordinate_system,
+                                             r_inner=r_inner, r_outer=r_outer, phi=phi)
+
+    def _pickle_parameters(self):
+        return SphericalWedge, {'name': self.name, 'r_inner': self.r_inner, 'r_outer': self.r_outer, 'phi': self.phi,
+                                'theta': self.theta}
+
+    @property
+    def theta(self):
+        return np.array([self.__theta_min, self.__theta_max])
+
+    @theta.setter
+    def theta(self, theta):
+        max_theta = reduce_angle(max(theta))
+        if max_theta > np.pi:
+            max_theta = 2 * np.pi - max_theta
+        min_theta = reduce_angle(min(theta))
+        if min_theta > np.pi:
+            min_theta = 2 * np.pi - min_theta
+        self.__theta_min = min_theta
+        self.__theta_max = max_theta
+        self.invalidate_cache()
+
+    def _contains_local(self, xyz):
+        return spherical_wedge_contains(xyz, self.r_inner, self.r_outer, self.phi,
+                                        self.__theta_min, self.__theta_max)
+
+    def _signed_distance_local(self, xyz):
+        return spherical_wedge_distance(xyz, self.r_inner, self.r_outer, self.phi,
+                                        self.__theta_min, self.__theta_max)
+
+    def _primitive(self):
+        return SPHERICAL_WEDGE, np.array([self.r_inner, self.r_outer, self.phi, self.__theta_min, self.__theta_max])
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, phi=np.pi/2, theta=np.array([0.0, np.pi/2])):
+        theta = np.asarray(theta, dtype=np.double)
+        r_inner, r_outer, phi, theta_min, theta_max = batch_parameters(r_inner, r_outer, phi,
+                                                                       theta.min(axis=-1), theta.max(axis=-1))
+        r_inner, r_outer = SphericalShape._radii_batch(r_inner, r_outer)
+        theta_min, theta_max = batch_angles(theta_min), batch_angles(theta_max)
+        theta_min = np.where(theta_min > np.pi, 2 * np.pi - theta_min, theta_min)
+        theta_max = np.where(theta_max > np.pi, 2 * np.pi - theta_max, theta_max)
+        return SPHERICAL_WEDGE, np.stack((r_inner, r_outer, batch_angles(phi), theta_min, theta_max), axis=-1)
+
+    def _bounding_box_local(self):
+        return np.array([[-self.r_outer] * 3, [self.r_outer] * 3])
+
+    def _volume_map(self, uvw):
+        r_inner, r_outer, phi = self.r_inner, self.r_outer, self.phi
+        cos_min, cos_max = np.cos(self.__theta_min), np.cos(self.__theta_max)
+        r = np.cbrt(r_inner**3 + uvw[:, 0] * (r_outer**3 - r_inner**3))
+        cos_theta = cos_min - uvw[:, 1] * (cos_min - cos_max)
+        sin_theta = np.sqrt(np.maximum(1 - cos_theta**2, 0.0))
+        return polar_points(r * sin_theta, uvw[:, 2] * phi, r * cos_theta)
+
+    def _surface_patches(self):
+        r_inner, r_outer, phi = self.r_inner, self.r_outer, self.phi
+        theta_min, theta_max = self.__theta_min, self.__theta_max
+        cos_range = np.cos(theta_min) - np.cos(theta_max)
+        r2_range = r_outer**2 - r_inner**2
+
+        def sphere(r, orientation):
+            def patch(uv):
+                cos_theta = np.cos(theta_min) - uv[:, 0] * cos_range
+                sin_theta = np.sqrt(np.maximum(1 - cos_theta**2, 0.0))
+                unit = polar_points(sin_theta, uv[:, 1] * phi, cos_theta)
+                return r * unit, orientation * unit
+            return patch
+
+        def cone(theta, orientation):
+            def patch(uv):
+                r = np.sqrt(r_inner**2 + uv[:, 0] * r2_range)
+                azimuth = uv[:, 1] * phi
+                points = polar_points(r * np.sin(theta), azimuth, r * np.cos(theta))
+                normals = polar_vectors(np.full(r.shape, orientation * np.cos(theta)), azimuth,
+                                        np.full(r.shape, -orientation * np.sin(theta)))
+                return points, normals
+            return patch
+
+        def meridional_map(uv):
+            r = np.sqrt(r_inner**2 + uv[:, 0] * r2_range)
+            theta = theta_min + uv[:, 1] * (theta_max - theta_min)
+            return r * np.sin(theta), r * np.cos(theta)
+
+        patches = [(r_outer**2 * phi * cos_range, sphere(r_outer, 1.0)),
+                   (r_inner**2 * phi * cos_range, sphere(r_inner, -1.0))]
+        if theta_min > 0:
+            patches.append((phi * np.sin(theta_min) * r2_range / 2, cone(theta_min, -1.0)))
+        if theta_max < np.pi:
+            patches.append((phi * np.sin(theta_max) * r2_range / 2, cone(theta_max, 1.0)))
+        patches += wedge_side_patches(phi, (theta_max - theta_min) * r2_range / 2, meridional_map)
+        return [patch for patch in patches if patch[0] > 0]
+
+
+cdef class SphericalCone(SphericalWedge):
+
+    def __init__(self, str name='Spherical cone', coordinate_system=None,
+                 double r_inner=0.0, double r_outer=1.0, double theta=np.pi/4):
+        super(SphericalCone, self).__init__(name, coordinate_system=coordinate_system,
+                                            r_inner=r_inner, r_outer=r_outer, phi=2*np.pi, theta=np.array([0, theta]))
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, theta=np.pi/4):
+        theta = np.asarray(theta, dtype=np.double)
+        return SphericalWedge._primitive_batch(r_inner, r_outer, 2*np.pi,
+                                               np.stack((np.zeros_like(theta), theta), axis=-1))
+
+
+cdef class Sphere(SphericalCone):
+
+    def __init__(self, str name='Sphere', coordinate_system=None, double r_inner=0.0, double r_outer=1.0):
+        super(Sphere, self).__init__(name, coordinate_system=coordinate_system,
+                                     r_inner=r_inner, r_outer=r_outer, theta=np.pi)
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0):
+        return SphericalCone._primitive_batch(r_inner, r_outer, np.pi)
+
+
+cdef class SphericalSegmentWedge(SphericalShape):
+
+    def __init__(self, str name='Spherical section', coordinate_system=None, double r_inner=0.0, double r_outer=1.0,
+                 double h1=0.0, double h2=1.0, double phi=np.pi/2):
+        super(SphericalSegmentWedge, self).__init__(name, coordinate_system=coordinate_system,
+                                                    r_inner=r_inner, r_outer=r_outer, phi=phi)
+        self.h1 = max(min(h1, h2), -self.r_outer)
+        self.h2 = min(max(h1, h2), self.r_outer)
+
+    def _pickle_parameters(self):
+        return SphericalSegmentWedge, {'name': self.name, 'r_inner': self.r_inner, 'r_outer': self.r_outer,
+                                       'h1': self.h1, 'h2': self.h2, 'phi': self.phi}
+
+    @property
+    def h1(self):
+        return self.__h1
+
+    @h1.setter
+    def h1(self, double h1):
+        self.__h1 = h1
+        self.invalidate_cache()
+
+    @property
+    def h2(self):
+        return self.__h2
+
+    @h2.setter
+    def h2(self, double h2):
+        self.__h2 = h2
+        self.invalidate_cache()
+
+    def _contains_local(self, xyz):
+        return spherical_segment_wedge_contains(xyz, self.r_inner, self.r_outer, self.phi, self.__h1, self.__h2)
+
+    def _signed_distance_local(self, xyz):
+        return spherical_segment_wedge_distance(xyz, self.r_inner, self.r_outer, self.phi, self.__h1, self.__h2)
+
+    def _primitive(self):
+        return SPHERICAL_SEGMENT_WEDGE, np.array([self.r_inner, self.r_outer, self.phi, self.__h1, self.__h2])
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, h1=0.0, h2=1.0, phi=np.pi/2):
+        r_inner, r_outer, h1, h2, phi = batch_parameters(r_inner, r_outer, h1, h2, phi)
+        r_inner, r_outer = SphericalShape._radii_batch(r_inner, r_outer)
+        h1, h2 = np.maximum(np.minimum(h1, h2), -r_outer), np.minimum(np.maximum(h1, h2), r_outer)
+        return SPHERICAL_SEGMENT_WEDGE, np.stack((r_inner, r_outer, batch_angles(phi), h1, h2), axis=-1)
+
+    def _bounding_box_local(self):
+        return np.array([[-self.r_outer, -self.r_outer, max(self.__h1, -self.r_outer)],
+                         [self.r_outer, self.r_outer, min(self.__h2, self.r_outer)]])
+
+    cdef tuple __z_range(self, double r):
+        return max(self.__h1, -r), min(self.__h2, r)
+
+    cdef tuple __rho2(self, z):
+        return self.r_outer**2 - z**2, np.maximum(self.r_inner**2 - z**2, 0.0)
+
+    def _volume_map(self, uvw):
+        r_inner, r_outer, phi = self.r_inner, self.r_outer, self.phi
+        z1, z2 = self.__z_range(r_outer)
+
+        def cdf(z):
+            z_inner = np.clip(z, -r_inner, r_inner)
+            return r_outer**2 * z - z**3 / 3 - (r_inner**2 * z_inner - z_inner**3 / 3)
+
+        def pdf(z):
+            rho2_outer, rho2_inner = self.__rho2(z)
+            return rho2_outer - rho2_inner
+
+        z = invert_cdf(cdf, pdf, cdf(z1) + uvw[:, 0] * (cdf(z2) - cdf(z1)), z1, z2)
+        rho2_outer, rho2_inner = self.__rho2(z)
+        rho = np.sqrt(rho2_inner + uvw[:, 1] * (rho2_outer - rho2_inner))
+        return polar_points(rho, uvw[:, 2] * phi, z)
+
+    def _surface_patches(self):
+        r_inner, r_outer, phi = self.r_inner, self.r_outer, self.phi
+
+        def zone(r, z_range, orientation):
+            def patch(uv):
+                z = z_range[0] + uv[:, 0] * (z_range[1] - z_range[0])
+                points = polar_points(np.sqrt(np.maximum(r**2 - z**2, 0.0)), uv[:, 1] * phi, z)
+                return points, orientation * points / r
+            return patch
+
+        def cap(z, orientation):
+            def patch(uv):
+                rho2_outer, rho2_inner = self.__rho2(z)
+                rho = np.sqrt(rho2_inner + uv[:, 0] * (rho2_outer - rho2_inner))
+                points = polar_points(rho, uv[:, 1] * phi, np.full(rho.shape, z))
+                return points, np.broadcast_to(np.array([0.0, 0.0, orientation]), points.shape)
+            return patch
+
+        def width_integral(z):
+            z_inner = np.clip(z, -r_inner, r_inner)
+            result = (z * np.sqrt(np.maximum(r_outer**2 - z**2, 0.0))
+                      + r_outer**2 * np.arcsin(np.clip(z / r_outer, -1.0, 1.0))) / 2
+            if r_inner > 0:
+                result -= (z_inner * np.sqrt(np.maximum(r_inner**2 - z_inner**2, 0.0))
+                           + r_inner**2 * np.arcsin(z_inner / r_inner)) / 2
+            return result
+
+        def width(z):
+            rho2_outer, rho2_inner = self.__rho2(z)
+            return np.sqrt(rho2_outer) - np.sqrt(rho2_inner)
+
+        z1, z2 = self.__z_range(r_outer)
+        zi1, zi2 = self.__z_range(r_inner)
+
+        def meridional_map(uv):
+            target = width_integral(z1) + uv[:, 0] * (width_integral(z2) - width_integral(z1))
+            z = invert_cdf(width_integral, width, target, z1, z2)
+            rho2_outer, rho2_inner = self.__rho2(z)
+            rho = np.sqrt(rho2_inner) + uv[:, 1] * (np.sqrt(rho2_outer) - np.sqrt(rho2_inner))
+            return rho, z
+
+        patches = [(r_outer * phi * (z2 - z1), zone(r_outer, (z1, z2), 1.0))]
+        if r_inner > 0 and zi2 > zi1:
+            patches.append((r_inner * phi * (zi2 - zi1), zone(r_inner, (zi1, zi2), -1.0)))
+        for z, orientation in ((z1, -1.0), (z2, 1.0)):
+            rho2_outer, rho2_inner = self.__rho2(z)
+            patches.append((phi / 2 * (rho2_outer - rho2_inner), cap(z, orientation)))
+        patches += wedge_side_patches(phi, width_integral(z2) - width_integral(z1), meridional_map)
+        return [patch for patch in patches if patch[0] > 0]
+
+
+cdef class SphericalSegment(SphericalSegmentWedge):
+
+    def __init__(self, str name='Spherical section', coordinate_system=None, double r_inner=0, double r_outer=1.0,
+                 double h1=0, double h2=1.0):
+        super(SphericalSegment, self).__init__(name, coordinate_system=coordinate_system,
+                                               r_inner=r_inner, r_outer=r_outer, h1=h1, h2=h2, phi=2*np.pi)
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, h1=0.0, h2=1.0):
+        return SphericalSegmentWedge._primitive_batch(r_inner, r_outer, h1, h2, 2*np.pi)
+
+
+cdef class SphericalCap(SphericalSegment):
+
+    def __init__(self, str name='Spherical section', coordinate_system=None, double r_inner=0, double r_outer=1.0,
+                 double h1=0):
+        super(SphericalCap, self).__init__(name, coordinate_system=coordinate_system,
+                                           r_inner=r_inner, r_outer=r_outer, h1=h1, h2=r_outer)
+
+    @staticmethod
+    def _primitive_batch(r_inner=0.0, r_outer=1.0, h1=0.0):
+        return SphericalSegment._primitive_batch(r_inner, r_outer, h1, r_outer)
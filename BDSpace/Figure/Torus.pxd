@@ -0,0 +1,21 @@
+from BDSpace.Figure.Figure cimport Figure
+
+cdef class ToricWedge(Figure):
+    cdef:
+        double __r_torus
+        double __r_tube_min
+        double __r_tube_max
+        double __theta_min
+        double __theta_max
+        double __phi
+
+    cdef __poloidal_angle(self, r, u)
+    cdef __points(self, r, theta, phi)
+
+
+cdef class ToricSector(ToricWedge):
+    pass
+
+
+cdef class Torus(ToricSector):
+    pass
@@ -0,0 +1,195 @@
+import numpy as np
+
+from BDSpace.Coordinates.transforms import reduce_angle, reduce_angles
+from BDSpace.Figure.Figure cimport Figure
+from BDSpace.Figure.Figure import batch_parameters, batch_angles
+from BDSpace.Figure._helpers import toric_wedge_contains, toric_wedge_distance, TORIC_WEDGE
+from BDSpace.Figure._sampling import invert_cdf, polar_points, polar_vectors, wedge_side_patches
+
+
+cdef class ToricWedge(Figure):
+
+    def __init__(self, str name='Toric wedge', coordinate_system=None,
+                 double phi=np.pi/2, theta=np.array([0.0, np.pi/2]),
+                 double r_torus=1.0, r_tube=np.array([0, 0.25])):
+        self.r_torus = r_torus
+        self.r_tube = r_tube
+        self.theta = theta
+        self.phi = phi
+        super(ToricWedge, self).__init__(name, coordinate_system=coordinate_system)
+
+    def _pickle_parameters(self):
+        return ToricWedge, {'name': self.name, 'phi': self.phi, 'theta': self.theta, 'r_torus': self.r_torus,
+                            'r_tube': self.r_tube}
+
+    @property
+    def r_torus(self):
+        return self.__r_torus
+
+    @r_torus.setter
+    def r_torus(self, double r_torus):
+        self.__r_torus = abs(r_torus)
+        self.invalidate_cache()
+
+    @property
+    def r_tube(self):
+        return np.array([self.__r_tube_min, self.__r_tube_max])
+
+    @r_tube.setter
+    def r_tube(self, r_tube):
+        r_tube = np.abs(np.array(r_tube, dtype=np.float64)).ravel()
+        # Torus is not allowed to be thicker then its radius
+        r_tube = np.minimum(r_tube, self.__r_torus)
+        self.__r_tube_min = r_tube.min()
+        self.__r_tube_max = r_tube.max()
+        self.invalidate_cache()
+
+    @property
+    def theta(self):
+        return np.array([self.__theta_min, self.__theta_max])
+
+    @theta.setter
+    def theta(self, theta):
+        reduced_theta = np.asarray(reduce_angles(np.array(theta, dtype=np.float64), keep_sign=True))
+        theta_min = min(reduced_theta)
+        theta_max = max(reduced_theta)
+        if theta_max - theta_min >= 2 * np.pi:
+            theta_min = 0.0
+            theta_max = 2 * np.pi
+        self.__theta_min = theta_min
+        self.__theta_max = theta_max
+        self.invalidate_cache()
+
+    @property
+    def phi(self):
+        return self.__phi
+
+    @phi.setter
+    def phi(self, double phi):
+        self.__phi = reduce_angle(phi)
+        self.invalidate_cache()
+
+    def _contains_local(self, xyz):
+        return toric_wedge_contains(xyz, self.__r_torus, self.__r_tube_min, self.__r_tube_max, self.__phi,
+                                    self.__theta_min, self.__theta_max)
+
+    def _signed_distance_local(self, xyz):
+        return toric_wedge_distance(xyz, self.__r_torus, self.__r_tube_min, self.__r_tube_max, self.__phi,
+                                    self.__theta_min, self.__theta_max)
+
+    def _primitive(self):
+        return TORIC_WEDGE, np.array([self.__r_torus, self.__r_tube_min, self.__r_tube_max, self.__phi,
+                                      self.__theta_min, self.__theta_max])
+
+    @staticmethod
+    def _primitive_batch(phi=np.pi/2, theta=np.array([0.0, np.pi/2]), r_torus=1.0, r_tube=np.array([0, 0.25])):
+        theta = batch_angles(theta, keep_sign=True)
+        r_tube = np.abs(np.asarray(r_tube, dtype=np.double))
+        phi, theta_min, theta_max, r_torus, r_min, r_max = batch_parameters(phi, theta.min(axis=-1),
+                                                                            theta.max(axis=-1), np.abs(r_torus),
+                                                                            r_tube.min(axis=-1),
+                                                                            r_tube.max(axis=-1))
+        full = theta_max - theta_min >= 2 * np.pi
+        theta_min[full] = 0.0
+        theta_max[full] = 2 * np.pi
+        return TORIC_WEDGE, np.stack((r_torus, np.minimum(r_min, r_torus), np.minimum(r_max, r_torus),
+                                      batch_angles(phi), theta_min, theta_max), axis=-1)
+
+    def _bounding_box_local(self):
+        r_max = self.__r_torus + self.__r_tube_max
+        return np.array([[-r_max, -r_max, -self.__r_tube_max], [r_max, r_max, self.__r_tube_max]])
+
+    cdef __poloidal_angle(self, r, u):
+        # poloidal angle density at tube radius r is proportional to r_torus + r * cos(theta)
+        def cdf(theta):
+            return self.__r_torus * theta + r * np.sin(theta)
+
+        def pdf(theta):
+            return self.__r_torus + r * np.cos(theta)
+
+        return invert_cdf(cdf, pdf, cdf(self.__theta_min) + u * (cdf(self.__theta_max) - cdf(self.__theta_min)),
+                          self.__theta_min, self.__theta_max)
+
+    cdef __points(self, r, theta, phi):
+        return polar_points(self.__r_torus + r * np.cos(theta), phi, r * np.sin(theta))
+
+    def _volume_map(self, uvw):
+        r_min, r_max = self.__r_tube_min, self.__r_tube_max
+        delta_theta = self.__theta_max - self.__theta_min
+        delta_sin = np.sin(self.__theta_max) - np.sin(self.__theta_min)
+
+        def cdf(r):
+            return self.__r_torus * delta_theta * r**2 / 2 + delta_sin * r**3 / 3
+
+        def pdf(r):
+            return self.__r_torus * delta_theta * r + delta_sin * r**2
+
+        r = invert_cdf(cdf, pdf, cdf(r_min) + uvw[:, 0] * (cdf(r_max) - cdf(r_min)), r_min, r_max)
+        return self.__points(r, self.__poloidal_angle(r, uvw[:, 1]), uvw[:, 2] * self.__phi)
+
+    def _surface_patches(self):
+        r_min, r_max = self.__r_tube_min, self.__r_tube_max
+        delta_theta = self.__theta_max - self.__theta_min
+        delta_sin = np.sin(self.__theta_max) - np.sin(self.__theta_min)
+
+        def tube(r, orientation):
+            def patch(uv):
+                theta = self.__poloidal_angle(np.full(uv.shape[0], r), uv[:, 0])
+                phi = uv[:, 1] * self.__phi
+                return (self.__points(r, theta, phi),
+                        polar_vectors(orientation * np.cos(theta), phi, orientation * np.sin(theta)))
+            return self.__phi * r * (self.__r_torus * delta_theta + r * delta_sin), patch
+
+        def poloidal_end(theta, orientation):
+            def cdf(r):
+                return self.__r_torus * r + np.cos(theta) * r**2 / 2
+
+            def pdf(r):
+                return self.__r_torus + np.cos(theta) * r
+
+            def patch(uv):
+                r = invert_cdf(cdf, pdf, cdf(r_min) + uv[:, 0] * (cdf(r_max) - cdf(r_min)), r_min, r_max)
+                phi = uv[:, 1] * self.__phi
+                normals = polar_vectors(np.full(r.shape, -orientation * np.sin(theta)), phi,
+                                        np.full(r.shape, orientation * np.cos(theta)))
+                return self.__points(r, theta, phi), normals
+            return self.__phi * (cdf(r_max) - cdf(r_min)), patch
+
+        def meridional_map(uv):
+            r = np.sqrt(r_min**2 + uv[:, 0] * (r_max**2 - r_min**2))
+            theta = self.__theta_min + uv[:, 1] * delta_theta
+            return self.__r_torus + r * np.cos(theta), r * np.sin(theta)
+
+        patches = [tube(r_max, 1.0), tube(r_min, -1.0)]
+        if delta_theta < 2 * np.pi:
+            patches += [poloidal_end(self.__theta_min, -1.0), poloidal_end(self.__theta_max, 1.0)]
+        patches += wedge_side_patches(self.__phi, delta_theta * (r_max**2 - r_min**2) / 2, meridional_map)
+        return [patch for patch in patches if patch[0] > 0]
+
+
+cdef class ToricSector(ToricWedge):
+
+    def __init__(self, str name='Toric sector', coordinate_system=None,
+                 double phi=np.pi/2,
+                 double r_torus=1.0, r_tube=np.array([0, 0.25])):
+
+        super(ToricSector, self).__init__(name, coordinate_system=coordinate_system,
+                                          phi=phi, theta=np.array([0, 2*np.pi]),
+                                          r_torus=r_torus, r_tube=r_tube)
+
+    @staticmethod
+    def _primitive_batch(phi=np.pi/2, r_torus=1.0, r_tube=np.array([0, 0.25])):
+        return ToricWedge._primitive_batch(phi, np.array([0, 2*np.pi]), r_torus, r_tube)
+
+
+cdef class Torus(ToricSector):
+
+    def __init__(self, str name='Torus', coordinate_system=None,
+                 double r_torus=1.0, r_tube=np.array([0, 0.25])):
+
+        super(Torus, self).__init__(name, coordinate_system=coordinate_system,
+                                    phi=2*np.pi, r_torus=r_torus, r_tube=r_tube)
+
+    @staticmethod
+    def _primitive_batch(r_torus=1.0, r_tube=np.array([0, 0.25])):
+        return ToricSector._primitive_batch(2*np.pi, r_torus, r_tube)
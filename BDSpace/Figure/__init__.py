@@ -1,52 +1,75 @@
-from BDSpace import Space
-
-
-class Figure(Space):
-
-    def __init__(self, name, coordinate_system=None):
-        super(Figure, self).__init__(name, coordinate_system=coordinate_system)
-
-    def __str__(self):
-        description = 'Figure: %s\n' % self.name
-        description += str(self.coordinate_system)
-        return description
-
-    def inner_volume(self):
-        """
-        calculates volume of the outer shell of the Figure.
-        For figures without voids and inner cavities returns the same value as volume function.
-        :return: Volume float
-        """
-        return 0.0
-
-    def external_volume(self):
-        """
-        calculates volume of the outer shell of the Figure.
-        For figures without voids and inner cavities returns the same value as volume function.
-        :return: Volume float
-        """
-        return 0.0
-
-    def volume(self):
-        """
-        Calculates volume of the Figure.
-        :return: Volume (float)
-        """
-        return self.external_volume() - self.inner_volume()
-
-    def inner_surface_area(self):
-        """
-        Calculates area of inner surface (zero if no such surface)
-        :return: Area of inner surface if any exist.
-        """
-        return 0.0
-
-    def external_surface_area(self):
-        """
-        Calculates external surface area of the Figure.
-        :return: Area of external surface.
-        """
-        return 0.0
-
-    def surface_area(self):
-        return self.inner_surface_area() + self.external_surface_area()
+from functools import reduce
+import numpy as np
+
+from BDSpace import SpaceIndex
+from .Figure import Figure
+from ._integration import integrate_volume, integrate_flux
+
+
+def cast_rays(scene, origins, directions, t_max=np.inf, tolerance=None, max_steps=10000):
+    """
+    Casts rays through all figures of the scene. Candidate figures of each ray are found
+    by the bounding volume hierarchy of the scene, then rays are intersected with the figures in batches.
+    Operands of CSG figures are not reported separately.
+    :param scene: SpaceIndex or root Space of the scene
+    :param origins: array of ray origins in global coordinate system shaped Nx3
+    :param directions: array of ray directions shaped Nx3, not necessarily unit
+    :param t_max: maximal distance along the rays
+    :param tolerance: accuracy of surface crossings, see Figure.intersect_rays
+    :param max_steps: maximal number of marching steps per ray
+    :return: tuple of arrays of ray indices, scene items indices, entry and exit distances and path lengths,
+             one entry per hit sorted by ray and entry distance, e.g. attenuation of each ray is
+             np.bincount(rays, weights=mu[items] * path_lengths, minlength=N)
+    """
+    index = scene if isinstance(scene, SpaceIndex) else SpaceIndex(scene)
+    origins = np.ascontiguousarray(origins, dtype=np.double).reshape(-1, 3)
+    directions = np.broadcast_to(np.asarray(directions, dtype=np.double).reshape(-1, 3), origins.shape)
+    directions = directions / np.sqrt(np.sum(directions * directions, axis=1))[:, np.newaxis]
+    rays, items, _ = index.query_rays(origins, directions, t_max=t_max)
+    hits = [[], [], [], [], []]
+    for item in np.unique(items):
+        figure = index.items[item]
+        if not isinstance(figure, Figure) or figure.compile() is None:
+            continue
+        if any(figure is operand for operand in getattr(figure.parent, 'operands', ())):
+            continue
+        selection = rays[items == item]
+        entry, exit, path_length = figure.intersect_rays(origins[selection], directions[selection], t_max=t_max,
+                                                         tolerance=tolerance, max_steps=max_steps)
+        hit = ~np.isnan(entry)
+        for collection, values in zip(hits, (selection, np.full(selection.size, item), entry, exit, path_length)):
+            collection.append(values[hit])
+    if not hits[0]:
+        return (np.zeros(0, dtype=np.int_), np.zeros(0, dtype=np.intc),
+                np.zeros(0), np.zeros(0), np.zeros(0))
+    rays, items, entry, exit, path_length = [np.concatenate(values) for values in hits]
+    order = np.lexsort((entry, rays))
+    return rays[order], items[order].astype(np.intc), entry[order], exit[order], path_length[order]
+
+
+def sdf_union(*distances):
+    """
+    Combines signed distances of several figures into the signed distance of their union.
+    :param distances: arrays of signed distances
+    :return: array of signed distances
+    """
+    return reduce(np.minimum, distances)
+
+
+def sdf_intersection(*distances):
+    """
+    Combines signed distances of several figures into the signed distance of their intersection.
+    :param distances: arrays of signed distances
+    :return: array of signed distances
+    """
+    return reduce(np.maximum, distances)
+
+
+def sdf_difference(distance, *distances):
+    """
+    Signed distance of the figure with all other figures subtracted.
+    :param distance: array of signed distances of the base figure
+    :param distances: arrays of signed distances of subtracted figures
+    :return: array of signed distances
+    """
+    return reduce(np.maximum, [-np.asarray(d) for d in distances], np.asarray(distance))
@@ -0,0 +1,121 @@
+cpdef enum PrimitiveKind:
+    SPHERICAL_WEDGE = 1
+    SPHERICAL_SEGMENT_WEDGE = 2
+    CYLINDRICAL_WEDGE = 3
+    CONICAL_WEDGE = 4
+    TORIC_WEDGE = 5
+    PARALLELEPIPED = 6
+
+cpdef enum CSGOperation:
+    CSG_UNION = -1
+    CSG_INTERSECTION = -2
+    CSG_DIFFERENCE = -3
+
+cdef enum:
+    CSG_STACK_SIZE = 64
+
+cdef bint in_angle_range(double angle, double angle_start, double angle_range) nogil
+cdef double ray_distance(double u, double v, double du, double dv) nogil
+cdef double angle_range_sdf(double u, double v, double angle_start, double angle_range) nogil
+cdef double polar_range_sdf(double rho, double z, double theta_min, double theta_max) nogil
+cdef double box_2d_sdf(double u, double v, double u_min, double u_max, double v_min, double v_max) nogil
+
+cdef bint spherical_wedge_point(double x, double y, double z,
+                                double r_inner, double r_outer, double phi,
+                                double theta_min, double theta_max) nogil
+cdef bint spherical_segment_wedge_point(double x, double y, double z,
+                                        double r_inner, double r_outer, double phi,
+                                        double h1, double h2) nogil
+cdef bint cylindrical_wedge_point(double x, double y, double z,
+                                  double r_inner, double r_outer, double phi,
+                                  double z_min, double z_max) nogil
+cdef bint conical_wedge_point(double x, double y, double z,
+                              double tan_theta, double phi, double z_min, double z_max,
+                              double z_offset, double z_cut) nogil
+cdef bint toric_wedge_point(double x, double y, double z,
+                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                            double theta_min, double theta_max) nogil
+cpdef double[:] parallelepiped_frame(double[:, :] vectors)
+cdef bint parallelepiped_point(double x, double y, double z, double* frame) nogil
+
+cpdef unsigned char[:] spherical_wedge_contains(double[:, :] xyz,
+                                                double r_inner, double r_outer, double phi,
+                                                double theta_min, double theta_max)
+cpdef unsigned char[:] spherical_segment_wedge_contains(double[:, :] xyz,
+                                                        double r_inner, double r_outer, double phi,
+                                                        double h1, double h2)
+cpdef unsigned char[:] cylindrical_wedge_contains(double[:, :] xyz,
+                                                  double r_inner, double r_outer, double phi,
+                                                  double z_min, double z_max)
+cpdef unsigned char[:] conical_wedge_contains(double[:, :] xyz,
+                                              double theta, double phi, double z_min, double z_max,
+                                              double z_offset, double r_min)
+cpdef unsigned char[:] toric_wedge_contains(double[:, :] xyz,
+                                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                                            double theta_min, double theta_max)
+cpdef unsigned char[:] parallelepiped_contains(double[:, :] xyz, double[:, :] vectors)
+
+cdef double spherical_wedge_sdf(double x, double y, double z,
+                                double r_inner, double r_outer, double phi,
+                                double theta_min, double theta_max) nogil
+cdef double spherical_segment_wedge_sdf(double x, double y, double z,
+                                        double r_inner, double r_outer, double phi,
+                                        double h1, double h2) nogil
+cdef double cylindrical_wedge_sdf(double x, double y, double z,
+                                  double r_inner, double r_outer, double phi,
+                                  double z_min, double z_max) nogil
+cdef double conical_wedge_sdf(double x, double y, double z,
+                              double sin_theta, double cos_theta, double phi, double z_min, double z_max,
+                              double z_offset, double z_cut) nogil
+cdef double toric_wedge_sdf(double x, double y, double z,
+                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                            double theta_min, double theta_max) nogil
+cdef double parallelepiped_sdf(double x, double y, double z, double* frame) nogil
+
+cpdef double[:] spherical_wedge_distance(double[:, :] xyz,
+                                         double r_inner, double r_outer, double phi,
+                                         double theta_min, double theta_max)
+cpdef double[:] spherical_segment_wedge_distance(double[:, :] xyz,
+                                                 double r_inner, double r_outer, double phi,
+                                                 double h1, double h2)
+cpdef double[:] cylindrical_wedge_distance(double[:, :] xyz,
+                                           double r_inner, double r_outer, double phi,
+                                           double z_min, double z_max)
+cpdef double[:] conical_wedge_distance(double[:, :] xyz,
+                                       double theta, double phi, double z_min, double z_max,
+                                       double z_offset, double r_min)
+cpdef double[:] toric_wedge_distance(double[:, :] xyz,
+                                     double r_torus, double r_tube_min, double r_tube_max, double phi,
+                                     double theta_min, double theta_max)
+cpdef double[:] parallelepiped_distance(double[:, :] xyz, double[:, :] vectors)
+
+cdef bint primitive_point(int kind, double* params, double x, double y, double z) nogil
+cdef double primitive_sdf(int kind, double* params, double x, double y, double z) nogil
+cdef double polar_cap_integral(double z, double r) nogil
+cdef double even_power_integral(double z, double z_cut, double shift, int power) nogil
+cdef void spherical_wedge_measures(double r_inner, double r_outer, double phi,
+                                   double theta_min, double theta_max, double* measures) nogil
+cdef void spherical_segment_wedge_measures(double r_inner, double r_outer, double phi,
+                                           double h1, double h2, double* measures) nogil
+cdef void cylindrical_wedge_measures(double r_inner, double r_outer, double phi,
+                                     double z_min, double z_max, double* measures) nogil
+cdef void conical_wedge_measures(double cos_theta, double tan_theta, double phi,
+                                 double z_min, double z_max, double z_offset, double z_cut, double* measures) nogil
+cdef void toric_wedge_measures(double r_torus, double r_min, double r_max, double phi,
+                               double theta_min, double theta_max, double* measures) nogil
+cdef void parallelepiped_measures(double* frame, double* measures) nogil
+cdef void primitive_measures(int kind, double* params, double* measures) nogil
+cpdef double[:, ::1] primitive_measures_batch(int kind, double[:, ::1] params)
+
+cdef bint csg_point(double x, double y, double z, int* codes, int* offsets, double* params, int n) nogil
+cdef double csg_sdf(double x, double y, double z, int* codes, int* offsets, double* params, int n) nogil
+
+cpdef unsigned char[:] csg_contains(double[:, :] xyz, int[:] codes, int[:] offsets, double[:] params)
+cpdef double[:] csg_distance(double[:, :] xyz, int[:] codes, int[:] offsets, double[:] params)
+
+cdef void csg_ray_march(double* origin, double* direction, double t_start, double t_stop,
+                        int* codes, int* offsets, double* params, int n,
+                        double tolerance, int max_steps, double* result) nogil
+cpdef double[:, :] csg_ray_cast(double[:, ::1] origins, double[:, ::1] directions, double[:] t_start, double[:] t_stop,
+                                int[:] codes, int[:] offsets, double[:] params,
+                                double tolerance, int max_steps)
@@ -0,0 +1,985 @@
+import numpy as np
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from libc.math cimport fmod, fabs, fmin, fmax, sqrt, sin, cos, tan, asin, atan2, M_PI, INFINITY, NAN, isnan
+
+
+cdef bint in_angle_range(double angle, double angle_start, double angle_range) nogil:
+    """
+    Checks if angle lies in the counterclockwise sector starting at angle_start and spanning angle_range.
+    :param angle: angle to check
+    :param angle_start: sector start angle
+    :param angle_range: sector span, sector covers full circle if angle_range >= 2*pi
+    :return: True if angle is inside the sector
+    """
+    cdef:
+        double delta
+    if angle_range >= 2 * M_PI:
+        return True
+    delta = fmod(angle - angle_start, 2 * M_PI)
+    if delta < 0:
+        delta += 2 * M_PI
+    return delta <= angle_range
+
+
+cdef double ray_distance(double u, double v, double du, double dv) nogil:
+    """
+    Distance from 2D point (u, v) to the ray starting at the origin with unit direction (du, dv).
+    """
+    cdef:
+        double t = u * du + v * dv
+    if t < 0:
+        t = 0.0
+    return sqrt((u - t * du) * (u - t * du) + (v - t * dv) * (v - t * dv))
+
+
+cdef double angle_range_sdf(double u, double v, double angle_start, double angle_range) nogil:
+    """
+    Exact signed distance from 2D point (u, v) to the sector with the apex at the origin.
+    :param u: point first coordinate
+    :param v: point second coordinate
+    :param angle_start: sector start angle
+    :param angle_range: sector span, full circle has no boundary and gives -inf
+    :return: signed distance, negative inside the sector
+    """
+    cdef:
+        double d
+    if angle_range >= 2 * M_PI:
+        return -INFINITY
+    d = fmin(ray_distance(u, v, cos(angle_start), sin(angle_start)),
+             ray_distance(u, v, cos(angle_start + angle_range), sin(angle_start + angle_range)))
+    if in_angle_range(atan2(v, u), angle_start, angle_range):
+        return -d
+    return d
+
+
+cdef double polar_range_sdf(double rho, double z, double theta_min, double theta_max) nogil:
+    """
+    Exact signed distance to the region between two coaxial cones theta_min <= theta <= theta_max.
+    Calculated in the meridional half-plane (rho, z), cones with theta = 0 or theta = pi degenerate to the axis.
+    """
+    cdef:
+        double d = INFINITY
+        double theta = atan2(rho, z)
+    if theta_min > 0:
+        d = ray_distance(rho, z, sin(theta_min), cos(theta_min))
+    if theta_max < M_PI:
+        d = fmin(d, ray_distance(rho, z, sin(theta_max), cos(theta_max)))
+    if d == INFINITY:
+        return -INFINITY
+    if theta_min <= theta <= theta_max:
+        return -d
+    return d
+
+
+cdef double box_2d_sdf(double u, double v, double u_min, double u_max, double v_min, double v_max) nogil:
+    """
+    Exact signed distance from 2D point (u, v) to the rectangle [u_min, u_max] x [v_min, v_max].
+    """
+    cdef:
+        double qu = fabs(u - (u_max + u_min) / 2) - (u_max - u_min) / 2
+        double qv = fabs(v - (v_max + v_min) / 2) - (v_max - v_min) / 2
+        double outside_u = fmax(qu, 0.0), outside_v = fmax(qv, 0.0)
+    return sqrt(outside_u * outside_u + outside_v * outside_v) + fmin(fmax(qu, qv), 0.0)
+
+
+cdef bint spherical_wedge_point(double x, double y, double z,
+                                double r_inner, double r_outer, double phi,
+                                double theta_min, double theta_max) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+        double r = sqrt(rho * rho + z * z)
+        double theta = atan2(rho, z)
+    if r < r_inner or r > r_outer:
+        return False
+    if r == 0.0:
+        return True
+    if theta < theta_min or theta > theta_max:
+        return False
+    return in_angle_range(atan2(y, x), 0.0, phi)
+
+
+cdef bint spherical_segment_wedge_point(double x, double y, double z,
+                                        double r_inner, double r_outer, double phi,
+                                        double h1, double h2) nogil:
+    cdef:
+        double r = sqrt(x * x + y * y + z * z)
+    if r < r_inner or r > r_outer or z < h1 or z > h2:
+        return False
+    return in_angle_range(atan2(y, x), 0.0, phi)
+
+
+cdef bint cylindrical_wedge_point(double x, double y, double z,
+                                  double r_inner, double r_outer, double phi,
+                                  double z_min, double z_max) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+    if rho < r_inner or rho > r_outer or z < z_min or z > z_max:
+        return False
+    return in_angle_range(atan2(y, x), 0.0, phi)
+
+
+cdef bint conical_wedge_point(double x, double y, double z,
+                              double tan_theta, double phi, double z_min, double z_max,
+                              double z_offset, double z_cut) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+        double h
+    if z < z_min or z > z_max:
+        return False
+    h = z_cut + (z if z >= 0 else -z)
+    if rho > h * tan_theta:
+        return False
+    if h > z_offset and rho < (h - z_offset) * tan_theta:
+        return False
+    return in_angle_range(atan2(y, x), 0.0, phi)
+
+
+cdef bint toric_wedge_point(double x, double y, double z,
+                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                            double theta_min, double theta_max) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y) - r_torus
+        double r = sqrt(rho * rho + z * z)
+    if r < r_tube_min or r > r_tube_max:
+        return False
+    if r > 0.0 and not in_angle_range(atan2(z, rho), theta_min, theta_max - theta_min):
+        return False
+    return in_angle_range(atan2(y, x), 0.0, phi)
+
+
+cpdef double[:] parallelepiped_frame(double[:, :] vectors):
+    """
+    Face frame of parallelepiped spanned by three vectors from the origin.
+    :param vectors: 3x3 array of parallelepiped edge vectors (rows)
+    :return: array of 13 values: unit normals of three face pairs (row-major 3x3),
+        distances between opposite faces, and 1.0 if the faces are mutually orthogonal (0.0 otherwise)
+    """
+    cdef:
+        double[:] frame = np.empty(13, dtype=np.double)
+    normals = np.linalg.inv(np.asarray(vectors).T)
+    heights = 1.0 / np.linalg.norm(normals, axis=1)
+    normals *= heights[:, np.newaxis]
+    np.asarray(frame)[:9] = normals.ravel()
+    np.asarray(frame)[9:12] = heights
+    frame[12] = np.allclose(np.dot(normals, normals.T), np.eye(3), rtol=0.0, atol=1.0e-12)
+    return frame
+
+
+cdef bint parallelepiped_point(double x, double y, double z, double* frame) nogil:
+    cdef:
+        int i
+        double d
+    for i in range(3):
+        d = frame[3 * i] * x + frame[3 * i + 1] * y + frame[3 * i + 2] * z
+        if d < 0.0 or d > frame[9 + i]:
+            return False
+    return True
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] spherical_wedge_contains(double[:, :] xyz,
+                                                double r_inner, double r_outer, double phi,
+                                                double theta_min, double theta_max):
+    """
+    Point membership test for spherical wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param theta_min: minimal polar angle
+    :param theta_max: maximal polar angle
+    :return: mask array, 1 for points inside the wedge, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    with nogil:
+        for i in prange(n):
+            result[i] = spherical_wedge_point(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                              r_inner, r_outer, phi, theta_min, theta_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] spherical_segment_wedge_contains(double[:, :] xyz,
+                                                        double r_inner, double r_outer, double phi,
+                                                        double h1, double h2):
+    """
+    Point membership test for spherical segment wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param h1: lower cutting plane z coordinate
+    :param h2: upper cutting plane z coordinate
+    :return: mask array, 1 for points inside the wedge, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    with nogil:
+        for i in prange(n):
+            result[i] = spherical_segment_wedge_point(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                                      r_inner, r_outer, phi, h1, h2)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] cylindrical_wedge_contains(double[:, :] xyz,
+                                                  double r_inner, double r_outer, double phi,
+                                                  double z_min, double z_max):
+    """
+    Point membership test for cylindrical wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param z_min: bottom base z coordinate
+    :param z_max: top base z coordinate
+    :return: mask array, 1 for points inside the wedge, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    with nogil:
+        for i in prange(n):
+            result[i] = cylindrical_wedge_point(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                                r_inner, r_outer, phi, z_min, z_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] conical_wedge_contains(double[:, :] xyz,
+                                              double theta, double phi, double z_min, double z_max,
+                                              double z_offset, double r_min):
+    """
+    Point membership test for (double) conical wedge in its local coordinate system.
+    The cone radius at height z is r_min + |z| * tan(theta),
+    coaxial inner cone of the same angle is shifted by z_offset along the axis.
+    :param xyz: array of points shaped Nx3
+    :param theta: cone half angle
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param z_min: bottom base z coordinate
+    :param z_max: top base z coordinate
+    :param z_offset: axial offset of the inner cone
+    :param r_min: cone radius at z = 0
+    :return: mask array, 1 for points inside the wedge, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double tan_theta = tan(theta), z_cut = 0.0
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    if tan_theta > 0:
+        z_cut = r_min / tan_theta
+    with nogil:
+        for i in prange(n):
+            result[i] = conical_wedge_point(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                            tan_theta, phi, z_min, z_max, z_offset, z_cut)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] toric_wedge_contains(double[:, :] xyz,
+                                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                                            double theta_min, double theta_max):
+    """
+    Point membership test for toric wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param r_torus: radius of the torus axis circle
+    :param r_tube_min: inner tube radius
+    :param r_tube_max: outer tube radius
+    :param phi: toroidal wedge angle, wedge starts at x axis
+    :param theta_min: minimal poloidal angle measured from the equatorial plane
+    :param theta_max: maximal poloidal angle
+    :return: mask array, 1 for points inside the wedge, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    with nogil:
+        for i in prange(n):
+            result[i] = toric_wedge_point(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                          r_torus, r_tube_min, r_tube_max, phi, theta_min, theta_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] parallelepiped_contains(double[:, :] xyz, double[:, :] vectors):
+    """
+    Point membership test for parallelepiped spanned by three vectors from the origin.
+    :param xyz: array of points shaped Nx3
+    :param vectors: 3x3 array of parallelepiped edge vectors (rows)
+    :return: mask array, 1 for points inside the parallelepiped, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] frame = parallelepiped_frame(vectors)
+        unsigned char[:] result = np.empty(n, dtype=np.uint8)
+    with nogil:
+        for i in prange(n):
+            result[i] = parallelepiped_point(xyz[i, 0], xyz[i, 1], xyz[i, 2], &frame[0])
+    return result
+
+
+cdef double spherical_wedge_sdf(double x, double y, double z,
+                                double r_inner, double r_outer, double phi,
+                                double theta_min, double theta_max) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+        double r = sqrt(rho * rho + z * z)
+        double d = r - r_outer
+    if r_inner > 0:
+        d = fmax(d, r_inner - r)
+    d = fmax(d, polar_range_sdf(rho, z, theta_min, theta_max))
+    return fmax(d, angle_range_sdf(x, y, 0.0, phi))
+
+
+cdef double spherical_segment_wedge_sdf(double x, double y, double z,
+                                        double r_inner, double r_outer, double phi,
+                                        double h1, double h2) nogil:
+    cdef:
+        double r = sqrt(x * x + y * y + z * z)
+        double d = r - r_outer
+    if r_inner > 0:
+        d = fmax(d, r_inner - r)
+    d = fmax(d, fmax(h1 - z, z - h2))
+    return fmax(d, angle_range_sdf(x, y, 0.0, phi))
+
+
+cdef double cylindrical_wedge_sdf(double x, double y, double z,
+                                  double r_inner, double r_outer, double phi,
+                                  double z_min, double z_max) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+        double rho_min = r_inner
+    if r_inner <= 0:
+        # axis is not a boundary of the solid cylinder
+        rho_min = -r_outer
+    return fmax(box_2d_sdf(rho, z, rho_min, r_outer, z_min, z_max), angle_range_sdf(x, y, 0.0, phi))
+
+
+cdef double conical_wedge_sdf(double x, double y, double z,
+                              double sin_theta, double cos_theta, double phi, double z_min, double z_max,
+                              double z_offset, double z_cut) nogil:
+    cdef:
+        double rho = sqrt(x * x + y * y)
+        double h = z_cut + fabs(z)
+        double d = rho * cos_theta - h * sin_theta
+    d = fmax(d, (h - z_offset) * sin_theta - rho * cos_theta)
+    d = fmax(d, fmax(z_min - z, z - z_max))
+    return fmax(d, angle_range_sdf(x, y, 0.0, phi))
+
+
+cdef double toric_wedge_sdf(double x, double y, double z,
+                            double r_torus, double r_tube_min, double r_tube_max, double phi,
+                            double theta_min, double theta_max) nogil:
+    cdef:
+        double u = sqrt(x * x + y * y) - r_torus
+        double r = sqrt(u * u + z * z)
+        double d = r - r_tube_max
+    if r_tube_min > 0:
+        d = fmax(d, r_tube_min - r)
+    d = fmax(d, angle_range_sdf(u, z, theta_min, theta_max - theta_min))
+    return fmax(d, angle_range_sdf(x, y, 0.0, phi))
+
+
+cdef double parallelepiped_sdf(double x, double y, double z, double* frame) nogil:
+    cdef:
+        int i
+        double q, q_max = -INFINITY, outside = 0.0
+    for i in range(3):
+        q = fabs(frame[3 * i] * x + frame[3 * i + 1] * y + frame[3 * i + 2] * z - frame[9 + i] / 2) - frame[9 + i] / 2
+        q_max = fmax(q_max, q)
+        if q > 0:
+            outside += q * q
+    if frame[12] > 0:
+        # faces are orthogonal, the distance is exact
+        return sqrt(outside) + fmin(q_max, 0.0)
+    return q_max
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] spherical_wedge_distance(double[:, :] xyz,
+                                         double r_inner, double r_outer, double phi,
+                                         double theta_min, double theta_max):
+    """
+    Signed distance to spherical wedge in its local coordinate system.
+    Distance is exact inside the wedge and a lower bound outside of it.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param theta_min: minimal polar angle
+    :param theta_max: maximal polar angle
+    :return: array of signed distances, negative inside the wedge
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] result = np.empty(n, dtype=np.double)
+    with nogil:
+        for i in prange(n):
+            result[i] = spherical_wedge_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                            r_inner, r_outer, phi, theta_min, theta_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] spherical_segment_wedge_distance(double[:, :] xyz,
+                                                 double r_inner, double r_outer, double phi,
+                                                 double h1, double h2):
+    """
+    Conservative signed distance to spherical segment wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param h1: lower cutting plane z coordinate
+    :param h2: upper cutting plane z coordinate
+    :return: array of signed distances, negative inside the wedge
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] result = np.empty(n, dtype=np.double)
+    with nogil:
+        for i in prange(n):
+            result[i] = spherical_segment_wedge_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                                    r_inner, r_outer, phi, h1, h2)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] cylindrical_wedge_distance(double[:, :] xyz,
+                                           double r_inner, double r_outer, double phi,
+                                           double z_min, double z_max):
+    """
+    Signed distance to cylindrical wedge in its local coordinate system.
+    Distance is exact for full cylinders and a lower bound outside of the wedges.
+    :param xyz: array of points shaped Nx3
+    :param r_inner: inner radius
+    :param r_outer: outer radius
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param z_min: bottom base z coordinate
+    :param z_max: top base z coordinate
+    :return: array of signed distances, negative inside the wedge
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] result = np.empty(n, dtype=np.double)
+    with nogil:
+        for i in prange(n):
+            result[i] = cylindrical_wedge_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                              r_inner, r_outer, phi, z_min, z_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] conical_wedge_distance(double[:, :] xyz,
+                                       double theta, double phi, double z_min, double z_max,
+                                       double z_offset, double r_min):
+    """
+    Conservative signed distance to (double) conical wedge in its local coordinate system.
+    :param xyz: array of points shaped Nx3
+    :param theta: cone half angle
+    :param phi: azimuthal wedge angle, wedge starts at x axis
+    :param z_min: bottom base z coordinate
+    :param z_max: top base z coordinate
+    :param z_offset: axial offset of the inner cone
+    :param r_min: cone radius at z = 0
+    :return: array of signed distances, negative inside the wedge
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double sin_theta = sin(theta), cos_theta = cos(theta), z_cut = 0.0
+        double[:] result = np.empty(n, dtype=np.double)
+    if sin_theta > 0:
+        z_cut = r_min * cos_theta / sin_theta
+    with nogil:
+        for i in prange(n):
+            result[i] = conical_wedge_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                          sin_theta, cos_theta, phi, z_min, z_max, z_offset, z_cut)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] toric_wedge_distance(double[:, :] xyz,
+                                     double r_torus, double r_tube_min, double r_tube_max, double phi,
+                                     double theta_min, double theta_max):
+    """
+    Signed distance to toric wedge in its local coordinate system.
+    Distance is exact for full tori and a lower bound outside of the wedges.
+    :param xyz: array of points shaped Nx3
+    :param r_torus: radius of the torus axis circle
+    :param r_tube_min: inner tube radius
+    :param r_tube_max: outer tube radius
+    :param phi: toroidal wedge angle, wedge starts at x axis
+    :param theta_min: minimal poloidal angle measured from the equatorial plane
+    :param theta_max: maximal poloidal angle
+    :return: array of signed distances, negative inside the wedge
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] result = np.empty(n, dtype=np.double)
+    with nogil:
+        for i in prange(n):
+            result[i] = toric_wedge_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2],
+                                        r_torus, r_tube_min, r_tube_max, phi, theta_min, theta_max)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] parallelepiped_distance(double[:, :] xyz, double[:, :] vectors):
+    """
+    Signed distance to parallelepiped spanned by three vectors from the origin.
+    Distance is exact for cuboids and a lower bound outside of oblique parallelepipeds.
+    :param xyz: array of points shaped Nx3
+    :param vectors: 3x3 array of parallelepiped edge vectors (rows)
+    :return: array of signed distances, negative inside the parallelepiped
+    """
+    cdef:
+        int i, n = xyz.shape[0]
+        double[:] frame = parallelepiped_frame(vectors)
+        double[:] result = np.empty(n, dtype=np.double)
+    with nogil:
+        for i in prange(n):
+            result[i] = parallelepiped_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2], &frame[0])
+    return result
+
+
+cdef bint primitive_point(int kind, double* params, double x, double y, double z) nogil:
+    """
+    Point membership test for primitive figure of given kind.
+    Parameters layout for each kind is documented in the _primitive method of the corresponding Figure.
+    """
+    if kind == SPHERICAL_WEDGE:
+        return spherical_wedge_point(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == SPHERICAL_SEGMENT_WEDGE:
+        return spherical_segment_wedge_point(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == CYLINDRICAL_WEDGE:
+        return cylindrical_wedge_point(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == CONICAL_WEDGE:
+        return conical_wedge_point(x, y, z, params[2], params[3], params[4], params[5], params[6], params[7])
+    elif kind == TORIC_WEDGE:
+        return toric_wedge_point(x, y, z, params[0], params[1], params[2], params[3], params[4], params[5])
+    elif kind == PARALLELEPIPED:
+        return parallelepiped_point(x, y, z, params)
+    return False
+
+
+cdef double primitive_sdf(int kind, double* params, double x, double y, double z) nogil:
+    """
+    Signed distance to primitive figure of given kind.
+    """
+    if kind == SPHERICAL_WEDGE:
+        return spherical_wedge_sdf(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == SPHERICAL_SEGMENT_WEDGE:
+        return spherical_segment_wedge_sdf(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == CYLINDRICAL_WEDGE:
+        return cylindrical_wedge_sdf(x, y, z, params[0], params[1], params[2], params[3], params[4])
+    elif kind == CONICAL_WEDGE:
+        return conical_wedge_sdf(x, y, z, params[0], params[1], params[3], params[4], params[5], params[6], params[7])
+    elif kind == TORIC_WEDGE:
+        return toric_wedge_sdf(x, y, z, params[0], params[1], params[2], params[3], params[4], params[5])
+    elif kind == PARALLELEPIPED:
+        return parallelepiped_sdf(x, y, z, params)
+    return INFINITY
+
+
+cdef double polar_cap_integral(double z, double r) nogil:
+    """
+    Integral of sqrt(r^2 - s^2) over s from 0 to z clipped to [-r, r], i.e. half of the meridional section area.
+    """
+    if r <= 0:
+        return 0.0
+    z = fmin(fmax(z, -r), r)
+    return (z * sqrt(fmax(r * r - z * z, 0.0)) + r * r * asin(z / r)) / 2
+
+
+cdef double even_power_integral(double z, double z_cut, double shift, int power) nogil:
+    """
+    Integral of max(|s| + z_cut - shift, 0)^(power - 1) over s from 0 to z.
+    """
+    cdef:
+        double h = fmax(fabs(z) + z_cut - shift, 0.0), h0 = fmax(z_cut - shift, 0.0)
+        double result = (h ** power - h0 ** power) / power
+    return -result if z < 0 else result
+
+
+cdef void spherical_wedge_measures(double r_inner, double r_outer, double phi,
+                                   double theta_min, double theta_max, double* measures) nogil:
+    cdef:
+        double cos_range = cos(theta_min) - cos(theta_max), r2_range = r_outer * r_outer - r_inner * r_inner
+        double volume = phi * (r_outer ** 3 - r_inner ** 3) * cos_range / 3
+        double inner_sphere = phi * r_inner * r_inner * cos_range
+        double area = phi * r_outer * r_outer * cos_range + inner_sphere
+    if theta_min > 0:
+        area += phi * sin(theta_min) * r2_range / 2
+    if theta_max < M_PI:
+        area += phi * sin(theta_max) * r2_range / 2
+    if phi < 2 * M_PI:
+        area += (theta_max - theta_min) * r2_range
+    if phi >= 2 * M_PI and theta_max - theta_min >= M_PI:
+        measures[0] = 4 * M_PI * r_inner ** 3 / 3
+        measures[2] = inner_sphere
+    else:
+        measures[0] = 0.0
+        measures[2] = 0.0
+    measures[1] = volume + measures[0]
+    measures[3] = area - measures[2]
+
+
+cdef void spherical_segment_wedge_measures(double r_inner, double r_outer, double phi,
+                                           double h1, double h2, double* measures) nogil:
+    cdef:
+        int i
+        double z, z_inner, volume = 0.0, area = 0.0, inner_zone = 0.0, width = 0.0
+        double z1 = fmax(h1, -r_outer), z2 = fmin(h2, r_outer)
+        double zi1 = fmax(h1, -r_inner), zi2 = fmin(h2, r_inner)
+    measures[0] = 0.0
+    measures[2] = 0.0
+    if z2 > z1:
+        for i in range(2):
+            z = z2 if i else z1
+            z_inner = fmin(fmax(z, -r_inner), r_inner)
+            volume = -volume + r_outer * r_outer * z - z ** 3 / 3 - (r_inner * r_inner * z_inner - z_inner ** 3 / 3)
+            width = -width + polar_cap_integral(z, r_outer) - polar_cap_integral(z, r_inner)
+            # caps
+            area += phi / 2 * (r_outer * r_outer - z * z - fmax(r_inner * r_inner - z * z, 0.0))
+        volume *= phi / 2
+        area += r_outer * phi * (z2 - z1)
+        if r_inner > 0 and zi2 > zi1:
+            inner_zone = r_inner * phi * (zi2 - zi1)
+            area += inner_zone
+        if phi < 2 * M_PI:
+            area += 2 * width
+        if phi >= 2 * M_PI and h1 <= -r_inner and h2 >= r_inner:
+            measures[0] = 4 * M_PI * r_inner ** 3 / 3
+            measures[2] = inner_zone
+    measures[1] = volume + measures[0]
+    measures[3] = area - measures[2]
+
+
+cdef void cylindrical_wedge_measures(double r_inner, double r_outer, double phi,
+                                     double z_min, double z_max, double* measures) nogil:
+    cdef:
+        double h = z_max - z_min
+    measures[0] = 0.0
+    measures[1] = phi / 2 * h * (r_outer * r_outer - r_inner * r_inner)
+    measures[2] = 0.0
+    measures[3] = phi * h * (r_outer + r_inner) + phi * (r_outer * r_outer - r_inner * r_inner)
+    if phi < 2 * M_PI:
+        measures[3] += 2 * h * (r_outer - r_inner)
+
+
+cdef void conical_wedge_measures(double cos_theta, double tan_theta, double phi,
+                                 double z_min, double z_max, double z_offset, double z_cut, double* measures) nogil:
+    cdef:
+        int i
+        double z, h, volume = 0.0, lateral = 0.0, width = 0.0, area = 0.0
+    for i in range(2):
+        z = z_max if i else z_min
+        volume = -volume + even_power_integral(z, z_cut, 0.0, 3) - even_power_integral(z, z_cut, z_offset, 3)
+        lateral = -lateral + even_power_integral(z, z_cut, 0.0, 2) + even_power_integral(z, z_cut, z_offset, 2)
+        width = -width + even_power_integral(z, z_cut, 0.0, 2) - even_power_integral(z, z_cut, z_offset, 2)
+        # bases
+        h = fabs(z) + z_cut
+        area += phi / 2 * tan_theta * tan_theta * (h * h - fmax(h - z_offset, 0.0) ** 2)
+    if tan_theta > 0:
+        area += phi * tan_theta / cos_theta * lateral
+    if phi < 2 * M_PI:
+        area += 2 * tan_theta * width
+    measures[0] = 0.0
+    measures[1] = phi / 2 * tan_theta * tan_theta * volume
+    measures[2] = 0.0
+    measures[3] = area
+
+
+cdef void toric_wedge_measures(double r_torus, double r_min, double r_max, double phi,
+                               double theta_min, double theta_max, double* measures) nogil:
+    cdef:
+        double delta_theta = theta_max - theta_min, delta_sin = sin(theta_max) - sin(theta_min)
+        double inner_tube = phi * r_min * (r_torus * delta_theta + r_min * delta_sin)
+        double area = phi * r_max * (r_torus * delta_theta + r_max * delta_sin) + inner_tube
+        double volume = phi * (r_torus * delta_theta * (r_max * r_max - r_min * r_min) / 2
+                               + delta_sin * (r_max ** 3 - r_min ** 3) / 3)
+    if delta_theta < 2 * M_PI:
+        area += phi * (2 * r_torus * (r_max - r_min)
+                       + (cos(theta_min) + cos(theta_max)) * (r_max * r_max - r_min * r_min) / 2)
+    if phi < 2 * M_PI:
+        area += delta_theta * (r_max * r_max - r_min * r_min)
+    if phi >= 2 * M_PI and delta_theta >= 2 * M_PI:
+        measures[0] = 2 * M_PI * M_PI * r_torus * r_min * r_min
+        measures[2] = inner_tube
+    else:
+        measures[0] = 0.0
+        measures[2] = 0.0
+    measures[1] = volume + measures[0]
+    measures[3] = area - measures[2]
+
+
+cdef void parallelepiped_measures(double* frame, double* measures) nogil:
+    cdef:
+        double det = (frame[0] * (frame[4] * frame[8] - frame[5] * frame[7])
+                      - frame[1] * (frame[3] * frame[8] - frame[5] * frame[6])
+                      + frame[2] * (frame[3] * frame[7] - frame[4] * frame[6]))
+        double volume = frame[9] * frame[10] * frame[11] / fabs(det)
+    measures[0] = 0.0
+    measures[1] = volume
+    measures[2] = 0.0
+    measures[3] = 2 * volume * (1 / frame[9] + 1 / frame[10] + 1 / frame[11])
+
+
+cdef void primitive_measures(int kind, double* params, double* measures) nogil:
+    """
+    Exact volume and surface area of primitive figure of given kind.
+    :param measures: inner (cavity) volume, external volume, inner (cavity) surface area and external surface area
+    """
+    if kind == SPHERICAL_WEDGE:
+        spherical_wedge_measures(params[0], params[1], params[2], params[3], params[4], measures)
+    elif kind == SPHERICAL_SEGMENT_WEDGE:
+        spherical_segment_wedge_measures(params[0], params[1], params[2], params[3], params[4], measures)
+    elif kind == CYLINDRICAL_WEDGE:
+        cylindrical_wedge_measures(params[0], params[1], params[2], params[3], params[4], measures)
+    elif kind == CONICAL_WEDGE:
+        conical_wedge_measures(params[1], params[2], params[3], params[4], params[5], params[6], params[7], measures)
+    elif kind == TORIC_WEDGE:
+        toric_wedge_measures(params[0], params[1], params[2], params[3], params[4], params[5], measures)
+    elif kind == PARALLELEPIPED:
+        parallelepiped_measures(params, measures)
+    else:
+        measures[0] = 0.0
+        measures[1] = 0.0
+        measures[2] = 0.0
+        measures[3] = 0.0
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:, ::1] primitive_measures_batch(int kind, double[:, ::1] params):
+    """
+    Exact volumes and surface areas of many primitive figures of the same kind.
+    :param kind: primitive kind
+    :param params: array of primitive parameters shaped NxK, one row per figure
+    :return: array shaped Nx4 of inner and external volumes and inner and external surface areas
+    """
+    cdef:
+        int i, n = params.shape[0]
+        double[:, ::1] result = np.zeros((n, 4), dtype=np.double)
+    if n == 0:
+        return result
+    with nogil:
+        for i in prange(n):
+            primitive_measures(kind, &params[i, 0], &result[i, 0])
+    return result
+
+
+cdef bint csg_point(double x, double y, double z, int* codes, int* offsets, double* params, int n) nogil:
+    """
+    Evaluates membership of a point in CSG expression compiled to postfix program.
+    Primitive instructions have positive codes, their parameters block starts with
+    row-major 3x3 matrix and translation vector mapping the point to the primitive local coordinates.
+    Operation instructions have negative codes and combine two topmost stack values.
+    """
+    cdef:
+        bint stack[CSG_STACK_SIZE]
+        int i, top = 0
+        double* p
+    for i in range(n):
+        if codes[i] > 0:
+            p = params + offsets[i]
+            stack[top] = primitive_point(codes[i], p + 12,
+                                         p[0] * x + p[1] * y + p[2] * z + p[9],
+                                         p[3] * x + p[4] * y + p[5] * z + p[10],
+                                         p[6] * x + p[7] * y + p[8] * z + p[11])
+            top += 1
+        else:
+            top -= 1
+            if codes[i] == CSG_UNION:
+                stack[top - 1] = stack[top - 1] or stack[top]
+            elif codes[i] == CSG_INTERSECTION:
+                stack[top - 1] = stack[top - 1] and stack[top]
+            else:
+                stack[top - 1] = stack[top - 1] and not stack[top]
+    return stack[0]
+
+
+cdef double csg_sdf(double x, double y, double z, int* codes, int* offsets, double* params, int n) nogil:
+    """
+    Evaluates signed distance of a point to CSG expression compiled to postfix program.
+    """
+    cdef:
+        double stack[CSG_STACK_SIZE]
+        int i, top = 0
+        double* p
+    for i in range(n):
+        if codes[i] > 0:
+            p = params + offsets[i]
+            stack[top] = primitive_sdf(codes[i], p + 12,
+                                       p[0] * x + p[1] * y + p[2] * z + p[9],
+                                       p[3] * x + p[4] * y + p[5] * z + p[10],
+                                       p[6] * x + p[7] * y + p[8] * z + p[11])
+            top += 1
+        else:
+            top -= 1
+            if codes[i] == CSG_UNION:
+                stack[top - 1] = fmin(stack[top - 1], stack[top])
+            elif codes[i] == CSG_INTERSECTION:
+                stack[top - 1] = fmax(stack[top - 1], stack[top])
+            else:
+                stack[top - 1] = fmax(stack[top - 1], -stack[top])
+    return stack[0]
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef unsigned char[:] csg_contains(double[:, :] xyz, int[:] codes, int[:] offsets, double[:] params):
+    """
+    Point membership test for CSG expression compiled to postfix program.
+    :param xyz: array of points shaped Nx3
+    :param codes: program instructions, primitive kinds or CSG operations
+    :param offsets: offsets of primitive instructions parameters blocks
+    :param params: parameters of all primitives
+    :return: mask array, 1 for points inside the figure, 0 otherwise
+    """
+    cdef:
+        int i, n = xyz.shape[0], n_codes = codes.shape[0]
+        unsigned char[:] result = np.zeros(n, dtype=np.uint8)
+    if n_codes == 0 or n == 0:
+        return result
+    with nogil:
+        for i in prange(n):
+            result[i] = csg_point(xyz[i, 0], xyz[i, 1], xyz[i, 2], &codes[0], &offsets[0], &params[0], n_codes)
+    return result
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:] csg_distance(double[:, :] xyz, int[:] codes, int[:] offsets, double[:] params):
+    """
+    Conservative signed distance to CSG expression compiled to postfix program.
+    :param xyz: array of points shaped Nx3
+    :param codes: program instructions, primitive kinds or CSG operations
+    :param offsets: offsets of primitive instructions parameters blocks
+    :param params: parameters of all primitives
+    :return: array of signed distances, negative inside the figure
+    """
+    cdef:
+        int i, n = xyz.shape[0], n_codes = codes.shape[0]
+        double[:] result = np.full(n, np.inf, dtype=np.double)
+    if n_codes == 0 or n == 0:
+        return result
+    with nogil:
+        for i in prange(n):
+            result[i] = csg_sdf(xyz[i, 0], xyz[i, 1], xyz[i, 2], &codes[0], &offsets[0], &params[0], n_codes)
+    return result
+
+
+cdef void csg_ray_march(double* origin, double* direction, double t_start, double t_stop,
+                        int* codes, int* offsets, double* params, int n,
+                        double tolerance, int max_steps, double* result) nogil:
+    """
+    Finds inside intervals of the ray segment by sphere tracing of the conservative signed distance:
+    the surface is never closer than |sdf|, so the ray may advance by |sdf| (but at least by tolerance)
+    both outside and inside the figure. Each change of the sign is bracketed by bisection
+    and located by linear interpolation of the distance.
+    :param result: entry and exit ray parameters and total length of inside intervals (NaN entry and exit if missed)
+    """
+    cdef:
+        int steps = 0
+        bint inside
+        double t = t_start, t_next, t_in = t_start, t_lo, t_hi, t_mid, d, d_next, d_lo, d_hi, d_mid
+    result[0] = NAN
+    result[1] = NAN
+    result[2] = 0.0
+    if not t_stop > t_start:
+        return
+    d = csg_sdf(origin[0] + t * direction[0], origin[1] + t * direction[1], origin[2] + t * direction[2],
+                codes, offsets, params, n)
+    inside = d < 0
+    if inside:
+        result[0] = t_start
+    while t < t_stop and steps < max_steps:
+        steps += 1
+        t_next = fmin(t + fmax(fabs(d), tolerance), t_stop)
+        d_next = csg_sdf(origin[0] + t_next * direction[0], origin[1] + t_next * direction[1],
+                         origin[2] + t_next * direction[2], codes, offsets, params, n)
+        if (d_next < 0) != inside:
+            t_lo = t
+            t_hi = t_next
+            d_lo = d
+            d_hi = d_next
+            while t_hi - t_lo > tolerance:
+                t_mid = (t_lo + t_hi) / 2
+                d_mid = csg_sdf(origin[0] + t_mid * direction[0], origin[1] + t_mid * direction[1],
+                                origin[2] + t_mid * direction[2], codes, offsets, params, n)
+                if (d_mid < 0) == inside:
+                    t_lo = t_mid
+                    d_lo = d_mid
+                else:
+                    t_hi = t_mid
+                    d_hi = d_mid
+            # the distance is nearly linear across the surface
+            if d_lo != d_hi:
+                t_mid = t_lo + (t_hi - t_lo) * fmin(fmax(d_lo / (d_lo - d_hi), 0.0), 1.0)
+            else:
+                t_mid = (t_lo + t_hi) / 2
+            if inside:
+                result[1] = t_mid
+                result[2] += t_mid - t_in
+            else:
+                t_in = t_mid
+                if isnan(result[0]):
+                    result[0] = t_mid
+            inside = not inside
+        t = t_next
+        d = d_next
+    if inside:
+        result[1] = t
+        result[2] += t - t_in
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef double[:, :] csg_ray_cast(double[:, ::1] origins, double[:, ::1] directions, double[:] t_start, double[:] t_stop,
+                                int[:] codes, int[:] offsets, double[:] params,
+                                double tolerance, int max_steps):
+    """
+    Casts rays through CSG expression compiled to postfix program.
+    Rays are given in the coordinate system of the program and parametrized by distance along unit directions.
+    :param origins: array of ray origins shaped Nx3
+    :param directions: array of unit ray directions shaped Nx3
+    :param t_start: array of ray parameters where marching starts, e.g. bounding box entry
+    :param t_stop: array of ray parameters where marching stops, e.g. bounding box exit
+    :param codes: program instructions, primitive kinds or CSG operations
+    :param offsets: offsets of primitive instructions parameters blocks
+    :param params: parameters of all primitives
+    :param tolerance: accuracy of the surface crossings, thinner features may be missed
+    :param max_steps: maximal number of marching steps per ray
+    :return: array shaped Nx3 of entry and exit ray parameters and path lengths inside the figure
+    """
+    cdef:
+        int i, n = origins.shape[0], n_codes = codes.shape[0]
+        double[:, ::1] result = np.empty((n, 3), dtype=np.double)
+    result[:, 0] = NAN
+    result[:, 1] = NAN
+    result[:, 2] = 0.0
+    if n_codes == 0 or n == 0:
+        return result
+    with nogil:
+        for i in prange(n):
+            csg_ray_march(&origins[i, 0], &directions[i, 0], t_start[i], t_stop[i],
+                          &codes[0], &offsets[0], &params[0], n_codes, tolerance, max_steps, &result[i, 0])
+    return result
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+import numpy as np
+
+
+_cache = OrderedDict()
+_CACHE_SIZE = 256
+
+
+def gauss_rule(order, dimension):
+    """
+    Tensor-product Gauss-Legendre rule on the unit cube.
+    :param order: number of nodes along each axis
+    :param dimension: dimension of the cube
+    :return: tuple of nodes array shaped (order ** dimension)xdimension and weights array
+    """
+    x, w = np.polynomial.legendre.leggauss(order)
+    x = 0.5 * (x + 1.0)
+    w = 0.5 * w
+    nodes = np.stack(np.meshgrid(*([x] * dimension), indexing='ij'), axis=-1).reshape(-1, dimension)
+    weights = np.prod(np.stack(np.meshgrid(*([w] * dimension), indexing='ij'), axis=-1).reshape(-1, dimension),
+                      axis=1)
+    return nodes, weights
+
+
+def adaptive_gauss(measures, integrand, dimension, order=4, rtol=1e-8, atol=1e-12, max_evaluations=4000000):
+    """
+    Integrates a function over several regions, each parametrized by the unit cube with uniform density.
+    Each active cell is bisected along every axis in turn, the axis where the halves change the Gauss rule
+    estimate of the cell the most is kept for further refinement while the change exceeds the share
+    of the tolerance proportional to the cell volume. Bisection along a single axis keeps the number of cells
+    low near planar singularities of the natural coordinates (poles, axes, field source boundaries).
+    Integrand is evaluated once per refinement level for all active cells of all regions.
+    :param measures: array of regions measures (volumes or areas)
+    :param integrand: function of regions indices array and unit cube points array shaped NxD returning values
+    :param dimension: dimension of the unit cube
+    :param order: number of Gauss nodes along each axis of a cell
+    :param rtol: relative tolerance of the integral
+    :param atol: absolute tolerance of the integral
+    :param max_evaluations: refinement stops when the total number of integrand evaluations exceeds this limit
+    :return: tuple of integral estimate and its error estimate
+    """
+    measures = np.asarray(measures, dtype=np.double)
+    nodes, weights = gauss_rule(order, dimension)
+    # halves of a cell bisected along each axis: 2 * dimension children as (axis, half) pairs
+    shifts = np.zeros((dimension, 2, dimension), dtype=np.double)
+    scales = np.ones((dimension, 2, dimension), dtype=np.double)
+    for axis in range(dimension):
+        shifts[axis, 1, axis] = 0.5
+        scales[axis, :, axis] = 0.5
+    children = 2 * dimension
+
+    def cells_integral(regions, origins, sizes):
+        u = (origins[:, np.newaxis, :] + sizes[:, np.newaxis, :] * nodes).reshape(-1, dimension)
+        values = np.asarray(integrand(np.repeat(regions, nodes.shape[0]), u), dtype=np.double)
+        return np.dot(values.reshape(-1, nodes.shape[0]), weights) * np.prod(sizes, axis=1) * measures[regions]
+
+    regions = np.arange(measures.size)
+    origins = np.zeros((measures.size, dimension), dtype=np.double)
+    sizes = np.ones((measures.size, dimension), dtype=np.double)
+    estimates = cells_integral(regions, origins, sizes)
+    evaluations = estimates.size * nodes.shape[0]
+    accepted = 0.0
+    error = 0.0
+    while regions.size > 0:
+        cells = np.arange(regions.size)
+        fractions = np.prod(sizes, axis=1)
+        halves_origins = (origins[:, np.newaxis, np.newaxis, :]
+                          + sizes[:, np.newaxis, np.newaxis, :] * shifts).reshape(-1, dimension)
+        halves_sizes = (sizes[:, np.newaxis, np.newaxis, :] * scales).reshape(-1, dimension)
+        halves = cells_integral(np.repeat(regions, children), halves_origins, halves_sizes)
+        evaluations += halves.size * nodes.shape[0]
+        halves = halves.reshape(-1, dimension, 2)
+        differences = np.abs(halves.sum(axis=2) - estimates[:, np.newaxis])
+        axes = np.argmax(differences, axis=1)
+        values = halves[cells, axes].sum(axis=1)
+        differences = differences[cells, axes]
+        total = accepted + np.sum(values)
+        converged = differences <= max(atol, rtol * abs(total)) * fractions
+        if evaluations >= max_evaluations:
+            converged[:] = True
+        accepted += np.sum(values[converged])
+        error += np.sum(differences[converged])
+        active = cells[~converged]
+        selection = (np.repeat(active, 2) * children + 2 * np.repeat(axes[active], 2)
+                     + np.tile([0, 1], active.size))
+        regions = np.repeat(regions[active], 2)
+        origins = halves_origins[selection]
+        sizes = halves_sizes[selection]
+        estimates = halves.reshape(-1)[selection]
+    return accepted, error
+
+
+def _field_points(field, figure, xyz, directions=None):
+    """
+    Converts points (and directions) from local coordinate system of the figure
+    to local coordinate system of the field.
+    """
+    if directions is not None:
+        xyz = np.vstack((xyz, xyz + directions))
+    xyz = np.asarray(figure.to_global_coordinate_system(np.ascontiguousarray(xyz, dtype=np.double)))
+    xyz = np.asarray(field.to_local_coordinate_system(xyz))
+    if directions is None:
+        return xyz
+    n = xyz.shape[0] // 2
+    return xyz[:n], xyz[n:] - xyz[:n]
+
+
+def _cached(kind, field, figure, options, calculate):
+    key = (kind, id(field), id(figure)) + options
+    state = (field.global_state, figure.global_state)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == state:
+        _cache.move_to_end(key)
+        return entry[1]
+    result = calculate()
+    _cache[key] = (state, result)
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
+
+
+def integrate_volume(field, figure, order=4, rtol=1e-8, atol=1e-12, max_evaluations=4000000):
+    """
+    Integrates scalar field over the volume of the figure.
+    Tensor-product Gauss rules are applied in natural coordinates of the figure (its uniform unit cube map)
+    with adaptive refinement until the estimated error is within tolerance.
+    The result is cached until the field, the figure or their positions change.
+    :param field: Field object
+    :param figure: Figure object
+    :param order: number of Gauss nodes along each axis of integration cells
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :param max_evaluations: maximal number of field evaluations
+    :return: integral of the scalar field over the figure volume
+    """
+    if figure._volume_map(np.zeros((1, 3))) is None:
+        raise NotImplementedError('Volume integration is not available for %s' % figure.name)
+
+    def integrand(regions, uvw):
+        xyz = _field_points(field, figure, figure._volume_map(uvw))
+        return field.scalar_field(xyz)
+
+    def calculate():
+        return adaptive_gauss([figure.volume()], integrand, 3, order=order, rtol=rtol, atol=atol,
+                              max_evaluations=max_evaluations)[0]
+
+    return _cached('volume', field, figure, (order, rtol, atol, max_evaluations), calculate)
+
+
+def integrate_flux(field, figure, order=4, rtol=1e-8, atol=1e-12, max_evaluations=4000000):
+    """
+    Calculates flux of the vector field through the surface of the figure along outward normals.
+    Each surface patch is integrated by tensor-product Gauss rules in its natural coordinates
+    with adaptive refinement, field is evaluated once per refinement level for all patches.
+    The result is cached until the field, the figure or their positions change.
+    :param field: Field object
+    :param figure: Figure object
+    :param order: number of Gauss nodes along each axis of integration cells
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :param max_evaluations: maximal number of field evaluations
+    :return: flux of the vector field through the figure surface
+    """
+    patches = figure._surface_patches()
+    if not patches:
+        raise NotImplementedError('Surface integration is not available for %s' % figure.name)
+
+    def integrand(regions, uv):
+        xyz = np.empty((uv.shape[0], 3), dtype=np.double)
+        normals = np.empty((uv.shape[0], 3), dtype=np.double)
+        for i in np.unique(regions):
+            mask = regions == i
+            xyz[mask], normals[mask] = patches[i][1](uv[mask])
+        xyz, normals = _field_points(field, figure, xyz, normals)
+        vectors = np.asarray(field.vector_field(np.ascontiguousarray(xyz)))
+        return np.sum(vectors * normals, axis=1)
+
+    def calculate():
+        areas = [patch[0] for patch in patches]
+        return adaptive_gauss(areas, integrand, 2, order=order, rtol=rtol, atol=atol,
+                              max_evaluations=max_evaluations)[0]
+
+    return _cached('flux', field, figure, (order, rtol, atol, max_evaluations), calculate)
@@ -0,0 +1,148 @@
+import numpy as np
+
+# corners of the unit cube cell enumerated by bits (u + 2 * v + 4 * w)
+_HEXAHEDRON_CORNERS = np.array([0, 1, 3, 2, 4, 5, 7, 6])  # VTK hexahedron ordering
+_KUHN_TETRAHEDRA = np.array([[0, 1, 3, 7], [0, 1, 5, 7], [0, 2, 3, 7],
+                             [0, 2, 6, 7], [0, 4, 5, 7], [0, 4, 6, 7]])
+
+
+def grid_axes(resolution, dimension):
+    """
+    Uniform grid nodes along each axis of unit hypercube.
+    :param resolution: number of divisions (int or sequence of ints per axis)
+    :param dimension: number of axes
+    :return: list of nodes arrays
+    """
+    divisions = np.broadcast_to(np.asarray(resolution, dtype=int), (dimension,))
+    if np.any(divisions < 1):
+        raise ValueError('Mesh resolution must be positive, received %s' % str(resolution))
+    return [np.linspace(0.0, 1.0, num=n + 1) for n in divisions]
+
+
+def grid_points(axes):
+    """
+    Nodes of structured grid in row-major order.
+    """
+    return np.column_stack([g.ravel() for g in np.meshgrid(*axes, indexing='ij')])
+
+
+def grid_cells(shape):
+    """
+    Corners of cells of structured grid enumerated by bits.
+    :param shape: number of nodes along each axis
+    :return: array of vertex indices shaped (cells, 2 ** dimension)
+    """
+    nodes = np.arange(np.prod(shape)).reshape(shape)
+    dimension = len(shape)
+    corners = []
+    for bits in range(2 ** dimension):
+        index = tuple(slice((bits >> d) & 1, shape[d] - 1 + ((bits >> d) & 1)) for d in range(dimension))
+        corners.append(nodes[index].ravel())
+    return np.column_stack(corners)
+
+
+def merge_vertices(vertices, cells, tolerance):
+    """
+    Merges coincident vertices and removes unused ones.
+    :param vertices: array of vertices shaped Nx3
+    :param cells: array of cells vertex indices
+    :param tolerance: distance below which vertices are considered coincident
+    :return: tuple of merged vertices and reindexed cells
+    """
+    keys = np.round(vertices / tolerance).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    cells = inverse.ravel()[cells]
+    used, reindexed = np.unique(cells, return_inverse=True)
+    return vertices[first[used]], reindexed.reshape(cells.shape)
+
+
+def merging_tolerance(vertices, relative=1.0e-9):
+    """
+    Distance below which mesh vertices are merged, relative to the mesh extent.
+    """
+    extent = np.ptp(vertices, axis=0) if vertices.shape[0] > 0 else np.zeros(3)
+    return max(relative * np.sqrt(np.dot(extent, extent)), np.finfo(np.double).tiny)
+
+
+def signed_volumes(vertices, tetrahedra):
+    """
+    Signed volumes of tetrahedra, positive for right-handed vertices order.
+    """
+    a = vertices[tetrahedra[:, 1]] - vertices[tetrahedra[:, 0]]
+    b = vertices[tetrahedra[:, 2]] - vertices[tetrahedra[:, 0]]
+    c = vertices[tetrahedra[:, 3]] - vertices[tetrahedra[:, 0]]
+    return np.einsum('ij,ij->i', a, np.cross(b, c)) / 6
+
+
+def compact(vertices, cells):
+    """
+    Read-only contiguous arrays of mesh vertices (float64) and cells (int32).
+    """
+    vertices = np.ascontiguousarray(vertices, dtype=np.double)
+    cells = np.ascontiguousarray(cells, dtype=np.int32)
+    vertices.flags.writeable = False
+    cells.flags.writeable = False
+    return vertices, cells
+
+
+def triangulate_patches(patches, resolution):
+    """
+    Triangulates surface patches on uniform grids of their unit square parametrization.
+    :param patches: list of surface patches (area, map)
+    :param resolution: grid divisions per patch parameter
+    :return: tuple of vertices and outward oriented triangles arrays
+    """
+    axes = grid_axes(resolution, 2)
+    uv = grid_points(axes)
+    quads = grid_cells((axes[0].size, axes[1].size))
+    triangles = np.vstack((quads[:, [0, 1, 3]], quads[:, [0, 3, 2]]))
+    vertices, normals, faces = [], [], []
+    offset = 0
+    for area, patch in patches:
+        points, directions = patch(uv)
+        vertices.append(points)
+        normals.append(directions)
+        faces.append(triangles + offset)
+        offset += uv.shape[0]
+    vertices = np.vstack(vertices)
+    normals = np.vstack(normals)
+    faces = np.vstack(faces)
+    tolerance = merging_tolerance(vertices)
+    a = vertices[faces[:, 1]] - vertices[faces[:, 0]]
+    b = vertices[faces[:, 2]] - vertices[faces[:, 0]]
+    flip = np.einsum('ij,ij->i', np.cross(a, b), normals[faces].sum(axis=1)) < 0
+    faces[flip] = faces[flip][:, [0, 2, 1]]
+    vertices, faces = merge_vertices(vertices, faces, tolerance)
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])]
+    return compact(vertices, faces)
+
+
+def mesh_volume_map(volume_map, resolution, cell_type):
+    """
+    Structured volume mesh of the image of unit cube grid.
+    :param volume_map: function mapping unit cube points to figure points
+    :param resolution: grid divisions per unit cube axis
+    :param cell_type: 'hexahedron' or 'tetrahedron'
+    :return: tuple of vertices and positively oriented cells arrays
+    """
+    axes = grid_axes(resolution, 3)
+    cubes = grid_cells(tuple(axis.size for axis in axes))
+    vertices = volume_map(grid_points(axes))
+    tolerance = merging_tolerance(vertices)
+    tetrahedra = cubes[:, _KUHN_TETRAHEDRA].reshape(-1, 4)
+    volumes = signed_volumes(vertices, tetrahedra)
+    if cell_type == 'hexahedron':
+        cells = cubes[:, _HEXAHEDRON_CORNERS]
+        inverted = volumes.reshape(-1, 6).sum(axis=1) < 0
+        cells[inverted] = cells[inverted][:, [4, 5, 6, 7, 0, 1, 2, 3]]
+        return compact(*merge_vertices(vertices, cells, tolerance))
+    elif cell_type == 'tetrahedron':
+        inverted = volumes < 0
+        tetrahedra[inverted] = tetrahedra[inverted][:, [0, 2, 1, 3]]
+        vertices, tetrahedra = merge_vertices(vertices, tetrahedra, tolerance)
+        sorted_cells = np.sort(tetrahedra, axis=1)
+        tetrahedra = tetrahedra[np.all(sorted_cells[:, 1:] != sorted_cells[:, :-1], axis=1)]
+        tetrahedra = tetrahedra[signed_volumes(vertices, tetrahedra) > tolerance ** 3]
+        return compact(*merge_vertices(vertices, tetrahedra, tolerance))
+    raise ValueError('Unknown cell type %s, use hexahedron or tetrahedron' % str(cell_type))
+
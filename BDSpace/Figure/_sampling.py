@@ -0,0 +1,106 @@
+import warnings
+import numpy as np
+from scipy.stats import qmc
+
+
+def unit_cube_sampler(method, dimension, seed=None):
+    """
+    Creates generator of points in the unit hypercube.
+    :param method: 'random' for pseudo-random, 'sobol' or 'halton' for scrambled quasi-random sequences
+    :param dimension: dimension of the hypercube
+    :param seed: seed for reproducible sampling
+    :return: function returning array of n points shaped (n, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'random':
+        return lambda n: rng.random((n, dimension))
+    elif method in ('sobol', 'halton'):
+        if method == 'sobol':
+            engine = qmc.Sobol(d=dimension, scramble=True, seed=rng)
+        else:
+            engine = qmc.Halton(d=dimension, scramble=True, seed=rng)
+
+        def draw(n):
+            with warnings.catch_warnings():
+                # chunks of the sequence are not necessarily powers of two
+                warnings.simplefilter('ignore', UserWarning)
+                return engine.random(n)
+        return draw
+    raise ValueError('Unknown sampling method %s, use random, sobol or halton' % str(method))
+
+
+def invert_cdf(cdf, pdf, target, lower, upper, tolerance=1.0e-13, max_iterations=100):
+    """
+    Solves cdf(x) = target for monotone non-decreasing cdf by safeguarded Newton iterations.
+    :param cdf: vectorized cumulative function
+    :param pdf: vectorized derivative of cdf
+    :param target: array of target cdf values
+    :param lower: lower bound of the solution (scalar or array)
+    :param upper: upper bound of the solution (scalar or array)
+    :param tolerance: relative tolerance of the solution
+    :param max_iterations: maximal number of iterations
+    :return: array of solutions
+    """
+    lower = np.array(np.broadcast_to(lower, target.shape), dtype=np.double)
+    upper = np.array(np.broadcast_to(upper, target.shape), dtype=np.double)
+    cdf_lower = cdf(lower)
+    cdf_upper = cdf(upper)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = lower + (upper - lower) * np.clip((target - cdf_lower) / (cdf_upper - cdf_lower), 0.0, 1.0)
+    x[~np.isfinite(x)] = lower[~np.isfinite(x)]
+    for _ in range(max_iterations):
+        residual = cdf(x) - target
+        lower = np.where(residual < 0, x, lower)
+        upper = np.where(residual > 0, x, upper)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = x - residual / pdf(x)
+        bisect = ~((x_new >= lower) & (x_new <= upper))
+        x_new[bisect] = (lower[bisect] + upper[bisect]) / 2
+        converged = np.all(np.abs(x_new - x) <= tolerance * (1.0 + np.abs(x)))
+        x = x_new
+        if converged:
+            break
+    return x
+
+
+def even_integral(antiderivative, z, z_cut):
+    """
+    Integral of g(|s| + z_cut) over s from 0 to z given antiderivative G of g.
+    """
+    return np.sign(z) * (antiderivative(np.abs(z) + z_cut) - antiderivative(z_cut))
+
+
+def polar_points(rho, phi, z):
+    """
+    Cartesian coordinates of points given in cylindrical coordinates.
+    """
+    return np.column_stack((rho * np.cos(phi), rho * np.sin(phi), z))
+
+
+def polar_vectors(v_rho, phi, v_z):
+    """
+    Cartesian components of vectors with radial and axial cylindrical components.
+    """
+    return np.column_stack((v_rho * np.cos(phi), v_rho * np.sin(phi), v_z))
+
+
+def wedge_side_patches(phi, area, meridional_map):
+    """
+    Planar sides of azimuthal wedge at angles 0 and phi.
+    :param phi: wedge angle, full circle has no sides
+    :param area: area of the meridional section
+    :param meridional_map: function mapping unit square points to (rho, z) arrays with uniform area density
+    :return: list of surface patches
+    """
+    if phi >= 2 * np.pi or area <= 0:
+        return []
+
+    def side(angle, normal):
+        def patch(uv):
+            rho, z = meridional_map(uv)
+            points = polar_points(rho, np.full(rho.shape, angle), z)
+            return points, np.broadcast_to(normal, points.shape)
+        return patch
+
+    return [(area, side(0.0, np.array([0.0, -1.0, 0.0]))),
+            (area, side(phi, np.array([-np.sin(phi), np.cos(phi), 0.0])))]
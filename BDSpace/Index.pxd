@@ -0,0 +1,38 @@
+from BDSpace.Space cimport Space
+
+
+cdef enum:
+    TRAVERSAL_STACK_SIZE = 128
+
+
+cdef class SpaceIndex(object):
+    cdef:
+        Space __space
+        int __leaf_size
+        tuple __items
+        tuple __state
+        tuple __changes
+        int __nodes
+        double[:, ::1] __item_min
+        double[:, ::1] __item_max
+        double[:, ::1] __box_min
+        double[:, ::1] __box_max
+        int[:] __order
+        int[:] __left
+        int[:] __right
+        int[:] __first
+        int[:] __last
+
+    cdef void __build(self)
+    cdef int __build_node(self, int node, int first, int last) nogil
+    cdef void __refit(self) nogil
+    cdef int __query_box(self, double* lo, double* hi, int* out) nogil
+    cdef int __query_ray(self, double* origin, double* direction, double t_max, int* out, double* t_out) nogil
+    cdef double __upper_bound(self, double* xyz) nogil
+    cdef int __candidates(self, double* xyz, double bound, int* out) nogil
+
+
+cdef bint boxes_overlap(double* lo_a, double* hi_a, double* lo_b, double* hi_b) nogil
+cdef bint ray_box(double* origin, double* direction, double* lo, double* hi, double t_max, double* t_enter) nogil
+cdef double box_min_distance(double* xyz, double* lo, double* hi) nogil
+cdef double box_max_distance(double* xyz, double* lo, double* hi) nogil
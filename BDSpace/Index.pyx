@@ -0,0 +1,515 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+from cython.parallel import prange
+
+from libc.math cimport sqrt, fabs, fmax, fmin, INFINITY
+
+from BDSpace.Space cimport Space, spaces_changes
+from BDSpace.Coordinates.Cartesian cimport coordinate_systems_changes
+
+
+cdef class SpaceIndex(object):
+    """
+    Bounding volume hierarchy over global axis aligned bounding boxes of all spaces of a Space tree
+    (the root included) which have geometry: figures, curves and fields.
+    Items are ordered along the Morton curve of their box centers and split in halves recursively.
+    The index follows changes of the tree: before each query it compares counters of changes of all spaces
+    and coordinate systems, only if they grew it checks if the global state of any space of the tree was changed.
+    Then boxes of the items are recomputed and the hierarchy is refitted,
+    or rebuilt if spaces were added to or removed from the tree.
+    Queries return indices of spaces in the items tuple of the index.
+    """
+
+    def __init__(self, Space space, int leaf_size=4):
+        if leaf_size < 1:
+            raise ValueError('Leaf size must be positive')
+        self.__space = space
+        self.__leaf_size = leaf_size
+        self.__items = ()
+        self.__state = None
+        self.__changes = None
+        self.__nodes = 0
+        self.update()
+
+    @property
+    def space(self):
+        return self.__space
+
+    @property
+    def items(self):
+        self.update()
+        return self.__items
+
+    def update(self):
+        """
+        Brings the index up to date with the Space tree. Called automatically by all queries.
+        :return: True if the index was refitted or rebuilt, False if it was up to date
+        """
+        changes = (spaces_changes(), coordinate_systems_changes())
+        if changes == self.__changes:
+            return False
+        self.__changes = changes
+        state = tree_state(self.__space)
+        if state == self.__state:
+            return False
+        items = []
+        boxes = []
+        for space in _walk(self.__space):
+            box = space.bounding_box()
+            if box is not None:
+                items.append(space)
+                boxes.append(box)
+        boxes = np.array(boxes, dtype=np.double).reshape(-1, 2, 3)
+        self.__item_min = np.ascontiguousarray(boxes[:, 0])
+        self.__item_max = np.ascontiguousarray(boxes[:, 1])
+        if len(items) != len(self.__items) or any(a is not b for a, b in zip(items, self.__items)):
+            self.__items = tuple(items)
+            self.__build()
+        else:
+            with nogil:
+                self.__refit()
+        self.__state = state
+        return True
+
+    def rebuild(self):
+        """
+        Rebuilds the hierarchy from scratch, e.g. after many refits have degraded its quality.
+        """
+        self.__items = ()
+        self.__state = None
+        self.__changes = None
+        self.update()
+
+    cdef void __build(self):
+        cdef:
+            int n = len(self.__items)
+        self.__order = np.ascontiguousarray(_morton_order(np.asarray(self.__item_min),
+                                                          np.asarray(self.__item_max)), dtype=np.intc)
+        self.__box_min = np.empty((max(2 * n - 1, 1), 3), dtype=np.double)
+        self.__box_max = np.empty((max(2 * n - 1, 1), 3), dtype=np.double)
+        self.__left = np.empty(max(2 * n - 1, 1), dtype=np.intc)
+        self.__right = np.empty(max(2 * n - 1, 1), dtype=np.intc)
+        self.__first = np.empty(max(2 * n - 1, 1), dtype=np.intc)
+        self.__last = np.empty(max(2 * n - 1, 1), dtype=np.intc)
+        with nogil:
+            if n > 0:
+                self.__nodes = self.__build_node(0, 0, n)
+            else:
+                self.__nodes = 0
+            self.__refit()
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __build_node(self, int node, int first, int last) nogil:
+        cdef:
+            int mid, next_node
+        self.__first[node] = first
+        self.__last[node] = last
+        if last - first <= self.__leaf_size:
+            self.__left[node] = -1
+            self.__right[node] = -1
+            return node + 1
+        mid = (first + last) // 2
+        self.__left[node] = node + 1
+        next_node = self.__build_node(node + 1, first, mid)
+        self.__right[node] = next_node
+        return self.__build_node(next_node, mid, last)
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef void __refit(self) nogil:
+        cdef:
+            int i, j, k, node
+        # children always follow their parent node
+        for node in range(self.__nodes - 1, -1, -1):
+            for k in range(3):
+                self.__box_min[node, k] = INFINITY
+                self.__box_max[node, k] = -INFINITY
+            if self.__left[node] < 0:
+                for i in range(self.__first[node], self.__last[node]):
+                    j = self.__order[i]
+                    for k in range(3):
+                        self.__box_min[node, k] = fmin(self.__box_min[node, k], self.__item_min[j, k])
+                        self.__box_max[node, k] = fmax(self.__box_max[node, k], self.__item_max[j, k])
+            else:
+                for k in range(3):
+                    self.__box_min[node, k] = fmin(self.__box_min[self.__left[node], k],
+                                                   self.__box_min[self.__right[node], k])
+                    self.__box_max[node, k] = fmax(self.__box_max[self.__left[node], k],
+                                                   self.__box_max[self.__right[node], k])
+
+    def bounding_box(self):
+        """
+        Box enclosing all items of the index in global coordinate system.
+        :return: 2x3 array of box minimal and maximal corners, or None if the index is empty
+        """
+        self.update()
+        if self.__nodes == 0:
+            return None
+        return np.array([self.__box_min[0], self.__box_max[0]])
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __query_box(self, double* lo, double* hi, int* out) nogil:
+        cdef:
+            int stack[TRAVERSAL_STACK_SIZE]
+            int top = 0, node, i, j, count = 0
+        if self.__nodes == 0:
+            return 0
+        stack[top] = 0
+        top += 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if not boxes_overlap(&self.__box_min[node, 0], &self.__box_max[node, 0], lo, hi):
+                continue
+            if self.__left[node] < 0:
+                for i in range(self.__first[node], self.__last[node]):
+                    j = self.__order[i]
+                    if boxes_overlap(&self.__item_min[j, 0], &self.__item_max[j, 0], lo, hi):
+                        if out != NULL:
+                            out[count] = j
+                        count += 1
+            else:
+                stack[top] = self.__right[node]
+                stack[top + 1] = self.__left[node]
+                top += 2
+        return count
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __query_ray(self, double* origin, double* direction, double t_max, int* out, double* t_out) nogil:
+        cdef:
+            int stack[TRAVERSAL_STACK_SIZE]
+            int top = 0, node, i, j, count = 0
+            double t_enter
+        if self.__nodes == 0:
+            return 0
+        stack[top] = 0
+        top += 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if not ray_box(origin, direction, &self.__box_min[node, 0], &self.__box_max[node, 0], t_max, &t_enter):
+                continue
+            if self.__left[node] < 0:
+                for i in range(self.__first[node], self.__last[node]):
+                    j = self.__order[i]
+                    if ray_box(origin, direction, &self.__item_min[j, 0], &self.__item_max[j, 0], t_max, &t_enter):
+                        if out != NULL:
+                            out[count] = j
+                            t_out[count] = t_enter
+                        count += 1
+            else:
+                stack[top] = self.__right[node]
+                stack[top + 1] = self.__left[node]
+                top += 2
+        return count
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef double __upper_bound(self, double* xyz) nogil:
+        cdef:
+            int stack[TRAVERSAL_STACK_SIZE]
+            int top = 0, node, i, j
+            double bound = INFINITY
+        if self.__nodes == 0:
+            return bound
+        stack[top] = 0
+        top += 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if box_min_distance(xyz, &self.__box_min[node, 0], &self.__box_max[node, 0]) > bound:
+                continue
+            if self.__left[node] < 0:
+                for i in range(self.__first[node], self.__last[node]):
+                    j = self.__order[i]
+                    bound = fmin(bound, box_max_distance(xyz, &self.__item_min[j, 0], &self.__item_max[j, 0]))
+            else:
+                stack[top] = self.__right[node]
+                stack[top + 1] = self.__left[node]
+                top += 2
+        return bound
+
+    @boundscheck(False)
+    @wraparound(False)
+    cdef int __candidates(self, double* xyz, double bound, int* out) nogil:
+        cdef:
+            int stack[TRAVERSAL_STACK_SIZE]
+            int top = 0, node, i, j, count = 0
+        if self.__nodes == 0:
+            return 0
+        stack[top] = 0
+        top += 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if box_min_distance(xyz, &self.__box_min[node, 0], &self.__box_max[node, 0]) > bound:
+                continue
+            if self.__left[node] < 0:
+                for i in range(self.__first[node], self.__last[node]):
+                    j = self.__order[i]
+                    if box_min_distance(xyz, &self.__item_min[j, 0], &self.__item_max[j, 0]) <= bound:
+                        if out != NULL:
+                            out[count] = j
+                        count += 1
+            else:
+                stack[top] = self.__right[node]
+                stack[top + 1] = self.__left[node]
+                top += 2
+        return count
+
+    @boundscheck(False)
+    @wraparound(False)
+    def query_boxes(self, boxes):
+        """
+        Finds items whose bounding boxes overlap the given boxes.
+        :param boxes: array of boxes in global coordinate system shaped Nx2x3 (minimal and maximal corners)
+        :return: tuple of arrays of box indices and item indices, one pair per overlap
+        """
+        cdef:
+            int i, n
+            double[:, ::1] lo, hi
+            long[:] counts, offsets
+            int[:] result
+        self.update()
+        boxes = np.asarray(boxes, dtype=np.double).reshape(-1, 2, 3)
+        lo = np.ascontiguousarray(boxes[:, 0])
+        hi = np.ascontiguousarray(boxes[:, 1])
+        n = lo.shape[0]
+        counts = np.zeros(n, dtype=np.int_)
+        with nogil:
+            for i in prange(n):
+                counts[i] = self.__query_box(&lo[i, 0], &hi[i, 0], NULL)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int_)
+        result = np.empty(max(offsets[n], 1), dtype=np.intc)
+        with nogil:
+            for i in prange(n):
+                self.__query_box(&lo[i, 0], &hi[i, 0], &result[offsets[i]])
+        return np.repeat(np.arange(n), counts), np.asarray(result)[:offsets[n]]
+
+    def query_box(self, box):
+        """
+        Finds items whose bounding boxes overlap the given box.
+        :param box: 2x3 array of box minimal and maximal corners in global coordinate system
+        :return: array of item indices
+        """
+        return np.sort(self.query_boxes(np.asarray(box, dtype=np.double).reshape(1, 2, 3))[1])
+
+    def query_points(self, xyz):
+        """
+        Finds items whose bounding boxes contain the given points.
+        :param xyz: array of points in global coordinate system shaped Nx3
+        :return: tuple of arrays of point indices and item indices, one pair per hit
+        """
+        xyz = np.asarray(xyz, dtype=np.double).reshape(-1, 3)
+        return self.query_boxes(np.stack((xyz, xyz), axis=1))
+
+    def query_point(self, xyz):
+        """
+        Finds items whose bounding boxes contain the given point.
+        :param xyz: point in global coordinate system
+        :return: array of item indices
+        """
+        return np.sort(self.query_points(np.asarray(xyz, dtype=np.double).reshape(1, 3))[1])
+
+    @boundscheck(False)
+    @wraparound(False)
+    def query_rays(self, origins, directions, double t_max=INFINITY):
+        """
+        Finds items whose bounding boxes are crossed by the rays.
+        :param origins: array of ray origins in global coordinate system shaped Nx3
+        :param directions: array of ray directions shaped Nx3, the ray parameter is measured in their units
+        :param t_max: maximal ray parameter
+        :return: tuple of arrays of ray indices, item indices and ray parameters of box entry points,
+                 hits of each ray are sorted by the entry parameter
+        """
+        cdef:
+            int i, n
+            double[:, ::1] o, d
+            long[:] counts, offsets
+            int[:] result
+            double[:] t_enter
+        self.update()
+        o = np.ascontiguousarray(np.asarray(origins, dtype=np.double).reshape(-1, 3))
+        d = np.require(np.broadcast_to(np.asarray(directions, dtype=np.double).reshape(-1, 3), (o.shape[0], 3)),
+                       requirements=['C', 'W'])
+        n = o.shape[0]
+        counts = np.zeros(n, dtype=np.int_)
+        with nogil:
+            for i in prange(n):
+                counts[i] = self.__query_ray(&o[i, 0], &d[i, 0], t_max, NULL, NULL)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int_)
+        result = np.empty(max(offsets[n], 1), dtype=np.intc)
+        t_enter = np.empty(max(offsets[n], 1), dtype=np.double)
+        with nogil:
+            for i in prange(n):
+                self.__query_ray(&o[i, 0], &d[i, 0], t_max, &result[offsets[i]], &t_enter[offsets[i]])
+        rays = np.repeat(np.arange(n), counts)
+        items = np.asarray(result)[:offsets[n]]
+        t = np.asarray(t_enter)[:offsets[n]]
+        order = np.lexsort((t, rays))
+        return rays[order], items[order], t[order]
+
+    def query_ray(self, origin, direction, double t_max=INFINITY):
+        """
+        Finds items whose bounding boxes are crossed by the ray.
+        :param origin: ray origin in global coordinate system
+        :param direction: ray direction, the ray parameter is measured in its units
+        :param t_max: maximal ray parameter
+        :return: tuple of arrays of item indices and ray parameters of box entry points sorted by the parameter
+        """
+        _, items, t = self.query_rays(np.asarray(origin, dtype=np.double).reshape(1, 3),
+                                      np.asarray(direction, dtype=np.double).reshape(1, 3), t_max=t_max)
+        return items, t
+
+    @boundscheck(False)
+    @wraparound(False)
+    def nearest_batch(self, xyz):
+        """
+        Finds the nearest item for each point. Candidates are selected by bounding boxes:
+        the distance to an item is not larger than the distance to the farthest corner of its box.
+        Then the distance method of candidate spaces is evaluated. The result is exact only if the distance
+        methods of the items are exact, conservative estimates (e.g. of wedges or the default box distance)
+        may rank an item nearer than it is, and the returned distance is then the estimate.
+        :param xyz: array of points in global coordinate system shaped Nx3
+        :return: tuple of arrays of nearest item indices (-1 for empty index) and distances
+        """
+        cdef:
+            int i, n
+            double[:, ::1] points
+            double[:] bound
+            long[:] counts, offsets
+            int[:] result
+        self.update()
+        points = np.ascontiguousarray(np.asarray(xyz, dtype=np.double).reshape(-1, 3))
+        n = points.shape[0]
+        bound = np.empty(n, dtype=np.double)
+        counts = np.zeros(n, dtype=np.int_)
+        with nogil:
+            for i in prange(n):
+                bound[i] = self.__upper_bound(&points[i, 0])
+                counts[i] = self.__candidates(&points[i, 0], bound[i], NULL)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int_)
+        result = np.empty(max(offsets[n], 1), dtype=np.intc)
+        with nogil:
+            for i in prange(n):
+                self.__candidates(&points[i, 0], bound[i], &result[offsets[i]])
+        candidate_points = np.repeat(np.arange(n), counts)
+        candidate_items = np.asarray(result)[:offsets[n]]
+        distance = np.empty(candidate_items.size, dtype=np.double)
+        for item in np.unique(candidate_items):
+            mask = candidate_items == item
+            distance[mask] = self.__items[item].distance(np.asarray(points)[candidate_points[mask]])
+        nearest = np.full(n, -1, dtype=np.intc)
+        nearest_distance = np.full(n, np.inf, dtype=np.double)
+        if candidate_items.size > 0:
+            order = np.lexsort((distance, candidate_points))
+            first = order[np.unique(candidate_points[order], return_index=True)[1]]
+            nearest[candidate_points[first]] = candidate_items[first]
+            nearest_distance[candidate_points[first]] = distance[first]
+        return nearest, nearest_distance
+
+    def nearest(self, xyz):
+        """
+        Finds the item nearest to the point, approximate as described in nearest_batch.
+        :param xyz: point in global coordinate system
+        :return: tuple of nearest item index (-1 for empty index) and distance
+        """
+        nearest, distance = self.nearest_batch(np.asarray(xyz, dtype=np.double).reshape(1, 3))
+        return int(nearest[0]), float(distance[0])
+
+
+def tree_state(Space space):
+    """
+    Global states of all spaces of the tree in depth-first order. The tuple changes whenever any space
+    of the tree, its coordinate system or its parents change, or spaces are added to or removed from the tree,
+    so it may be used as a key of cached results depending on the whole tree.
+    :param space: root Space of the tree
+    :return: tuple of global states
+    """
+    return tuple(element.global_state for element in _walk(space))
+
+
+def _walk(Space space):
+    yield space
+    for element in space.elements.values():
+        for descendant in _walk(element):
+            yield descendant
+
+
+def _spread_bits(v):
+    v = (v | (v << np.uint64(16))) & np.uint64(0x030000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x0300F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x030C30C3)
+    return (v | (v << np.uint64(2))) & np.uint64(0x09249249)
+
+
+def _morton_order(box_min, box_max):
+    """
+    Orders boxes along Morton curve of their centers, unbounded boxes are centered at the origin.
+    """
+    with np.errstate(invalid='ignore'):
+        centers = (box_min + box_max) / 2
+    centers[~np.isfinite(centers)] = 0.0
+    if centers.shape[0] == 0:
+        return np.zeros(0, dtype=np.intc)
+    lo = centers.min(axis=0)
+    size = centers.max(axis=0) - lo
+    size[size <= 0] = 1.0
+    cells = np.minimum((centers - lo) / size * 1024, 1023).astype(np.uint64)
+    codes = _spread_bits(cells[:, 0]) | (_spread_bits(cells[:, 1]) << np.uint64(1)) \
+        | (_spread_bits(cells[:, 2]) << np.uint64(2))
+    return np.argsort(codes, kind='stable')
+
+
+@boundscheck(False)
+cdef bint boxes_overlap(double* lo_a, double* hi_a, double* lo_b, double* hi_b) nogil:
+    return lo_a[0] <= hi_b[0] and lo_b[0] <= hi_a[0] \
+        and lo_a[1] <= hi_b[1] and lo_b[1] <= hi_a[1] \
+        and lo_a[2] <= hi_b[2] and lo_b[2] <= hi_a[2]
+
+
+@boundscheck(False)
+cdef bint ray_box(double* origin, double* direction, double* lo, double* hi, double t_max, double* t_enter) nogil:
+    """
+    Slab test of the ray segment origin + t * direction, 0 <= t <= t_max, against the box.
+    """
+    cdef:
+        int k
+        double t_near = 0.0, t_far = t_max, t1, t2
+    for k in range(3):
+        if direction[k] == 0:
+            if origin[k] < lo[k] or origin[k] > hi[k]:
+                return False
+        else:
+            t1 = (lo[k] - origin[k]) / direction[k]
+            t2 = (hi[k] - origin[k]) / direction[k]
+            t_near = fmax(t_near, fmin(t1, t2))
+            t_far = fmin(t_far, fmax(t1, t2))
+    t_enter[0] = t_near
+    return t_near <= t_far
+
+
+@boundscheck(False)
+cdef double box_min_distance(double* xyz, double* lo, double* hi) nogil:
+    cdef:
+        int k
+        double d, total = 0.0
+    for k in range(3):
+        d = fmax(fmax(lo[k] - xyz[k], xyz[k] - hi[k]), 0.0)
+        total += d * d
+    return sqrt(total)
+
+
+@boundscheck(False)
+cdef double box_max_distance(double* xyz, double* lo, double* hi) nogil:
+    cdef:
+        int k
+        double d, total = 0.0
+    for k in range(3):
+        d = fmax(fabs(xyz[k] - lo[k]), fabs(xyz[k] - hi[k]))
+        total += d * d
+    return sqrt(total)
@@ -0,0 +1,234 @@
+import numpy as np
+
+from BDSpace.Coordinates import Cartesian, transforms
+from BDSpace.Curve import Line, Arc, Helix
+
+
+def _rotation_z(angles):
+    """
+    Transposed rotation matrices around z axis (basis rotation as in Cartesian.rotate_axis_angle).
+    """
+    c, s = np.cos(angles), np.sin(angles)
+    zeros, ones = np.zeros_like(angles), np.ones_like(angles)
+    return np.stack((np.stack((c, s, zeros), axis=-1),
+                     np.stack((-s, c, zeros), axis=-1),
+                     np.stack((zeros, zeros, ones), axis=-1)), axis=-2)
+
+
+def _rotation_y(angles):
+    """
+    Transposed rotation matrices around y axis (basis rotation as in Cartesian.rotate_axis_angle).
+    """
+    c, s = np.cos(angles), np.sin(angles)
+    zeros, ones = np.zeros_like(angles), np.ones_like(angles)
+    return np.stack((np.stack((c, zeros, -s), axis=-1),
+                     np.stack((zeros, ones, zeros), axis=-1),
+                     np.stack((s, zeros, c), axis=-1)), axis=-2)
+
+
+class PathBatch(object):
+    """
+    Batch of paths of one kind (lines, arcs or helices) stored as arrays of parameters and frames.
+    Path i in global coordinate system is origins[i] + r_i(t) @ bases[i], where r_i(t) is the curve
+    in its local frame with the same equations as Line, Arc and Helix classes.
+    """
+
+    kinds = ('line', 'arc', 'helix')
+
+    def __init__(self, kind, origins, bases, start, stop, directions=None, radii=None, pitches=None, right=True):
+        """
+        :param kind: 'line', 'arc' or 'helix'
+        :param origins: array of frames origins in global coordinate system shaped Nx3
+        :param bases: array of frames bases shaped Nx3x3, rows are local axes in global coordinate system
+        :param start: array of curve parameter start values
+        :param stop: array of curve parameter stop values
+        :param directions: lines unit directions in their local frames shaped Nx3
+        :param radii: radii of arcs and helices
+        :param pitches: pitches of helices
+        :param right: True for right-handed arcs and helices (array or scalar)
+        """
+        if kind not in self.kinds:
+            raise ValueError('Unknown path kind %s, use one of %s' % (kind, ', '.join(self.kinds)))
+        self.kind = kind
+        self.origins = np.ascontiguousarray(origins, dtype=np.double).reshape(-1, 3)
+        n = self.origins.shape[0]
+        self.bases = np.ascontiguousarray(np.broadcast_to(np.asarray(bases, dtype=np.double), (n, 3, 3)))
+        self.start = np.ascontiguousarray(np.broadcast_to(np.asarray(start, dtype=np.double), (n,)))
+        self.stop = np.ascontiguousarray(np.broadcast_to(np.asarray(stop, dtype=np.double), (n,)))
+        self.directions = None
+        self.radii = None
+        self.pitches = None
+        self.orientation = np.where(np.broadcast_to(np.asarray(right, dtype=bool), (n,)), 1.0, -1.0)
+        if kind == 'line':
+            self.directions = np.ascontiguousarray(np.broadcast_to(np.asarray(directions, dtype=np.double), (n, 3)))
+        else:
+            self.radii = np.ascontiguousarray(np.broadcast_to(np.asarray(radii, dtype=np.double), (n,)))
+        if kind == 'helix':
+            self.pitches = np.ascontiguousarray(np.broadcast_to(np.asarray(pitches, dtype=np.double), (n,)))
+
+    def __len__(self):
+        return self.origins.shape[0]
+
+    def _parameters(self, t):
+        t = np.asarray(t, dtype=np.double)
+        if t.ndim == 1:
+            t = t[np.newaxis, :]
+        return np.broadcast_to(t, (len(self), t.shape[-1]))
+
+    def _local_derivative(self, t, order):
+        """
+        Derivatives of the local curves of given order at parameters t shaped NxM.
+        """
+        if self.kind == 'line':
+            if order == 0:
+                return t[:, :, np.newaxis] * self.directions[:, np.newaxis, :]
+            if order == 1:
+                return np.broadcast_to(self.directions[:, np.newaxis, :], t.shape + (3,)).copy()
+            return np.zeros(t.shape + (3,))
+        r = self.radii[:, np.newaxis]
+        sign = self.orientation[:, np.newaxis]
+        # derivatives of cos and sin are the shifts of the argument by quarter periods
+        cos = np.cos(t + order * np.pi / 2)
+        sin = np.sin(t + order * np.pi / 2)
+        if self.kind == 'arc':
+            return np.stack((r * cos, sign * r * sin, np.zeros_like(t)), axis=-1)
+        x = r * (1.0 - cos) if order == 0 else -r * cos
+        lead = self.pitches[:, np.newaxis] / (2 * np.pi)
+        z = lead * t if order == 0 else (np.broadcast_to(lead, t.shape) if order == 1 else np.zeros_like(t))
+        return np.stack((x, sign * r * sin, z), axis=-1)
+
+    def generate_points(self, t):
+        """
+        Calculates points of all paths.
+        :param t: curve parameter values shaped NxM, or M values shared by all paths
+        :return: array of points in global coordinate system shaped NxMx3
+        """
+        local = self._local_derivative(self._parameters(t), 0)
+        return np.einsum('nmi,nij->nmj', local, self.bases) + self.origins[:, np.newaxis, :]
+
+    def derivative(self, t, order=1):
+        """
+        Calculates derivatives of the paths radius vectors in global coordinate system.
+        :param t: curve parameter values shaped NxM, or M values shared by all paths
+        :param order: derivative order
+        :return: array of derivative vectors shaped NxMx3
+        """
+        return np.einsum('nmi,nij->nmj', self._local_derivative(self._parameters(t), order), self.bases)
+
+    def tangent(self, t):
+        """
+        Calculates tangent vectors (first derivatives) of the paths in global coordinate system.
+        :param t: curve parameter values shaped NxM, or M values shared by all paths
+        :return: array of tangent vectors shaped NxMx3
+        """
+        return self.derivative(t, order=1)
+
+    def linspace(self, num):
+        """
+        Uniform curve parameter values from start to stop of each path shaped Nxnum.
+        """
+        fraction = np.linspace(0.0, 1.0, num)
+        return self.start[:, np.newaxis] + (self.stop - self.start)[:, np.newaxis] * fraction
+
+    def length(self):
+        """
+        Exact lengths of the paths.
+        """
+        span = np.abs(self.stop - self.start)
+        if self.kind == 'line':
+            return span * np.sqrt(np.sum(self.directions ** 2, axis=1))
+        if self.kind == 'arc':
+            return span * self.radii
+        return span * np.sqrt(self.radii ** 2 + (self.pitches / (2 * np.pi)) ** 2)
+
+    def curve(self, i):
+        """
+        Creates ParametricCurve object of a single path of the batch.
+        """
+        coordinate_system = Cartesian(basis=np.copy(self.bases[i]), origin=np.copy(self.origins[i]),
+                                      name='%s path coordinate system' % self.kind.capitalize())
+        if self.kind == 'line':
+            return Line(name='Line Path', coordinate_system=coordinate_system, origin=np.zeros(3),
+                        a=self.directions[i, 0], b=self.directions[i, 1], c=self.directions[i, 2],
+                        start=self.start[i], stop=self.stop[i])
+        right = bool(self.orientation[i] > 0)
+        if self.kind == 'arc':
+            return Arc(coordinate_system=coordinate_system, a=self.radii[i], b=self.radii[i],
+                       start=self.start[i], stop=self.stop[i], right=right)
+        return Helix(name='Right Helix' if right else 'Left Helix', coordinate_system=coordinate_system,
+                     radius=self.radii[i], pitch=self.pitches[i], start=self.start[i], stop=self.stop[i], right=right)
+
+
+def _points(coordinate_system, points1, points2):
+    points1 = np.ascontiguousarray(points1, dtype=np.double).reshape(-1, 3)
+    points2 = np.ascontiguousarray(np.broadcast_to(np.asarray(points2, dtype=np.double), points1.shape))
+    basis = np.asarray(coordinate_system.basis, dtype=np.double)
+    origin = np.asarray(coordinate_system.origin, dtype=np.double)
+    return points1, points2, basis, origin
+
+
+def lines_between_points(coordinate_system, points1, points2):
+    """
+    Batch version of line_between_two_points.
+    :param coordinate_system: Cartesian coordinate system of the points
+    :param points1: array of start points shaped Nx3
+    :param points2: array of end points shaped Nx3
+    :return: PathBatch of lines
+    """
+    points1, points2, basis, origin = _points(coordinate_system, points1, points2)
+    direction = points2 - points1
+    distance = np.sqrt(np.sum(direction * direction, axis=1))
+    return PathBatch('line', points1 @ basis + origin, basis, 0.0, distance,
+                     directions=direction / distance[:, np.newaxis])
+
+
+def helices_between_points(coordinate_system, points1, points2, radius=1, loops=1, right=True):
+    """
+    Batch version of helix_between_two_points.
+    :param coordinate_system: Cartesian coordinate system of the points
+    :param points1: array of start points shaped Nx3
+    :param points2: array of end points shaped Nx3
+    :param radius: helices radius (array or scalar)
+    :param loops: number of loops (array or scalar)
+    :param right: True for right-handed helices (array or scalar)
+    :return: PathBatch of helices
+    """
+    points1, points2, basis, origin = _points(coordinate_system, points1, points2)
+    direction = points2 - points1
+    distance = np.sqrt(np.sum(direction * direction, axis=1))
+    r_theta_phi = np.asarray(transforms.cartesian_to_spherical(direction))
+    bases = _rotation_y(r_theta_phi[:, 1]) @ _rotation_z(r_theta_phi[:, 2]) @ basis
+    loops = np.asarray(loops).astype(int)
+    return PathBatch('helix', points1 @ basis + origin, bases, 0.0, np.pi * 2 * loops,
+                     radii=radius, pitches=distance / loops, right=right)
+
+
+def arcs_between_points(coordinate_system, points1, points2, radius=1, right=True):
+    """
+    Batch version of arc_between_two_points.
+    :param coordinate_system: Cartesian coordinate system of the points
+    :param points1: array of start points shaped Nx3
+    :param points2: array of end points shaped Nx3
+    :param radius: arcs radius (array or scalar), not less than half of the distance between the points
+    :param right: True for right-handed arcs (array or scalar)
+    :return: PathBatch of arcs
+    """
+    points1, points2, basis, origin = _points(coordinate_system, points1, points2)
+    n = points1.shape[0]
+    radius = np.broadcast_to(np.asarray(radius, dtype=np.double), (n,))
+    right = np.broadcast_to(np.asarray(right, dtype=bool), (n,))
+    global_points = np.stack((points1, points2), axis=1) @ basis + origin
+    direction = points2 - points1
+    distance = np.sqrt(np.sum(direction * direction, axis=1))
+    r_theta_phi = np.asarray(transforms.cartesian_to_spherical(direction))
+    bases = _rotation_y(r_theta_phi[:, 1] + np.pi / 2) @ _rotation_z(r_theta_phi[:, 2]) @ basis
+    x_offset = -distance / 2
+    y_offset = np.sqrt(radius ** 2 - x_offset ** 2)
+    y_offset = np.where(right, -y_offset, y_offset)
+    offsets = np.stack((x_offset, y_offset, np.zeros(n)), axis=1)
+    origins = np.einsum('ni,nij->nj', offsets, bases) + global_points[:, 0]
+    local_points = np.einsum('nkj,nij->nki', global_points - origins[:, np.newaxis, :], bases)
+    phi = np.asarray(transforms.cartesian_to_spherical(np.ascontiguousarray(local_points.reshape(-1, 3))))
+    phi = phi[:, 2].reshape(n, 2)
+    phi = np.where(right[:, np.newaxis], phi, 2 * np.pi - phi)
+    return PathBatch('arc', origins, bases, phi[:, 0], phi[:, 1], radii=radius, right=right)
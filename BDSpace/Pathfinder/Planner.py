@@ -0,0 +1,270 @@
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+from BDSpace import SpaceIndex
+from BDSpace.Index import tree_state
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import Line, Arc
+from BDSpace.Figure import Figure
+from ._astar import astar
+
+
+_cache = weakref.WeakKeyDictionary()  # root Space -> grids of the scene ordered by last use
+_CACHE_SIZE = 16
+_BLOCK = 8  # voxels along each axis of the blocks culled by the scene index
+
+
+class OccupancyGrid(object):
+    """
+    Voxel occupancy model of the figures of a Space tree in global coordinate system.
+    A voxel is blocked if a figure contains its center or comes closer to the center than the clearance
+    plus half of the voxel diagonal, so every point of a free voxel keeps the clearance from the figures
+    (within accuracy of the figures signed distances). Points outside the grid box are blocked.
+    """
+
+    def __init__(self, scene, voxel_size, box=None, clearance=0.0, max_voxels=20000000):
+        """
+        :param scene: root Space of the scene or its SpaceIndex
+        :param voxel_size: edge length of the cubic voxels
+        :param box: 2x3 array of the grid box corners, by default the scene bounding box
+                    inflated by the clearance and two voxels
+        :param clearance: minimal distance from the figures
+        :param max_voxels: maximal number of voxels of the grid
+        """
+        index = scene if isinstance(scene, SpaceIndex) else SpaceIndex(scene)
+        if voxel_size <= 0 or clearance < 0:
+            raise ValueError('Voxel size must be positive and clearance non-negative')
+        if box is None:
+            box = index.bounding_box()
+            if box is None or not np.all(np.isfinite(box)):
+                raise ValueError('Scene has no finite bounding box, please provide the grid box')
+            box = np.array(box) + np.array([[-1.0], [1.0]]) * (clearance + 2 * voxel_size)
+        box = np.array(box, dtype=np.double)
+        self.voxel_size = float(voxel_size)
+        self.clearance = float(clearance)
+        self.shape = tuple(int(n) for n in np.maximum(np.ceil((box[1] - box[0]) / voxel_size), 1))
+        if np.prod(self.shape, dtype=np.float64) > max_voxels:
+            raise ValueError('Occupancy grid of %s voxels exceeds the limit, increase the voxel size' % str(self.shape))
+        self.origin = box[0]
+        self.box = np.array([box[0], box[0] + voxel_size * np.array(self.shape)])
+        self.blocked = self.__occupancy(index)
+        self.blocked.flags.writeable = False
+
+    def __occupancy(self, index):
+        blocked = np.zeros(self.shape, dtype=np.uint8)
+        margin = self.clearance + 0.5 * np.sqrt(3.0) * self.voxel_size
+        blocks_shape = tuple(-(-n // _BLOCK) for n in self.shape)
+        blocks = np.stack(np.meshgrid(*[np.arange(n) for n in blocks_shape], indexing='ij'),
+                          axis=-1).reshape(-1, 3)
+        lo = self.origin + blocks * _BLOCK * self.voxel_size - margin
+        hi = self.origin + (blocks + 1) * _BLOCK * self.voxel_size + margin
+        block_hits, items = index.query_boxes(np.stack((lo, hi), axis=1))
+        offsets = np.stack(np.meshgrid(*[np.arange(_BLOCK)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+        for item in np.unique(items):
+            figure = index.items[item]
+            if not isinstance(figure, Figure):
+                continue
+            if any(figure is operand for operand in getattr(figure.parent, 'operands', ())):
+                continue
+            ijk = (blocks[block_hits[items == item]][:, np.newaxis, :] * _BLOCK + offsets).reshape(-1, 3)
+            ijk = ijk[np.all(ijk < self.shape, axis=1)]
+            free = ~blocked[ijk[:, 0], ijk[:, 1], ijk[:, 2]].astype(bool)
+            ijk = ijk[free]
+            centers = self.centers(ijk)
+            hit = np.asarray(figure.contains(centers)).astype(bool)
+            hit |= np.asarray(figure.signed_distance(centers)) <= margin
+            blocked[ijk[hit, 0], ijk[hit, 1], ijk[hit, 2]] = 1
+        return blocked
+
+    def centers(self, ijk):
+        """
+        Centers of voxels with given integer indices shaped Nx3.
+        """
+        return self.origin + (np.asarray(ijk) + 0.5) * self.voxel_size
+
+    def voxels(self, xyz):
+        """
+        Integer indices of voxels containing the points, -1 for points outside the grid.
+        """
+        ijk = np.floor((np.asarray(xyz, dtype=np.double).reshape(-1, 3) - self.origin) / self.voxel_size)
+        outside = np.any((ijk < 0) | (ijk >= self.shape), axis=1)
+        ijk = ijk.astype(np.int_)
+        ijk[outside] = -1
+        return ijk
+
+    def is_free(self, xyz):
+        """
+        Checks which points lie in free voxels.
+        :param xyz: array of points in global coordinate system shaped Nx3
+        :return: boolean mask array
+        """
+        ijk = self.voxels(xyz)
+        free = ijk[:, 0] >= 0
+        free[free] = self.blocked[ijk[free, 0], ijk[free, 1], ijk[free, 2]] == 0
+        return free
+
+    def _polylines_free(self, points, owners, num):
+        """
+        Checks batches of sampled curves: points of curve i are points[owners == i].
+        """
+        free = self.is_free(points)
+        return np.bincount(owners, weights=~free, minlength=num) == 0
+
+    def segments_free(self, starts, ends):
+        """
+        Checks which segments pass through free voxels only. All segments are sampled in one batch
+        with the step of a quarter of the voxel size.
+        :param starts: array of segments start points shaped Nx3
+        :param ends: array of segments end points shaped Nx3
+        :return: boolean mask array
+        """
+        starts = np.asarray(starts, dtype=np.double).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=np.double).reshape(-1, 3)
+        lengths = np.sqrt(np.sum((ends - starts) ** 2, axis=1))
+        counts = np.ceil(lengths / (0.25 * self.voxel_size)).astype(np.int_) + 1
+        owners = np.repeat(np.arange(starts.shape[0]), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        fraction = (np.arange(owners.size) - first) / np.maximum(counts[owners] - 1, 1)
+        points = starts[owners] + fraction[:, np.newaxis] * (ends - starts)[owners]
+        return self._polylines_free(points, owners, starts.shape[0])
+
+
+def occupancy_grid(scene, voxel_size, box=None, clearance=0.0):
+    """
+    Occupancy grid of the scene cached between queries until any space of the scene
+    or its coordinate system changes. See OccupancyGrid for the parameters.
+    """
+    space = scene.space if isinstance(scene, SpaceIndex) else scene
+    options = (voxel_size, clearance, None if box is None else tuple(np.ravel(box).tolist()))
+    state = tree_state(space)
+    grids = _cache.setdefault(space, OrderedDict())
+    entry = grids.get(options)
+    if entry is not None and entry[0] == state:
+        grids.move_to_end(options)
+        return entry[1]
+    grid = OccupancyGrid(scene, voxel_size, box=box, clearance=clearance)
+    grids[options] = (state, grid)
+    if len(grids) > _CACHE_SIZE:
+        grids.popitem(last=False)
+    return grid
+
+
+def _shortcut(grid, points):
+    """
+    Removes path vertices while the straight segments stay in free voxels: from each kept vertex
+    the farthest visible vertex is found with one batched check of all candidate segments.
+    """
+    kept = [0]
+    i = 0
+    while i < points.shape[0] - 1:
+        candidates = np.arange(i + 1, points.shape[0])
+        free = grid.segments_free(np.repeat(points[i:i + 1], candidates.size, axis=0), points[candidates])
+        free[0] = True
+        i = candidates[np.flatnonzero(free)[-1]]
+        kept.append(i)
+    return points[kept]
+
+
+def _fillets(grid, points, corner_radius):
+    """
+    Rounds interior vertices of the polyline by arcs tangent to both adjacent segments.
+    Radius is limited so that arcs take at most half of each segment, arcs leaving free voxels
+    are shrunk by halving the radius and dropped after several attempts.
+    :return: tuple of tangent distances from the vertices, arcs radii, centers, turning angles,
+             unit directions of incoming and outgoing segments and unit normals towards the arcs centers
+    """
+    n = points.shape[0] - 2
+    incoming = points[1:-1] - points[:-2]
+    outgoing = points[2:] - points[1:-1]
+    lengths_in = np.sqrt(np.sum(incoming ** 2, axis=1))
+    lengths_out = np.sqrt(np.sum(outgoing ** 2, axis=1))
+    u1 = incoming / lengths_in[:, np.newaxis]
+    u2 = outgoing / lengths_out[:, np.newaxis]
+    cos_angle = np.clip(np.sum(u1 * u2, axis=1), -1.0, 1.0)
+    angles = np.arccos(cos_angle)
+    normal = u2 - cos_angle[:, np.newaxis] * u1
+    normal_length = np.sqrt(np.sum(normal ** 2, axis=1))
+    turning = (angles > 1e-9) & (normal_length > 1e-12)
+    normal[turning] /= normal_length[turning, np.newaxis]
+    half_tan = np.tan(0.5 * angles)
+    # inner segments are shared by two arcs, the first and the last segments by one
+    share_in = np.full(n, 0.5)
+    share_in[0] = 1.0
+    share_out = np.full(n, 0.5)
+    share_out[-1] = 1.0
+    available = np.minimum(share_in * lengths_in, share_out * lengths_out)
+    radii = np.where(turning, np.minimum(corner_radius, available / np.where(turning, half_tan, 1.0)), 0.0)
+    samples = np.linspace(0.0, 1.0, 17)
+    for attempt in range(7):
+        check = np.flatnonzero(radii > 0)
+        if check.size == 0:
+            break
+        tangent_points = points[1:-1][check] - u1[check] * (radii[check] * half_tan[check])[:, np.newaxis]
+        centers = tangent_points + normal[check] * radii[check, np.newaxis]
+        t = angles[check, np.newaxis] * samples
+        arc_points = (centers[:, np.newaxis, :]
+                      + radii[check, np.newaxis, np.newaxis] * (-np.cos(t)[:, :, np.newaxis] * normal[check, np.newaxis]
+                                                                + np.sin(t)[:, :, np.newaxis] * u1[check, np.newaxis]))
+        free = grid._polylines_free(arc_points.reshape(-1, 3), np.repeat(np.arange(check.size), samples.size),
+                                    check.size)
+        if np.all(free):
+            break
+        radii[check[~free]] = 0.0 if attempt == 6 else 0.5 * radii[check[~free]]
+    distances = radii * half_tan
+    centers = points[1:-1] - u1 * distances[:, np.newaxis] + normal * radii[:, np.newaxis]
+    return distances, radii, centers, angles, u1, u2, normal
+
+
+def plan_path(scene, start, goal, voxel_size, box=None, clearance=0.0, corner_radius=0.0):
+    """
+    Plans a route between two points avoiding figures of the scene. A* search runs over the cached occupancy
+    grid of the scene, the voxel path is straightened by removing vertices while the segments stay free,
+    then the corners are optionally rounded by arcs.
+    :param scene: root Space of the scene or its SpaceIndex
+    :param start: start point in global coordinate system
+    :param goal: goal point in global coordinate system
+    :param voxel_size: edge length of the occupancy grid voxels
+    :param box: 2x3 array of the grid box corners, by default the scene bounding box inflated by the clearance
+    :param clearance: minimal distance from the figures
+    :param corner_radius: radius of arcs rounding the corners of the route, 0 for sharp corners
+    :return: list of Line and Arc curves in global coordinate system forming the route, None if no route exists
+    """
+    grid = occupancy_grid(scene, voxel_size, box=box, clearance=clearance)
+    ends = np.array([start, goal], dtype=np.double).reshape(2, 3)
+    voxels = grid.voxels(ends)
+    if not np.all(grid.is_free(ends)):
+        raise ValueError('Start and goal points must be inside the grid box and keep the clearance from figures')
+    flat = np.ravel_multi_index(tuple(voxels.T), grid.shape)
+    path = np.asarray(astar(grid.blocked, flat[0], flat[1]))
+    if path.size == 0:
+        return None
+    points = grid.centers(np.column_stack(np.unravel_index(path, grid.shape)))
+    points = np.vstack((ends[0], points[1:-1], ends[1])) if path.size > 1 else ends
+    points = _shortcut(grid, points)
+    distances = np.zeros(points.shape[0] - 2)
+    if corner_radius > 0 and points.shape[0] > 2:
+        distances, radii, centers, angles, u1, u2, normal = _fillets(grid, points, corner_radius)
+    curves = []
+    position = points[0]
+    for i in range(1, points.shape[0]):
+        end = points[i]
+        if i < points.shape[0] - 1:
+            end = points[i] - distances[i - 1] * u1[i - 1] if distances[i - 1] > 0 else points[i]
+        direction = end - position
+        length = np.sqrt(np.dot(direction, direction))
+        if length > 1e-12:
+            direction /= length
+            curves.append(Line(name='Route segment %d' % len(curves), origin=np.copy(position),
+                               a=direction[0], b=direction[1], c=direction[2], start=0.0, stop=length))
+        position = end
+        if i < points.shape[0] - 1 and distances[i - 1] > 0:
+            x_axis = -normal[i - 1]
+            y_axis = u1[i - 1]
+            basis = np.array([x_axis, y_axis, np.cross(x_axis, y_axis)])
+            coordinate_system = Cartesian(basis=basis, origin=np.copy(centers[i - 1]),
+                                          name='Route arc coordinate system')
+            curves.append(Arc(name='Route arc %d' % len(curves), coordinate_system=coordinate_system,
+                              a=radii[i - 1], b=radii[i - 1], start=0.0, stop=angles[i - 1], right=True))
+            position = points[i] + distances[i - 1] * u2[i - 1]
+    return curves
@@ -3,6 +3,8 @@ import numpy as np
 from BDSpace.Coordinates import Cartesian, transforms
 from BDSpace.Coordinates.transforms import unit_vector
 from BDSpace.Curve import Line, Arc, Helix
+from .Batch import PathBatch, lines_between_points, helices_between_points, arcs_between_points
+from .Planner import OccupancyGrid, occupancy_grid, plan_path
 
 
 def line_between_two_points(coordinate_system, point1, point2):
@@ -0,0 +1 @@
+cpdef long[:] astar(const unsigned char[:, :, ::1] blocked, long start, long goal)
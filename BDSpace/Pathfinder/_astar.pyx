@@ -0,0 +1,140 @@
+import numpy as np
+
+from cython import boundscheck, wraparound
+
+from libc.math cimport sqrt, INFINITY
+
+
+# 26 moves to neighbour voxels and voxels which a move touches (the move itself included),
+# a move is allowed only if all of them are free, so diagonal moves never cut corners of obstacles
+_MOVES = np.array([[i, j, k] for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)
+                   if i != 0 or j != 0 or k != 0], dtype=np.intc)
+_TOUCHED = np.array([[[move[0] * (mask & 1), move[1] * ((mask >> 1) & 1), move[2] * ((mask >> 2) & 1)]
+                      for mask in range(1, 8)] for move in _MOVES], dtype=np.intc)
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef inline void _sift_up(double[::1] keys, long[::1] items, long position):
+    cdef:
+        long parent
+        double key = keys[position]
+        long item = items[position]
+    while position > 0:
+        parent = (position - 1) // 2
+        if keys[parent] <= key:
+            break
+        keys[position] = keys[parent]
+        items[position] = items[parent]
+        position = parent
+    keys[position] = key
+    items[position] = item
+
+
+@boundscheck(False)
+@wraparound(False)
+cdef inline void _sift_down(double[::1] keys, long[::1] items, long size):
+    cdef:
+        long position = 0, child
+        double key = keys[0]
+        long item = items[0]
+    while True:
+        child = 2 * position + 1
+        if child >= size:
+            break
+        if child + 1 < size and keys[child + 1] < keys[child]:
+            child += 1
+        if keys[child] >= key:
+            break
+        keys[position] = keys[child]
+        items[position] = items[child]
+        position = child
+    keys[position] = key
+    items[position] = item
+
+
+@boundscheck(False)
+@wraparound(False)
+cpdef long[:] astar(const unsigned char[:, :, ::1] blocked, long start, long goal):
+    """
+    Finds the shortest path between two free voxels of the occupancy grid by A* search
+    over 26-connected voxels with Euclidean move costs and the Euclidean distance heuristic.
+    :param blocked: occupancy grid, nonzero for blocked voxels
+    :param start: flat index of the start voxel
+    :param goal: flat index of the goal voxel
+    :return: array of flat indices of the path voxels from start to goal, empty if the goal is unreachable
+    """
+    cdef:
+        int nx = blocked.shape[0], ny = blocked.shape[1], nz = blocked.shape[2]
+        long n = <long> nx * ny * nz, size = 0, node, neighbour, capacity = 1024
+        int x, y, z, gx, gy, gz, m, k, tx, ty, tz
+        bint allowed
+        double cost, dx, dy, dz
+        int[:, ::1] moves = _MOVES
+        int[:, :, ::1] touched = _TOUCHED
+        double[::1] move_costs = np.sqrt(np.sum(_MOVES * _MOVES, axis=1).astype(np.double))
+        double[::1] g = np.full(n, INFINITY, dtype=np.double)
+        long[::1] parents = np.full(n, -1, dtype=np.int_)
+        unsigned char[::1] closed = np.zeros(n, dtype=np.uint8)
+        double[::1] keys = np.empty(capacity, dtype=np.double)
+        long[::1] items = np.empty(capacity, dtype=np.int_)
+    gx = goal // (ny * nz)
+    gy = (goal // nz) % ny
+    gz = goal % nz
+    g[start] = 0.0
+    keys[0] = 0.0
+    items[0] = start
+    size = 1
+    while size > 0:
+        node = items[0]
+        size -= 1
+        if size > 0:
+            keys[0] = keys[size]
+            items[0] = items[size]
+            _sift_down(keys, items, size)
+        if closed[node]:
+            continue
+        closed[node] = 1
+        if node == goal:
+            break
+        x = node // (ny * nz)
+        y = (node // nz) % ny
+        z = node % nz
+        for m in range(26):
+            allowed = True
+            for k in range(7):
+                tx = x + touched[m, k, 0]
+                ty = y + touched[m, k, 1]
+                tz = z + touched[m, k, 2]
+                if tx < 0 or tx >= nx or ty < 0 or ty >= ny or tz < 0 or tz >= nz or blocked[tx, ty, tz]:
+                    allowed = False
+                    break
+            if not allowed:
+                continue
+            neighbour = (<long> (x + moves[m, 0]) * ny + y + moves[m, 1]) * nz + z + moves[m, 2]
+            if closed[neighbour]:
+                continue
+            cost = g[node] + move_costs[m]
+            if cost >= g[neighbour]:
+                continue
+            g[neighbour] = cost
+            parents[neighbour] = node
+            if size == capacity:
+                capacity *= 2
+                keys = np.resize(np.asarray(keys), capacity)
+                items = np.resize(np.asarray(items), capacity)
+            dx = x + moves[m, 0] - gx
+            dy = y + moves[m, 1] - gy
+            dz = z + moves[m, 2] - gz
+            keys[size] = cost + sqrt(dx * dx + dy * dy + dz * dz)
+            items[size] = neighbour
+            _sift_up(keys, items, size)
+            size += 1
+    if not closed[goal]:
+        return np.zeros(0, dtype=np.int_)
+    path = [goal]
+    node = goal
+    while node != start:
+        node = parents[node]
+        path.append(node)
+    return np.array(path[::-1], dtype=np.int_)
@@ -0,0 +1,362 @@
+import pickle
+import struct
+
+import numpy as np
+
+from BDSpace.Space import Space, _restore_space
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import ParametricCurve
+from ._version import __version__
+
+
+SCENE_FORMAT_VERSION = 1
+_MAGIC = b'BDSCENE\0'
+_PREFIX = struct.Struct('<8sIIQQ')  # magic, format version, reserved, header length, data offset
+_ALIGNMENT = 64
+_LINKS = ('coordinate_system', 'parent', 'elements')
+
+
+class _ArrayWriter(object):
+    """
+    Collects arrays of the scene file and assigns them aligned offsets in the data block.
+    """
+
+    def __init__(self):
+        self.arrays = []
+        self.table = {}
+        self.size = 0
+
+    def add(self, array):
+        array = np.ascontiguousarray(array)
+        name = len(self.arrays)
+        self.table[name] = (array.dtype.str, array.shape, self.size)
+        self.arrays.append(array)
+        self.size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+        return name
+
+
+def _is_number(value):
+    return isinstance(value, (bool, int, float, np.bool_, np.integer, np.floating))
+
+
+def _is_space_list(value):
+    return isinstance(value, (list, tuple)) and all(isinstance(item, Space) for item in value)
+
+
+def _encode(values, writer, index):
+    """
+    Encodes a column of values of the class table: numbers and equally shaped arrays are stacked,
+    arrays of different lengths are concatenated with offsets, spaces are replaced by node indices,
+    tuples are split into columns and everything else is pickled with the header.
+    :return: column specification
+    """
+    if all(value is None or isinstance(value, Space) for value in values) \
+            and any(value is not None for value in values):
+        return 'ref', writer.add(np.array([-1 if value is None else index[id(value)] for value in values],
+                                          dtype=np.int64))
+    if all(_is_space_list(value) for value in values) and any(len(value) > 0 for value in values):
+        offsets = np.cumsum([0] + [len(value) for value in values], dtype=np.int64)
+        data = np.array([index[id(item)] for value in values for item in value], dtype=np.int64)
+        return 'refs', writer.add(data), writer.add(offsets)
+    if all(_is_number(value) for value in values):
+        return 'scalar', writer.add(np.array(values))
+    if all(isinstance(value, np.ndarray) and value.dtype.kind in 'biuf' and value.ndim > 0 for value in values):
+        shapes = set(value.shape for value in values)
+        dtypes = set(value.dtype for value in values)
+        if len(dtypes) == 1:
+            if len(shapes) == 1:
+                return 'stacked', writer.add(np.stack(values))
+            if len(set(shape[1:] for shape in shapes)) == 1:
+                offsets = np.cumsum([0] + [value.shape[0] for value in values], dtype=np.int64)
+                return 'ragged', writer.add(np.concatenate(values)), writer.add(offsets)
+    if all(isinstance(value, tuple) for value in values) and len(set(len(value) for value in values)) == 1:
+        return 'tuple', [_encode([value[i] for value in values], writer, index) for i in range(len(values[0]))]
+    return 'object', list(values)
+
+
+class SceneFile(object):
+    """
+    Space tree saved to the binary scene file, see save_scene.
+    Arrays of the file are memory-mapped and the spaces are built on demand,
+    so loading one subtree reads and deserializes only the nodes it needs.
+    The header of the file (classes, names and parameters which are not arrays) is pickled,
+    so opening a file may execute arbitrary code: only open scene files from trusted sources.
+    """
+
+    def __init__(self, path, mmap=True):
+        """
+        :param path: path to the scene file
+        :param mmap: memory-map arrays of the file instead of reading them to memory
+        """
+        with open(path, 'rb') as f:
+            magic, version, _, header_length, data_offset = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != _MAGIC:
+                raise ValueError('%s is not a BDSpace scene file' % path)
+            if version > SCENE_FORMAT_VERSION:
+                raise ValueError('Scene file format version %d is not supported, maximal version is %d'
+                                 % (version, SCENE_FORMAT_VERSION))
+            header = pickle.loads(f.read(header_length))
+        if mmap:
+            # plain ndarray view of the map avoids memmap bookkeeping on every slice
+            self.__data = np.memmap(path, dtype=np.uint8, mode='r').view(np.ndarray)
+        else:
+            self.__data = np.fromfile(path, dtype=np.uint8)
+        self.__path = path
+        self.__version = version
+        self.__data_offset = data_offset
+        self.__arrays = header['arrays']
+        self.__names = header['names']
+        self.__coordinate_systems = header['coordinate_systems']
+        self.__tables = header['tables']
+        self.__nodes = {key: self.__array(name) for key, name in header['nodes'].items()}
+        self.__spaces = {}
+        self.__building = set()
+        self.__pending = {}
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def version(self):
+        return self.__version
+
+    @property
+    def names(self):
+        return list(self.__names)
+
+    def __len__(self):
+        return len(self.__names)
+
+    def __array(self, name):
+        dtype, shape, offset = self.__arrays[name]
+        dtype = np.dtype(dtype)
+        start = self.__data_offset + offset
+        count = int(np.prod(shape, dtype=np.int64))
+        return self.__data[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+
+    def __decode(self, column, row):
+        kind = column[0]
+        if kind == 'scalar':
+            return self.__array(column[1])[row].item()
+        if kind == 'stacked':
+            return np.array(self.__array(column[1])[row])
+        if kind == 'ragged':
+            offsets = self.__array(column[2])
+            return np.array(self.__array(column[1])[offsets[row]:offsets[row + 1]])
+        if kind == 'ref':
+            node = int(self.__array(column[1])[row])
+            return None if node < 0 else self.__require(node)
+        if kind == 'refs':
+            offsets = self.__array(column[2])
+            return [self.__require(int(node)) for node in self.__array(column[1])[offsets[row]:offsets[row + 1]]]
+        if kind == 'tuple':
+            return tuple(self.__decode(item, row) for item in column[1])
+        return column[1][row]
+
+    def children(self, node):
+        """
+        Indices of the nodes whose parent is the given node.
+        :param node: node index
+        :return: array of node indices
+        """
+        end = int(self.__nodes['end'][node])
+        return node + 1 + np.flatnonzero(self.__nodes['parent'][node + 1:end] == node)
+
+    def find(self, path):
+        """
+        Index of the node given by the path of names from the root of the scene.
+        :param path: sequence of names or string of names separated by '/', the first name is the root name
+        :return: node index
+        """
+        if isinstance(path, str):
+            path = path.split('/')
+        path = list(path)
+        if not path or path[0] != self.__names[0]:
+            raise KeyError('Scene has no node %s' % '/'.join(path))
+        node = 0
+        for name in path[1:]:
+            for child in self.children(node):
+                if self.__names[child] == name:
+                    node = int(child)
+                    break
+            else:
+                raise KeyError('Scene has no node %s' % '/'.join(path))
+        return node
+
+    def __require(self, node):
+        """
+        Builds the node with its ancestors and the spaces it references, without its subtree.
+        """
+        if node in self.__spaces:
+            return self.__spaces[node]
+        self.__building.add(node)
+        table = self.__tables[int(self.__nodes['table'][node])]
+        row = int(self.__nodes['row'][node])
+        sections = {}
+        for (section, key), column in table['columns'].items():
+            sections.setdefault(section, {})[key] = self.__decode(column, row)
+        space = _restore_space(table['class'], table['initializer'],
+                               sections.get('parameters', {}), sections.get('attributes', {}))
+        name, labels, euler_angles_convention = self.__coordinate_systems[int(self.__nodes['cs'][node])]
+        coordinate_system = Cartesian(None, np.array(self.__nodes['origin'][node]), name, labels,
+                                      euler_angles_convention)
+        coordinate_system.__setstate__(np.array(self.__nodes['rotation'][node]))
+        state = dict(sections.get('state', {}), coordinate_system=coordinate_system, parent=None, elements=[])
+        space.__setstate__(state)
+        if 'cache' in sections:
+            space._restore_mesh_cache({key: value for key, value in sections['cache'].items()
+                                       if value is not None})
+        self.__spaces[node] = space
+        self.__building.discard(node)
+        for element in self.__pending.pop(node, []):
+            space.add_element(element)
+        # operands of a CSG figure are built while the figure is built, they are linked when it is ready
+        parent = int(self.__nodes['parent'][node])
+        if parent in self.__building:
+            self.__pending.setdefault(parent, []).append(space)
+        elif parent >= 0:
+            self.__require(parent).add_element(space)
+        return space
+
+    def load(self, path=None):
+        """
+        Builds the node with its whole subtree. Its ancestors and the spaces referenced by the subtree
+        (e.g. fields of a SuperposedField) are built too, so global coordinates in the subtree are the same
+        as in the saved scene, while other branches of the scene are not read.
+        Nodes are built once, loading of overlapping subtrees returns the same objects.
+        :param path: node index, path of names (see find) or None for the root
+        :return: Space object
+        """
+        if path is None:
+            node = 0
+        elif isinstance(path, (int, np.integer)):
+            node = int(path)
+        else:
+            node = self.find(path)
+        for subnode in range(node, int(self.__nodes['end'][node])):
+            self.__require(subnode)
+        return self.__spaces[node]
+
+    @property
+    def root(self):
+        return self.load()
+
+    def close(self):
+        """
+        Releases the memory map of the file, the spaces built already stay valid.
+        """
+        self.__data = None
+        self.__nodes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _preorder(space, nodes, index):
+    index[id(space)] = len(nodes)
+    nodes.append(space)
+    for element in space.elements.values():
+        _preorder(element, nodes, index)
+
+
+def save_scene(space, path, mesh_cache=True):
+    """
+    Saves the Space tree to the versioned binary scene file.
+    Transforms of all nodes are stored in flat arrays, parameters of the nodes in columns of a table
+    per class, so thousands of similar nodes take a few arrays. Spaces referenced by the nodes but
+    located outside the tree (e.g. pieces of a CompositeCurve) are saved with their own trees.
+    Callables of vectorized curves and fields must be picklable.
+    :param space: root Space of the tree
+    :param path: path to the file
+    :param mesh_cache: build and save mesh trees and arc-length tables of the curves,
+                       so loading does not repeat the adaptive meshing
+    """
+    nodes, index, records = [], {}, []
+    _preorder(space, nodes, index)
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        if mesh_cache and isinstance(node, ParametricCurve):
+            node.length_table  # builds the mesh tree and the arc-length table unless they are cached
+        initializer, parameters = node._pickle_parameters()
+        state = node._pickle_state()
+        attributes = state.pop('attributes')
+        record = {('parameters', key): value for key, value in parameters.items()}
+        record.update({('attributes', key): value for key, value in attributes.items()})
+        record.update({('state', key): value for key, value in state.items() if key not in _LINKS})
+        if isinstance(node, ParametricCurve):
+            record.update({('cache', key): value for key, value in node._mesh_cache().items()})
+        records.append((type(node), initializer, record))
+        for value in list(parameters.values()) + list(state.values()):
+            for item in (value if _is_space_list(value) else [value]):
+                if isinstance(item, Space) and id(item) not in index:
+                    while item.parent is not None:
+                        item = item.parent
+                    _preorder(item, nodes, index)
+        i += 1
+    n = len(nodes)
+    parents = np.array([-1 if node.parent is None or id(node.parent) not in index else index[id(node.parent)]
+                        for node in nodes], dtype=np.int64)
+    ends = np.arange(1, n + 1, dtype=np.int64)
+    for i in range(n - 1, -1, -1):
+        if parents[i] >= 0:
+            ends[parents[i]] = max(ends[parents[i]], ends[i])
+    writer = _ArrayWriter()
+    coordinate_systems, cs_index, cs_nodes = [], {}, np.empty(n, dtype=np.int32)
+    origins, rotations = np.empty((n, 3), dtype=np.double), np.empty((n, 4), dtype=np.double)
+    for i, node in enumerate(nodes):
+        _, arguments, quadruple = node.coordinate_system.__reduce__()
+        key = pickle.dumps(arguments[2:])
+        if key not in cs_index:
+            cs_index[key] = len(coordinate_systems)
+            coordinate_systems.append(arguments[2:])
+        cs_nodes[i] = cs_index[key]
+        origins[i] = arguments[1]
+        rotations[i] = quadruple
+    tables, table_index = [], {}
+    node_tables, node_rows = np.empty(n, dtype=np.int32), np.empty(n, dtype=np.int64)
+    groups = {}
+    for i, (cls, initializer, record) in enumerate(records):
+        key = (cls, initializer)
+        if key not in table_index:
+            table_index[key] = len(groups)
+            groups[key] = []
+        node_tables[i] = table_index[key]
+        node_rows[i] = len(groups[key])
+        groups[key].append(record)
+    for (cls, initializer), group in groups.items():
+        keys = []
+        for record in group:
+            keys.extend(key for key in record if key not in keys)
+        columns = {key: _encode([record.get(key) for record in group], writer, index) for key in keys}
+        tables.append({'class': cls, 'initializer': initializer, 'columns': columns})
+    header = {'library': __version__, 'names': [node.name for node in nodes],
+              'coordinate_systems': coordinate_systems, 'tables': tables,
+              'nodes': {'parent': writer.add(parents), 'end': writer.add(ends), 'table': writer.add(node_tables),
+                        'row': writer.add(node_rows), 'cs': writer.add(cs_nodes),
+                        'origin': writer.add(origins), 'rotation': writer.add(rotations)},
+              'arrays': writer.table}
+    header = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)
+    data_offset = -(-(_PREFIX.size + len(header)) // _ALIGNMENT) * _ALIGNMENT
+    with open(path, 'wb') as f:
+        f.write(_PREFIX.pack(_MAGIC, SCENE_FORMAT_VERSION, 0, len(header), data_offset))
+        f.write(header)
+        for name, array in enumerate(writer.arrays):
+            f.seek(data_offset + writer.table[name][2])
+            f.write(array.tobytes())
+        f.truncate(data_offset + writer.size)
+
+
+def load_scene(path, mmap=True):
+    """
+    Opens the scene file saved by save_scene, spaces are built on demand by SceneFile.load.
+    The file header is unpickled, only load scene files from trusted sources.
+    :param path: path to the file
+    :param mmap: memory-map arrays of the file instead of reading them to memory
+    :return: SceneFile object
+    """
+    return SceneFile(path, mmap=mmap)
@@ -7,14 +7,22 @@ cdef class Space(object):
 
         Space __parent
         dict __elements
+        object __bounding_box
+        tuple __bounding_box_state
+        unsigned long long __version
+        object __weakref__
 
     cpdef bint add_element(self, Space element)
     cpdef bint remove_element(self, Space element)
     cpdef void detach_from_parent(self)
     cpdef void print_tree(self, int level=*)
+    cpdef void invalidate_bounding_box(self)
 
     cpdef double[:] to_global_coordinate_system_vector(self, double[:] xyz)
     cpdef double[:, :] to_global_coordinate_system(self, double[:, :] xyz)
     cpdef Cartesian basis_in_global_coordinate_system(self)
     cpdef double[:] to_local_coordinate_system_vector(self, double[:] xyz)
     cpdef double[:, :] to_local_coordinate_system(self, double[:, :] xyz)
+
+
+cdef unsigned long long spaces_changes()
@@ -9,6 +9,42 @@ from BDSpace.Coordinates.Cartesian cimport Cartesian
 from ._version import __version__
 
 
+cdef unsigned long long _last_version = 0
+cdef unsigned long long _last_change = 0
+
+
+cdef unsigned long long _next_version():
+    global _last_version
+    _last_version += 1
+    return _last_version
+
+
+cdef unsigned long long _changed_version():
+    global _last_change
+    _last_change += 1
+    return _next_version()
+
+
+cdef unsigned long long spaces_changes():
+    """
+    Number of changes of geometry, coordinate systems and parents of all spaces.
+    While neither it nor coordinate_systems_changes grows, no global state can change.
+    """
+    return _last_change
+
+
+def _restore_space(cls, initializer, parameters, attributes):
+    """
+    Creates an instance of the Space subclass, initializes it with the constructor of its class family
+    and sets the properties which are not constructor parameters. Used for unpickling, see Space.__reduce__.
+    """
+    space = cls.__new__(cls)
+    initializer.__init__(space, **parameters)
+    for name, value in attributes.items():
+        setattr(space, name, value)
+    return space
+
+
 cdef class Space(object):
 
     def __init__(self, str name, Cartesian coordinate_system=None):
@@ -19,6 +55,9 @@ cdef class Space(object):
             self.__coordinate_system = coordinate_system
         self.__parent = None
         self.__elements = {}
+        self.__bounding_box = None
+        self.__bounding_box_state = None
+        self.__version = _next_version()
 
     @property
     def name(self):
@@ -35,6 +74,7 @@ cdef class Space(object):
     @coordinate_system.setter
     def coordinate_system(self, Cartesian coordinate_system):
         self.__coordinate_system = coordinate_system
+        self.__version = _changed_version()
 
     @property
     def parent(self):
@@ -44,6 +84,7 @@ cdef class Space(object):
     def parent(self, parent):
         if isinstance(parent, Space) or parent is None:
             self.__parent = parent
+            self.__version = _changed_version()
         else:
             raise ValueError('Only Space object or None are accepted for parent.')
 
@@ -51,6 +92,55 @@ cdef class Space(object):
     def elements(self):
         return self.__elements
 
+    @property
+    def version(self):
+        """
+        Unique version number of the Space state, it is renewed by every change of geometry or parameters
+        of the Space, of its coordinate system object or of its parent.
+        """
+        return self.__version
+
+    @property
+    def global_state(self):
+        """
+        Versions of the Space, its coordinate system and all its parents.
+        The tuple changes whenever anything defining the Space in the global coordinate system changes,
+        so it may be used as a key of cached results depending on a single Space.
+        """
+        state = (self.__version, self.__coordinate_system.version)
+        if self.__parent is None:
+            return state
+        return state + self.__parent.global_state
+
+    def _pickle_parameters(self):
+        """
+        Constructor and its keyword arguments which recreate the object on unpickling.
+        Subclasses override it to ship their parameters, cached data is rebuilt by the receiver.
+        :return: tuple of the class with the constructor and dict of keyword arguments
+        """
+        return Space, {'name': self.__name}
+
+    def _pickle_state(self):
+        """
+        State of the object on unpickling: values of the properties which are not constructor parameters,
+        which are set right after construction, then coordinate system, elements and parent.
+        Links between parents and elements are kept in the state and never in constructor parameters,
+        so pickle resolves the cyclic references of the tree without constructing objects twice.
+        """
+        return {'attributes': {}, 'coordinate_system': self.__coordinate_system, 'parent': self.__parent,
+                'elements': list(self.__elements.values())}
+
+    def __reduce__(self):
+        initializer, parameters = self._pickle_parameters()
+        state = self._pickle_state()
+        return _restore_space, (type(self), initializer, parameters, state.pop('attributes')), state
+
+    def __setstate__(self, state):
+        # the parent is pickled only to keep the tree, it links the object back when adding its elements
+        self.coordinate_system = state['coordinate_system']
+        for element in state['elements']:
+            self.add_element(element)
+
     def __str__(self):
         description = 'BDSpace: %s\n' % self.name
         description += str(self.coordinate_system)
@@ -150,6 +240,60 @@ cdef class Space(object):
             Cartesian basis_global = self.basis_in_global_coordinate_system()
         return basis_global.to_local(xyz)
 
+    def _bounding_box_local(self):
+        """
+        Axis aligned box enclosing the geometry of the Space in its local coordinate system.
+        Subclasses with geometry (figures, curves, fields) override this method.
+        :return: 2x3 array of box minimal and maximal corners, or None if the Space has no geometry
+        """
+        return None
+
+    cpdef void invalidate_bounding_box(self):
+        """
+        Marks cached bounding boxes as outdated and renews the version of the Space.
+        Must be called whenever geometry or parameters of the Space change.
+        """
+        self.__bounding_box_state = None
+        self.__version = _changed_version()
+
+    def bounding_box(self):
+        """
+        Axis aligned box enclosing the geometry of the Space in global coordinate system.
+        The box encloses the local box transformed to global coordinates and is cached
+        until the global state of the Space changes.
+        :return: read-only 2x3 array of box minimal and maximal corners, or None if the Space has no geometry
+        """
+        state = self.global_state
+        if state != self.__bounding_box_state:
+            box = self._bounding_box_local()
+            if box is not None:
+                box = np.asarray(box, dtype=np.double)
+                if np.all(np.isfinite(box)):
+                    corners = np.array([[box[i, 0], box[j, 1], box[k, 2]]
+                                        for i in (0, 1) for j in (0, 1) for k in (0, 1)], dtype=np.double)
+                    corners = np.asarray(self.to_global_coordinate_system(corners))
+                    box = np.array([corners.min(axis=0), corners.max(axis=0)])
+                else:
+                    box = np.array([[-np.inf] * 3, [np.inf] * 3])
+                box.flags.writeable = False
+            self.__bounding_box = box
+            self.__bounding_box_state = state
+        return self.__bounding_box
+
+    def distance(self, xyz):
+        """
+        Distance from points to the geometry of the Space. By default it is the distance to the bounding box,
+        subclasses provide exact or conservative estimate never exceeding the true distance.
+        :param xyz: array of points in global coordinate system shaped Nx3 (or a single 3D point)
+        :return: array of distances, zero inside
+        """
+        xyz = np.asarray(xyz, dtype=np.double).reshape(-1, 3)
+        box = self.bounding_box()
+        if box is None:
+            return np.full(xyz.shape[0], np.inf, dtype=np.double)
+        outside = np.maximum(np.maximum(box[0] - xyz, xyz - box[1]), 0.0)
+        return np.sqrt(np.sum(outside * outside, axis=1))
+
     cpdef bint add_element(self, Space element):
         if element == self:
             return False
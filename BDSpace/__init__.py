@@ -1 +1,3 @@
 from .Space import Space
+from .Index import SpaceIndex
+from .Scene import SceneFile, save_scene, load_scene
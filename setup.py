@@ -66,11 +66,76 @@ extensions = [
         ['BDSpace/Curve/Parametric.pyx'],
         depends=['BDSpace/Field/Field.pxd'],
     ),
+    Extension(
+        'BDSpace.Curve.BVH',
+        ['BDSpace/Curve/BVH.pyx'],
+        depends=['BDSpace/Curve/BVH.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure._helpers',
+        ['BDSpace/Figure/_helpers.pyx'],
+        depends=['BDSpace/Figure/_helpers.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Figure',
+        ['BDSpace/Figure/Figure.pyx'],
+        depends=['BDSpace/Figure/Figure.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Sphere',
+        ['BDSpace/Figure/Sphere.pyx'],
+        depends=['BDSpace/Figure/Sphere.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Cylinder',
+        ['BDSpace/Figure/Cylinder.pyx'],
+        depends=['BDSpace/Figure/Cylinder.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Cone',
+        ['BDSpace/Figure/Cone.pyx'],
+        depends=['BDSpace/Figure/Cone.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Torus',
+        ['BDSpace/Figure/Torus.pyx'],
+        depends=['BDSpace/Figure/Torus.pxd'],
+    ),
+    Extension(
+        'BDSpace.Figure.Cube',
+        ['BDSpace/Figure/Cube.pyx'],
+        depends=['BDSpace/Figure/Cube.pxd'],
+    ),
     Extension(
         'BDSpace.Field.CurveField',
         ['BDSpace/Field/CurveField.pyx'],
         depends=['BDSpace/Field/CurveField.pxd'],
     ),
+    Extension(
+        'BDSpace.Field.OctreeField',
+        ['BDSpace/Field/OctreeField.pyx'],
+        depends=['BDSpace/Field/OctreeField.pxd'],
+    ),
+    Extension(
+        'BDSpace.Field._tracing',
+        ['BDSpace/Field/_tracing.pyx'],
+        depends=['BDSpace/Field/_tracing.pxd'],
+    ),
+    Extension(
+        'BDSpace.Field._particles',
+        ['BDSpace/Field/_particles.pyx'],
+        depends=['BDSpace/Field/_particles.pxd'],
+    ),
+    Extension(
+        'BDSpace.Pathfinder._astar',
+        ['BDSpace/Pathfinder/_astar.pyx'],
+        depends=['BDSpace/Pathfinder/_astar.pxd'],
+    ),
+    Extension(
+        'BDSpace.Index',
+        ['BDSpace/Index.pyx'],
+        depends=['BDSpace/Index.pxd'],
+    ),
 ]
 
 copt = {'msvc': [],
@@ -154,6 +219,8 @@ setup(
         'BDSpace.Coordinates': ['*.pxd'],
         'BDSpace.Field': ['*.pxd'],
         'BDSpace.Curve': ['*.pxd'],
+        'BDSpace.Figure': ['*.pxd'],
+        'BDSpace.Pathfinder': ['*.pxd'],
     },
     install_requires=['numpy', 'scipy',
                       'BDQuaternions>=0.2.11',
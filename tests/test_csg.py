@@ -0,0 +1,88 @@
+import numpy as np
+import unittest
+
+from BDSpace import Space
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Figure.Sphere import Sphere
+from BDSpace.Figure.Cube import Cube
+from BDSpace.Figure.Cylinder import Cylinder
+from BDSpace.Figure.Torus import Torus
+from BDSpace.Figure.CSG import Union, Intersection, Difference
+
+
+class TestCSG(unittest.TestCase):
+
+    def test_contains_and_distance(self):
+        cylinder = Cylinder(r_outer=0.5, z=[0.0, 4.0], coordinate_system=Cartesian(origin=np.array([3.0, 0.0, 0.0])))
+        union = Union(figures=[Sphere(r_outer=1.0), cylinder])
+        self.assertEqual(len(union.operands), 2)
+        self.assertIs(cylinder.parent, union)
+        xyz = np.array([[0.0, 0.0, 0.0], [3.0, 0.0, 2.0], [3.0, 0.0, 5.0], [1.5, 0.0, 0.0]])
+        np.testing.assert_array_equal(union.contains(xyz), [True, True, False, False])
+        np.testing.assert_allclose(union.signed_distance(xyz), [-1.0, -0.5, 1.0, 0.5])
+        difference = Difference(figures=[Cube(a=2.0, coordinate_system=Cartesian(origin=np.array([-1.0] * 3))),
+                                         Sphere(r_outer=1.0)])
+        np.testing.assert_array_equal(difference.contains(np.array([[0.9, 0.9, 0.9], [0.5, 0.0, 0.0]])),
+                                      [True, False])
+        intersection = Intersection(figures=[Sphere(r_outer=1.0), Torus(r_torus=1.0, r_tube=[0.0, 0.25])])
+        np.testing.assert_array_equal(intersection.contains(np.array([[0.9, 0.0, 0.0], [1.1, 0.0, 0.0]])),
+                                      [True, False])
+
+    def test_compile_cache_and_empty_box(self):
+        ball = Sphere(r_outer=1.0, coordinate_system=Cartesian(origin=np.array([5.0, 0.0, 0.0])))
+        intersection = Intersection(figures=[Sphere(r_outer=1.0), ball])
+        self.assertIsNone(intersection.bounding_box())
+        self.assertEqual(intersection.volume_estimate(), (0.0, 0.0))
+        program = intersection.compile()
+        intersection.contains(np.zeros((1, 3)))
+        self.assertIs(intersection.compile(), program)
+        ball.coordinate_system.origin = np.array([1.0, 0.0, 0.0])
+        self.assertIsNot(intersection.compile(), program)
+        np.testing.assert_array_equal(intersection.contains(np.array([[0.5, 0.0, 0.0], [-0.5, 0.0, 0.0]])),
+                                      [True, False])
+        np.testing.assert_allclose(intersection.bounding_box(), [[0.0, -1.0, -1.0], [1.0, 1.0, 1.0]])
+
+    def test_nested_in_space(self):
+        scene = Space('Scene', coordinate_system=Cartesian(origin=np.array([10.0, 0.0, 0.0])))
+        inner = Union(figures=[Sphere(r_outer=1.0),
+                               Sphere(r_outer=1.0, coordinate_system=Cartesian(origin=np.array([1.5, 0.0, 0.0])))])
+        outer = Difference(figures=[inner, Cube(a=4.0, coordinate_system=Cartesian(origin=np.array([0.75, -2.0, 0.0])))])
+        scene.add_element(outer)
+        xyz = np.array([[10.0, 0.0, -0.5], [11.0, 0.0, 0.5], [12.0, 0.0, -0.5], [11.5, 0.0, -0.99]])
+        np.testing.assert_array_equal(outer.contains(xyz), [True, False, True, True])
+        self.assertRaises(ValueError, Union(figures=[Union()]).compile)
+
+    def test_volume_and_surface_area(self):
+        sphere = Sphere(r_outer=1.0)
+        cube = Cube(a=2.0, coordinate_system=Cartesian(origin=np.array([-1.0, -1.0, -1.0])))
+        intersection = Intersection(figures=[sphere, cube])
+        volume, error = intersection.volume_estimate()
+        self.assertLess(error, 1e-2)
+        self.assertAlmostEqual(volume, 4 / 3 * np.pi, delta=max(4 * error, 1e-3))
+        area, error = intersection.surface_area_estimate()
+        self.assertAlmostEqual(area, 4 * np.pi, delta=max(4 * error, 1e-2))
+        self.assertAlmostEqual(intersection.volume(), volume)
+        cylinder = Cylinder(r_outer=0.5, z=[0.0, 4.0], coordinate_system=Cartesian(origin=np.array([3.0, 0.0, 0.0])))
+        union = Union(figures=[Sphere(r_outer=1.0), cylinder])
+        volume, error = union.volume_estimate()
+        self.assertAlmostEqual(volume, 4 / 3 * np.pi + np.pi, delta=4 * error)
+        self.assertEqual(union.volume_estimate(), (volume, error))
+        cylinder.r_outer = 1.0
+        volume, error = union.volume_estimate()
+        self.assertAlmostEqual(volume, 4 / 3 * np.pi + 4 * np.pi, delta=4 * error)
+        difference = Difference(figures=[Cube(a=1.0), Sphere(r_outer=1.0)])
+        self.assertAlmostEqual(difference.volume(), 1 - np.pi / 6, places=3)
+
+    def test_sample_volume(self):
+        union = Union(figures=[Sphere(r_outer=1.0),
+                               Sphere(r_outer=0.5, coordinate_system=Cartesian(origin=np.array([3.0, 0.0, 0.0])))])
+        xyz = np.vstack(list(union.sample_volume(20000, chunk_size=4096, method='halton', seed=0)))
+        self.assertEqual(xyz.shape, (20000, 3))
+        self.assertTrue(np.all(union.contains(xyz)))
+        self.assertAlmostEqual(np.mean(xyz[:, 0] > 2.0), 1 / 9, delta=0.01)
+        self.assertRaises(NotImplementedError, next, union.sample_surface(10))
+        # rejection sampling of empty figures gives up instead of drawing forever
+        for origin in ([5.0, 0.0, 0.0], [1.9, 1.9, 0.0]):
+            empty = Intersection(figures=[Sphere(r_outer=1.0),
+                                          Sphere(r_outer=1.0, coordinate_system=Cartesian(origin=np.array(origin)))])
+            self.assertRaises(ValueError, next, empty.sample_volume(10, chunk_size=4096))
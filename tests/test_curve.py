@@ -0,0 +1,224 @@
+import unittest
+import numpy as np
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import Line, Arc, Helix, PolylineCurve, VectorizedParametricCurve, CubicSplineCurve, CompositeCurve
+
+
+class TestCurve(unittest.TestCase):
+
+    def setUp(self):
+        self.helix = Helix(name='Helix', radius=2.0, pitch=0.5, start=0.0, stop=4 * np.pi)
+        self.arc = Arc(name='Arc', a=3.0, b=1.0, start=0.0, stop=np.pi)
+
+    def test_length_table(self):
+        t, s = self.helix.length_table
+        self.assertEqual(t.size, s.size)
+        self.assertEqual(s[0], 0.0)
+        self.assertTrue(np.all(np.diff(s) > 0))
+        self.assertAlmostEqual(s[-1], self.helix.length(), places=6)
+
+    def test_t_at_length(self):
+        speed = np.sqrt(2.0 ** 2 + (0.5 / (2 * np.pi)) ** 2)
+        s = np.linspace(0.0, 4 * np.pi * speed, num=57)
+        t = np.asarray(self.helix.t_at_length(s))
+        np.testing.assert_allclose(t, s / speed, atol=1e-6)
+        t = np.asarray(self.helix.t_at_length(np.array([-1.0, 1e3])))
+        np.testing.assert_allclose(t, [0.0, 4 * np.pi])
+        t = np.asarray(self.arc.t_at_length(np.linspace(0.0, self.arc.length_table[1][-1], num=101)))
+        self.assertTrue(np.all(np.diff(t) > 0))
+
+    def test_generate_points_uniform(self):
+        xyz = np.asarray(self.arc.generate_points_uniform(200))
+        self.assertEqual(xyz.shape, (200, 3))
+        chords = np.sqrt(np.sum(np.diff(xyz, axis=0) ** 2, axis=1))
+        np.testing.assert_allclose(chords, np.mean(chords), rtol=1e-3)
+        np.testing.assert_allclose(xyz[0], [3.0, 0.0, 0.0], atol=1e-12)
+        np.testing.assert_allclose(xyz[-1], [-3.0, 0.0, 0.0], atol=1e-12)
+
+    def test_length_table_invalidation(self):
+        s_before = self.helix.length_table[1][-1]
+        self.helix.radius = 1.0
+        s_after = self.helix.length_table[1][-1]
+        self.assertAlmostEqual(s_after / s_before, np.sqrt(1.0 + (0.5 / (2 * np.pi)) ** 2) /
+                               np.sqrt(4.0 + (0.5 / (2 * np.pi)) ** 2), places=6)
+        line = Line(coordinate_system=Cartesian(), a=1.0, b=0.0, c=0.0, start=0.0, stop=2.0)
+        self.assertAlmostEqual(line.length_table[1][-1], 2.0)
+        line.stop = 3.0
+        self.assertAlmostEqual(line.length_table[1][-1], 3.0)
+        self.assertIn('length_dt_ds', self.helix._mesh_cache())
+        self.helix.dt = 1.0e-8
+        self.assertEqual(self.helix._mesh_cache(), {})
+
+    def test_closest_points(self):
+        coordinate_system = Cartesian(origin=np.array([1.0, -2.0, 0.5]))
+        coordinate_system.rotate_axis_angle(np.array([1.0, 1.0, 0.0]), np.pi / 5)
+        arc = Arc(name='Circle', coordinate_system=coordinate_system, a=2.0, b=2.0, start=0.0, stop=np.pi)
+        t_true = np.linspace(0.1, np.pi - 0.1, num=50)
+        normals = np.asarray(arc.generate_points(t_true)) / 2.0
+        local_xyz = np.asarray(arc.generate_points(t_true)) + normals * 0.7
+        xyz = np.asarray(arc.to_global_coordinate_system(local_xyz))
+        t, distance = arc.closest_points(xyz)
+        np.testing.assert_allclose(t, t_true, atol=1e-9)
+        np.testing.assert_allclose(distance, 0.7, atol=1e-9)
+        t, distance = arc.closest_points(np.asarray(arc.to_global_coordinate_system(
+            np.array([[3.0, -1.0, 0.0], [0.5, -1.0, 0.0]]))))
+        np.testing.assert_allclose(t, [0.0, 0.0], atol=1e-12)
+        np.testing.assert_allclose(distance, [np.sqrt(2.0), np.sqrt(3.25)], atol=1e-12)
+        t, distance = self.helix.closest_points(np.array([[0.0, 0.0, 0.5]]))
+        self.assertAlmostEqual(t[0], 2 * np.pi, places=9)
+        self.assertAlmostEqual(distance[0], 0.0, places=9)
+        polyline = PolylineCurve([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.1, 0.0], [1.0, 0.2, 0.0]])
+        xyz = np.random.RandomState(0).uniform(-0.2, 1.2, (1000, 3)) * [1.0, 0.3, 0.1]
+        nodes = np.asarray(polyline.generate_points(polyline.length_table[0]))
+        node_distance = np.min(np.linalg.norm(xyz[:, None, :] - nodes[None, :, :], axis=2), axis=1)
+        self.assertTrue(np.all(np.asarray(polyline.closest_points(xyz)[1]) <= node_distance + 1e-12))
+
+    def test_derivative(self):
+        t = np.linspace(0.0, 4 * np.pi, num=33)
+        d1 = np.asarray(self.helix.derivative(t, 1))
+        np.testing.assert_allclose(d1, np.asarray(self.helix.tangent(t)), atol=1e-12)
+        d0 = np.asarray(self.helix.derivative(t, 0))
+        np.testing.assert_allclose(d0, np.asarray(self.helix.generate_points(t)), atol=1e-12)
+        d2 = np.asarray(self.arc.derivative(t, 2))
+        np.testing.assert_allclose(d2, -np.asarray(self.arc.generate_points(t)), atol=1e-12)
+
+    def test_frenet_frame(self):
+        t = np.linspace(0.0, 4 * np.pi, num=33)
+        tangent, normal, binormal, curvature, torsion = self.helix.frenet_frame(t)
+        c = 0.5 / (2 * np.pi)
+        np.testing.assert_allclose(curvature, 2.0 / (4.0 + c ** 2))
+        # x = r - r * cos(t) mirrors the standard helix, hence the negative torsion
+        np.testing.assert_allclose(torsion, -c / (4.0 + c ** 2))
+        for v in (tangent, normal, binormal):
+            np.testing.assert_allclose(np.sum(np.asarray(v) ** 2, axis=1), 1.0)
+        np.testing.assert_allclose(np.cross(tangent, normal), binormal, atol=1e-12)
+        np.testing.assert_allclose(np.sum(np.asarray(tangent) * np.asarray(normal), axis=1), 0.0, atol=1e-12)
+        # normal of the helix points to its axis
+        axis_point = np.asarray(self.helix.generate_points(t)) * np.array([1.0, 1.0, 0.0]) - np.array([2.0, 0.0, 0.0])
+        np.testing.assert_allclose(np.asarray(normal)[:, :2], -axis_point[:, :2] / 2.0, atol=1e-12)
+        line = Line(a=1.0, b=2.0, c=3.0)
+        tangent, normal, binormal, curvature, torsion = line.frenet_frame(np.linspace(0.0, 1.0, num=5))
+        np.testing.assert_allclose(curvature, 0.0)
+        np.testing.assert_allclose(torsion, 0.0)
+        np.testing.assert_allclose(np.sum(np.asarray(tangent) * np.asarray(normal), axis=1), 0.0, atol=1e-12)
+        np.testing.assert_allclose(np.cross(tangent, normal), binormal, atol=1e-12)
+
+    def test_stencil_derivatives(self):
+        # curves without analytic derivatives fall back to finite difference stencils
+        radius, c = 2.0, 0.5 / (2 * np.pi)
+        helix = VectorizedParametricCurve(lambda t: radius * np.cos(t), lambda t: radius * np.sin(t),
+                                          lambda t: c * t, start=0.0, stop=2 * np.pi)
+        t = np.linspace(0.0, 2 * np.pi, num=33)
+        np.testing.assert_allclose(helix.derivative(t, 3),
+                                   np.stack((radius * np.sin(t), -radius * np.cos(t), np.zeros_like(t)), axis=1),
+                                   atol=1e-5)
+        _, _, _, curvature, torsion = helix.frenet_frame(t)
+        np.testing.assert_allclose(curvature, radius / (radius ** 2 + c ** 2), rtol=1e-6)
+        np.testing.assert_allclose(torsion, c / (radius ** 2 + c ** 2), rtol=1e-4)
+        cubic = VectorizedParametricCurve(lambda t: t ** 3, lambda t: -2.0 * t ** 3, lambda t: t ** 2, stop=3.0)
+        np.testing.assert_allclose(cubic.derivative(t, 3), np.tile([6.0, -12.0, 0.0], (33, 1)), atol=1e-6)
+
+    def test_vectorized_curve(self):
+        calls = []
+
+        def x(t):
+            calls.append(t.size)
+            return 2.0 - 2.0 * np.cos(t)
+
+        curve = VectorizedParametricCurve(x, lambda t: 2.0 * np.sin(t), lambda t: 0.5 / (2 * np.pi) * t,
+                                          name='Python helix', start=0.0, stop=4 * np.pi)
+        t = np.linspace(0.0, 4 * np.pi, num=33)
+        np.testing.assert_allclose(curve.generate_points(t), self.helix.generate_points(t), atol=1e-12)
+        self.assertEqual(calls, [33])
+        np.testing.assert_allclose(curve.tangent(t), self.helix.tangent(t), atol=1e-9)
+        np.testing.assert_allclose(curve.derivative(t, 2), self.helix.derivative(t, 2), atol=1e-6)
+        self.assertAlmostEqual(curve.length_table[1][-1], self.helix.length_table[1][-1], places=6)
+        self.assertAlmostEqual(curve.x_point(np.pi), 4.0)
+        self.assertAlmostEqual(curve.tangent_y_point(0.0), 2.0, places=9)
+        _, _, _, curvature, torsion = curve.frenet_frame(t)
+        _, _, _, curvature_ref, torsion_ref = self.helix.frenet_frame(t)
+        np.testing.assert_allclose(curvature, curvature_ref, rtol=1e-6)
+        np.testing.assert_allclose(torsion, torsion_ref, rtol=1e-3)
+        xyz = np.array([[0.0, 0.0, 0.5], [1.0, 1.0, 0.1]])
+        np.testing.assert_allclose(curve.closest_points(xyz)[1], self.helix.closest_points(xyz)[1], atol=1e-9)
+        # array methods evaluate the callables in batches, never point by point
+        del calls[:]
+        curve.closest_points(np.random.RandomState(0).uniform(-3.0, 3.0, (200, 3)))
+        curve.frenet_frame(t)
+        self.assertLess(len(calls), 50)
+        del calls[:]
+        self.assertAlmostEqual(curve.tangent_x_point(1.0), 2.0 * np.sin(1.0), places=9)
+        self.assertEqual(calls, [4])
+        line = VectorizedParametricCurve(lambda t: t, lambda t: 0.0, lambda t: 0.0,
+                                         dx=lambda t: 1.0, dy=lambda t: 0.0, dz=lambda t: 0.0)
+        np.testing.assert_allclose(line.tangent(t), np.tile([1.0, 0.0, 0.0], (33, 1)))
+
+    def test_polyline_curve(self):
+        t = np.linspace(0.0, 4 * np.pi, num=2001)
+        polyline = PolylineCurve(np.vstack((self.helix.generate_points(t), self.helix.generate_points(t)[-1:])))
+        self.assertEqual(polyline.vertices_t.size, t.size)
+        self.assertAlmostEqual(polyline.length(), self.helix.length(), places=4)
+        s = polyline.vertices_t
+        np.testing.assert_allclose(polyline.generate_points(s), polyline.points, atol=1e-12)
+        np.testing.assert_allclose(np.linalg.norm(polyline.tangent(0.5 * (s[1:] + s[:-1])), axis=1), 1.0)
+        middle = 0.5 * (polyline.points[10] + polyline.points[11])
+        np.testing.assert_allclose(polyline.generate_points(np.array([0.5 * (s[10] + s[11])]))[0], middle)
+        self.assertAlmostEqual(polyline.closest_points(np.array([middle]))[1][0], 0.0, places=9)
+        polyline.points = [[0.0, 0.0, 0.0], [3.0, 4.0, 0.0]]
+        self.assertEqual(polyline.stop, 5.0)
+        np.testing.assert_allclose(polyline.bounding_box(), [[0.0, 0.0, 0.0], [3.0, 4.0, 0.0]], atol=1e-2)
+        with self.assertRaises(ValueError):
+            PolylineCurve([[1.0, 1.0, 1.0], [1.0, 1.0, 1.0]])
+
+    def test_cubic_spline_curve(self):
+        t = np.linspace(0.0, 4 * np.pi, num=81)
+        spline = CubicSplineCurve(self.helix.generate_points(t), knots=t, boundary='not-a-knot')
+        self.assertEqual(spline.start, 0.0)
+        self.assertEqual(spline.stop, 4 * np.pi)
+        np.testing.assert_allclose(spline.generate_points(t), self.helix.generate_points(t), atol=1e-12)
+        t = np.linspace(0.0, 4 * np.pi, num=1001)
+        np.testing.assert_allclose(spline.generate_points(t), self.helix.generate_points(t), atol=1e-4)
+        np.testing.assert_allclose(spline.tangent(t), self.helix.tangent(t), atol=2e-3)
+        np.testing.assert_allclose(spline.derivative(t, 2), self.helix.derivative(t, 2), atol=5e-2)
+        self.assertAlmostEqual(spline.tangent_x_point(1.0), self.helix.tangent_x_point(1.0), places=3)
+        self.assertAlmostEqual(spline.length(), self.helix.length(), places=3)
+        spline.points = [[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [3.0, 4.0, 0.0]]
+        self.assertEqual(spline.stop, 5.0)
+        np.testing.assert_allclose(spline.generate_points(np.array([2.5])), [[1.5, 2.0, 0.0]])
+        with self.assertRaises(ValueError):
+            CubicSplineCurve([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], knots=[1.0, 0.0])
+
+    def test_composite_curve(self):
+        line = Line(origin=np.zeros(3), a=1.0, b=0.0, c=0.0, start=2.0, stop=0.0)
+        arc = Arc(a=1.0, b=1.0, start=np.pi, stop=1.5 * np.pi, coordinate_system=Cartesian(origin=np.array([1.0, 0.0, 0.0])))
+        polyline = PolylineCurve([[1.0, -1.0, 0.0], [1.0, -1.0, 2.0], [3.0, -1.0, 2.0]])
+        composite = CompositeCurve([line, arc, polyline])
+        np.testing.assert_allclose(composite.offsets, [0.0, 2.0, 2.0 + 0.5 * np.pi, 6.0 + 0.5 * np.pi])
+        np.testing.assert_allclose(composite.vertices_t, [0.0, 2.0, 2.0 + 0.5 * np.pi, 4.0 + 0.5 * np.pi,
+                                                          6.0 + 0.5 * np.pi])
+        t = np.linspace(0.0, composite.stop, num=200)
+        pieces, local = composite.locate(t)
+        points = np.asarray(composite.generate_points(t))
+        for i, curve in enumerate(composite.curves):
+            selection = pieces == i
+            np.testing.assert_allclose(points[selection],
+                                       curve.to_global_coordinate_system(curve.generate_points(local[selection])),
+                                       atol=1e-12)
+        np.testing.assert_allclose(points[0], [2.0, 0.0, 0.0])
+        np.testing.assert_allclose(points[-1], [3.0, -1.0, 2.0], atol=1e-12)
+        np.testing.assert_allclose(composite.tangent(np.array([1.0]))[0], [-1.0, 0.0, 0.0])
+        self.assertAlmostEqual(composite.y_point(2.0 + 0.5 * np.pi), -1.0)
+        self.assertAlmostEqual(composite.length(), 6.0 + 0.5 * np.pi)
+        self.assertAlmostEqual(composite.length_table[1][-1], 6.0 + 0.5 * np.pi, places=9)
+        self.assertAlmostEqual(float(np.sum(composite.mesh_tree().flatten().solution)), 6.0 + 0.5 * np.pi, places=6)
+        np.testing.assert_allclose(composite.t_at_length(np.array([1.0, 5.0 + 0.5 * np.pi])),
+                                   [1.0, 5.0 + 0.5 * np.pi], atol=1e-9)
+        xyz = np.array([[1.0, 0.5, 0.0], [2.0, -1.0, 3.0]])
+        np.testing.assert_allclose(composite.closest_points(xyz)[1], [0.5, 1.0], atol=1e-9)
+        np.testing.assert_allclose(composite.bounding_box(), [[0.0, -1.0, 0.0], [3.0, 0.0, 2.0]], atol=1e-2)
+        polyline.points = [[1.0, -1.0, 0.0], [1.0, -1.0, 1.0]]
+        self.assertAlmostEqual(composite.stop, 3.0 + 0.5 * np.pi)
+        np.testing.assert_allclose(composite.generate_points(np.array([composite.stop]))[0], [1.0, -1.0, 1.0])
+        with self.assertRaises(ValueError):
+            CompositeCurve([])
+
@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+from BDSpace import Space
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import Line, Arc, Helix, CurveBVH
+from BDSpace.Curve.BVH import min_distance, intersections, pairwise_clearance
+
+
+class TestCurveBVH(unittest.TestCase):
+
+    def setUp(self):
+        self.circle = Arc(name='Circle', a=1.0, b=1.0, start=0.0, stop=2 * np.pi)
+        self.shifted_circle = Arc(name='Shifted circle', coordinate_system=Cartesian(origin=[1.0, 0.0, 0.0]),
+                                  a=1.0, b=1.0, start=0.0, stop=2 * np.pi)
+        self.line = Line(name='Line', coordinate_system=Cartesian(origin=[0.0, 0.0, 2.0]),
+                         a=1.0, b=0.0, c=0.0, start=-3.0, stop=3.0)
+
+    def test_bounding_box(self):
+        bvh = CurveBVH(self.shifted_circle)
+        box = np.asarray(bvh.bounding_box())
+        self.assertTrue(np.all(box[0] <= np.array([0.0, -1.0, 0.0])))
+        self.assertTrue(np.all(box[1] >= np.array([2.0, 1.0, 0.0])))
+        np.testing.assert_allclose(box, [[0.0, -1.0, 0.0], [2.0, 1.0, 0.0]], atol=1e-3)
+
+    def test_min_distance(self):
+        distance, t_a, t_b = min_distance(self.circle, self.line)
+        self.assertAlmostEqual(distance, 2.0, places=9)
+        self.assertAlmostEqual(abs(t_b), 1.0, places=6)
+        helix = Helix(name='Helix', coordinate_system=Cartesian(origin=[-1.0, 0.0, 0.0]),
+                      radius=1.0, pitch=1.0, start=0.0, stop=4 * np.pi)
+        distance, t_a, t_b = min_distance(CurveBVH(self.line), CurveBVH(helix))
+        self.assertAlmostEqual(distance, 0.0, places=6)
+        self.assertAlmostEqual(t_b, 4 * np.pi, places=6)
+
+    def test_intersections(self):
+        t_a, t_b, distance = intersections(self.circle, self.shifted_circle)
+        self.assertEqual(t_a.size, 2)
+        np.testing.assert_allclose(t_a, [np.pi / 3, 5 * np.pi / 3], atol=1e-6)
+        np.testing.assert_allclose(t_b, [2 * np.pi / 3, 4 * np.pi / 3], atol=1e-6)
+        t_a, t_b, distance = intersections(self.circle, self.line)
+        self.assertEqual(t_a.size, 0)
+
+    def test_pairwise_clearance(self):
+        scene = Space('Scene')
+        for curve in (self.circle, self.shifted_circle, self.line):
+            scene.add_element(curve)
+        result = pairwise_clearance(scene, 1.5)
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(result[0][2], 0.0, places=6)
+        result = pairwise_clearance([self.circle, self.shifted_circle, self.line], 2.5)
+        self.assertEqual(len(result), 3)
@@ -1,6 +1,16 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 from BDSpace.Field import Field, ConstantScalarConservativeField, ConstantVectorConservativeField
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField, VectorizedSphericallySymmetric
+from BDSpace.Field import SuperposedField, HyperbolicPotentialCurveConservativeField, trace_field_lines
+from BDSpace.Field import push_particles
+from BDSpace.Field._tracing import TRACE_MAX_LENGTH, TRACE_FIGURE_BOUNDARY, TRACE_WEAK_FIELD
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import PolylineCurve, CompositeCurve
+from BDSpace.Pathfinder import line_between_two_points, helix_between_two_points, arc_between_two_points
+from BDSpace.Figure.Sphere import Sphere
 
 
 class TestField(unittest.TestCase):
@@ -36,7 +46,7 @@ class TestField(unittest.TestCase):
 
     def test_constant_scalar_field(self):
         CField = ConstantScalarConservativeField('My field', 'My type', np.pi)
-        xyz = np.random.random((100, 3))
+        xyz = np.random.RandomState(0).random_sample((100, 3))
         result = CField.scalar_field(xyz)
         np.testing.assert_allclose(result, np.ones(100, dtype=np.double) * np.pi)
         result = CField.vector_field(xyz)
@@ -44,10 +54,118 @@ class TestField(unittest.TestCase):
 
     def test_constant_vector_field(self):
         VField = ConstantVectorConservativeField('My field', 'My type', np.array([1.0, 0.0, 0.0], dtype=np.double))
-        xyz = np.random.random((100, 3))
+        xyz = np.random.RandomState(0).random_sample((100, 3))
         result = VField.scalar_field(xyz)
         np.testing.assert_allclose(result, xyz[:, 0])
         result = VField.vector_field(xyz)
         check = np.zeros((100, 3), dtype=np.double)
         check[:, 0] += np.ones(100, dtype=np.double)
         np.testing.assert_allclose(result, check)
+
+    def test_vectorized_spherically_symmetric_field(self):
+        reference = HyperbolicPotentialSphericalConservativeField('Point charge', 'electrostatic', r=0.1, a=2.0)
+        field = VectorizedSphericallySymmetric('Point charge', 'electrostatic',
+                                               lambda r: 2.0 / np.maximum(r, 0.1),
+                                               vector_law=lambda r: np.where(r < 0.1, 0.0, 2.0 / r ** 2))
+        conservative = VectorizedSphericallySymmetric('Point charge', 'electrostatic',
+                                                      lambda r: 2.0 / np.maximum(r, 0.1))
+        xyz = np.random.RandomState(0).random_sample((100, 3)) * 4 - 2
+        np.testing.assert_allclose(field.scalar_field(xyz), reference.scalar_field(xyz))
+        np.testing.assert_allclose(field.vector_field(xyz), reference.vector_field(xyz), atol=1e-12)
+        np.testing.assert_allclose(conservative.vector_field(xyz), reference.vector_field(xyz), rtol=1e-7)
+        self.assertAlmostEqual(field.scalar_field_point(np.array([0.0, 0.0, 2.0])), 1.0)
+        np.testing.assert_allclose(field.vector_field_point(np.array([0.0, 0.0, 2.0])), [0.0, 0.0, 0.5], atol=1e-12)
+        self.assertAlmostEqual(conservative.vector_field_r_point(1.0), 2.0, places=8)
+
+    def test_trace_field_lines(self):
+        charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.01, a=1.0)
+        charge.coordinate_system = Cartesian(origin=[0.0, 0.0, -1.0])
+        sink = HyperbolicPotentialSphericalConservativeField('Sink', 'electrostatic', r=0.01, a=-1.0)
+        sink.coordinate_system = Cartesian(origin=[0.0, 0.0, 1.0])
+        directions = np.random.default_rng(0).normal(size=(200, 3))
+        directions /= np.linalg.norm(directions, axis=1)[:, np.newaxis]
+        seeds = np.array([0.0, 0.0, -1.0]) + 0.1 * directions
+        points, offsets, reasons = trace_field_lines(charge, seeds, max_length=2.0)
+        self.assertTrue(np.all(reasons == TRACE_MAX_LENGTH))
+        np.testing.assert_allclose(points[offsets[1:] - 1], np.array([0.0, 0.0, -1.0]) + 2.1 * directions)
+        dipole = SuperposedField('Dipole', [charge, sink])
+        target = Sphere('Target', r_outer=0.05, coordinate_system=Cartesian(origin=[0.0, 0.0, 1.0]))
+        points, offsets, reasons, curves = trace_field_lines(dipole, seeds, max_length=20.0, figure=target,
+                                                             curves=True)
+        self.assertEqual(offsets[-1], points.shape[0])
+        boundary = reasons == TRACE_FIGURE_BOUNDARY
+        self.assertGreater(np.count_nonzero(boundary), 100)
+        ends = points[offsets[1:] - 1]
+        np.testing.assert_allclose(np.linalg.norm(ends[boundary] - [0.0, 0.0, 1.0], axis=1), 0.05)
+        # q1 cos(theta1) + q2 cos(theta2) is constant along field lines of two point charges
+        for i in range(seeds.shape[0]):
+            line = points[offsets[i]:offsets[i + 1]]
+            r1 = line - [0.0, 0.0, -1.0]
+            r2 = line - [0.0, 0.0, 1.0]
+            invariant = r1[:, 2] / np.linalg.norm(r1, axis=1) - r2[:, 2] / np.linalg.norm(r2, axis=1)
+            self.assertLess(np.ptp(invariant), 1e-4)
+        self.assertAlmostEqual(curves[0].stop, np.sum(np.linalg.norm(np.diff(points[:offsets[1]], axis=0), axis=1)))
+        line_field = HyperbolicPotentialCurveConservativeField('Line field', 'electrostatic', curves[0], r=0.01)
+        self.assertTrue(np.all(np.isfinite(line_field.scalar_field(np.array([[0.0, 1.0, 0.0]])))))
+        points, offsets, reasons = trace_field_lines(ConstantVectorConservativeField(
+            'Zero', 'test', np.zeros(3)), seeds[:3])
+        np.testing.assert_array_equal(reasons, TRACE_WEAK_FIELD)
+        np.testing.assert_array_equal(offsets, [0, 1, 2, 3])
+
+    def test_line_integral(self):
+        charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.05, a=2.0)
+        charge.coordinate_system = Cartesian(origin=[0.3, -0.2, 0.1])
+        start, stop = np.array([1.0, 0.5, -0.3]), np.array([-0.8, 1.2, 0.6])
+        potentials = np.asarray(charge.scalar_field(charge.to_local_coordinate_system(np.vstack((start, stop)))))
+        cs = Cartesian()
+        curves = [line_between_two_points(cs, start, stop),
+                  helix_between_two_points(cs, start, stop, radius=0.3, loops=3),
+                  arc_between_two_points(cs, start, stop, radius=2.0),
+                  PolylineCurve(np.array([start, [0.3, -0.2, 0.5], [0.0, 0.0, -1.0], stop]))]
+        np.testing.assert_allclose(charge.line_integral(curves), potentials[0] - potentials[1], rtol=1e-8)
+        self.assertAlmostEqual(charge.line_integral(curves[0]), potentials[0] - potentials[1])
+        back = helix_between_two_points(cs, start, stop, radius=0.3, loops=3)
+        back.start, back.stop = back.stop, back.start
+        loop = CompositeCurve([curves[0], back])
+        self.assertAlmostEqual(charge.line_integral(loop), 0.0)
+        self.assertAlmostEqual(charge.line_integral(CompositeCurve(curves[3:])), potentials[0] - potentials[1])
+        field = ConstantVectorConservativeField('Uniform', 'electrostatic', np.array([1.0, 2.0, 0.0]))
+        self.assertAlmostEqual(field.line_integral(curves[1]), -1.8 + 2 * 0.7)
+
+    def test_push_particles(self):
+        magnetic = ConstantVectorConservativeField('B', 'magnetic', np.array([0.0, 0.0, 2.0]))
+        charges = np.linspace(1.0, 2.0, 50)
+        velocities = np.tile([1.0, 0.0, 0.1], (50, 1))
+        period = np.pi / charges[0]
+        trajectory = np.zeros((21, 50, 3))
+        x, v, absorbed_by, _ = push_particles(np.zeros((50, 3)), velocities, charges, 1.0, period / 200, 200,
+                                              magnetic_field=magnetic, trajectory=trajectory, snapshot_every=10)
+        np.testing.assert_allclose(np.linalg.norm(v, axis=1), np.linalg.norm(velocities, axis=1))
+        np.testing.assert_allclose(x[0], [0.0, 0.0, 0.1 * period], atol=1e-3)
+        np.testing.assert_allclose(np.ptp(trajectory[:, 0, 1]), 2 * 1.0 / (2.0 * charges[0]), rtol=1e-3)
+        np.testing.assert_array_equal(trajectory[-1], x)
+        np.testing.assert_array_equal(absorbed_by, -1)
+        with self.assertRaises(ValueError):
+            push_particles(np.zeros((1, 3)), velocities[:1], 1.0, 1.0, 0.1, 1, magnetic_field=magnetic,
+                           method='leapfrog')
+        attractor = HyperbolicPotentialSphericalConservativeField('Attractor', 'electrostatic', r=0.01, a=-1.0)
+        for method in ('boris', 'leapfrog'):
+            x, v, _, _ = push_particles([[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]], 1.0, 1.0, 2 * np.pi / 1000, 1000,
+                                        electric_field=attractor, method=method)
+            np.testing.assert_allclose(x, [[1.0, 0.0, 0.0]], atol=1e-3)
+            np.testing.assert_allclose(v, [[0.0, 1.0, 0.0]], atol=1e-3)
+        seeds = np.random.default_rng(0).uniform(-1.0, 1.0, (500, 3)) * [1.0, 1.0, 0.0] + [0.0, 0.0, -3.0]
+        target = Sphere('Target', r_outer=0.5)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trajectory.npy')
+            x, v, absorbed_by, absorbed_step = push_particles(seeds, [0.0, 0.0, 1.0], 1.0, 1.0, 0.01, 500,
+                                                              electric_field=attractor, absorbers=[target],
+                                                              trajectory=path, snapshot_every=100)
+            trajectory = np.load(path, mmap_mode='r')
+            self.assertEqual(trajectory.shape, (6, 500, 3))
+            np.testing.assert_array_equal(trajectory[-1], x)
+            del trajectory
+        hit = absorbed_by == 0
+        self.assertTrue(np.any(hit) and not np.all(hit))
+        np.testing.assert_allclose(np.linalg.norm(x[hit], axis=1), 0.5)
+        self.assertTrue(np.all(absorbed_step[hit] > 0) and np.all(absorbed_step[~hit] == -1))
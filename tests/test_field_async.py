@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+import numpy as np
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField, VectorizedSphericallySymmetric
+from BDSpace.Field import FieldBatcher
+
+
+class TestFieldAsync(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.requests = [random.uniform(-2.0, 2.0, (random.randint(1, 50), 3)) for _ in range(100)]
+        self.field = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.3, a=2.0)
+        self.batches = []
+
+    def law(self, r):
+        self.batches.append(r.size)
+        return 1.0 / (1.0 + r)
+
+    def test_results(self):
+        async def evaluate():
+            scalars = await asyncio.gather(*[self.field.scalar_field_async(xyz) for xyz in self.requests])
+            vectors = await asyncio.gather(*[self.field.vector_field_async(xyz) for xyz in self.requests])
+            empty = await self.field.scalar_field_async(np.zeros((0, 3)))
+            return scalars, vectors, empty
+        scalars, vectors, empty = asyncio.run(evaluate())
+        for xyz, scalar, vector in zip(self.requests, scalars, vectors):
+            np.testing.assert_allclose(scalar, np.asarray(self.field.scalar_field(xyz)))
+            np.testing.assert_allclose(vector, np.asarray(self.field.vector_field(xyz)))
+        self.assertEqual(empty.shape, (0,))
+        # the batcher is rebound to a new event loop
+        np.testing.assert_allclose(asyncio.run(self.field.scalar_field_async(self.requests[0])),
+                                   np.asarray(self.field.scalar_field(self.requests[0])))
+
+    def test_batching(self):
+        field = VectorizedSphericallySymmetric('Law', 'electrostatic', self.law)
+        num_points = sum(xyz.shape[0] for xyz in self.requests)
+        field.batcher = FieldBatcher(field, max_batch=num_points + 1, max_delay=10.0)
+
+        async def evaluate():
+            tasks = [asyncio.ensure_future(field.scalar_field_async(xyz)) for xyz in self.requests]
+            await asyncio.sleep(0)
+            field.batcher.flush()
+            return await asyncio.gather(*tasks)
+        results = asyncio.run(evaluate())
+        self.assertEqual(self.batches, [num_points])
+        for xyz, result in zip(self.requests, results):
+            np.testing.assert_allclose(result, 1.0 / (1.0 + np.sqrt(np.sum(xyz ** 2, axis=1))))
+        # batches are limited by the number of points and by the delay
+        self.batches = []
+        field.batcher = FieldBatcher(field, max_batch=200, max_delay=0.001)
+        results = asyncio.run(evaluate())
+        self.assertGreater(len(self.batches), 1)
+        self.assertTrue(all(size <= 200 for size in self.batches))
+        self.assertEqual(sum(self.batches), num_points)
+        with self.assertRaises(ValueError):
+            self.field.batcher = FieldBatcher(field)
+
+    def test_errors(self):
+        def law(r):
+            raise ValueError('Bad law')
+        field = VectorizedSphericallySymmetric('Law', 'electrostatic', law)
+
+        async def evaluate():
+            return await asyncio.gather(*[field.scalar_field_async(xyz) for xyz in self.requests[:3]],
+                                        return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in asyncio.run(evaluate())))
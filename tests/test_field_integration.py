@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+from BDSpace import Space
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Field import ConstantScalarConservativeField, HyperbolicPotentialSphericalConservativeField
+from BDSpace.Field import SuperposedField, extract_isosurface
+from BDSpace.Figure import integrate_flux, integrate_volume
+from BDSpace.Figure.Sphere import Sphere, SphericalWedge
+from BDSpace.Figure.Cube import Cube
+from BDSpace.Figure.Torus import Torus
+
+
+class TestFieldIntegration(unittest.TestCase):
+
+    def setUp(self):
+        self.charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.1, a=2.0)
+        self.charge.coordinate_system = Cartesian(origin=[0.3, -0.2, 0.1])
+
+    def test_gauss_law(self):
+        sphere = Sphere('Sphere', r_outer=1.5)
+        self.assertAlmostEqual(integrate_flux(self.charge, sphere), 8 * np.pi, places=6)
+        cube = Cube('Cube', a=2.0, coordinate_system=Cartesian(origin=[-0.7, -1.1, -0.8]))
+        self.assertAlmostEqual(integrate_flux(self.charge, cube), 8 * np.pi, places=6)
+        torus = Torus('Torus', r_torus=3.0, r_tube=[0.0, 1.0])
+        self.assertAlmostEqual(integrate_flux(self.charge, torus), 0.0, places=6)
+
+    def test_volume_integral(self):
+        field = ConstantScalarConservativeField('Constant', 'test', potential=3.0)
+        wedge = SphericalWedge('Wedge', r_inner=0.5, r_outer=1.0, phi=np.pi, theta=[0.2, 1.5])
+        self.assertAlmostEqual(integrate_volume(field, wedge), 3.0 * wedge.volume())
+        self.charge.coordinate_system = Cartesian()
+        sphere = Sphere('Sphere', r_outer=1.0)
+        expected = 2.0 / 0.1 * 4 / 3 * np.pi * 0.1 ** 3 + 4 * np.pi * (1.0 - 0.1 ** 2)
+        self.assertAlmostEqual(integrate_volume(self.charge, sphere, rtol=1e-7) / expected, 1.0, places=5)
+
+    def test_cache(self):
+        scene = Space('Scene')
+        sphere = Sphere('Sphere', r_outer=1.5)
+        scene.add_element(sphere)
+        flux = integrate_flux(self.charge, sphere)
+        self.assertEqual(integrate_flux(self.charge, sphere), flux)
+        self.charge.a = 1.0
+        self.assertAlmostEqual(integrate_flux(self.charge, sphere), 4 * np.pi, places=6)
+        scene.coordinate_system.origin = [10.0, 0.0, 0.0]
+        self.assertAlmostEqual(integrate_flux(self.charge, sphere), 0.0, places=6)
+        sphere.r_outer = 20.0
+        self.assertAlmostEqual(integrate_flux(self.charge, sphere), 4 * np.pi, places=6)
+        superposed = SuperposedField('Superposed', [self.charge])
+        self.assertAlmostEqual(integrate_flux(superposed, sphere), 4 * np.pi, places=6)
+        self.charge.a = 3.0
+        self.assertAlmostEqual(integrate_flux(superposed, sphere), 12 * np.pi, places=6)
+
+    def test_isosurface(self):
+        box = [[-1.5, -1.5, -1.5], [1.5, 1.5, 1.5]]
+        vertices, faces = extract_isosurface(self.charge, 2.0, box, resolution=32)
+        radii = np.sqrt(np.sum((vertices - [0.3, -0.2, 0.1]) ** 2, axis=1))
+        np.testing.assert_allclose(radii, 1.0, atol=1e-2)
+        edges = np.concatenate((faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]))
+        self.assertEqual(np.unique(edges, axis=0).shape[0], edges.shape[0])
+        _, counts = np.unique(np.sort(edges, axis=1), axis=0, return_counts=True)
+        self.assertTrue(np.all(counts == 2))
+        a, b, c = vertices[faces[:, 0]], vertices[faces[:, 1]], vertices[faces[:, 2]]
+        volume = np.sum(np.einsum('ij,ij->i', a, np.cross(b, c))) / 6
+        self.assertAlmostEqual(volume, -4.0 / 3 * np.pi, places=1)
+        vertices, faces = extract_isosurface(self.charge, 2.0, Sphere('Sphere', r_outer=1.0), resolution=16)
+        self.assertTrue(np.all(np.sqrt(np.sum(vertices[faces].mean(axis=1) ** 2, axis=1)) <= 1.0))
+        self.assertEqual(extract_isosurface(self.charge, 100.0, box)[1].shape, (0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,255 @@
+import numpy as np
+import unittest
+
+from BDSpace import Space, SpaceIndex
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Figure import sdf_union, sdf_intersection, sdf_difference, cast_rays
+from BDSpace.Figure.Sphere import Sphere, SphericalWedge, SphericalSegmentWedge
+from BDSpace.Figure.Cylinder import Cylinder, CylindricalWedge
+from BDSpace.Figure.Cone import ConicalWedge
+from BDSpace.Figure.Torus import Torus, ToricWedge
+from BDSpace.Figure.Cube import Cube, ParallelepipedTriclinic
+
+
+class TestFigure(unittest.TestCase):
+
+    def test_contains_monte_carlo_volume(self):
+        rng = np.random.default_rng(0)
+        xyz = rng.uniform(-1.5, 1.5, size=(400000, 3))
+        figures = [Sphere(r_inner=0.3, r_outer=1.0),
+                   SphericalSegmentWedge(r_inner=0.3, r_outer=1.0, h1=-0.2, h2=0.6, phi=2.0),
+                   CylindricalWedge(r_inner=0.3, r_outer=1.0, phi=2.0, z=[-0.5, 0.7]),
+                   ConicalWedge(phi=1.5, theta=np.pi / 5, z=[-0.7, 1.0], z_offset=0.3, r_min=0.1),
+                   Torus(r_torus=1.0, r_tube=[0.1, 0.4]),
+                   ParallelepipedTriclinic(a=1.0, b=1.2, c=0.8, alpha=1.2, beta=1.4, gamma=1.9)]
+        for figure in figures:
+            volume = np.count_nonzero(figure.contains(xyz)) / xyz.shape[0] * 27
+            self.assertAlmostEqual(volume, figure.volume(), delta=0.05)
+
+    def test_volume_and_surface_area(self):
+        figures = [Sphere(r_inner=0.3, r_outer=1.0),
+                   SphericalWedge(r_inner=0.2, r_outer=1.0, phi=4.0, theta=[0.3, 1.2]),
+                   SphericalSegmentWedge(r_inner=0.3, r_outer=1.0, h1=-0.2, h2=0.6, phi=2.0),
+                   CylindricalWedge(r_inner=0.3, r_outer=1.0, phi=2.0, z=[-0.5, 0.7]),
+                   ConicalWedge(phi=1.5, theta=np.pi / 5, z=[-0.7, 1.0], z_offset=0.3, r_min=0.1),
+                   ToricWedge(phi=2.0, theta=[-1.0, 1.5], r_torus=1.0, r_tube=[0.1, 0.4]),
+                   ParallelepipedTriclinic(a=1.0, b=1.2, c=0.8, alpha=1.2, beta=1.4, gamma=1.9)]
+        for figure in figures:
+            area = sum(patch[0] for patch in figure._surface_patches())
+            self.assertAlmostEqual(figure.surface_area(), area, places=12)
+        torus = Torus(r_torus=1.0, r_tube=[0.1, 0.25])
+        self.assertAlmostEqual(torus.volume(), 2 * np.pi ** 2 * (0.25 ** 2 - 0.1 ** 2))
+        self.assertAlmostEqual(torus.inner_surface_area(), 4 * np.pi ** 2 * 0.1)
+        sphere = figures[0]
+        self.assertAlmostEqual(sphere.volume(), 4 / 3 * np.pi * (1 - 0.3 ** 3))
+        sphere.r_outer = 2.0
+        self.assertAlmostEqual(sphere.volume(), 4 / 3 * np.pi * (8 - 0.3 ** 3))
+        self.assertAlmostEqual(sphere.surface_area(), 4 * np.pi * (4 + 0.3 ** 2))
+        cube = Cube(a=1.0)
+        cube.a = 2.0
+        self.assertAlmostEqual(cube.volume(), 2.0)
+        np.testing.assert_allclose(cube.vectors[0], [2.0, 0.0, 0.0])
+
+    def test_batch_measures(self):
+        rng = np.random.default_rng(2)
+        parameters = {'r_inner': rng.uniform(0.0, 1.0, 20), 'r_outer': rng.uniform(0.5, 2.0, 20),
+                      'phi': rng.uniform(0.1, 7.0, 20), 'theta': rng.uniform(-1.0, 4.0, (20, 2))}
+        figures = [SphericalWedge(**values) for values in _rows(parameters)]
+        np.testing.assert_allclose(SphericalWedge.volume_batch(**parameters), [f.volume() for f in figures])
+        np.testing.assert_allclose(SphericalWedge.surface_area_batch(**parameters),
+                                   [f.surface_area() for f in figures])
+        parameters = {'phi': rng.uniform(0.1, 7.0, 20), 'theta': rng.uniform(0.0, 1.5, 20),
+                      'z': rng.uniform(-1.0, 1.0, (20, 2)), 'z_offset': rng.uniform(0.0, 1.0, 20), 'r_min': 0.1}
+        figures = [ConicalWedge(**values) for values in _rows(parameters)]
+        np.testing.assert_allclose(ConicalWedge.volume_batch(**parameters), [f.volume() for f in figures])
+        np.testing.assert_allclose(ConicalWedge.surface_area_batch(**parameters), [f.surface_area() for f in figures])
+        parameters = {'phi': rng.uniform(0.1, 7.0, 20), 'theta': rng.uniform(-4.0, 4.0, (20, 2)),
+                      'r_torus': 1.0, 'r_tube': rng.uniform(0.0, 0.5, (20, 2))}
+        figures = [ToricWedge(**values) for values in _rows(parameters)]
+        np.testing.assert_allclose(ToricWedge.surface_area_batch(**parameters), [f.surface_area() for f in figures])
+        np.testing.assert_allclose(Sphere.volume_batch(r_outer=[[1.0], [2.0]]), 4 / 3 * np.pi * np.array([[1.0], [8.0]]))
+        np.testing.assert_allclose(Cube.surface_area_batch([1.0, 2.0]), [6.0, 24.0])
+        self.assertAlmostEqual(ParallelepipedTriclinic.volume_batch(1.0, 1.2, 0.8, 1.2, 1.4, 1.9),
+                               ParallelepipedTriclinic(a=1.0, b=1.2, c=0.8, alpha=1.2, beta=1.4, gamma=1.9).volume())
+
+    def test_contains_wedge_angles(self):
+        wedge = SphericalWedge(r_inner=0.5, r_outer=1.0, phi=np.pi / 2, theta=[np.pi / 4, np.pi / 2])
+        mask = wedge.contains(np.array([[0.5, 0.5, 0.1],
+                                        [-0.5, 0.5, 0.1],
+                                        [0.3, 0.3, 0.6],
+                                        [0.1, 0.1, 0.0],
+                                        [0.5, 0.5, -0.1]]))
+        np.testing.assert_array_equal(mask, [True, False, False, False, False])
+        cylinder = CylindricalWedge(r_inner=0.5, r_outer=1.0, phi=3 * np.pi / 2, z=[0.0, 1.0])
+        mask = cylinder.contains(np.array([[0.0, -0.75, 0.5], [0.5, -0.5, 0.5], [0.75, 0.0, 1.5]]))
+        np.testing.assert_array_equal(mask, [True, False, False])
+        torus = ToricWedge(phi=2 * np.pi, theta=[-np.pi / 2, np.pi / 2], r_torus=1.0, r_tube=[0.0, 0.25])
+        mask = torus.contains(np.array([[1.2, 0.0, 0.0], [0.8, 0.0, 0.0], [1.0, 0.0, 0.2], [0.0, 1.1, -0.1]]))
+        np.testing.assert_array_equal(mask, [True, False, True, True])
+
+    def test_contains_space_hierarchy(self):
+        scene = Space('Scene', coordinate_system=Cartesian(origin=np.array([10.0, 0.0, 0.0])))
+        cube = Cube(a=1.0, coordinate_system=Cartesian(origin=np.array([0.0, 5.0, 0.0])))
+        cube.coordinate_system.rotate_axis_angle(np.array([0.0, 0.0, 1.0]), np.pi / 2)
+        scene.add_element(cube)
+        mask = cube.contains(np.array([[9.5, 5.5, 0.5], [10.5, 5.5, 0.5], [9.5, 5.5, 1.5]]))
+        np.testing.assert_array_equal(mask, [True, False, False])
+        cylinder = Cylinder(r_outer=1.0, z=[0.0, 1.0])
+        self.assertTrue(cylinder.contains([0.5, 0.0, 0.5])[0])
+        self.assertEqual(cylinder.contains(np.empty((0, 3))).size, 0)
+
+    def test_signed_distance_exact(self):
+        sphere = Sphere(r_inner=0.5, r_outer=1.0)
+        np.testing.assert_allclose(sphere.signed_distance(np.array([[2.0, 0.0, 0.0], [0.0, 0.8, 0.0],
+                                                                    [0.0, 0.0, 0.1]])), [1.0, -0.2, 0.4])
+        cube = Cube(a=1.0)
+        np.testing.assert_allclose(cube.signed_distance(np.array([[2.0, 2.0, 0.5], [0.5, 0.5, 0.6]])),
+                                   [np.sqrt(2.0), -0.4])
+        cylinder = Cylinder(r_outer=1.0, z=[0.0, 1.0])
+        np.testing.assert_allclose(cylinder.signed_distance(np.array([[0.0, 0.0, 0.5], [2.0, 0.0, 2.0]])),
+                                   [-0.5, np.sqrt(2.0)])
+        torus = Torus(r_torus=1.0, r_tube=[0.0, 0.25])
+        np.testing.assert_allclose(torus.signed_distance(np.array([[0.0, 0.0, 0.0], [0.0, 1.1, 0.0]])),
+                                   [0.75, -0.15])
+
+    def test_signed_distance_conservative(self):
+        rng = np.random.default_rng(1)
+        p = rng.uniform(-1.5, 1.5, size=(50000, 3))
+        q = p + rng.normal(0.0, 0.05, size=p.shape)
+        step = np.linalg.norm(p - q, axis=1)
+        figures = [SphericalWedge(r_inner=0.2, r_outer=1.0, phi=4.0, theta=[0.3, 1.2]),
+                   CylindricalWedge(r_inner=0.3, r_outer=1.0, phi=2.0, z=[-0.5, 0.7]),
+                   ConicalWedge(phi=1.5, theta=np.pi / 5, z=[-0.7, 1.0], z_offset=0.3, r_min=0.1),
+                   ToricWedge(phi=2.0, theta=[-1.0, 1.5], r_torus=1.0, r_tube=[0.1, 0.4]),
+                   ParallelepipedTriclinic(a=1.0, b=1.2, c=0.8, alpha=1.2, beta=1.4, gamma=1.9)]
+        for figure in figures:
+            d_p = figure.signed_distance(p)
+            d_q = figure.signed_distance(q)
+            self.assertTrue(np.all(np.abs(d_p - d_q) <= step * (1 + 1e-9)))
+            np.testing.assert_array_equal(d_p <= 0, figure.contains(p))
+
+    def test_signed_distance_composition(self):
+        scene = Space('Scene', coordinate_system=Cartesian(origin=np.array([0.0, 0.0, 1.0])))
+        sphere = Sphere(r_outer=1.0)
+        cube = Cube(a=1.0)
+        scene.add_element(sphere)
+        scene.add_element(cube)
+        xyz = np.array([[0.0, 0.0, 1.0], [0.5, 0.5, 1.5], [3.0, 0.0, 1.0]])
+        d_sphere = sphere.signed_distance(xyz)
+        d_cube = cube.signed_distance(xyz)
+        np.testing.assert_allclose(d_sphere, [-1.0, -(1 - np.sqrt(0.75)), 2.0])
+        np.testing.assert_allclose(sdf_union(d_sphere, d_cube), np.minimum(d_sphere, d_cube))
+        np.testing.assert_allclose(sdf_intersection(d_sphere, d_cube), np.maximum(d_sphere, d_cube))
+        np.testing.assert_allclose(sdf_difference(d_sphere, d_cube), np.maximum(d_sphere, -d_cube))
+
+    def test_sample_volume(self):
+        figures = [SphericalSegmentWedge(r_inner=0.3, r_outer=1.0, h1=-0.2, h2=0.6, phi=2.0),
+                   ConicalWedge(phi=1.5, theta=np.pi / 5, z=[-0.7, 1.0], z_offset=0.3, r_min=0.1),
+                   ToricWedge(phi=2.0, theta=[-1.0, 1.5], r_torus=1.0, r_tube=[0.1, 0.4]),
+                   SphericalWedge(r_inner=0.2, r_outer=1.0, phi=1.0, theta=[0.3, 1.2]),
+                   ParallelepipedTriclinic(a=1.0, b=1.2, c=0.8, alpha=1.2, beta=1.4, gamma=1.9)]
+        for figure in figures:
+            figure.coordinate_system = Cartesian(origin=np.array([1.0, 2.0, 3.0]))
+            chunks = list(figure.sample_volume(25000, chunk_size=10000, method='sobol', seed=1))
+            self.assertEqual([chunk.shape[0] for chunk in chunks], [10000, 10000, 5000])
+            xyz = np.vstack(chunks)
+            self.assertTrue(np.all(figure.contains(xyz)))
+            np.testing.assert_array_equal(xyz, np.vstack(list(figure.sample_volume(25000, chunk_size=10000,
+                                                                                   method='sobol', seed=1))))
+        cylinder = Cylinder(r_inner=0.5, r_outer=1.0, z=[0.0, 2.0])
+        for method in ('random', 'sobol', 'halton'):
+            xyz = np.vstack(list(cylinder.sample_volume(2 ** 16, method=method, seed=0)))
+            rho = np.sqrt(xyz[:, 0] ** 2 + xyz[:, 1] ** 2)
+            self.assertAlmostEqual(np.mean(rho < 0.75), (0.75 ** 2 - 0.25) / 0.75, delta=0.01)
+            self.assertAlmostEqual(np.mean(xyz[:, 2]), 1.0, delta=0.01)
+        self.assertRaises(ValueError, next, cylinder.sample_volume(10, method='grid'))
+
+    def test_sample_surface(self):
+        cylinder = Cylinder(r_outer=1.0, z=[0.0, 1.0], coordinate_system=Cartesian(origin=np.array([0.0, 0.0, 5.0])))
+        chunks = list(cylinder.sample_surface(2 ** 15, chunk_size=2 ** 13, method='sobol', seed=0, normals=True))
+        xyz = np.vstack([points for points, _ in chunks])
+        normals = np.vstack([directions for _, directions in chunks])
+        self.assertEqual(xyz.shape, (2 ** 15, 3))
+        np.testing.assert_allclose(cylinder.signed_distance(xyz), 0.0, atol=1e-12)
+        np.testing.assert_allclose(np.linalg.norm(normals, axis=1), 1.0)
+        self.assertTrue(np.all(cylinder.signed_distance(xyz + 1e-6 * normals) > 0))
+        on_bases = np.isclose(xyz[:, 2], 5.0) | np.isclose(xyz[:, 2], 6.0)
+        self.assertAlmostEqual(np.mean(on_bases), 2 * np.pi / (4 * np.pi), delta=0.01)
+        torus = ToricWedge(phi=2.0, theta=[-1.0, 1.5], r_torus=1.0, r_tube=[0.1, 0.4])
+        xyz = np.vstack(list(torus.sample_surface(10000, seed=3)))
+        np.testing.assert_allclose(torus.signed_distance(xyz), 0.0, atol=1e-12)
+
+    def test_meshes(self):
+        sphere = Sphere(r_outer=1.0, coordinate_system=Cartesian(origin=np.array([0.0, 0.0, 5.0])))
+        vertices, triangles = sphere.surface_mesh(32)
+        self.assertEqual(triangles.dtype, np.int32)
+        local_vertices, local_triangles = sphere.surface_mesh(32, global_coordinates=False)
+        self.assertIs(local_triangles, triangles)
+        self.assertFalse(local_vertices.flags.writeable or triangles.flags.writeable)
+        np.testing.assert_allclose(sphere.signed_distance(vertices), 0.0, atol=1e-12)
+        edges = np.sort(np.vstack((triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]])), axis=1)
+        self.assertTrue(np.all(np.unique(edges, axis=0, return_counts=True)[1] == 2))
+        a = vertices[triangles[:, 1]] - vertices[triangles[:, 0]]
+        b = vertices[triangles[:, 2]] - vertices[triangles[:, 0]]
+        centers = vertices[triangles].mean(axis=1) - np.array([0.0, 0.0, 5.0])
+        self.assertTrue(np.all(np.einsum('ij,ij->i', np.cross(a, b), centers) > 0))
+        self.assertAlmostEqual(np.linalg.norm(np.cross(a, b), axis=1).sum() / 2, 4 * np.pi, delta=0.1)
+        for cell_type, corners in (('tetrahedron', 4), ('hexahedron', 8)):
+            vertices, cells = sphere.volume_mesh(16, cell_type=cell_type)
+            self.assertEqual(cells.shape[1], corners)
+            self.assertTrue(np.all(sphere.signed_distance(vertices) < 1e-12))
+        vertices, cells = sphere.volume_mesh(16, global_coordinates=False)
+        a, b, c = [vertices[cells[:, i]] - vertices[cells[:, 0]] for i in (1, 2, 3)]
+        volumes = np.einsum('ij,ij->i', a, np.cross(b, c)) / 6
+        self.assertTrue(np.all(volumes > 0))
+        self.assertAlmostEqual(volumes.sum(), 4 * np.pi / 3, delta=0.2)
+        sphere.r_outer = 2.0
+        vertices, new_triangles = sphere.surface_mesh(32, global_coordinates=False)
+        self.assertIsNot(new_triangles, triangles)
+        np.testing.assert_allclose(np.linalg.norm(vertices, axis=1), 2.0)
+        cube = Cube(a=2.0)
+        vertices, cells = cube.volume_mesh(4, cell_type='hexahedron')
+        self.assertEqual(cells.shape, (64, 8))
+        self.assertEqual(vertices.shape, (125, 3))
+
+    def test_intersect_rays(self):
+        shell = Sphere(r_inner=0.5, r_outer=1.0, coordinate_system=Cartesian(origin=np.array([3.0, 0.0, 0.0])))
+        entry, exit, path_length = shell.intersect_rays([[0.0, 0.0, 0.0], [0.0, 0.75, 0.0], [0.0, 2.0, 0.0]],
+                                                        [2.0, 0.0, 0.0])
+        np.testing.assert_allclose(entry[:2], [2.0, 3.0 - np.sqrt(1 - 0.75 ** 2)], atol=1e-9)
+        np.testing.assert_allclose(exit[:2], [4.0, 3.0 + np.sqrt(1 - 0.75 ** 2)], atol=1e-9)
+        np.testing.assert_allclose(path_length, [1.0, 2 * np.sqrt(1 - 0.75 ** 2), 0.0], atol=1e-9)
+        self.assertTrue(np.isnan(entry[2]) and np.isnan(exit[2]))
+        entry, exit, path_length = shell.intersect_rays([3.0, 0.0, 0.0], [0.0, 0.0, 1.0], t_max=0.8)
+        np.testing.assert_allclose([entry[0], exit[0], path_length[0]], [0.5, 0.8, 0.3], atol=1e-9)
+        torus = ToricWedge(phi=np.pi, theta=[0.0, 2 * np.pi], r_torus=2.0, r_tube=[0.0, 0.5])
+        _, _, path_length = torus.intersect_rays([[-5.0, 0.1, 0.0], [-5.0, -0.1, 0.0]], [1.0, 0.0, 0.0])
+        self.assertEqual(path_length[1], 0.0)
+        xyz = np.column_stack((np.linspace(-5.0, 5.0, 100001), np.full(100001, 0.1), np.zeros(100001)))
+        self.assertAlmostEqual(path_length[0], np.count_nonzero(torus.contains(xyz)) * 1e-4, delta=1e-3)
+
+    def test_cast_rays(self):
+        scene = Space('Scene')
+        rng = np.random.default_rng(5)
+        for origin in rng.uniform(-5.0, 5.0, (20, 3)):
+            scene.add_element(Sphere(r_outer=0.5, coordinate_system=Cartesian(origin=origin)))
+        origins = rng.uniform(-6.0, 6.0, (2000, 3))
+        directions = rng.normal(size=(2000, 3))
+        rays, items, entry, exit, path_length = cast_rays(scene, origins, directions, t_max=20.0)
+        self.assertTrue(np.all(np.diff(rays) >= 0))
+        figures = [element for element in scene.elements.values()]
+        expected = np.zeros((2000, 20))
+        for i, figure in enumerate(figures):
+            expected[:, i] = figure.intersect_rays(origins, directions, t_max=20.0)[2]
+        self.assertEqual(np.count_nonzero(expected), rays.size)
+        index = [figures.index(item) for item in np.array(SpaceIndex(scene).items, dtype=object)[items]]
+        np.testing.assert_allclose(path_length, expected[rays, index])
+        np.testing.assert_allclose(exit - entry, path_length, atol=1e-9)
+
+
+def _rows(parameters):
+    """
+    Splits dictionary of batch parameters into per-figure keyword arguments.
+    """
+    size = max(np.shape(value)[0] for value in parameters.values() if np.ndim(value) > 0)
+    return [{key: value[i] if np.ndim(value) > 0 else value for key, value in parameters.items()} for i in range(size)]
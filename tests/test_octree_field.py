@@ -0,0 +1,48 @@
+import unittest
+import numpy as np
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve.Parametric import Line
+from BDSpace.Field import OctreeField, ConstantVectorConservativeField
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField, HyperbolicPotentialCurveConservativeField
+
+
+class TestOctreeField(unittest.TestCase):
+
+    def setUp(self):
+        self.box = [[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]]
+        self.points = np.random.RandomState(0).uniform(-1.0, 1.0, (2000, 3))
+
+    def test_linear_field(self):
+        field = ConstantVectorConservativeField('Linear', 'electrostatic', np.array([1.0, -2.0, 0.5]))
+        octree = OctreeField('Octree', field, self.box)
+        self.assertEqual(octree.depth, 0)
+        self.assertEqual(octree.num_leaves, 64)
+        self.assertEqual(octree.type, 'electrostatic')
+        np.testing.assert_allclose(octree.scalar_field(self.points), field.scalar_field(self.points), atol=1e-12)
+        np.testing.assert_allclose(octree.vector_field(self.points), field.vector_field(self.points), atol=1e-12)
+        self.assertAlmostEqual(octree.scalar_field_point(np.array([0.5, 0.5, 0.5])), -0.25)
+        np.testing.assert_allclose(octree.scalar_field(np.array([[2.0, 0.0, 0.0]])), [0.0])
+        np.testing.assert_allclose(octree.bounding_box(), self.box)
+        with self.assertRaises(ValueError):
+            OctreeField('Octree', field, [[0.0, 0.0, 0.0], [1.0, 0.0, 1.0]])
+
+    def test_point_charge(self):
+        charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.05, a=2.0)
+        charge.coordinate_system = Cartesian(origin=[0.3, -0.2, 0.1])
+        octree = OctreeField('Octree', charge, self.box, max_depth=5, rtol=1e-2)
+        self.assertEqual(octree.depth, 5)
+        exact = np.asarray(charge.scalar_field(charge.to_local_coordinate_system(self.points)))
+        np.testing.assert_allclose(octree.scalar_field(self.points), exact, rtol=1e-2)
+        self.assertLess(octree.num_samples, 129 ** 3 / 5)
+
+    def test_wire(self):
+        line = Line(origin=np.array([0.0, 0.0, -2.0]), a=0.0, b=0.0, c=4.0)
+        wire = HyperbolicPotentialCurveConservativeField('Wire', 'electrostatic', line, r=0.01)
+        wire.a = 1.0
+        octree = OctreeField('Octree', wire, self.box, max_depth=6, rtol=1e-2)
+        np.testing.assert_allclose(octree.scalar_field(self.points), wire.scalar_field(self.points), rtol=1e-2)
+        self.assertLess(octree.num_samples, 257 ** 3 / 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
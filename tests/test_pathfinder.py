@@ -0,0 +1,126 @@
+import gc
+import weakref
+import unittest
+import numpy as np
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Pathfinder import line_between_two_points, helix_between_two_points, arc_between_two_points
+from BDSpace.Pathfinder import PathBatch, lines_between_points, helices_between_points, arcs_between_points
+from BDSpace.Pathfinder import occupancy_grid, plan_path
+from BDSpace import Space, SpaceIndex
+from BDSpace.Figure.Sphere import Sphere
+from BDSpace.Figure.Cube import Cube
+
+
+class TestPathBatch(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.coordinate_system = Cartesian(origin=np.array([0.5, -1.0, 2.0]))
+        self.coordinate_system.rotate_axis_angle(np.array([1.0, 2.0, 3.0]), 0.7)
+        self.points1 = random.uniform(-2.0, 2.0, (10, 3))
+        self.points2 = random.uniform(-2.0, 2.0, (10, 3))
+        self.right = random.rand(10) > 0.5
+
+    def check_batch(self, batch, path):
+        self.assertEqual(len(batch), 10)
+        t = batch.linspace(9)
+        points = batch.generate_points(t)
+        tangents = batch.tangent(t)
+        lengths = batch.length()
+        np.testing.assert_allclose(points[:, 0], self.points1 @ np.asarray(self.coordinate_system.basis)
+                                   + np.asarray(self.coordinate_system.origin), atol=1e-12)
+        for i in range(10):
+            curve = path(i)
+            self.assertAlmostEqual(curve.start, batch.start[i])
+            self.assertAlmostEqual(curve.stop, batch.stop[i])
+            np.testing.assert_allclose(points[i], curve.to_global_coordinate_system(curve.generate_points(t[i])),
+                                       atol=1e-12)
+            origin = np.asarray(curve.to_global_coordinate_system_vector(np.zeros(3)))
+            np.testing.assert_allclose(tangents[i],
+                                       np.asarray(curve.to_global_coordinate_system(curve.derivative(t[i]))) - origin,
+                                       atol=1e-12)
+            self.assertAlmostEqual(lengths[i] / curve.length(), 1.0, places=10)
+            single = batch.curve(i)
+            np.testing.assert_allclose(single.to_global_coordinate_system(single.generate_points(t[i])), points[i],
+                                       atol=1e-12)
+
+    def test_lines(self):
+        batch = lines_between_points(self.coordinate_system, self.points1, self.points2)
+        self.check_batch(batch, lambda i: line_between_two_points(self.coordinate_system,
+                                                                  self.points1[i], self.points2[i]))
+
+    def test_helices(self):
+        batch = helices_between_points(self.coordinate_system, self.points1, self.points2, radius=0.4, loops=2,
+                                       right=self.right)
+        self.check_batch(batch, lambda i: helix_between_two_points(self.coordinate_system,
+                                                                   self.points1[i], self.points2[i],
+                                                                   radius=0.4, loops=2, right=self.right[i]))
+
+    def test_arcs(self):
+        batch = arcs_between_points(self.coordinate_system, self.points1, self.points2, radius=3.0, right=self.right)
+        self.check_batch(batch, lambda i: arc_between_two_points(self.coordinate_system,
+                                                                 self.points1[i], self.points2[i],
+                                                                 radius=3.0, right=self.right[i]))
+        self.assertEqual(batch.generate_points(np.array([0.5, 1.0])).shape, (10, 2, 3))
+        with self.assertRaises(ValueError):
+            PathBatch('spiral', np.zeros((1, 3)), np.eye(3), 0.0, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class TestPlanner(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = Space('Scene')
+        self.scene.add_element(Sphere('Ball', r_outer=1.0))
+        self.scene.add_element(Cube('Box', a=1.0, coordinate_system=Cartesian(origin=np.array([1.5, -2.0, -0.5]))))
+        self.box = [[-3.5, -3.5, -3.5], [3.5, 3.5, 3.5]]
+        self.start = np.array([-3.0, 0.0, 0.1])
+        self.goal = np.array([3.0, 0.2, 0.0])
+
+    def route_points(self, curves):
+        points = []
+        for curve in curves:
+            t = np.linspace(curve.start, curve.stop, 50)
+            curve_points = np.asarray(curve.to_global_coordinate_system(curve.generate_points(t)))
+            if points:
+                np.testing.assert_allclose(curve_points[0], points[-1][-1], atol=1e-9)
+            points.append(curve_points)
+        return np.vstack(points)
+
+    def test_route(self):
+        for corner_radius in (0.0, 0.5):
+            curves = plan_path(self.scene, self.start, self.goal, voxel_size=0.1, box=self.box, clearance=0.2,
+                               corner_radius=corner_radius)
+            points = self.route_points(curves)
+            np.testing.assert_allclose(points[0], self.start, atol=1e-12)
+            np.testing.assert_allclose(points[-1], self.goal, atol=1e-12)
+            self.assertGreaterEqual(np.sqrt(np.sum(points ** 2, axis=1)).min(), 1.2 - 1e-9)
+            self.assertFalse(np.any(self.scene.elements['Box'].contains(points)))
+            self.assertLess(sum(curve.length() for curve in curves), 7.0)
+
+    def test_grid_cache(self):
+        grid = occupancy_grid(self.scene, 0.1, box=self.box, clearance=0.2)
+        self.assertIs(occupancy_grid(self.scene, 0.1, box=self.box, clearance=0.2), grid)
+        self.assertFalse(np.all(grid.is_free(np.array([[0.0, 0.0, 0.0], [-3.0, 0.0, 0.1]]))))
+        self.scene.elements['Box'].coordinate_system.origin = np.array([1.5, 2.0, -0.5])
+        moved = occupancy_grid(self.scene, 0.1, box=self.box, clearance=0.2)
+        self.assertIsNot(moved, grid)
+        self.assertIsNot(occupancy_grid(self.scene, 0.2, box=self.box, clearance=0.2), moved)
+        # figure queries do not invalidate the grid and the cache does not keep the scene alive
+        self.scene.elements['Box'].contains(np.zeros((1, 3)))
+        self.assertIs(occupancy_grid(SpaceIndex(self.scene), 0.1, box=self.box, clearance=0.2), moved)
+        scene = weakref.ref(self.scene)
+        self.scene = None
+        gc.collect()
+        self.assertIsNone(scene())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            plan_path(self.scene, np.zeros(3), self.goal, voxel_size=0.1, box=self.box)
+        shell = Space('Shell')
+        shell.add_element(Sphere('Shell', r_inner=1.0, r_outer=1.5, coordinate_system=Cartesian(origin=self.goal)))
+        self.assertIsNone(plan_path(shell, self.start, self.goal, voxel_size=0.25, box=self.box))
+
@@ -0,0 +1,129 @@
+import pickle
+import unittest
+import numpy as np
+from BDSpace import Space
+from BDSpace.Figure.Sphere import Sphere, SphericalWedge
+from BDSpace.Figure.Cube import Cube
+from BDSpace.Figure.Cylinder import Cylinder
+from BDSpace.Figure.Cone import ConicalWedge
+from BDSpace.Figure.Torus import Torus
+from BDSpace.Figure.CSG import Difference
+from BDSpace.Curve import Line, Arc, Helix, PolylineCurve, CubicSplineCurve, VectorizedParametricCurve
+from BDSpace.Curve import CompositeCurve
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField, ConstantVectorConservativeField
+from BDSpace.Field import VectorizedSphericallySymmetric, SuperposedField, HyperbolicPotentialCurveConservativeField
+from BDSpace.Field import OctreeField, ProcessPoolFieldEvaluator
+
+
+def round_trip(obj):
+    return pickle.loads(pickle.dumps(obj))
+
+
+class TestPickle(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.points = np.ascontiguousarray(random.uniform(-3.0, 3.0, (300, 3)))
+        self.root = Space('Root')
+        self.root.coordinate_system.origin = np.array([0.2, 0.1, -0.3])
+        self.root.coordinate_system.rotate_axis_angle(np.array([1.0, 2.0, 3.0]), 0.7)
+
+    def test_figures(self):
+        sphere = Sphere('Sphere', r_outer=1.5)
+        sphere.coordinate_system.origin = np.array([0.3, 0.0, 0.0])
+        difference = Difference('Difference', figures=[Sphere('Ball'), Cube('Box', a=1.2)])
+        difference.coordinate_system.rotate_axis_angle(np.array([0.0, 1.0, 0.0]), 0.4)
+        figures = [sphere, SphericalWedge('Wedge', r_inner=0.5, r_outer=2.0), Cube('Cube', a=1.3),
+                   Cylinder('Cylinder', r_inner=0.2, r_outer=1.0, z=[0.0, 2.0]), ConicalWedge('Cone'),
+                   Torus('Torus', r_torus=1.5, r_tube=0.4), difference]
+        for figure in figures:
+            self.root.add_element(figure)
+        root = round_trip(self.root)
+        self.assertEqual(sorted(root.elements), sorted(self.root.elements))
+        for figure in figures:
+            restored = root.elements[figure.name]
+            self.assertIs(type(restored), type(figure))
+            self.assertIs(restored.parent, root)
+            np.testing.assert_array_equal(np.asarray(restored.contains(self.points)),
+                                          np.asarray(figure.contains(self.points)))
+        restored = round_trip(difference)
+        self.assertEqual([operand.name for operand in restored.operands], ['Ball', 'Box'])
+        self.assertTrue(all(operand.parent is restored for operand in restored.operands))
+        np.testing.assert_array_equal(np.asarray(restored.contains(self.points)),
+                                      np.asarray(difference.contains(self.points)))
+
+    def test_curves(self):
+        vertices = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [2.0, 1.0, 1.0]])
+        curves = [Line('Line', a=1.0, b=2.0, c=0.5, start=0.1, stop=2.0),
+                  Arc('Arc', a=2.0, b=1.0, start=0.3, stop=2.0, right=False),
+                  Helix('Helix', radius=0.5, pitch=0.3, stop=5.0),
+                  PolylineCurve(vertices), CubicSplineCurve(vertices, boundary='not-a-knot'),
+                  VectorizedParametricCurve(np.cos, np.sin, np.negative, stop=3.0),
+                  CompositeCurve([Line(stop=1.0), Arc(start=0.0, stop=1.0), PolylineCurve(vertices)])]
+        curves[3].stop = 2.0
+        t = np.linspace(0.0, 1.0, 37)
+        for curve in curves:
+            curve.coordinate_system.rotate_axis_angle(np.array([1.0, 1.0, 0.0]), 0.3)
+            restored = round_trip(curve)
+            self.assertIs(type(restored), type(curve))
+            self.assertEqual((restored.start, restored.stop), (curve.start, curve.stop))
+            curve_t = curve.start + (curve.stop - curve.start) * t
+            np.testing.assert_allclose(
+                np.asarray(restored.to_global_coordinate_system(restored.generate_points(curve_t))),
+                np.asarray(curve.to_global_coordinate_system(curve.generate_points(curve_t))), atol=1e-12)
+
+    def check_field(self, field, restored):
+        self.assertIs(type(restored), type(field))
+        np.testing.assert_allclose(np.asarray(restored.scalar_field(self.points)),
+                                   np.asarray(field.scalar_field(self.points)))
+        np.testing.assert_allclose(np.asarray(restored.vector_field(self.points)),
+                                   np.asarray(field.vector_field(self.points)))
+        np.testing.assert_allclose(np.asarray(restored.to_global_coordinate_system(self.points)),
+                                   np.asarray(field.to_global_coordinate_system(self.points)))
+
+    def test_fields(self):
+        point_charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.3, a=2.0)
+        point_charge.coordinate_system.origin = np.array([1.0, 0.0, 0.0])
+        point_charge.cutoff = 5.0
+        helix = Helix('Helix', radius=0.7, pitch=0.4, stop=8.0)
+        helix.coordinate_system.rotate_axis_angle(np.array([0.0, 1.0, 0.0]), 0.5)
+        wire = HyperbolicPotentialCurveConservativeField('Wire', 'electrostatic', helix, r=0.05)
+        wire.a = 0.3
+        uniform = ConstantVectorConservativeField('Uniform', 'electrostatic', np.array([0.1, 0.2, 0.3]))
+        law = VectorizedSphericallySymmetric('Law', 'electrostatic', np.exp)
+        superposed = SuperposedField('Superposed', [point_charge, wire, uniform])
+        for element in (point_charge, helix, uniform, law, superposed):
+            self.root.add_element(element)
+        root = round_trip(self.root)
+        for field in (point_charge, uniform, law, superposed):
+            self.check_field(field, root.elements[field.name])
+        restored = root.elements['Helix'].elements['Wire']
+        self.check_field(wire, restored)
+        self.assertEqual(restored.cutoff, wire.cutoff)
+        self.assertIs(restored.curve, root.elements['Helix'])
+        # pickling an element keeps its parents, so global transforms are preserved
+        restored = round_trip(superposed)
+        self.check_field(superposed, restored)
+        self.assertEqual(restored.parent.name, 'Root')
+        self.check_field(wire, round_trip(wire))
+        octree = OctreeField('Octree', point_charge, [[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]], max_depth=2)
+        restored = round_trip(octree)
+        self.check_field(octree, restored)
+        self.assertEqual((restored.depth, restored.num_samples), (octree.depth, octree.num_samples))
+
+    def test_process_pool_evaluator(self):
+        point_charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.3, a=2.0)
+        uniform = ConstantVectorConservativeField('Uniform', 'electrostatic', np.array([0.1, 0.2, 0.3]))
+        field = SuperposedField('Superposed', [point_charge, uniform])
+        self.root.add_element(field)
+        with ProcessPoolFieldEvaluator(field, processes=2) as evaluator:
+            np.testing.assert_allclose(evaluator.scalar_field(self.points),
+                                       np.asarray(field.scalar_field(self.points)))
+            np.testing.assert_allclose(evaluator.vector_field(self.points),
+                                       np.asarray(field.vector_field(self.points)))
+            # workers get the new field after any change of the field or its parents
+            point_charge.a = 3.0
+            self.root.coordinate_system.origin = np.array([1.0, 1.0, 1.0])
+            np.testing.assert_allclose(evaluator.scalar_field(self.points),
+                                       np.asarray(field.scalar_field(self.points)))
+            self.assertEqual(evaluator.vector_field(np.zeros((0, 3))).shape, (0, 3))
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from BDSpace import Space, SceneFile, save_scene, load_scene
+from BDSpace.Figure.Sphere import Sphere
+from BDSpace.Figure.Cube import Cube
+from BDSpace.Figure.CSG import Difference
+from BDSpace.Curve import Line, Arc, Helix, PolylineCurve, CompositeCurve
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField, HyperbolicPotentialCurveConservativeField
+from BDSpace.Field import SuperposedField, OctreeField
+
+
+class TestScene(unittest.TestCase):
+
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.points = np.ascontiguousarray(random.uniform(-3.0, 3.0, (200, 3)))
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'scene.bds')
+        self.root = Space('Root')
+        self.root.coordinate_system.origin = np.array([0.1, 0.2, 0.3])
+        for i in range(20):
+            block = Space('Block %d' % i)
+            block.coordinate_system.origin = random.uniform(-10.0, 10.0, 3)
+            block.coordinate_system.rotate_axis_angle(random.normal(size=3), random.uniform())
+            self.root.add_element(block)
+            block.add_element(Sphere('Sphere', r_outer=random.uniform(0.5, 1.0)))
+            block.add_element(Difference('Difference', figures=[Cube('Cube'), Sphere('Ball', r_outer=0.6)]))
+            helix = Helix('Helix', radius=0.5, pitch=0.2, stop=random.uniform(5.0, 10.0))
+            block.add_element(helix)
+            HyperbolicPotentialCurveConservativeField('Wire', 'electrostatic', helix, r=0.01).a = 0.1
+            block.add_element(PolylineCurve(random.uniform(size=(random.randint(3, 9), 3)), name='Polyline'))
+        self.root.add_element(CompositeCurve([Line(stop=1.0), Arc(start=0.0, stop=1.0)], name='Route'))
+        self.charge = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=0.1, a=1.0)
+        self.charge.cutoff = 4.0
+        self.root.elements['Block 3'].add_element(self.charge)
+        wire = self.root.elements['Block 5'].elements['Helix'].elements['Wire']
+        self.root.add_element(SuperposedField('Total', [self.charge, wire]))
+        self.root.add_element(OctreeField('Octree', self.charge, [[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]],
+                                          max_depth=2))
+        save_scene(self.root, self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assert_same_field(self, field, loaded):
+        np.testing.assert_allclose(np.asarray(loaded.scalar_field(self.points)),
+                                   np.asarray(field.scalar_field(self.points)))
+        np.testing.assert_allclose(np.asarray(loaded.vector_field(self.points)),
+                                   np.asarray(field.vector_field(self.points)))
+
+    def test_subtree(self):
+        with load_scene(self.path) as scene:
+            self.assertIsInstance(scene, SceneFile)
+            self.assertEqual(len(scene), 20 * 8 + 7)
+            block = scene.load('Root/Block 7')
+            # only the ancestors of the subtree are built besides the subtree itself
+            self.assertEqual(list(block.parent.elements), ['Block 7'])
+            self.assertIs(scene.load(['Root', 'Block 7']), block)
+            with self.assertRaises(KeyError):
+                scene.find('Root/Block 100')
+        saved = self.root.elements['Block 7']
+        self.assertEqual(sorted(block.elements), sorted(saved.elements))
+        for name in ('Sphere', 'Difference'):
+            np.testing.assert_array_equal(np.asarray(block.elements[name].contains(self.points)),
+                                          np.asarray(saved.elements[name].contains(self.points)))
+        polyline, saved_polyline = block.elements['Polyline'], saved.elements['Polyline']
+        t = np.linspace(0.0, polyline.stop, 11)
+        np.testing.assert_allclose(np.asarray(polyline.to_global_coordinate_system(polyline.generate_points(t))),
+                                   np.asarray(saved_polyline.to_global_coordinate_system(
+                                       saved_polyline.generate_points(t))))
+        helix = block.elements['Helix']
+        self.assert_same_field(saved.elements['Helix'].elements['Wire'], helix.elements['Wire'])
+        # mesh tree and arc-length table are loaded from the file
+        cache, saved_cache = helix._mesh_cache(), saved.elements['Helix']._mesh_cache()
+        self.assertEqual(sorted(cache), sorted(saved_cache))
+        for key in cache:
+            np.testing.assert_array_equal(cache[key], saved_cache[key])
+
+    def test_whole_scene(self):
+        root = load_scene(self.path, mmap=False).root
+        self.assertEqual(sorted(root.elements), sorted(self.root.elements))
+        np.testing.assert_allclose(np.asarray(root.to_global_coordinate_system(self.points)),
+                                   np.asarray(self.root.to_global_coordinate_system(self.points)))
+        self.assert_same_field(self.root.elements['Total'], root.elements['Total'])
+        self.assert_same_field(self.root.elements['Octree'], root.elements['Octree'])
+        self.assertIs(root.elements['Total'].fields[0], root.elements['Block 3'].elements['Charge'])
+        self.assertAlmostEqual(root.elements['Route'].length(), self.root.elements['Route'].length())
+        self.assertEqual(root.elements['Block 0'].elements['Difference'].operands[1].name, 'Ball')
+
+    def test_format(self):
+        with open(self.path, 'r+b') as f:
+            f.seek(8)
+            f.write(np.array([99], dtype='<u4').tobytes())
+        with self.assertRaises(ValueError):
+            load_scene(self.path)
+        with open(self.path, 'r+b') as f:
+            f.write(b'NOTSCENE')
+        with self.assertRaises(ValueError):
+            load_scene(self.path)
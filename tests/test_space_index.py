@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+from BDSpace import Space, SpaceIndex
+from BDSpace.Coordinates import Cartesian
+from BDSpace.Curve import Arc
+from BDSpace.Figure.Sphere import Sphere
+from BDSpace.Figure.Cube import Cube
+from BDSpace.Figure.CSG import Union
+from BDSpace.Field import HyperbolicPotentialSphericalConservativeField
+
+
+class TestSpaceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = Space('Scene')
+        rng = np.random.default_rng(1)
+        for origin in rng.uniform(-10.0, 10.0, (50, 3)):
+            self.scene.add_element(Sphere('Ball', r_outer=0.5, coordinate_system=Cartesian(origin=origin)))
+        self.group = Space('Group', coordinate_system=Cartesian(origin=[50.0, 0.0, 0.0]))
+        self.scene.add_element(self.group)
+        self.circle = Arc(name='Circle', a=1.0, b=1.0, start=0.0, stop=2 * np.pi)
+        self.group.add_element(self.circle)
+        self.field = HyperbolicPotentialSphericalConservativeField('Charge', 'electrostatic', r=1.0, a=1.0)
+        self.field.cutoff = 2.0
+        self.group.add_element(self.field)
+        self.index = SpaceIndex(self.scene)
+
+    def test_bounding_box(self):
+        ball = self.scene.elements['Ball']
+        origin = np.asarray(ball.coordinate_system.origin)
+        np.testing.assert_allclose(ball.bounding_box(), [origin - 0.5, origin + 0.5])
+        self.assertIsNone(self.group.bounding_box())
+        box = self.circle.bounding_box()
+        self.assertTrue(np.all(box[0] <= [49.0, -1.0, 0.0]) and np.all(box[1] >= [51.0, 1.0, 0.0]))
+        np.testing.assert_allclose(self.field.bounding_box(), [[48.0, -2.0, -2.0], [52.0, 2.0, 2.0]])
+        self.assertIs(self.field.bounding_box(), self.field.bounding_box())
+        version = self.group.coordinate_system.version
+        self.group.coordinate_system.origin = [60.0, 0.0, 0.0]
+        self.assertNotEqual(self.group.coordinate_system.version, version)
+        np.testing.assert_allclose(self.field.bounding_box(), [[58.0, -2.0, -2.0], [62.0, 2.0, 2.0]])
+        ball.r_outer = 1.0
+        np.testing.assert_allclose(ball.bounding_box()[1] - ball.bounding_box()[0], 2.0)
+        union = Union('Union', figures=[Cube('Cube', a=1.0), Sphere('Ball', r_outer=0.5)])
+        np.testing.assert_allclose(union.bounding_box(), [[-0.5, -0.5, -0.5], [1.0, 1.0, 1.0]])
+        union.operands[1].coordinate_system.origin = [2.0, 0.0, 0.0]
+        np.testing.assert_allclose(union.bounding_box(), [[0.0, -0.5, -0.5], [2.5, 1.0, 1.0]])
+
+    def test_queries_brute_force(self):
+        items = self.index.items
+        self.assertEqual(len(items), 52)
+        boxes = np.array([item.bounding_box() for item in items])
+        xyz = np.random.default_rng(2).uniform(-12.0, 55.0, (500, 3))
+        points, hits = self.index.query_points(xyz)
+        inside = np.all((xyz[:, np.newaxis] >= boxes[:, 0]) & (xyz[:, np.newaxis] <= boxes[:, 1]), axis=2)
+        self.assertEqual(set(zip(points, hits)), set(zip(*np.nonzero(inside))))
+        box = np.array([[-5.0, -5.0, -5.0], [5.0, 5.0, 5.0]])
+        overlap = np.all((boxes[:, 0] <= box[1]) & (boxes[:, 1] >= box[0]), axis=1)
+        np.testing.assert_array_equal(self.index.query_box(box), np.flatnonzero(overlap))
+        nearest, distance = self.index.nearest_batch(xyz)
+        distances = np.array([item.distance(xyz) for item in items])
+        np.testing.assert_allclose(distance, distances.min(axis=0))
+        np.testing.assert_array_equal(nearest, distances.argmin(axis=0))
+
+    def test_ray(self):
+        hits, t = self.index.query_ray([0.0, 0.0, 0.0], [1.0, 0.0, 0.0], t_max=100.0)
+        self.assertTrue(np.all(np.diff(t) >= 0))
+        self.assertIn(self.index.items.index(self.field), hits)
+        self.assertAlmostEqual(t[list(hits).index(self.index.items.index(self.field))], 48.0)
+        hits, t = self.index.query_ray([0.0, 0.0, 0.0], [1.0, 0.0, 0.0], t_max=40.0)
+        self.assertNotIn(self.index.items.index(self.field), hits)
+
+    def test_update(self):
+        self.assertFalse(self.index.update())
+        # read-only queries create temporary coordinate systems which must not invalidate the index
+        xyz = np.random.default_rng(3).uniform(-1.0, 1.0, (10, 3))
+        self.scene.elements['Ball'].contains(xyz)
+        self.field.to_local_coordinate_system(xyz)
+        self.assertFalse(self.index.update())
+        # changes outside of the tree make the index check the tree but keep it
+        Space('Other').coordinate_system.origin = [1.0, 0.0, 0.0]
+        self.assertFalse(self.index.update())
+        self.assertEqual(self.index.nearest([50.0, 0.0, 3.0])[0], self.index.items.index(self.field))
+        self.group.coordinate_system.origin = [0.0, 0.0, 100.0]
+        self.assertEqual(self.index.nearest([0.0, 0.0, 103.0]), (self.index.items.index(self.field), 1.0))
+        self.assertEqual(len(self.index.query_point([50.0, 0.0, 0.0])), 0)
+        self.scene.remove_element(self.group)
+        self.assertEqual(len(self.index.items), 50)
+        self.assertGreater(self.index.nearest([0.0, 0.0, 103.0])[1], 80.0)